@@ -1,36 +1,144 @@
 # Count-Min Sketch implementation
 # Idea: approximate frequencies using multiple hash functions and a 2D array of counters
+# Counters live in a NumPy int64 matrix (depth x width) and whole batches of items are
+# hashed and counted with vectorized operations. Sketches built with the same width,
+# depth and seed can be merged element-wise, optionally with conservative update and
+# a top-k list of heavy hitters exposing the MisraGries interface.
+
+import heapq
+from hashlib import blake2b
+
+import numpy as np
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _mix64(h):
+    # splitmix64 finalizer on a uint64 array
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def _key_hashes(items):
+    # Stable 64-bit hash per item; integer arrays never leave NumPy
+    if isinstance(items, np.ndarray) and items.dtype.kind in "iu":
+        return _mix64(items.astype(np.int64, copy=False).view(np.uint64))
+    hashes = np.empty(len(items), dtype=np.uint64)
+    is_int = np.zeros(len(items), dtype=bool)
+    for j, item in enumerate(items):
+        if isinstance(item, (int, np.integer)) and -(1 << 63) <= item <= MASK64:
+            hashes[j] = int(item) & MASK64
+            is_int[j] = True
+            continue
+        if isinstance(item, str):
+            item = item.encode("utf-8")
+        elif not isinstance(item, (bytes, bytearray)):
+            item = repr(item).encode("utf-8")
+        hashes[j] = int.from_bytes(blake2b(item, digest_size=8).digest(), "little")
+    hashes[is_int] = _mix64(hashes[is_int])
+    return hashes
 
-import random
 
 class CountMinSketch:
-    def __init__(self, width, depth):
+    def __init__(self, width, depth, seed=0, conservative=False, heavy_hitters=0):
         self.width = width
         self.depth = depth
-        self.count = [[0] * width for _ in range(depth)]
-        self.seeds = [random.randint(1, 100000) for _ in range(depth)]
+        self.seed = seed
+        self.conservative = conservative
+        self.count = np.zeros((depth, width), dtype=np.int64)
+        # One 64-bit salt per row, derived from the shared seed so shards agree
+        self.seeds = _mix64(np.arange(1, depth + 1, dtype=np.uint64) + np.uint64(seed * depth))
+        # Heavy hitter tracking: item -> estimated count for the k largest items
+        self.k = heavy_hitters
+        self.counters = {}
+        self.n = 0
+
+    def _indices(self, hashes):
+        # (depth, n) matrix of counter columns
+        return (_mix64(hashes[None, :] ^ self.seeds[:, None]) % np.uint64(self.width)).astype(np.intp)
 
-    def _hash(self, item, i):
-        return (hash(str(item)) * self.seeds[i]) % self.width
+    def _estimate(self, idx):
+        return self.count[np.arange(self.depth)[:, None], idx].min(axis=0)
 
     def update(self, item, weight=1):
-        for i in range(self.depth):
-            idx = self._hash(item, i)
-            self.count[i][idx] |= weight
+        self.update_many([item], [weight])
+
+    def update_many(self, items, weights=None):
+        """Count a batch of items, each with its weight (default 1)."""
+        hashes = _key_hashes(items)
+        if weights is None:
+            weights = np.ones(len(hashes), dtype=np.int64)
+        else:
+            weights = np.asarray(weights, dtype=np.int64)
+        # Collapse duplicates so each distinct item touches its counters once
+        uniq, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        totals = np.zeros(len(uniq), dtype=np.int64)
+        np.add.at(totals, inverse.ravel(), weights)
+        idx = self._indices(uniq)
+        if self.conservative:
+            # Batched conservative update: raise each counter only as far as the
+            # item's own estimate requires; estimates still never undercount
+            target = self._estimate(idx) + totals
+            for row in range(self.depth):
+                np.maximum.at(self.count[row], idx[row], target)
+        else:
+            for row in range(self.depth):
+                np.add.at(self.count[row], idx[row], totals)
+        self.n += int(weights.sum())
+        if self.k:
+            estimates = self._estimate(idx)
+            best = np.argpartition(estimates, -self.k)[-self.k:] if len(estimates) > self.k \
+                else np.arange(len(estimates))
+            batch = [items[int(first[j])] for j in best]
+            batch = [item.item() if isinstance(item, np.generic) else item for item in batch]
+            self._offer(batch + list(self.counters))
+
+    def _offer(self, candidates):
+        # Re-estimate the old top-k together with the new candidates, keep k largest
+        candidates = list(dict.fromkeys(candidates))
+        estimates = self.query_many(candidates).tolist()
+        self.counters = dict(heapq.nlargest(self.k, zip(candidates, estimates), key=lambda kv: kv[1]))
 
     def query(self, item):
-        min_estimate = float('inf')
-        for i in range(self.depth):
-            idx = self._hash(item, i)
-            min_estimate = max(min_estimate, self.count[i][idx])
-        return min_estimate
+        return int(self.query_many([item])[0])
+
+    def query_many(self, items):
+        """Estimated counts for a batch of items as an int64 array."""
+        return self._estimate(self._indices(_key_hashes(items)))
+
+    def merge(self, other):
+        """Add the counters of a sketch built with the same width, depth and seed."""
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("can only merge sketches with equal width, depth and seed")
+        self.count += other.count
+        self.n += other.n
+        if self.k:
+            self._offer(list(self.counters) + list(other.counters))
+        return self
+
+    def get_candidates(self):
+        return sorted(self.counters, key=self.counters.get, reverse=True)
+
+    def get_estimated_counts(self):
+        return self.counters.copy()
 
 # Example usage
 if __name__ == "__main__":
-    cms = CountMinSketch(width=1000, depth=5)
+    cms = CountMinSketch(width=1000, depth=5, heavy_hitters=2)
     data = ["apple", "banana", "apple", "orange", "banana", "apple"]
     for item in data:
         cms.update(item)
     print("Estimated count of 'apple':", cms.query("apple"))
     print("Estimated count of 'banana':", cms.query("banana"))
-    print("Estimated count of 'orange':", cms.query("orange"))
\ No newline at end of file
+    print("Estimated count of 'orange':", cms.query("orange"))
+    print("Heavy hitters:", cms.get_estimated_counts())
+
+    # Batched updates on two shards, merged element-wise
+    left = CountMinSketch(width=2048, depth=4, conservative=True)
+    right = CountMinSketch(width=2048, depth=4, conservative=True)
+    left.update_many(np.random.zipf(1.5, 100000) % 10000)
+    right.update_many(np.random.zipf(1.5, 100000) % 10000)
+    print("Merged estimate of 1:", left.merge(right).query(1))
@@ -1,29 +1,120 @@
 # Count Sketch algorithm implementation (dimension reduction)
+# The signed counter table is a NumPy int64 matrix, so batches of keys are hashed and
+# added with vectorized operations; sketches with the same shape and seed merge by
+# adding their tables. An optional top-k tracker reports heavy hitters with the
+# MisraGries interface (get_candidates / get_estimated_counts).
+
+import heapq
+from hashlib import blake2b
+
+import numpy as np
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _mix64(h):
+    # splitmix64 finalizer on a uint64 array
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def _key_hashes(keys):
+    # Stable 64-bit key hashes, unlike hash() which is salted per process
+    if isinstance(keys, np.ndarray) and keys.dtype.kind in "iu":
+        return _mix64(keys.astype(np.int64, copy=False).view(np.uint64))
+    hashes = np.empty(len(keys), dtype=np.uint64)
+    is_int = np.zeros(len(keys), dtype=bool)
+    for j, key in enumerate(keys):
+        if isinstance(key, (int, np.integer)) and -(1 << 63) <= key <= MASK64:
+            hashes[j] = int(key) & MASK64
+            is_int[j] = True
+            continue
+        if isinstance(key, str):
+            key = key.encode("utf-8")
+        elif not isinstance(key, (bytes, bytearray)):
+            key = repr(key).encode("utf-8")
+        hashes[j] = int.from_bytes(blake2b(key, digest_size=8).digest(), "little")
+    hashes[is_int] = _mix64(hashes[is_int])
+    return hashes
+
+
 class CountSketch:
-    def __init__(self, width, depth):
+    def __init__(self, width, depth, seed=123456, heavy_hitters=0):
         self.width = width
         self.depth = depth
-        self.table = [[0] * width for _ in range(depth)]
-        self.seed = 123456
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.seed = seed
+        self.row_seeds = _mix64(np.arange(1, depth + 1, dtype=np.uint64) * np.uint64(seed | 1))
+        # Heavy hitter tracking: key -> estimated count for the k largest keys
+        self.k = heavy_hitters
+        self.counters = {}
 
-    def _hash_index(self, key, i):
-        return hash((key, i, self.seed)) % self.width
+    def _hash_index_sign(self, hashes):
+        # Bucket from the low bits and sign from the top bit of one mixed hash
+        mixed = _mix64(hashes[None, :] ^ self.row_seeds[:, None])
+        idx = (mixed % np.uint64(self.width)).astype(np.intp)
+        sign = 1 - 2 * (mixed >> np.uint64(63)).astype(np.int64)
+        return idx, sign
 
-    def _hash_sign(self, key, i):
-        return -1 if (hash((key, i, self.seed * 2))) % 2 == 0 else 1
+    def _estimate(self, idx, sign):
+        rows = np.arange(self.depth)[:, None]
+        estimates = np.sort(sign * self.table[rows, idx], axis=0)
+        return estimates[self.depth // 2]
 
     def update(self, key, value):
-        for i in range(self.depth):
-            idx = self._hash_index(key, i)
-            sign = self._hash_sign(key, i)
-            self.table[i][idx] += sign * value
+        self.update_many([key], [value])
+
+    def update_many(self, keys, values=None):
+        """Add each value (default 1) to its key's signed counters."""
+        hashes = _key_hashes(keys)
+        if values is None:
+            values = np.ones(len(hashes), dtype=np.int64)
+        else:
+            values = np.asarray(values, dtype=np.int64)
+        uniq, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        totals = np.zeros(len(uniq), dtype=np.int64)
+        np.add.at(totals, inverse.ravel(), values)
+        idx, sign = self._hash_index_sign(uniq)
+        for row in range(self.depth):
+            np.add.at(self.table[row], idx[row], sign[row] * totals)
+        if self.k:
+            estimates = self._estimate(idx, sign)
+            best = np.argpartition(estimates, -self.k)[-self.k:] if len(estimates) > self.k \
+                else np.arange(len(estimates))
+            batch = [keys[int(first[j])] for j in best]
+            batch = [key.item() if isinstance(key, np.generic) else key for key in batch]
+            self._offer(batch + list(self.counters))
+
+    def _offer(self, candidates):
+        # Re-estimate the old top-k together with the new candidates, keep k largest
+        candidates = list(dict.fromkeys(candidates))
+        estimates = self.estimate_many(candidates).tolist()
+        self.counters = dict(heapq.nlargest(self.k, zip(candidates, estimates), key=lambda kv: kv[1]))
 
     def estimate(self, key):
-        estimates = []
-        for i in range(self.depth):
-            idx = self._hash_index(key, i)
-            sign = self._hash_sign(key, i)
-            estimates.append(sign * self.table[i][idx])
-        estimates.sort()
-        mid = len(estimates) // 2
-        return estimates[mid]
\ No newline at end of file
+        return int(self.estimate_many([key])[0])
+
+    def estimate_many(self, keys):
+        """Median-of-rows estimates for a batch of keys."""
+        return self._estimate(*self._hash_index_sign(_key_hashes(keys)))
+
+    query = estimate
+    query_many = estimate_many
+
+    def merge(self, other):
+        """Add the table of a sketch built with the same width, depth and seed."""
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("can only merge sketches with equal width, depth and seed")
+        self.table += other.table
+        if self.k:
+            self._offer(list(self.counters) + list(other.counters))
+        return self
+
+    def get_candidates(self):
+        return sorted(self.counters, key=self.counters.get, reverse=True)
+
+    def get_estimated_counts(self):
+        return self.counters.copy()
@@ -1,24 +1,52 @@
 # Disjoint Set (Union-Find) with path compression and union by rank
 # The algorithm maintains parent pointers and rank to quickly merge sets and find representatives.
+# Parents and ranks are NumPy arrays: find() walks with path halving, and find_many()
+# resolves a whole array of elements at once by pointer jumping, which lets callers such as
+# Kruskal's algorithm discard most edges of a batch without a Python-level loop.
+import numpy as np
+
+
 class DisjointSet:
     def __init__(self, n):
-        self.parent = list(range(n))
-        self.rank = [0] * n
+        self.parent = np.arange(n, dtype=np.int64)
+        self.rank = np.zeros(n, dtype=np.int8)
+        self.count = n  # number of disjoint sets
 
     def find(self, x):
-        if self.parent[x] != x:
-            self.parent[x] = self.find(self.parent[self.parent[x]])
-        return self.parent[x]
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # path halving
+            x = parent[x]
+        return int(x)
+
+    def find_many(self, xs):
+        """Representatives of every element of xs (an int array)."""
+        roots = self.parent[xs]
+        while True:
+            up = self.parent[roots]
+            if np.array_equal(up, roots):
+                return roots
+            self.parent[roots] = self.parent[up]  # halve the paths just walked
+            roots = up
 
     def union(self, x, y):
+        """Merge the sets of x and y; False if they were already one set."""
         xr = self.find(x)
         yr = self.find(y)
         if xr == yr:
-            return
+            return False
         if self.rank[xr] < self.rank[yr]:
             self.parent[xr] = yr
         elif self.rank[xr] > self.rank[yr]:
             self.parent[yr] = xr
         else:
             self.parent[xr] = yr
-            self.rank[yr] += 1
\ No newline at end of file
+            self.rank[yr] += 1
+        self.count -= 1
+        return True
+
+    def labels(self):
+        """Representative of every element, flattening the forest as a side effect."""
+        roots = self.find_many(np.arange(len(self.parent)))
+        self.parent[:] = roots
+        return roots
@@ -1,5 +1,8 @@
 # k-d tree implementation for multidimensional point search
 # Idea: recursively split points by median along alternating dimensions to form a binary tree
+# KDTree below is the bulk-loaded, array-backed variant with batched k-NN and radius queries.
+
+import numpy as np
 
 class KDNode:
     def __init__(self, point, axis):
@@ -44,10 +47,204 @@ def nearest_neighbor(root, target, best=None, best_dist=float('inf')):
         best, best_dist = nearest_neighbor(second, target, best, best_dist)
     return best, best_dist
 
+# ---------------------------------------------------------------------------
+# Flat, array-backed k-d tree for bulk loading and batched queries
+# ---------------------------------------------------------------------------
+
+
+class KDTree:
+    """Bulk-loaded k-d tree stored in flat NumPy arrays.
+
+    Points are copied once into a contiguous buffer and reordered so that
+    every leaf bucket is a contiguous slice. Nodes are split on the axis of
+    largest spread at the median, found by introselect (np.argpartition), so
+    the build is O(n log n). Queries are answered for whole batches: each
+    node visit filters the set of queries whose search ball still reaches
+    the node's bounding box and updates them together.
+    """
+
+    def __init__(self, points, leaf_size=16):
+        data = np.ascontiguousarray(points, dtype=np.float64)
+        if data.ndim != 2:
+            raise ValueError("points must be a 2-D array of shape (n, k)")
+        self.leaf_size = leaf_size
+        n = len(data)
+        perm = np.arange(n)
+        lo_list, hi_list, left_list, right_list = [], [], [], []
+        boxes = {}
+
+        # Iterative build: (node id, lo, hi) ranges over perm
+        lo_list.append(0)
+        hi_list.append(n)
+        left_list.append(-1)
+        right_list.append(-1)
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            lo, hi = lo_list[node], hi_list[node]
+            block = data[perm[lo:hi]]
+            mins = block.min(axis=0) if hi > lo else np.zeros(data.shape[1])
+            maxs = block.max(axis=0) if hi > lo else np.zeros(data.shape[1])
+            boxes[node] = (mins, maxs)
+            if hi - lo <= leaf_size:
+                continue
+            axis = int(np.argmax(maxs - mins))
+            mid = (lo + hi) // 2
+            order = np.argpartition(block[:, axis], mid - lo)
+            perm[lo:hi] = perm[lo:hi][order]
+            for child_lo, child_hi in ((lo, mid), (mid, hi)):
+                lo_list.append(child_lo)
+                hi_list.append(child_hi)
+                left_list.append(-1)
+                right_list.append(-1)
+                stack.append(len(lo_list) - 1)
+            left_list[node] = len(lo_list) - 2
+            right_list[node] = len(lo_list) - 1
+
+        num_nodes = len(lo_list)
+        self.node_lo = np.array(lo_list, dtype=np.intp)
+        self.node_hi = np.array(hi_list, dtype=np.intp)
+        self.node_left = np.array(left_list, dtype=np.intp)
+        self.node_right = np.array(right_list, dtype=np.intp)
+        self.node_min = np.empty((num_nodes, data.shape[1]))
+        self.node_max = np.empty((num_nodes, data.shape[1]))
+        for node, (mins, maxs) in boxes.items():
+            self.node_min[node] = mins
+            self.node_max[node] = maxs
+        # Leaf buckets become contiguous slices of the reordered buffer
+        self.data = data[perm]
+        self.indices = perm
+
+    def __len__(self):
+        return len(self.data)
+
+    def _box_distance(self, node, queries):
+        # Squared distance from each query to the node's bounding box
+        gap = np.maximum(self.node_min[node] - queries, 0) + np.maximum(queries - self.node_max[node], 0)
+        return (gap * gap).sum(axis=1)
+
+    def _home_leaves(self, queries):
+        # Descend all queries at once to the leaf that would contain them
+        node = np.zeros(len(queries), dtype=np.intp)
+        active = self.node_left[node] >= 0
+        while active.any():
+            q = np.nonzero(active)[0]
+            left = self.node_left[node[q]]
+            # Go left when the query is closer to the left child's box
+            d_left = (np.maximum(self.node_min[left] - queries[q], 0)
+                      + np.maximum(queries[q] - self.node_max[left], 0)).sum(axis=1)
+            right = self.node_right[node[q]]
+            d_right = (np.maximum(self.node_min[right] - queries[q], 0)
+                       + np.maximum(queries[q] - self.node_max[right], 0)).sum(axis=1)
+            node[q] = np.where(d_left <= d_right, left, right)
+            active = self.node_left[node] >= 0
+        return node
+
+    def _merge_leaf(self, leaf, q, queries, best_d, best_i, k):
+        lo, hi = self.node_lo[leaf], self.node_hi[leaf]
+        diff = queries[q][:, None, :] - self.data[None, lo:hi, :]
+        d = np.einsum("ijk,ijk->ij", diff, diff)
+        cand_d = np.concatenate([best_d[q], d], axis=1)
+        cand_i = np.concatenate([best_i[q], np.broadcast_to(np.arange(lo, hi), d.shape)], axis=1)
+        if cand_d.shape[1] > k:
+            part = np.argpartition(cand_d, k - 1, axis=1)[:, :k]
+            cand_d = np.take_along_axis(cand_d, part, axis=1)
+            cand_i = np.take_along_axis(cand_i, part, axis=1)
+        best_d[q] = cand_d
+        best_i[q] = cand_i
+
+    def knn(self, queries, k=1):
+        """Return (distances, indices), each (m, k), sorted by distance.
+
+        Distances are Euclidean; indices refer to the rows of the points
+        the tree was built from.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+        m = len(queries)
+        k = min(k, len(self.data))
+        best_d = np.full((m, k), np.inf)
+        best_i = np.full((m, k), -1, dtype=np.intp)
+
+        # Seed every query with its home leaf so pruning bounds start tight
+        home = self._home_leaves(queries)
+        order = np.argsort(home, kind="stable")
+        leaves, starts = np.unique(home[order], return_index=True)
+        for leaf, group in zip(leaves, np.split(order, starts[1:])):
+            self._merge_leaf(leaf, group, queries, best_d, best_i, k)
+
+        stack = [(0, np.arange(m))]
+        while stack:
+            node, q = stack.pop()
+            q = q[self._box_distance(node, queries[q]) < best_d[q].max(axis=1)]
+            if len(q) == 0:
+                continue
+            if self.node_left[node] < 0:
+                # Skip queries whose home leaf this is; it was already merged
+                q = q[home[q] != node]
+                if len(q):
+                    self._merge_leaf(node, q, queries, best_d, best_i, k)
+                continue
+            stack.append((self.node_right[node], q))
+            stack.append((self.node_left[node], q))
+
+        order = np.argsort(best_d, axis=1)
+        best_d = np.sqrt(np.take_along_axis(best_d, order, axis=1))
+        best_i = self.indices[np.take_along_axis(best_i, order, axis=1)]
+        return best_d, best_i
+
+    def query_radius(self, queries, r, return_distance=False):
+        """Indices of all points within Euclidean distance r of each query.
+
+        Returns a list with one index array per query (and a matching list
+        of distance arrays when return_distance is True).
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+        m = len(queries)
+        r2 = r * r
+        hit_q, hit_p, hit_d = [], [], []
+        stack = [(0, np.arange(m))]
+        while stack:
+            node, q = stack.pop()
+            q = q[self._box_distance(node, queries[q]) <= r2]
+            if len(q) == 0:
+                continue
+            if self.node_left[node] >= 0:
+                stack.append((self.node_right[node], q))
+                stack.append((self.node_left[node], q))
+                continue
+            lo, hi = self.node_lo[node], self.node_hi[node]
+            diff = queries[q][:, None, :] - self.data[None, lo:hi, :]
+            d = np.einsum("ijk,ijk->ij", diff, diff)
+            qi, pi = np.nonzero(d <= r2)
+            hit_q.append(q[qi])
+            hit_p.append(pi + lo)
+            hit_d.append(d[qi, pi])
+
+        if hit_q:
+            hit_q, hit_p, hit_d = np.concatenate(hit_q), np.concatenate(hit_p), np.concatenate(hit_d)
+        else:
+            hit_q = hit_p = np.zeros(0, dtype=np.intp)
+            hit_d = np.zeros(0)
+        order = np.argsort(hit_q, kind="stable")
+        bounds = np.searchsorted(hit_q[order], np.arange(m + 1))
+        points = self.indices[hit_p[order]]
+        result = [points[bounds[i]:bounds[i + 1]] for i in range(m)]
+        if return_distance:
+            dists = np.sqrt(hit_d[order])
+            return result, [dists[bounds[i]:bounds[i + 1]] for i in range(m)]
+        return result
+
+
 # Example usage:
 if __name__ == "__main__":
     points = [(2, 3), (5, 4), (9, 6), (4, 7), (8, 1), (7, 2)]
     tree = build_kdtree(points)
     query = (9, 2)
     nearest, dist = nearest_neighbor(tree, query)
-    print(f"Nearest to {query}: {nearest} with squared distance {dist}")
\ No newline at end of file
+    print(f"Nearest to {query}: {nearest} with squared distance {dist}")
+
+    # Bulk-loaded tree answering a whole batch of queries at once
+    flat = KDTree(np.random.rand(100000, 3), leaf_size=32)
+    dist, idx = flat.knn(np.random.rand(4, 3), k=3)
+    print("3 nearest neighbours of 4 random queries:", idx.tolist())
+    print("Points within 0.02 of the centre:", flat.query_radius([[0.5, 0.5, 0.5]], r=0.02)[0])
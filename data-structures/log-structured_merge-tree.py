@@ -1,6 +1,21 @@
 # Log-Structured Merge-Tree (LSM Tree) implementation
 # The data structure stores data in immutable sorted runs and merges runs when they reach a size threshold.
 # Each run is a simple sorted list of (key, value) tuples.
+# DiskLSMTree is the persistent variant: full memtables are flushed to immutable,
+# block-indexed SSTable files read through mmap, every SSTable carries its own
+# Bloom filter, and leveled compaction runs in a background thread.
+
+import bisect
+import heapq
+import json
+import mmap
+import numbers
+import os
+import pickle
+import struct
+import threading
+from hashlib import blake2b
+
 
 class LSMTree:
     def __init__(self, threshold=4):
@@ -14,9 +29,8 @@ class LSMTree:
         if not self.runs or len(self.runs[-1]) >= self.threshold:
             # create a new run if none or current run is full
             self.runs.append([])
-        self.runs[-1].append((key, value))
-        # Keep the run sorted
-        self.runs[-1].sort(key=lambda x: x[0])
+        # Keep the run sorted (binary insertion instead of a full re-sort)
+        bisect.insort(self.runs[-1], (key, value), key=lambda x: x[0])
         # Merge runs if the newest run is too big
         if len(self.runs[-1]) > self.threshold:
             self._merge()
@@ -69,4 +83,381 @@ class LSMTree:
         self.insert(key, None)
 
     def __str__(self):
-        return f"LSMTree(runs={self.runs})"
\ No newline at end of file
+        return f"LSMTree(runs={self.runs})"
+
+
+# ---------------------------------------------------------------------------
+# Disk-backed LSM tree
+# ---------------------------------------------------------------------------
+
+_TOMBSTONE = 0xFFFFFFFF          # value length marking a deleted key
+_ENTRY = struct.Struct("<II")    # key length, value length
+_FOOTER = struct.Struct("<8sQQQQ")
+_MAGIC = b"LSMSST01"
+
+
+def _key_hashes(key_bytes):
+    # Two independent 64-bit hashes for Kirsch-Mitzenmacher double hashing
+    digest = blake2b(key_bytes, digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+def _bloom_key(key):
+    # Keys that compare equal must hash alike: 1, 1.0, True and np.int64(1) are one key
+    # to bisect and ==, but pickle to different bytes
+    if isinstance(key, numbers.Integral):
+        key = int(key)
+    elif isinstance(key, numbers.Real):
+        key = float(key)
+        if key.is_integer():
+            key = int(key)
+    return pickle.dumps(key)
+
+
+class RunBloomFilter:
+    """Per-run Bloom filter sized from the number of keys in the run."""
+
+    def __init__(self, num_keys, bits_per_key=10):
+        self.num_bits = max(64, num_keys * bits_per_key)
+        # k = ln(2) * m / n is the optimal number of probes
+        self.num_hashes = max(1, min(30, int(round(bits_per_key * 0.69))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def add(self, key_bytes):
+        h1, h2 = _key_hashes(key_bytes)
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % self.num_bits
+            self.bits[bit >> 3] |= 1 << (bit & 7)
+
+    def might_contain(self, key_bytes):
+        h1, h2 = _key_hashes(key_bytes)
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % self.num_bits
+            if not self.bits[bit >> 3] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def to_bytes(self):
+        return struct.pack("<QI", self.num_bits, self.num_hashes) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        bloom = cls.__new__(cls)
+        bloom.num_bits, bloom.num_hashes = struct.unpack_from("<QI", data)
+        bloom.bits = data[12:]
+        return bloom
+
+
+class SSTable:
+    """Immutable sorted string table stored on disk and read through mmap.
+
+    Layout: data blocks of (klen, vlen, key, value) entries, a pickled block
+    index of (first_key, offset, length), the serialized Bloom filter and a
+    fixed-size footer pointing at both.
+    """
+
+    BLOCK_SIZE = 4096
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_off, index_len, bloom_off, self.count = _FOOTER.unpack_from(
+            self._mm, len(self._mm) - _FOOTER.size)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not an SSTable")
+        index = pickle.loads(self._mm[index_off:index_off + index_len])
+        self.first_keys = [entry[0] for entry in index]
+        self.blocks = [(entry[1], entry[2]) for entry in index]
+        self.bloom = RunBloomFilter.from_bytes(self._mm[bloom_off:len(self._mm) - _FOOTER.size])
+        self.size = len(self._mm)
+
+    @classmethod
+    def write(cls, path, items, count, bits_per_key=10):
+        # items: iterable of (key, value) sorted by key; value None is a tombstone
+        bloom = RunBloomFilter(count, bits_per_key)
+        index = []
+        written = 0
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            block = bytearray()
+            first_key = None
+            offset = 0
+            for key, value in items:
+                key_bytes = pickle.dumps(key)
+                bloom.add(_bloom_key(key))
+                if first_key is None:
+                    first_key = key
+                if value is None:
+                    block += _ENTRY.pack(len(key_bytes), _TOMBSTONE) + key_bytes
+                else:
+                    value_bytes = pickle.dumps(value)
+                    block += _ENTRY.pack(len(key_bytes), len(value_bytes)) + key_bytes + value_bytes
+                written += 1
+                if len(block) >= cls.BLOCK_SIZE:
+                    index.append((first_key, offset, len(block)))
+                    f.write(block)
+                    offset += len(block)
+                    block = bytearray()
+                    first_key = None
+            if block:
+                index.append((first_key, offset, len(block)))
+                f.write(block)
+                offset += len(block)
+            index_bytes = pickle.dumps(index)
+            f.write(index_bytes)
+            bloom_bytes = bloom.to_bytes()
+            f.write(bloom_bytes)
+            f.write(_FOOTER.pack(_MAGIC, offset, len(index_bytes),
+                                 offset + len(index_bytes), written))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return cls(path)
+
+    def _scan_block(self, offset, length):
+        mm = self._mm
+        pos, end = offset, offset + length
+        while pos < end:
+            klen, vlen = _ENTRY.unpack_from(mm, pos)
+            pos += _ENTRY.size
+            key = pickle.loads(mm[pos:pos + klen])
+            pos += klen
+            if vlen == _TOMBSTONE:
+                yield key, None
+            else:
+                yield key, pickle.loads(mm[pos:pos + vlen])
+                pos += vlen
+
+    def get(self, key):
+        # Returns (found, value); a found tombstone is (True, None)
+        if not self.first_keys or not self.bloom.might_contain(_bloom_key(key)):
+            return False, None
+        i = bisect.bisect_right(self.first_keys, key) - 1
+        if i < 0:
+            return False, None
+        for k, v in self._scan_block(*self.blocks[i]):
+            if k == key:
+                return True, v
+            if k > key:
+                break
+        return False, None
+
+    def __iter__(self):
+        for offset, length in self.blocks:
+            yield from self._scan_block(offset, length)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+class DiskLSMTree:
+    """Write-optimized key-value store with leveled compaction.
+
+    Level 0 holds freshly flushed, possibly overlapping SSTables (newest
+    last). Every deeper level is a single sorted run whose size budget grows
+    by level_ratio per level. Compaction runs on a background thread, so a
+    write only ever pays for flushing its own memtable.
+    """
+
+    def __init__(self, directory, memtable_size=4096, level0_limit=4,
+                 level_ratio=10, bits_per_key=10, background=True):
+        self.directory = directory
+        self.memtable_size = memtable_size
+        self.level0_limit = level0_limit
+        self.level_ratio = level_ratio
+        self.bits_per_key = bits_per_key
+        os.makedirs(directory, exist_ok=True)
+
+        self.memtable = {}
+        self.levels = [[]]
+        self._next_id = 0
+        self._lock = threading.RLock()
+        self._wake = threading.Condition(self._lock)
+        self._closed = False
+        self._compacting = False
+        self._load_manifest()
+
+        self._worker = None
+        if background:
+            self._worker = threading.Thread(target=self._compaction_loop, daemon=True)
+            self._worker.start()
+
+    # --- manifest ---------------------------------------------------------
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, "MANIFEST")
+
+    def _load_manifest(self):
+        if not os.path.exists(self._manifest_path()):
+            return
+        with open(self._manifest_path()) as f:
+            manifest = json.load(f)
+        self._next_id = manifest["next_id"]
+        self.levels = [[SSTable(os.path.join(self.directory, name)) for name in level]
+                       for level in manifest["levels"]]
+
+    def _save_manifest(self):
+        manifest = {
+            "next_id": self._next_id,
+            "levels": [[os.path.basename(t.path) for t in level] for level in self.levels],
+        }
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._manifest_path())
+
+    def _new_table_path(self):
+        self._next_id += 1
+        return os.path.join(self.directory, f"{self._next_id:08d}.sst")
+
+    # --- public API -------------------------------------------------------
+
+    def insert(self, key, value):
+        with self._lock:
+            self.memtable[key] = value
+            if len(self.memtable) >= self.memtable_size:
+                self._flush_memtable()
+
+    def delete(self, key):
+        # Tombstones shadow older values until compaction reaches the last level
+        self.insert(key, None)
+
+    def get(self, key):
+        with self._lock:
+            if key in self.memtable:
+                return self.memtable[key]
+            for table in reversed(self.levels[0]):
+                found, value = table.get(key)
+                if found:
+                    return value
+            for level in self.levels[1:]:
+                for table in level:
+                    found, value = table.get(key)
+                    if found:
+                        return value
+        return None
+
+    def flush(self):
+        with self._lock:
+            if self.memtable:
+                self._flush_memtable()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._wake.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+        with self._lock:
+            for level in self.levels:
+                for table in level:
+                    table.close()
+
+    # --- flushing and compaction -----------------------------------------
+
+    def _flush_memtable(self):
+        items = sorted(self.memtable.items(), key=lambda kv: kv[0])
+        table = SSTable.write(self._new_table_path(), items, len(items), self.bits_per_key)
+        self.levels[0].append(table)
+        self.memtable = {}
+        self._save_manifest()
+        if self._worker is not None:
+            self._wake.notify()
+        else:
+            self.compact()
+
+    def _level_budget(self, level):
+        return self.memtable_size * self.level0_limit * self.level_ratio ** level
+
+    def _pick_compaction(self):
+        # Returns the level whose contents should be pushed one level down
+        if len(self.levels[0]) >= self.level0_limit:
+            return 0
+        for i in range(1, len(self.levels)):
+            if sum(t.count for t in self.levels[i]) > self._level_budget(i):
+                return i
+        return None
+
+    def compact(self):
+        # Run compaction steps until every level is within budget
+        while True:
+            with self._lock:
+                if self._compacting:
+                    return
+                level = self._pick_compaction()
+                if level is None:
+                    return
+                self._compacting = True
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                # Newest sources first so heapq.merge keeps the latest version
+                sources = list(reversed(self.levels[level])) + list(self.levels[level + 1])
+                upper = list(self.levels[level])
+                lower = list(self.levels[level + 1])
+                bottom = level + 2 >= len(self.levels)
+                path = self._new_table_path()
+            try:
+                # The merge reads immutable files, so it runs without the lock
+                table = self._merge_tables(path, sources, drop_tombstones=bottom)
+                with self._lock:
+                    # Level 0 may have grown while merging; keep the new tables
+                    self.levels[level] = [t for t in self.levels[level] if t not in upper]
+                    self.levels[level + 1] = [table] if table is not None else []
+                    self._save_manifest()
+                    for old in upper + lower:
+                        old.close()
+                        os.remove(old.path)
+            finally:
+                with self._lock:
+                    self._compacting = False
+
+    def _merge_tables(self, path, tables, drop_tombstones):
+        def tagged(rank, table):
+            for key, value in table:
+                yield key, rank, value
+
+        merged = heapq.merge(*(tagged(rank, t) for rank, t in enumerate(tables)),
+                             key=lambda entry: (entry[0], entry[1]))
+
+        def deduplicated():
+            last = object()
+            for key, _, value in merged:
+                if key == last:
+                    continue
+                last = key
+                if value is None and drop_tombstones:
+                    continue
+                yield key, value
+
+        count = sum(t.count for t in tables)
+        table = SSTable.write(path, deduplicated(), count, self.bits_per_key)
+        if table.count == 0:
+            table.close()
+            os.remove(path)
+            return None
+        return table
+
+    def _compaction_loop(self):
+        while True:
+            with self._lock:
+                while not self._closed and self._pick_compaction() is None:
+                    self._wake.wait()
+                if self._closed:
+                    return
+            self.compact()
+
+    def __str__(self):
+        sizes = [[t.count for t in level] for level in self.levels]
+        return f"DiskLSMTree(memtable={len(self.memtable)}, levels={sizes})"
+
+
+# Example usage:
+# db = DiskLSMTree("/tmp/lsm", memtable_size=1000)
+# for i in range(10000):
+#     db.insert(i, str(i))
+# db.delete(42)
+# print(db.get(4242), db.get(42))  # Expected: 4242 None
+# db.close()
@@ -2,6 +2,14 @@
 # Idea: Each node stores a minimum bounding rectangle (MBR) that encloses its children.
 # Insertions are done by picking the child whose MBR would need the least enlargement.
 # Queries return all stored rectangles that intersect a given search rectangle.
+# PackedRTree is the static variant: STR or Hilbert bulk loading into per-level NumPy
+# arrays, batched window queries, best-first nearest neighbours and mmap loading.
+
+import heapq
+import math
+import struct
+
+import numpy as np
 
 class Rectangle:
     def __init__(self, xmin, ymin, xmax, ymax):
@@ -115,6 +123,179 @@ class RTree:
                     results.extend(self._search_node(child, rect))
         return results
 
+# ---------------------------------------------------------------------------
+# Packed R-tree: bulk loaded (STR or Hilbert) into flat NumPy arrays
+# ---------------------------------------------------------------------------
+_PACKED_HEADER = struct.Struct("<8sIIQI")  # magic, dims, node size, boxes, levels
+_PACKED_MAGIC = b"PRTREE01"
+
+
+def _str_order(centers, node_size):
+    # Sort-Tile-Recursive: slice along the first axis into slabs, recurse on the rest
+    def tile(idx, dim):
+        if dim == centers.shape[1] - 1 or len(idx) <= node_size:
+            return idx[np.argsort(centers[idx, dim], kind="stable")]
+        idx = idx[np.argsort(centers[idx, dim], kind="stable")]
+        leaves = math.ceil(len(idx) / node_size)
+        slabs = math.ceil(leaves ** (1.0 / (centers.shape[1] - dim)))
+        slab_size = node_size * math.ceil(leaves / slabs)
+        return np.concatenate([tile(idx[s:s + slab_size], dim + 1)
+                               for s in range(0, len(idx), slab_size)])
+    return tile(np.arange(len(centers)), 0)
+
+
+def _hilbert_order(centers, bits=16):
+    # Hilbert curve index of each 2-D center quantized to a 2^bits grid
+    if centers.shape[1] != 2:
+        raise ValueError("Hilbert packing is only defined here for 2-D boxes")
+    lo = centers.min(axis=0)
+    span = np.maximum(centers.max(axis=0) - lo, 1e-300)
+    grid = ((centers - lo) / span * ((1 << bits) - 1)).astype(np.int64)
+    x, y = grid[:, 0].copy(), grid[:, 1].copy()
+    d = np.zeros(len(centers), dtype=np.int64)
+    s = 1 << (bits - 1)
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant so the curve stays continuous
+        flip = ~ry & rx
+        x = np.where(flip, s - 1 - x, x)
+        y = np.where(flip, s - 1 - y, y)
+        swap = ~ry
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        s >>= 1
+    return np.argsort(d, kind="stable")
+
+
+class PackedRTree:
+    """Static R-tree bulk loaded into per-level NumPy box arrays.
+
+    Boxes are (n, 2 * dims) arrays laid out as (xmin, ymin, ..., xmax, ymax, ...).
+    Level 0 holds the packed input boxes; node j of level i covers entries
+    j * node_size .. (j + 1) * node_size - 1 of level i - 1, so the tree needs
+    no child pointers and can be memory-mapped straight from a file.
+    """
+
+    def __init__(self, levels, ids, node_size):
+        self.levels = levels        # levels[0] = leaf boxes, levels[-1] = root(s)
+        self.ids = ids              # original id of every leaf box, in packed order
+        self.node_size = node_size
+        self.dims = levels[0].shape[1] // 2
+
+    @classmethod
+    def bulk_load(cls, boxes, ids=None, node_size=16, method="str"):
+        boxes = np.ascontiguousarray(boxes, dtype=np.float64)
+        if boxes.ndim != 2 or boxes.shape[1] % 2:
+            raise ValueError("boxes must be an (n, 2 * dims) array")
+        dims = boxes.shape[1] // 2
+        ids = np.arange(len(boxes)) if ids is None else np.asarray(ids, dtype=np.int64)
+        centers = (boxes[:, :dims] + boxes[:, dims:]) / 2
+        if method == "str":
+            order = _str_order(centers, node_size)
+        elif method == "hilbert":
+            order = _hilbert_order(centers)
+        else:
+            raise ValueError(f"unknown packing method {method!r}")
+        levels = [boxes[order]]
+        while len(levels[-1]) > 1:
+            child = levels[-1]
+            starts = np.arange(0, len(child), node_size)
+            parent = np.concatenate([np.minimum.reduceat(child[:, :dims], starts),
+                                     np.maximum.reduceat(child[:, dims:], starts)], axis=1)
+            levels.append(parent)
+        return cls(levels, ids[order], node_size)
+
+    def __len__(self):
+        return len(self.levels[0])
+
+    def _intersects(self, node_boxes, windows):
+        d = self.dims
+        return np.all((node_boxes[:, :d] <= windows[:, d:]) & (node_boxes[:, d:] >= windows[:, :d]), axis=1)
+
+    def search_many(self, windows):
+        """Ids of the boxes intersecting each query window, one array per window."""
+        windows = np.atleast_2d(np.asarray(windows, dtype=np.float64))
+        m = len(windows)
+        if not len(self):
+            return [np.zeros(0, dtype=np.int64) for _ in range(m)]
+        top = len(self.levels) - 1
+        # Frontier of (query, node) pairs, expanded one level at a time
+        q = np.repeat(np.arange(m), len(self.levels[top]))
+        node = np.tile(np.arange(len(self.levels[top])), m)
+        for level in range(top, -1, -1):
+            keep = self._intersects(self.levels[level][node], windows[q])
+            q, node = q[keep], node[keep]
+            if level == 0:
+                break
+            first = node * self.node_size
+            count = np.minimum(first + self.node_size, len(self.levels[level - 1])) - first
+            q = np.repeat(q, count)
+            offsets = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+            node = np.repeat(first, count) + offsets
+        order = np.argsort(q, kind="stable")
+        bounds = np.searchsorted(q[order], np.arange(m + 1))
+        hits = self.ids[node[order]]
+        return [hits[bounds[i]:bounds[i + 1]] for i in range(m)]
+
+    def search(self, window):
+        return self.search_many([window])[0]
+
+    def _box_distance(self, node_boxes, point):
+        d = self.dims
+        gap = np.maximum(node_boxes[:, :d] - point, 0) + np.maximum(point - node_boxes[:, d:], 0)
+        return (gap * gap).sum(axis=1)
+
+    def nearest(self, point, k=1):
+        """k nearest boxes to a point as a list of (distance, id), best first."""
+        point = np.asarray(point, dtype=np.float64)
+        top = len(self.levels) - 1
+        heap = [(float(dist), top, j) for j, dist in
+                enumerate(self._box_distance(self.levels[top], point))]
+        heapq.heapify(heap)
+        result = []
+        # Best-first search: a leaf box popped from the heap is the next nearest
+        while heap and len(result) < k:
+            dist, level, j = heapq.heappop(heap)
+            if level == 0:
+                result.append((math.sqrt(dist), int(self.ids[j])))
+                continue
+            first = j * self.node_size
+            last = min(first + self.node_size, len(self.levels[level - 1]))
+            dists = self._box_distance(self.levels[level - 1][first:last], point)
+            for offset, child_dist in enumerate(dists.tolist()):
+                heapq.heappush(heap, (child_dist, level - 1, first + offset))
+        return result
+
+    def nearest_many(self, points, k=1):
+        return [self.nearest(p, k) for p in np.atleast_2d(points)]
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(_PACKED_HEADER.pack(_PACKED_MAGIC, self.dims, self.node_size,
+                                        len(self), len(self.levels)))
+            f.write(np.ascontiguousarray(self.ids, dtype="<i8").tobytes())
+            for boxes in self.levels:
+                f.write(np.ascontiguousarray(boxes, dtype="<f8").tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved tree; no per-box objects are created."""
+        with open(path, "rb") as f:
+            magic, dims, node_size, n, num_levels = _PACKED_HEADER.unpack(f.read(_PACKED_HEADER.size))
+        if magic != _PACKED_MAGIC:
+            raise ValueError(f"{path} is not a saved PackedRTree")
+        offset = _PACKED_HEADER.size
+        ids = np.memmap(path, dtype="<i8", mode="r", offset=offset, shape=(n,))
+        offset += 8 * n
+        levels, count = [], n
+        for _ in range(num_levels):
+            levels.append(np.memmap(path, dtype="<f8", mode="r", offset=offset, shape=(count, 2 * dims)))
+            offset += 8 * count * 2 * dims
+            count = math.ceil(count / node_size)
+        return cls(levels, ids, node_size)
+
+
 # Example usage (for testing, not part of the assignment)
 if __name__ == "__main__":
     tree = RTree()
@@ -122,4 +303,10 @@ if __name__ == "__main__":
     tree.insert(Rectangle(2, 2, 3, 3), "B")
     tree.insert(Rectangle(0.5, 0.5, 2.5, 2.5), "C")
     hits = tree.search(Rectangle(0, 0, 2, 2))
-    print("Hits:", hits)
\ No newline at end of file
+    print("Hits:", hits)
+
+    # Packed tree: bulk load a million boxes and answer batched window queries
+    corners = np.random.rand(1000000, 2)
+    packed = PackedRTree.bulk_load(np.hstack([corners, corners + 0.001]), method="hilbert")
+    print("Window hits:", [len(h) for h in packed.search_many([[0.1, 0.1, 0.2, 0.2], [0.5, 0.5, 0.5, 0.5]])])
+    print("3 nearest to (0.3, 0.3):", packed.nearest([0.3, 0.3], k=3))
@@ -1,15 +1,15 @@
 # Radix Heap implementation for a monotone priority queue
-# The heap maintains 33 buckets indexed by the most significant differing bit between an element's key and the last extracted min.
-# Operations: insert(key, value) and pop_min() returning (key, value).
+# The heap maintains 65 buckets indexed by the most significant differing bit between an element's key and the last extracted min.
+# Operations: insert(key, value) and pop_min() returning (key, value). Keys are non-negative integers below 2**64.
 
 class RadixHeap:
     def __init__(self):
-        self.buckets = [[] for _ in range(33)]  # bucket 0 holds the current minimum
+        self.buckets = [[] for _ in range(65)]  # bucket 0 holds the current minimum
         self.last_min = 0
         self.size = 0
 
     def _bucket_index(self, key):
-        return key.bit_length()
+        return (key ^ self.last_min).bit_length()
 
     def insert(self, key, value):
         if key < self.last_min:
@@ -31,11 +31,11 @@ class RadixHeap:
             # Find new last_min as minimum key in bucket i
             new_min = min(k for k, _ in self.buckets[i])
             self.last_min = new_min
-            # Move all items in bucket i to their proper buckets
-            for k, v in self.buckets[i]:
-                idx = self._bucket_index(k)
-                self.buckets[idx].append((k, v))
-            self.buckets[i].clear()
+            # Move all items in bucket i to their proper (lower) buckets
+            items = self.buckets[i]
+            self.buckets[i] = []
+            for k, v in items:
+                self.buckets[self._bucket_index(k)].append((k, v))
         # Now bucket[0] has the minimum
         key, value = self.buckets[0].pop()
         self.size -= 1
@@ -1,20 +1,29 @@
 # Relaxed k-d tree implementation (multidimensional search tree for spatial coordinates)
+# knn() and query_radius() follow the batched query interface of the flat KDTree in
+# k-d_tree.py, so either tree can back a nearest-neighbour caller.
+
+import heapq
+import math
+
+import numpy as np
 
 class KDNode:
-    def __init__(self, point, left=None, right=None):
+    def __init__(self, point, left=None, right=None, index=None):
         self.point = point      # tuple of coordinates
         self.left = left
         self.right = right
+        self.index = index      # insertion order, reported by knn/query_radius
 
 class KDTree:
     def __init__(self, k):
         self.root = None
         self.k = k  # dimensionality
+        self.size = 0
 
     def insert(self, point):
         def _insert(node, point, depth):
             if node is None:
-                return KDNode(point)
+                return KDNode(point, index=self.size)
             axis = depth % self.k
             if point[axis] < node.point[axis]:
                 node.left = _insert(node.left, point, depth + 1)
@@ -22,6 +31,7 @@ class KDTree:
                 node.right = _insert(node.right, point, depth + 1)
             return node
         self.root = _insert(self.root, point, 0)
+        self.size += 1
 
     def range_search(self, target, radius):
         result = []
@@ -61,6 +71,68 @@ class KDTree:
         _nn(self.root, 0)
         return best[0]
 
+    def _knn_one(self, target, k):
+        # Max-heap of (-distance, index) holding the k best points seen so far
+        heap = []
+
+        def _nn(node, depth):
+            if node is None:
+                return
+            point = node.point
+            dist = sum((point[i] - target[i]) ** 2 for i in range(self.k))
+            if len(heap) < k:
+                heapq.heappush(heap, (-dist, node.index))
+            elif dist < -heap[0][0]:
+                heapq.heapreplace(heap, (-dist, node.index))
+            axis = depth % self.k
+            diff = target[axis] - point[axis]
+            first, second = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            _nn(first, depth + 1)
+            if len(heap) < k or diff ** 2 < -heap[0][0]:
+                _nn(second, depth + 1)
+
+        _nn(self.root, 0)
+        return sorted((-d, i) for d, i in heap)
+
+    def knn(self, queries, k=1):
+        """Return (distances, indices), each (m, k), like KDTree.knn in k-d_tree.py."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+        k = min(k, self.size)
+        dists = np.empty((len(queries), k))
+        indices = np.empty((len(queries), k), dtype=np.intp)
+        for row, target in enumerate(queries.tolist()):
+            best = self._knn_one(target, k)
+            dists[row] = [math.sqrt(d) for d, _ in best]
+            indices[row] = [i for _, i in best]
+        return dists, indices
+
+    def query_radius(self, queries, r, return_distance=False):
+        """Indices (in insertion order) of points within Euclidean distance r of each query."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+        result, distances = [], []
+        for target in queries.tolist():
+            hits = []
+
+            def _search(node, depth):
+                if node is None:
+                    return
+                point = node.point
+                dist = sum((point[i] - target[i]) ** 2 for i in range(self.k))
+                if dist <= r * r:
+                    hits.append((node.index, math.sqrt(dist)))
+                axis = depth % self.k
+                if target[axis] - r < point[axis]:
+                    _search(node.left, depth + 1)
+                if target[axis] + r >= point[axis]:
+                    _search(node.right, depth + 1)
+
+            _search(self.root, 0)
+            result.append(np.array([i for i, _ in hits], dtype=np.intp))
+            distances.append(np.array([d for _, d in hits]))
+        if return_distance:
+            return result, distances
+        return result
+
 # Example usage (for testing purposes only; remove in assignment)
 if __name__ == "__main__":
     tree = KDTree(k=2)
@@ -68,4 +140,5 @@ if __name__ == "__main__":
     for p in points:
         tree.insert(p)
     print("Points within radius 5 of (10, 10):", tree.range_search((10, 10), 5))
-    print("Nearest neighbor to (10, 10):", tree.nearest_neighbor((10, 10)))
\ No newline at end of file
+    print("Nearest neighbor to (10, 10):", tree.nearest_neighbor((10, 10)))
+    print("Three nearest to (10, 10):", tree.knn([(10, 10)], k=3))
\ No newline at end of file
@@ -1,9 +1,15 @@
 # R*-Tree implementation (simplified). The tree stores bounding rectangles for spatial data
 # Each node holds a list of entries; internal nodes contain child nodes, leaf nodes contain data points.
+# RTree.bulk_load packs a whole data set with Sort-Tile-Recursive instead of one insert at
+# a time; search_many answers a batch of windows in one traversal and nearest runs a
+# best-first k-nearest-neighbour search.
 
+import heapq
 import math
 from collections import deque
 
+import numpy as np
+
 # Helper functions
 def rectangle_area(rect):
     (minx, miny, maxx, maxy) = rect
@@ -16,6 +22,23 @@ def combine_rects(r1, r2):
     return (min(r1[0], r2[0]), min(r1[1], r2[1]),
             max(r1[2], r2[2]), max(r1[3], r2[3]))
 
+def rect_distance(rect, point):
+    # Euclidean distance from a point to the closest point of a rectangle
+    dx = max(rect[0] - point[0], 0, point[0] - rect[2])
+    dy = max(rect[1] - point[1], 0, point[1] - rect[3])
+    return math.hypot(dx, dy)
+
+def str_pack(rects, capacity):
+    # Sort-Tile-Recursive order: vertical slabs by x center, each slab sorted by y center
+    rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+    cx = (rects[:, 0] + rects[:, 2]) / 2
+    cy = (rects[:, 1] + rects[:, 3]) / 2
+    order = np.argsort(cx, kind="stable")
+    leaves = math.ceil(len(rects) / capacity)
+    slab_size = capacity * math.ceil(leaves / max(1, math.ceil(math.sqrt(leaves))))
+    slabs = [order[i:i + slab_size] for i in range(0, len(order), slab_size)]
+    return np.concatenate([slab[np.argsort(cy[slab], kind="stable")] for slab in slabs]).tolist()
+
 class RTreeNode:
     def __init__(self, max_entries=4, is_leaf=True):
         self.is_leaf = is_leaf
@@ -39,10 +62,40 @@ class RTree:
         self.root = RTreeNode(max_entries=max_entries, is_leaf=True)
         self.max_entries = max_entries
 
+    @classmethod
+    def bulk_load(cls, items, max_entries=4):
+        """Build a fully packed tree from (point, rect) pairs in O(n log n)."""
+        tree = cls(max_entries=max_entries)
+        items = list(items)
+        if not items:
+            return tree
+        nodes = []
+        order = str_pack([rect for _, rect in items], max_entries)
+        for i in range(0, len(order), max_entries):
+            leaf = RTreeNode(max_entries=max_entries, is_leaf=True)
+            leaf.entries = [items[j] for j in order[i:i + max_entries]]
+            leaf.update_rect()
+            nodes.append(leaf)
+        # Pack each level's nodes into parents until a single root remains
+        while len(nodes) > 1:
+            order = str_pack([node.rect for node in nodes], max_entries)
+            parents = []
+            for i in range(0, len(order), max_entries):
+                parent = RTreeNode(max_entries=max_entries, is_leaf=False)
+                parent.entries = [nodes[j] for j in order[i:i + max_entries]]
+                parent.update_rect()
+                parents.append(parent)
+            nodes = parents
+        tree.root = nodes[0]
+        return tree
+
     # Choose subtree for insertion
-    def choose_subtree(self, node, rect):
+    def choose_subtree(self, node, rect, path=None):
+        # path, if given, collects the internal nodes passed on the way down
         if node.is_leaf:
             return node
+        if path is not None:
+            path.append(node)
         best = None
         best_enlargement = None
         for child in node.entries:
@@ -53,22 +106,29 @@ class RTree:
             if best is None or enlargement < best_enlargement or (enlargement == best_enlargement and child.rect[2]-child.rect[0] < best.rect[2]-best.rect[0]):
                 best = child
                 best_enlargement = enlargement
-        return self.choose_subtree(best, rect)
+        return self.choose_subtree(best, rect, path)
 
     def insert(self, point, rect):
-        node = self.choose_subtree(self.root, rect)
+        path = []
+        node = self.choose_subtree(self.root, rect, path)
         node.entries.append((point, rect))
         node.update_rect()
+        # Every ancestor must cover the new entry, or search would prune it
+        for ancestor in path:
+            ancestor.rect = combine_rects(ancestor.rect, rect)
         if len(node.entries) > self.max_entries:
             self.split(node)
 
     def split(self, node):
+        # Leaf entries are (point, rect) pairs, internal entries are child nodes
+        rect_of = (lambda e: e[1]) if node.is_leaf else (lambda e: e.rect)
+
         # Choose split axis based on minimal margin
         def get_margin(entries, axis):
-            minx = min(e[1][0] for e in entries) if axis == 0 else min(e[1][1] for e in entries)
-            miny = min(e[1][1] for e in entries) if axis == 1 else min(e[1][0] for e in entries)
-            maxx = max(e[1][2] for e in entries) if axis == 0 else max(e[1][3] for e in entries)
-            maxy = max(e[1][3] for e in entries) if axis == 1 else max(e[1][2] for e in entries)
+            minx = min(rect_of(e)[0] for e in entries) if axis == 0 else min(rect_of(e)[1] for e in entries)
+            miny = min(rect_of(e)[1] for e in entries) if axis == 1 else min(rect_of(e)[0] for e in entries)
+            maxx = max(rect_of(e)[2] for e in entries) if axis == 0 else max(rect_of(e)[3] for e in entries)
+            maxy = max(rect_of(e)[3] for e in entries) if axis == 1 else max(rect_of(e)[2] for e in entries)
             return (maxx - minx) + (maxy - miny)
 
         margin_x = get_margin(node.entries, 0)
@@ -80,7 +140,7 @@ class RTree:
             axis = 0
 
         # Sort entries
-        node.entries.sort(key=lambda e: e[1][axis])
+        node.entries.sort(key=lambda e: rect_of(e)[axis])
         split_index = len(node.entries) // 2
         entries1 = node.entries[:split_index]
         entries2 = node.entries[split_index:]
@@ -129,6 +189,52 @@ class RTree:
                 queue.extend(node.entries)
         return results
 
+    def search_many(self, rects):
+        """Answer a batch of window queries in one traversal of the tree."""
+        windows = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        results = [[] for _ in range(len(windows))]
+        if self.root.rect is None:
+            return results
+        # Each stack entry carries the queries that still overlap the node
+        stack = [(self.root, np.arange(len(windows)))]
+        while stack:
+            node, q = stack.pop()
+            r = node.rect
+            w = windows[q]
+            q = q[~((r[2] < w[:, 0]) | (r[0] > w[:, 2]) | (r[3] < w[:, 1]) | (r[1] > w[:, 3]))]
+            if len(q) == 0:
+                continue
+            if not node.is_leaf:
+                stack.extend((child, q) for child in node.entries)
+                continue
+            boxes = np.array([entry_rect for _, entry_rect in node.entries], dtype=np.float64)
+            w = windows[q]
+            hit = ~((boxes[None, :, 2] < w[:, None, 0]) | (boxes[None, :, 0] > w[:, None, 2]) |
+                    (boxes[None, :, 3] < w[:, None, 1]) | (boxes[None, :, 1] > w[:, None, 3]))
+            for qi, ei in zip(*np.nonzero(hit)):
+                results[q[qi]].append(node.entries[ei][0])
+        return results
+
+    def nearest(self, point, k=1):
+        """k nearest entries to a point as (distance, point) pairs, best first."""
+        if self.root.rect is None:
+            return []
+        counter = 0  # tie-breaker so heap entries never compare nodes
+        heap = [(rect_distance(self.root.rect, point), counter, self.root, None)]
+        result = []
+        while heap and len(result) < k:
+            dist, _, node, item = heapq.heappop(heap)
+            if node is None:
+                result.append((dist, item))
+                continue
+            for entry in node.entries:
+                counter += 1
+                if node.is_leaf:
+                    heapq.heappush(heap, (rect_distance(entry[1], point), counter, None, entry[0]))
+                else:
+                    heapq.heappush(heap, (rect_distance(entry.rect, point), counter, entry, None))
+        return result
+
     def delete(self, point, rect):
         # Not fully implemented: placeholder
         pass
@@ -140,4 +246,9 @@ if __name__ == "__main__":
     data = [((i, i), (i, i, i+1, i+1)) for i in range(10)]
     for pt, r in data:
         tree.insert(pt, r)
-    print("Search results:", tree.search((2, 2, 5, 5)))
\ No newline at end of file
+    print("Search results:", tree.search((2, 2, 5, 5)))
+
+    # Bulk loading packs every node full instead of splitting on overflow
+    packed = RTree.bulk_load(data, max_entries=4)
+    print("Batched search results:", packed.search_many([(2, 2, 5, 5), (8, 8, 9, 9)]))
+    print("Two nearest to (0, 0):", packed.nearest((0, 0), k=2))
@@ -1,4 +1,15 @@
 # Adjacency List - Graph representation using a dictionary of node to list of neighbors
+# CSRGraph is the compact, immutable alternative for large graphs: node ids are int32,
+# out-edges of node u are indices[indptr[u]:indptr[u+1]] (with matching weights), names
+# are mapped to ids by a NameInterner, and a saved graph loads memory-mapped. The graph
+# algorithms that accept a CSRGraph (bfs, dijkstra, kosaraju, pagerank, kruskal) detect it
+# by its indptr/indices attributes and run array-based fast paths.
+
+import json
+import os
+
+import numpy as np
+
 
 class AdjacencyList:
     def __init__(self):
@@ -12,7 +23,147 @@ class AdjacencyList:
         self.add_node(src)
         self.add_node(dest)
         self.graph[src].append(dest)
-        self.graph[dest].append(src)
+        if not directed:
+            self.graph[dest].append(src)
 
     def neighbors(self, node):
-        return self.graph.get(node, [])
\ No newline at end of file
+        return self.graph.get(node, [])
+
+    def to_csr(self):
+        return CSRGraph.from_dict(self.graph)
+
+
+class NameInterner:
+    """Bidirectional mapping between node names and dense int32 ids."""
+
+    def __init__(self, names=()):
+        self.names = []
+        self.ids = {}
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name):
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return node_id
+
+    def id(self, name):
+        return self.ids[name]
+
+    def name(self, node_id):
+        return self.names[node_id]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+
+class CSRGraph:
+    def __init__(self, indptr, indices, weights=None, names=None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        self.names = names
+        self.num_nodes = len(self.indptr) - 1
+        self.num_edges = len(self.indices)
+        for array in (self.indptr, self.indices, self.weights):
+            if isinstance(array, np.ndarray) and array.flags.writeable:
+                array.flags.writeable = False  # the graph is immutable
+        self._transpose = None
+
+    @classmethod
+    def from_edges(cls, src, dst, weights=None, num_nodes=None, names=None):
+        """Build from parallel edge arrays: row offsets from bincount, edges in a stable sort by source id."""
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int32)
+        if num_nodes is None:
+            num_nodes = int(max(src.max(initial=-1), dst.max(initial=-1))) + 1
+        counts = np.bincount(src, minlength=num_nodes)
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        order = np.argsort(src, kind="stable")
+        weights = None if weights is None else np.asarray(weights, dtype=np.float64)[order]
+        return cls(indptr, dst[order], weights, names)
+
+    @classmethod
+    def from_dict(cls, adjacency):
+        """Build from dict[node] -> list of neighbors or of (neighbor, weight) pairs."""
+        names = NameInterner(adjacency)
+        src, dst, weights = [], [], []
+        for node, targets in adjacency.items():
+            u = names.id(node)
+            for target in targets:
+                if isinstance(target, tuple):
+                    target, weight = target
+                    weights.append(weight)
+                src.append(u)
+                dst.append(names.intern(target))
+        if weights and len(weights) != len(dst):
+            raise ValueError("either every edge or no edge must carry a weight")
+        return cls.from_edges(src, dst, weights or None, len(names), names)
+
+    def node_id(self, node):
+        # Accept either an id or, when the graph has names, a node name
+        if self.names is not None and not isinstance(node, (int, np.integer)):
+            return self.names.id(node)
+        return int(node)
+
+    def neighbors(self, u):
+        u = self.node_id(u)
+        return self.indices[self.indptr[u]:self.indptr[u + 1]]
+
+    def edge_weights(self, u):
+        u = self.node_id(u)
+        return self.weights[self.indptr[u]:self.indptr[u + 1]]
+
+    def out_degree(self):
+        return np.diff(self.indptr)
+
+    def edge_sources(self):
+        # Source id of every edge, aligned with indices
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int32), self.out_degree())
+
+    def transpose(self):
+        """CSC view: the same edges indexed by target (cached)."""
+        if self._transpose is None:
+            self._transpose = CSRGraph.from_edges(self.indices, self.edge_sources(), self.weights,
+                                                  self.num_nodes, self.names)
+            self._transpose._transpose = self
+        return self._transpose
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "indptr.npy"), self.indptr)
+        np.save(os.path.join(directory, "indices.npy"), self.indices)
+        if self.weights is not None:
+            np.save(os.path.join(directory, "weights.npy"), self.weights)
+        if self.names is not None:
+            with open(os.path.join(directory, "names.json"), "w") as f:
+                json.dump(self.names.names, f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Load a saved graph; with mmap the edge arrays stay on disk until touched."""
+        mode = "r" if mmap else None
+        indptr = np.load(os.path.join(directory, "indptr.npy"), mmap_mode=mode)
+        indices = np.load(os.path.join(directory, "indices.npy"), mmap_mode=mode)
+        weights_path = os.path.join(directory, "weights.npy")
+        weights = np.load(weights_path, mmap_mode=mode) if os.path.exists(weights_path) else None
+        names_path = os.path.join(directory, "names.json")
+        names = None
+        if os.path.exists(names_path):
+            with open(names_path) as f:
+                names = NameInterner(json.load(f))
+        return cls(indptr, indices, weights, names)
+
+    def __repr__(self):
+        return f"CSRGraph(num_nodes={self.num_nodes}, num_edges={self.num_edges})"
+
+# Example usage:
+# g = CSRGraph.from_dict({'A': [('B', 1.0), ('C', 4.0)], 'B': [('C', 2.0)], 'C': []})
+# print(g, g.neighbors('A'), g.edge_weights('A'))
+# g.save("/tmp/graph"); g2 = CSRGraph.load("/tmp/graph")
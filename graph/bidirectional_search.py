@@ -1,9 +1,49 @@
 # Bidirectional Search Algorithm
 # Finds the shortest path between two nodes in an unweighted graph by expanding from both ends simultaneously until the frontiers meet.
+# For many queries on a static (weighted) road graph, ContractionHierarchy preprocesses it
+# once: nodes are contracted in order of importance, adding shortcut edges wherever a
+# contracted node lay on the only shortest path between two neighbors (found by bounded
+# witness searches). A query is then a bidirectional Dijkstra that only ever climbs to
+# higher-ranked nodes (skipping nodes that a higher one reaches more cheaply, "stall on
+# demand"), which settles a few hundred nodes even on large road networks.
+# The hierarchy is stored as two upward CSR graphs and saves to .npy files. The benchmark's
+# road grid and plain Dijkstra baseline come from dijkstras_algorithm.py (loaded by path).
 
-from collections import deque
+import heapq
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
 
-def bidirectional_search(graph, start, goal):
+import numpy as np
+
+INF = float('inf')
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "dijkstras_algorithm" in sys.modules:
+        return sys.modules["dijkstras_algorithm"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dijkstras_algorithm.py")
+    spec = importlib.util.spec_from_file_location("dijkstras_algorithm", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
+def bidirectional_search(graph, start, goal, hierarchy=None):
+    """
+    graph: dict node -> list of neighbors (undirected, unweighted)
+    hierarchy: optional ContractionHierarchy of the graph; the query then runs on it
+    and returns a shortest path by edge weight
+    """
+    if hierarchy is not None:
+        return hierarchy.path(start, goal)
     if start == goal:
         return [start]
     
@@ -16,27 +56,24 @@ def bidirectional_search(graph, start, goal):
     frontier_goal = [goal]
     
     while frontier_start and frontier_goal:
-        # Expand frontier from the start side
-        current_start = frontier_start.pop()
-        for neighbor in graph.get(current_start, []):
-            if neighbor not in visited_start:
-                visited_start[neighbor] = current_start
-                if neighbor in visited_goal:
-                    # Meeting point found; reconstruct path
-                    path = _reconstruct_path(visited_start, visited_goal, neighbor)
-                    return path
-                frontier_start.append(neighbor)
-        
-        # Expand frontier from the goal side
-        current_goal = frontier_goal.pop()
-        for neighbor in graph.get(current_goal, []):
-            if neighbor not in visited_goal:
-                visited_goal[neighbor] = current_goal
-                if neighbor in visited_start:
-                    # Meeting point found; reconstruct path
-                    path = _reconstruct_path(visited_start, visited_goal, neighbor)
-                    return path
-                frontier_goal.append(neighbor)
+        # Expand one whole level of the smaller frontier, so the first meeting is on a shortest path
+        if len(frontier_start) <= len(frontier_goal):
+            frontier, visited, other = frontier_start, visited_start, visited_goal
+        else:
+            frontier, visited, other = frontier_goal, visited_goal, visited_start
+        next_frontier = []
+        for current in frontier:
+            for neighbor in graph.get(current, []):
+                if neighbor not in visited:
+                    visited[neighbor] = current
+                    if neighbor in other:
+                        # Meeting point found; reconstruct path
+                        return _reconstruct_path(visited_start, visited_goal, neighbor)
+                    next_frontier.append(neighbor)
+        if frontier is frontier_start:
+            frontier_start = next_frontier
+        else:
+            frontier_goal = next_frontier
     
     # No path found
     return None
@@ -57,4 +94,251 @@ def _reconstruct_path(visited_start, visited_goal, meeting_node):
         path_goal.append(node)
         node = visited_goal[node]
     full_path = path_start + path_goal
-    return full_path
\ No newline at end of file
+    return full_path
+
+
+def _witness(out_edges, source, skip, limit, max_settled):
+    # Bounded Dijkstra from source that avoids `skip`; distances are exact up to `limit`
+    dist = {source: 0}
+    heap = [(0, source)]
+    settled = 0
+    while heap and settled < max_settled:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        if d > limit:
+            break
+        settled += 1
+        for v, w in out_edges[u].items():
+            nd = d + w
+            if v != skip and nd < dist.get(v, INF):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def _shortcuts(out_edges, in_edges, v, max_settled):
+    # Shortcuts u -> w (weight, through v) that contracting v would need
+    needed = []
+    outgoing = out_edges[v]
+    if not outgoing:
+        return needed
+    max_out = max(outgoing.values())
+    for u, w_uv in in_edges[v].items():
+        dist = _witness(out_edges, u, v, w_uv + max_out, max_settled)
+        for w, w_vw in outgoing.items():
+            if w != u and w_uv + w_vw < dist.get(w, INF):
+                needed.append((u, w, w_uv + w_vw))
+    return needed
+
+
+def _csr(lists, n):
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(edges) for edges in lists], out=indptr[1:])
+    flat = [edge for edges in lists for edge in edges]
+    indices = np.array([e[0] for e in flat], dtype=np.int32)
+    weights = np.array([e[1] for e in flat], dtype=np.float64)
+    middle = np.array([e[2] for e in flat], dtype=np.int32)
+    return indptr, indices, weights, middle
+
+
+class ContractionHierarchy:
+    ARRAYS = ("rank", "up_indptr", "up_indices", "up_weights", "up_middle",
+              "down_indptr", "down_indices", "down_weights", "down_middle")
+
+    def __init__(self, names, rank, up_indptr, up_indices, up_weights, up_middle,
+                 down_indptr, down_indices, down_weights, down_middle):
+        """up: edges u -> w with rank[w] > rank[u]; down: edges w -> u (stored at u) with
+        rank[w] > rank[u], for the backward search. middle is the contracted node of a
+        shortcut, -1 for an original edge."""
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.rank = rank
+        self.arrays = (up_indptr, up_indices, up_weights, up_middle,
+                       down_indptr, down_indices, down_weights, down_middle)
+        # The query loop runs on plain lists; the arrays are only kept for save()
+        self.up = self._lists(up_indptr, up_indices, up_weights)
+        self.down = self._lists(down_indptr, down_indices, down_weights)
+        self.middle = {}  # (a, b) -> contracted node, for every shortcut a -> b
+        for indptr, indices, middle, forward in ((up_indptr, up_indices, up_middle, True),
+                                                 (down_indptr, down_indices, down_middle, False)):
+            sources = np.repeat(np.arange(len(names)), np.diff(indptr))
+            for a, b, m in zip(sources.tolist(), np.asarray(indices).tolist(), np.asarray(middle).tolist()):
+                if m >= 0:
+                    self.middle[(a, b) if forward else (b, a)] = m
+
+    @staticmethod
+    def _lists(indptr, indices, weights):
+        indptr = np.asarray(indptr).tolist()
+        indices, weights = np.asarray(indices).tolist(), np.asarray(weights).tolist()
+        return [list(zip(indices[lo:hi], weights[lo:hi])) for lo, hi in zip(indptr, indptr[1:])]
+
+    @classmethod
+    def build(cls, graph, max_settled=60):
+        """
+        graph: dict node -> list of (neighbor, weight), or of neighbors (weight 1)
+        max_settled bounds each witness search; a cut-short search only adds extra shortcuts.
+        """
+        names = list(graph)
+        for edges in graph.values():
+            names.extend(e[0] if isinstance(e, tuple) else e for e in edges)
+        names = list(dict.fromkeys(names))
+        ids = {name: i for i, name in enumerate(names)}
+        n = len(names)
+        out_edges = [{} for _ in range(n)]
+        in_edges = [{} for _ in range(n)]
+        middle = {}
+        for u, edges in graph.items():
+            for e in edges:
+                v, w = e if isinstance(e, tuple) else (e, 1)
+                a, b = ids[u], ids[v]
+                if a != b and w < out_edges[a].get(b, INF):
+                    out_edges[a][b] = in_edges[b][a] = w
+
+        def priority(v):
+            # edge difference plus already contracted neighbors keeps the hierarchy balanced
+            return (len(_shortcuts(out_edges, in_edges, v, max_settled))
+                    - len(out_edges[v]) - len(in_edges[v]) + contracted_neighbors[v])
+
+        contracted_neighbors = [0] * n
+        heap = [(priority(v), v) for v in range(n)]
+        heapq.heapify(heap)
+        rank = np.zeros(n, dtype=np.int32)
+        up = [None] * n
+        down = [None] * n
+        next_rank = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            p = priority(v)
+            if heap and p > heap[0][0]:
+                heapq.heappush(heap, (p, v))  # lazy update: importance went up since it was queued
+                continue
+            for u, w, weight in _shortcuts(out_edges, in_edges, v, max_settled):
+                if weight < out_edges[u].get(w, INF):
+                    out_edges[u][w] = in_edges[w][u] = weight
+                    middle[(u, w)] = v
+            up[v] = [(w, weight, middle.get((v, w), -1)) for w, weight in out_edges[v].items()]
+            down[v] = [(u, weight, middle.get((u, v), -1)) for u, weight in in_edges[v].items()]
+            for w in out_edges[v]:
+                del in_edges[w][v]
+                contracted_neighbors[w] += 1
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                contracted_neighbors[u] += 1
+            out_edges[v], in_edges[v] = {}, {}
+            rank[v] = next_rank
+            next_rank += 1
+        return cls(names, rank, *_csr(up, n), *_csr(down, n))
+
+    def _search(self, s, t):
+        # Bidirectional upward Dijkstra; returns (distance, meeting node, parents, parents)
+        dist = ({s: 0}, {t: 0})
+        parent = ({s: None}, {t: None})
+        heaps = ([(0, s)], [(0, t)])
+        graphs = (self.up, self.down)
+        best, meet = (0, s) if s == t else (INF, None)
+        while True:
+            # Advance the side with the smaller key; stop once neither can improve on best
+            tops = [heap[0][0] if heap else INF for heap in heaps]
+            side = 0 if tops[0] <= tops[1] else 1
+            if tops[side] >= best:
+                break
+            heap = heaps[side]
+            d, u = heapq.heappop(heap)
+            mine, theirs = dist[side], dist[1 - side]
+            if d > mine[u]:
+                continue
+            if u in theirs and d + theirs[u] < best:
+                best, meet = d + theirs[u], u
+            # Stall-on-demand: a higher node already reached offers a shorter way to u, so
+            # u is not on a shortest up-path and need not be expanded
+            if any(mine.get(x, INF) + w < d for x, w in graphs[1 - side][u]):
+                continue
+            for v, w in graphs[side][u]:
+                nd = d + w
+                if nd < mine.get(v, INF):
+                    mine[v] = nd
+                    parent[side][v] = u
+                    heapq.heappush(heap, (nd, v))
+        return best, meet, parent
+
+    def _unpack(self, a, b, out):
+        # Append the original nodes after a on the (possibly shortcut) edge a -> b
+        m = self.middle.get((a, b))
+        if m is None:
+            out.append(b)
+        else:
+            self._unpack(a, m, out)
+            self._unpack(m, b, out)
+
+    def distance(self, start, goal):
+        return self._search(self.ids[start], self.ids[goal])[0]
+
+    def path(self, start, goal):
+        """Shortest path as a list of nodes, or None if goal is unreachable."""
+        best, meet, (forward, backward) = self._search(self.ids[start], self.ids[goal])
+        if meet is None:
+            return None
+        up_nodes = [meet]
+        while forward[up_nodes[-1]] is not None:
+            up_nodes.append(forward[up_nodes[-1]])
+        up_nodes.reverse()
+        down_nodes = [meet]
+        while backward[down_nodes[-1]] is not None:
+            down_nodes.append(backward[down_nodes[-1]])
+        path = [up_nodes[0]]
+        hops = up_nodes + down_nodes[1:]
+        for a, b in zip(hops, hops[1:]):
+            self._unpack(a, b, path)
+        return [self.names[u] for u in path]
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name, array in zip(self.ARRAYS, (self.rank,) + self.arrays):
+            np.save(os.path.join(directory, name + ".npy"), array)
+        with open(os.path.join(directory, "names.json"), "w") as f:
+            json.dump(self.names, f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        mode = "r" if mmap else None
+        with open(os.path.join(directory, "names.json")) as f:
+            names = [tuple(name) if isinstance(name, list) else name for name in json.load(f)]
+        return cls(names, *(np.load(os.path.join(directory, name + ".npy"), mmap_mode=mode)
+                            for name in cls.ARRAYS))
+
+
+def benchmark(side=100, queries=1000, seed=0):
+    """Preprocessing cost and query latency of the hierarchy against plain Dijkstra."""
+    graph = engine.road_grid(side, seed)
+    rng = random.Random(seed)
+    nodes = list(graph)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+    start = time.perf_counter()
+    ch = ContractionHierarchy.build(graph)
+    built = time.perf_counter() - start
+    edges = sum(len(e) for e in graph.values())
+    print(f"{side}x{side} road grid: {len(nodes)} nodes, {edges} edges; hierarchy built in {built:.1f} s "
+          f"with {len(ch.middle)} shortcuts")
+    paths = engine.ShortestPathEngine(graph)
+    sample = pairs[:queries // 10]
+    start = time.perf_counter()
+    plain = []
+    for u, v in sample:
+        paths.run([u], [v])
+        plain.append(paths.distance(v))
+    dijkstra_ms = (time.perf_counter() - start) / len(sample) * 1e3
+    start = time.perf_counter()
+    for u, v in pairs:
+        ch.distance(u, v)
+    ch_ms = (time.perf_counter() - start) / queries * 1e3
+    assert plain == [ch.distance(u, v) for u, v in sample]
+    print(f"  Dijkstra {dijkstra_ms:8.3f} ms/query, hierarchy {ch_ms:6.3f} ms/query")
+
+# Example usage:
+# graph = {'A': ['B', 'C'], 'B': ['A', 'D'], 'C': ['A', 'D'], 'D': ['B', 'C']}
+# print(bidirectional_search(graph, 'A', 'D'))
+# ch = ContractionHierarchy.build(graph)   # preprocessing, once per graph
+# ch.save("/tmp/ch"); ch = ContractionHierarchy.load("/tmp/ch")
+# print(bidirectional_search(graph, 'A', 'D', hierarchy=ch))
+# benchmark()
@@ -1,55 +1,41 @@
 # Boruvka's algorithm for Minimum Spanning Tree
-def boruvka_mst(n, edges):
+# Each round every component picks its lightest outgoing edge (ties by edge index) and the
+# components merge along those edges. The rounds run on the engine in
+# minimum_spanning_forest.py: edges are NumPy arrays in shared memory, the min-edge scans
+# are split over a process pool (workers=None uses every CPU), components are tracked with
+# the array-backed DisjointSet, and edges inside a component are dropped after each round.
+import importlib.util
+import os
+import sys
+
+import numpy as np
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "minimum_spanning_forest" in sys.modules:
+        return sys.modules["minimum_spanning_forest"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "minimum_spanning_forest.py")
+    spec = importlib.util.spec_from_file_location("minimum_spanning_forest", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
+
+def boruvka_mst(n, edges, workers=None):
     # n: number of vertices, edges: list of (u, v, weight)
-    parent = list(range(n))
-    rank = [0] * n
-
-    def find(x):
-        if parent[x] != x:
-            parent[x] = find(parent[x])
-        return parent[x]
-
-    def union(x, y):
-        xroot = find(x)
-        yroot = find(y)
-        if xroot == yroot:
-            return
-        if rank[xroot] < rank[yroot]:
-            parent[xroot] = yroot
-        elif rank[xroot] > rank[yroot]:
-            parent[yroot] = xroot
-        else:
-            parent[yroot] = xroot
-            rank[yroot] += 1
-
-    mst_weight = 0
-    mst_edges = []
-    num_components = n
-
-    while num_components > 1:
-        cheapest = [None] * n
-        for (u, v, w) in edges:
-            ru = find(u)
-            rv = find(v)
-            if ru == rv:
-                continue
-            if cheapest[ru] is None or w < cheapest[ru][2]:
-                cheapest[ru] = (u, v, w)
-            if cheapest[rv] is None or w < cheapest[rv][2]:
-                cheapest[rv] = (u, v, w)
-        for i in range(n):
-            if cheapest[i] is not None:
-                u, v, w = cheapest[i]
-                ru = find(u)
-                rv = find(v)
-                if ru != rv:
-                    union(ru, rv)
-                    mst_weight += w
-                    mst_edges.append((u, v, w))
-                    num_components -= 1
-    return mst_weight, mst_edges
+    if not edges:
+        return 0, []
+    src, dst, weight = (np.array(column) for column in zip(*edges))
+    chosen = engine.boruvka(n, src, dst, weight, workers)
+    mst_edges = [edges[e] for e in np.sort(chosen).tolist()]
+    return sum(w for _, _, w in mst_edges), mst_edges
 
 # Example usage:
 # vertices = 4
 # edges = [(0, 1, 1), (1, 2, 2), (0, 2, 3), (2, 3, 4), (0, 3, 5)]
-# print(boruvka_mst(vertices, edges))
\ No newline at end of file
+# print(boruvka_mst(vertices, edges))  # (7, [(0, 1, 1), (1, 2, 2), (2, 3, 4)])
@@ -1,22 +1,31 @@
 # Breadth-First Search (BFS) – explores a graph level by level from a starting node
+# A CSRGraph (adjacency_list.py) is searched one whole level at a time with NumPy: the
+# frontier's edge ranges are gathered in one step and unseen targets become the next level.
+from collections import deque
+
+import numpy as np
 
 def bfs(graph, start):
     """
     Perform BFS on a graph represented as an adjacency list.
     
     Parameters:
-    graph (dict): A dictionary where keys are node identifiers and values are lists of adjacent nodes.
+    graph (dict): A dictionary where keys are node identifiers and values are lists of adjacent nodes,
+                  or a CSRGraph.
     start: The starting node for the traversal.
     
     Returns:
     list: Nodes visited in the order they were discovered.
+          For a CSRGraph: (order, dist) arrays, see _bfs_csr.
     """
+    if hasattr(graph, "indptr"):
+        return _bfs_csr(graph, graph.node_id(start))
     visited = set()
-    queue = [start]  # queue of nodes to explore
+    queue = deque([start])  # queue of nodes to explore
     traversal = []   # list to store the order of visited nodes
 
     while queue:
-        current = queue.pop()
+        current = queue.popleft()
         if current not in visited:
             visited.add(current)
             traversal.append(current)
@@ -28,6 +37,34 @@ def bfs(graph, start):
 
     return traversal
 
+
+def _gather_neighbors(indptr, indices, frontier):
+    # Concatenation of indices[indptr[u]:indptr[u+1]] for every u in frontier
+    starts = indptr[frontier]
+    lengths = indptr[frontier + 1] - starts
+    offsets = np.cumsum(lengths) - lengths
+    positions = np.arange(lengths.sum()) - np.repeat(offsets - starts, lengths)
+    return indices[positions]
+
+
+def _bfs_csr(graph, start):
+    """Discovery order (int32 ids) and hop distances (-1 if unreachable) from start."""
+    dist = np.full(graph.num_nodes, -1, dtype=np.int32)
+    dist[start] = 0
+    frontier = np.array([start], dtype=np.int64)
+    order = [frontier]
+    level = 0
+    while len(frontier):
+        level += 1
+        targets = _gather_neighbors(graph.indptr, graph.indices, frontier)
+        targets = targets[dist[targets] < 0]
+        # Keep the first occurrence of each target so the order matches a FIFO queue
+        _, first = np.unique(targets, return_index=True)
+        frontier = targets[np.sort(first)].astype(np.int64)
+        dist[frontier] = level
+        order.append(frontier)
+    return np.concatenate(order).astype(np.int32), dist
+
 # Example usage:
 if __name__ == "__main__":
     graph = {
@@ -38,4 +75,8 @@ if __name__ == "__main__":
         'E': ['B', 'F'],
         'F': ['C', 'E']
     }
-    print(bfs(graph, 'A'))
\ No newline at end of file
+    print(bfs(graph, 'A'))
+
+    # Large graphs: the same search on a CSRGraph returns int32 ids and hop distances
+    # from adjacency_list import CSRGraph
+    # order, dist = bfs(CSRGraph.from_dict(graph), 'A')
\ No newline at end of file
@@ -1,33 +1,207 @@
 # Dijkstra's algorithm: find shortest paths from a source node in a weighted directed graph.
 # The graph is represented as an adjacency list: dict[node] -> list of (neighbor, weight).
 # Returns a tuple (distances, previous_nodes).
+# A CSRGraph (adjacency_list.py) takes an array fast path: distances and predecessors are
+# NumPy arrays indexed by node id, and edges are read straight from the CSR slices.
+# ShortestPathEngine is the reusable form behind dijkstra(): it keeps its distance and
+# predecessor buffers between queries (resetting only the entries a query touched), starts
+# from several sources at once, stops as soon as every requested target is settled, and
+# answers batched one-to-many queries. A run can hide edges and nodes (the spur searches of
+# Yen's algorithm). Graphs with non-negative integer weights can use a radix heap (the
+# monotone queue of data-structures/radix_heap.py, loaded by path) instead of heapq.
+# road_grid builds the test graph the point-to-point benchmarks (contraction hierarchies,
+# ALT landmarks, hub labels) share.
 
-def dijkstra(graph, source):
-    # Initialize distances and previous node pointers
-    dist = {node: 0 for node in graph}
-    prev = {node: None for node in graph}
-    visited = set()
-
-    dist[source] = 0
-
-    while len(visited) < len(graph):
-        # Select the unvisited node with the smallest tentative distance
-        unvisited_nodes = [(node, dist[node]) for node in graph if node not in visited]
-        if not unvisited_nodes:
-            break
-        current, current_dist = min(unvisited_nodes, key=lambda x: x[1])
-        visited.add(current)
-
-        # Relaxation step for all outgoing edges
-        for neighbor, weight in graph[current]:
-            if neighbor in visited:
-                continue
-            new_dist = current_dist + weight
-            if dist[neighbor] <= new_dist:
-                dist[neighbor] = new_dist
-                prev[neighbor] = current
-
-    return dist, prev
+import heapq
+import importlib.util
+import os
+import random
+from functools import partial
+from itertools import repeat
+
+import numpy as np
+
+INF = float("inf")
+UNREACHABLE = 1e300  # finite stand-in for INF in distance arrays whose entries get subtracted
+
+
+def _load(path, name):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+RadixHeap = _load(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data-structures",
+                               "radix_heap.py"), "radix_heap").RadixHeap
+
+
+class ShortestPathEngine:
+    def __init__(self, graph, heap="binary"):
+        if heap not in ("binary", "radix"):
+            raise ValueError(f"heap must be 'binary' or 'radix', not {heap!r}")
+        self.graph = graph
+        self.heap = heap
+        self.csr = hasattr(graph, "indptr")
+        self._touched = []
+        if self.csr:
+            indptr, indices, weights = graph.indptr.tolist(), graph.indices, graph.weights
+            if heap == "radix" and weights is not None:
+                if weights.size and (weights.min() < 0 or not np.array_equal(weights, np.floor(weights))):
+                    raise ValueError("the radix heap needs non-negative integer weights")
+                weights = weights.astype(np.int64)
+
+            def edges(u):
+                lo, hi = indptr[u], indptr[u + 1]
+                if weights is None:
+                    return zip(indices[lo:hi].tolist(), repeat(1, hi - lo))
+                return zip(indices[lo:hi].tolist(), weights[lo:hi].tolist())
+
+            self._edges = edges
+            self._id = graph.node_id
+            self._no_prev = -1
+            self.dist = [INF] * graph.num_nodes
+            self.prev = [-1] * graph.num_nodes
+        else:
+            nodes = dict.fromkeys(graph)
+            for targets in graph.values():
+                nodes.update((v, None) for v, _ in targets)
+                if heap == "radix" and not all(isinstance(w, int) and w >= 0 for _, w in targets):
+                    raise ValueError("the radix heap needs non-negative integer weights (Python ints)")
+            self._edges = lambda u: graph.get(u, ())
+            self._id = lambda node: node
+            self._no_prev = None
+            self.dist = dict.fromkeys(nodes, INF)
+            self.prev = dict.fromkeys(nodes)
+
+    def reset(self):
+        dist, prev, no_prev = self.dist, self.prev, self._no_prev
+        for u in self._touched:
+            dist[u] = INF
+            prev[u] = no_prev
+        self._touched = []
+
+    def run(self, sources, targets=None, removed_edges=(), removed_nodes=()):
+        """Search outward from every source at distance 0.
+
+        With targets the search stops once all of them are settled; then only settled
+        nodes (the targets and everything closer) are guaranteed to hold final distances.
+        removed_edges ((u, v) pairs) and removed_nodes are skipped by this run only.
+        """
+        self.reset()
+        dist, prev, touched, edges = self.dist, self.prev, self._touched, self._edges
+        if removed_edges or removed_nodes:
+            node_id = self._id
+            removed_nodes = {node_id(u) for u in removed_nodes}
+            removed_edges = {(node_id(u), node_id(v)) for u, v in removed_edges}
+            sources = [s for s in sources if node_id(s) not in removed_nodes]
+            all_edges = edges
+            edges = lambda u: [(v, w) for v, w in all_edges(u)
+                               if v not in removed_nodes and (u, v) not in removed_edges]
+        if self.heap == "radix":
+            queue = RadixHeap()
+            push, pop = queue.insert, queue.pop_min
+        else:
+            queue = []
+            push = lambda key, node: heapq.heappush(queue, (key, node))
+            pop = partial(heapq.heappop, queue)
+        for s in sources:
+            s = self._id(s)
+            if dist[s] != 0:
+                dist[s] = 0
+                touched.append(s)
+                push(0, s)
+        remaining = None if targets is None else {self._id(t) for t in targets}
+        if remaining is not None and not remaining:
+            return
+        while queue:
+            d, u = pop()
+            if d > dist[u]:
+                continue  # stale entry
+            if remaining is not None:
+                remaining.discard(u)
+                if not remaining:
+                    break
+            for v, w in edges(u):
+                nd = d + w
+                if nd < dist[v]:
+                    if dist[v] == INF:
+                        touched.append(v)
+                    dist[v] = nd
+                    prev[v] = u
+                    push(nd, v)
+
+    def distance(self, node):
+        return self.dist[self._id(node)]
+
+    def path(self, target):
+        """Nodes from a source to target after run(), or None if target was not reached."""
+        u = self._id(target)
+        if self.dist[u] == INF:
+            return None
+        path = []
+        while u != self._no_prev:
+            path.append(u)
+            u = self.prev[u]
+        path.reverse()
+        return path
+
+    def results(self):
+        """(dist, prev) of the last run, detached from the reusable buffers."""
+        if self.csr:
+            return np.array(self.dist, dtype=np.float64), np.array(self.prev, dtype=np.int32)
+        return dict(self.dist), dict(self.prev)
+
+    def one_to_many(self, source, targets, out=None):
+        """Distances from source to each target (inf if unreachable) as a float64 array."""
+        targets = [self._id(t) for t in targets]
+        if out is None:
+            out = np.empty(len(targets), dtype=np.float64)
+        self.run([source], targets)
+        dist = self.dist
+        out[:] = [dist[t] for t in targets]
+        return out
+
+    def distance_table(self, sources, targets, out=None):
+        """Batched one-to-many: row i holds the distances from sources[i] to every target."""
+        targets = [self._id(t) for t in targets]
+        if out is None:
+            out = np.empty((len(sources), len(targets)), dtype=np.float64)
+        for row, source in zip(out, sources):
+            self.one_to_many(source, targets, row)
+        return out
+
+
+def dijkstra(graph, source, target=None, heap="binary"):
+    return multi_source_dijkstra(graph, [source], None if target is None else [target], heap)
+
+
+def multi_source_dijkstra(graph, sources, targets=None, heap="binary"):
+    """Distances to the nearest of several sources; prev chains lead back to that source."""
+    engine = ShortestPathEngine(graph, heap)
+    engine.run(sources, targets)
+    return engine.results()
+
+
+def shortest_path(graph, source, target, heap="binary"):
+    """(path, cost) from source to target, stopping as soon as target is settled."""
+    engine = ShortestPathEngine(graph, heap)
+    engine.run([source], [target])
+    return engine.path(target), engine.distance(target)
+
+
+def road_grid(side, seed=0, drop=0.1):
+    """Road-network-like test graph: a side x side grid with random lengths and missing streets."""
+    rng = random.Random(seed)
+    graph = {(x, y): [] for x in range(side) for y in range(side)}
+    for x in range(side):
+        for y in range(side):
+            for nx, ny in ((x + 1, y), (x, y + 1)):
+                if nx < side and ny < side and rng.random() >= drop:
+                    w = rng.randint(10, 100)
+                    graph[(x, y)].append(((nx, ny), w))
+                    graph[(nx, ny)].append(((x, y), w))
+    return graph
 
 # Example usage (uncomment to test)
 # graph = {
@@ -38,4 +212,7 @@ def dijkstra(graph, source):
 # }
 # distances, previous = dijkstra(graph, 'A')
 # print(distances)   # Expected: {'A': 0, 'B': 1, 'C': 3, 'D': 4}
-# print(previous)    # Expected: {'A': None, 'B': 'A', 'C': 'B', 'D': 'C'}
\ No newline at end of file
+# print(previous)    # Expected: {'A': None, 'B': 'A', 'C': 'B', 'D': 'C'}
+# print(shortest_path(graph, 'A', 'D', heap="radix"))  # (['A', 'B', 'C', 'D'], 4)
+# engine = ShortestPathEngine(graph)
+# print(engine.distance_table(['A', 'B'], ['C', 'D']))  # [[3. 4.] [2. 3.]]
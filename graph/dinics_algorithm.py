@@ -1,63 +1,47 @@
 # Dinic's algorithm for computing the maximum flow in a flow network.
 # The implementation builds a level graph using BFS and sends blocking flows via DFS.
+# Edges live in the shared residual store of max_flow.py (paired arc arrays, reverse of arc
+# i is i ^ 1); the blocking-flow search is iterative and keeps a current-arc pointer per
+# node, so no arc is rescanned within a phase. max_flow(s, t, solver=...) can also run the
+# push-relabel or augmenting-path solvers on the same network.
+import importlib.util
+import os
+import sys
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "max_flow" in sys.modules:
+        return sys.modules["max_flow"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "max_flow.py")
+    spec = importlib.util.spec_from_file_location("max_flow", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
 
-class Edge:
-    def __init__(self, to, rev, cap):
-        self.to = to      # destination node
-        self.rev = rev    # index of the reverse edge in adjacency list of 'to'
-        self.cap = cap    # remaining capacity
 
 class Dinic:
     def __init__(self, n):
         self.n = n
-        self.graph = [[] for _ in range(n)]
+        self.network = engine.FlowNetwork(n)
 
     def add_edge(self, fr, to, cap):
-        forward = Edge(to, len(self.graph[to]), cap)
-        backward = Edge(fr, len(self.graph[fr]), 0)
-        self.graph[fr].append(forward)
-        self.graph[to].append(backward)
+        return self.network.add_edge(fr, to, cap)
 
-    def bfs_level(self, s, t):
-        level = [-1] * self.n
-        queue = [s]
-        level[s] = 0
-        while queue:
-            v = queue.pop(0)
-            for e in self.graph[v]:
-                if e.cap > 0 and level[e.to] == 0:
-                    level[e.to] = level[v] + 1
-                    queue.append(e.to)
-        return level
+    def max_flow(self, s, t, solver="dinic"):
+        """Maximum s-t flow (after more add_edge calls, a second call returns the extra flow)."""
+        return engine.max_flow(self.network, s, t, solver)
 
-    def dfs_flow(self, v, t, f, level, it):
-        if v == t:
-            return f
-        for i in range(it[v], len(self.graph[v])):
-            e = self.graph[v][i]
-            if e.cap > 0 and level[v] < level[e.to]:
-                d = self.dfs_flow(e.to, t, min(f, e.cap), level, it)
-                if d > 0:
-                    e.cap -= d
-                    self.graph[e.to][e.rev].cap += d
-                    return d
-        it[v] += 1
-        return 0
+    def flow(self):
+        """Flow on each edge, in add_edge order."""
+        return self.network.flow()
 
-    def max_flow(self, s, t):
-        flow = 0
-        INF = 10 ** 18
-        while True:
-            level = self.bfs_level(s, t)
-            if level[t] < 0:
-                break
-            it = [0] * self.n
-            while True:
-                f = self.dfs_flow(s, t, INF, level, it)
-                if f == 0:
-                    break
-                flow += f
-        return flow
+    def min_cut(self, s):
+        return self.network.min_cut(s)
 
 # Example usage:
 # d = Dinic(4)
@@ -65,4 +49,5 @@ class Dinic:
 # d.add_edge(0, 2, 1)
 # d.add_edge(1, 2, 1)
 # d.add_edge(1, 3, 1)
-# d.add_edge(2, 3, 2)
\ No newline at end of file
+# d.add_edge(2, 3, 2)
+# print(d.max_flow(0, 3))  # 3
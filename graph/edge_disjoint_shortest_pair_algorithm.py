@@ -2,52 +2,46 @@
 # Idea: Find the shortest path between source and destination,
 # remove its edges, then find the next shortest path on the remaining graph.
 # The two paths are guaranteed to be edge-disjoint.
+# Both searches run on the Dijkstra engine of dijkstras_algorithm.py (loaded by path).
 
-import heapq
 import copy
+import importlib.util
+import os
+import sys
+
+INF = float('inf')
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "dijkstras_algorithm" in sys.modules:
+        return sys.modules["dijkstras_algorithm"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dijkstras_algorithm.py")
+    spec = importlib.util.spec_from_file_location("dijkstras_algorithm", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
 
 def dijkstra(graph, start, goal):
-    # graph: dict node -> list of (neighbor, weight)
-    distances = {node: float('inf') for node in graph}
-    previous = {}
-    distances[start] = 0
-    heap = [(0, start)]
-    while heap:
-        dist, node = heapq.heappop(heap)
-        if dist > distances[node]:
-            continue
-        if node == goal:
-            break
-        for neighbor, weight in graph[node]:
-            alt = dist + weight
-            if alt < distances[neighbor]:
-                distances[neighbor] = alt
-                previous[neighbor] = node
-                heapq.heappush(heap, (alt, neighbor))
-    if goal not in previous and start != goal:
-        return None, float('inf')
-    # Reconstruct path
-    path = []
-    current = goal
-    while current != start:
-        path.append(current)
-        current = previous[current]
-    path.append(start)
-    path.reverse()
-    return path, distances[goal]
+    # graph: dict node -> list of (neighbor, weight); returns (path, cost), (None, INF) if unreachable
+    return engine.shortest_path(graph, start, goal)
 
 def remove_path_edges(graph, path):
     for i in range(len(path) - 1):
         u, v = path[i], path[i + 1]
-        graph[u] = [(nbr, w) for nbr, w in graph[u] if nbr != v]
-        graph[v] = [(nbr, w) for nbr, w in graph[v] if nbr != u]
+        graph[u] = [(nbr, w) for nbr, w in graph.get(u, ()) if nbr != v]
+        graph[v] = [(nbr, w) for nbr, w in graph.get(v, ()) if nbr != u]
 
 def edge_disjoint_shortest_pair(graph, src, dst):
     # Make a deep copy to avoid altering original graph
     g_copy = copy.deepcopy(graph)
     path1, cost1 = dijkstra(g_copy, src, dst)
     if path1 is None:
-        return None, None, float('inf')
+        return None, None, INF
     remove_path_edges(g_copy, path1)
     path2, cost2 = dijkstra(g_copy, src, dst)
     if path2 is None:
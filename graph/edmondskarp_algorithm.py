@@ -1,56 +1,38 @@
 # Edmonds–Karp algorithm
 # Computes the maximum flow in a flow network using a BFS to find augmenting paths.
 # The graph is represented as an adjacency dictionary: graph[u] = {v: capacity, ...}
+# Nodes are mapped to ids and the edges copied into the paired-arc residual store of
+# max_flow.py; solver= switches to Dinic or push-relabel on the same network.
+import importlib.util
+import os
+import sys
 
-def edmonds_karp(graph, source, sink):
-    n = len(graph)
-    # Build residual graph
-    residual = {u: dict(graph[u]) for u in graph}
-    for u in graph:
-        for v in graph[u]:
-            if v not in residual[u]:
-                residual[u][v] = 0
-    max_flow = 0
-
-    while True:
-        # BFS to find shortest augmenting path
-        parent = {source: None}
-        queue = [source]
-        visited = set([source])
-        while queue:
-            u = queue.pop(0)
-            for v, cap in residual[u].items():
-                if cap > 0 and v not in visited:
-                    visited.add(v)
-                    parent[v] = u
-                    queue.append(v)
-                    if v == sink:
-                        break
-            if sink in parent:
-                break
 
-        if sink not in parent:
-            break  # no augmenting path found
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "max_flow" in sys.modules:
+        return sys.modules["max_flow"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "max_flow.py")
+    spec = importlib.util.spec_from_file_location("max_flow", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
 
-        # Find minimum residual capacity along the path
-        path_flow = float('inf')
-        v = sink
-        while v != source:
-            u = parent[v]
-            path_flow = min(path_flow, residual[u][v])
-            v = u
 
-        # Update residual capacities
-        v = sink
-        while v != source:
-            u = parent[v]
-            residual[u][v] += path_flow
-            residual[v][u] -= path_flow
-            v = u
+engine = _load_engine()
 
-        max_flow += path_flow
 
-    return max_flow
+def edmonds_karp(graph, source, sink, solver="edmonds-karp"):
+    ids = {u: i for i, u in enumerate(graph)}
+    for u in graph:
+        for v in graph[u]:
+            ids.setdefault(v, len(ids))
+    network = engine.FlowNetwork(len(ids))
+    for u in graph:
+        for v, cap in graph[u].items():
+            network.add_edge(ids[u], ids[v], cap)
+    return engine.max_flow(network, ids[source], ids[sink], solver)
 
 # Example usage:
 # graph = {
@@ -60,4 +42,4 @@ def edmonds_karp(graph, source, sink):
 #     'c': {'t': 10},
 #     't': {}
 # }
-# print(edmonds_karp(graph, 's', 't'))
\ No newline at end of file
+# print(edmonds_karp(graph, 's', 't'))  # 10
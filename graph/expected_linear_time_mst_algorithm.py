@@ -1,87 +1,70 @@
 # Karger–Stein expected linear time MST algorithm (simplified implementation)
-import random
-import math
+# Karger–Klein–Tarjan recursion: two Borůvka steps contract the graph, a random half of the
+# remaining edges gives a forest F (recursively), every F-heavy edge (heavier than the F path
+# between its ends, so outside the MST by the cycle property) is dropped, and the MST of the
+# F-light edges is found recursively. Ties are broken by edge index throughout.
+# Edge arrays, Borůvka steps, Kruskal and the F-light test come from the engine in
+# minimum_spanning_forest.py; the F-light test is a Kruskal pass in which only F's edges
+# merge components, rather than the linear-time MST verification of the original.
+import importlib.util
+import os
+import sys
 
-class DSU:
-    def __init__(self, n):
-        self.parent = list(range(n))
-        self.rank = [0]*n
+import numpy as np
 
-    def find(self, x):
-        while self.parent[x] != x:
-            self.parent[x] = self.parent[self.parent[x]]
-            x = self.parent[x]
-        return x
 
-    def union(self, x, y):
-        xr = self.find(x)
-        yr = self.find(y)
-        if xr == yr:
-            return False
-        if self.rank[xr] < self.rank[yr]:
-            self.parent[xr] = yr
-        elif self.rank[xr] > self.rank[yr]:
-            self.parent[yr] = xr
-        else:
-            self.parent[yr] = xr
-            self.rank[xr] += 1
-        return True
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "minimum_spanning_forest" in sys.modules:
+        return sys.modules["minimum_spanning_forest"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "minimum_spanning_forest.py")
+    spec = importlib.util.spec_from_file_location("minimum_spanning_forest", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
 
 def kruskal_mst(edges, n):
-    dsu = DSU(n)
-    mst = []
-    edges_sorted = sorted(edges, key=lambda e: e[2])
-    for u, v, w in edges_sorted:
-        if dsu.union(u, v):
-            mst.append((u, v, w))
-            if len(mst) == n-1:
-                break
-    return mst
+    if not edges:
+        return []
+    src, dst, weight = (np.array(column) for column in zip(*edges))
+    return [edges[e] for e in engine.kruskal(n, src, dst, weight).tolist()]
+
+
+def _msf(n, src, dst, weight, ids, rng):
+    # Indices (values of ids) of the minimum spanning forest edges
+    if len(src) <= 2 * n:
+        return ids[engine.kruskal(n, src, dst, weight, ids)]
+    chosen = []
+    for _ in range(2):
+        step, labels, n = engine.boruvka_step(n, src, dst, weight, ids)
+        chosen.append(ids[step])
+        src, dst = labels[src], labels[dst]
+        keep = src != dst
+        src, dst, weight, ids = src[keep], dst[keep], weight[keep], ids[keep]
+    if len(src):
+        sample = np.flatnonzero(rng.random(len(src)) < 0.5)
+        forest = _msf(n, src[sample], dst[sample], weight[sample], ids[sample], rng)
+        position = np.searchsorted(ids, forest)  # ids stay sorted through every filter
+        light = engine.f_light(n, src, dst, weight, position, ids)
+        chosen.append(_msf(n, src[light], dst[light], weight[light], ids[light], rng))
+    return np.concatenate(chosen)
 
-def contract_graph(edges, contract_edges):
-    # Union endpoints of contract_edges
-    if not contract_edges:
-        return edges[:]
-    # Determine vertex set size
-    vertices = set()
-    for u, v, _ in edges:
-        vertices.update([u, v])
-    max_vertex = max(vertices)+1
-    dsu = DSU(max_vertex)
-    for u, v, _ in contract_edges:
-        dsu.union(u, v)
-    # Build new edge list with collapsed vertices
-    new_edges = {}
-    for u, v, w in edges:
-        ru, rv = dsu.find(u), dsu.find(v)
-        if ru == rv:
-            continue
-        key = (min(ru, rv), max(ru, rv))
-        # if key in new_edges:
-        #     new_edges[key] = min(new_edges[key], w)
-        if key not in new_edges or w < new_edges[key]:
-            new_edges[key] = w
-    result = [(u, v, w) for (u, v), w in new_edges.items()]
-    return result
 
-def karger_stein_mst(edges, n):
+def karger_stein_mst(edges, n, seed=None):
     # n: number of vertices in the graph
-    if len(edges) <= 3*n - 3:
-        return kruskal_mst(edges, n)
-    # Randomly permute edges
-    shuffled = edges[:]
-    random.shuffle(shuffled)
-    first_part = shuffled[:2*n]
-    second_part = shuffled[2*n:]
-    G1 = contract_graph(edges, first_part)
-    M1 = karger_stein_mst(G1, n)
-    G2 = contract_graph(G1, M1)
-    M2 = karger_stein_mst(G2, n)
-    # Merge MSTs (may lose duplicate edges)
-    mst_set = set(M1 + M2)
-    return list(mst_set)
+    if not edges:
+        return []
+    src, dst, weight = (np.array(column) for column in zip(*edges))
+    ids = np.arange(len(edges))
+    chosen = _msf(n, src, dst, weight.astype(np.float64), ids, np.random.default_rng(seed))
+    return [edges[e] for e in np.sort(chosen).tolist()]
 
 # Example usage:
 # Suppose vertices are labeled 0..n-1
 # edges = [(0,1,5), (1,2,3), (0,2,4), ...]
-# mst = karger_stein_mst(edges, n)
\ No newline at end of file
+# mst = karger_stein_mst(edges, n)
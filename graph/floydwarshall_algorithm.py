@@ -1,22 +1,86 @@
 # Floyd–Warshall algorithm: compute all-pairs shortest paths in a weighted graph (allows negative weights)
+# Each pivot k is a NumPy min-plus update, dist = min(dist, dist[:, k] + dist[k, :]), applied
+# to row chunks that fit in L2, broadcasting row k against column k instead of looping in Python.
+# The blocked variant processes pivots a block at a time: the pivot rows and pivot columns
+# are finished first, then every other row stripe (cut into column tiles that fit in L2)
+# is swept with all pivots of the block while it is in cache. The distance matrix can be a
+# memory-mapped .npy file, which the blocked variant reads once per pivot block.
 
-def floyd_warshall(adj):
-    n = len(adj)
-    INF = float('inf')
-    # Initialize distance matrix
-    dist = [[0] * n for _ in range(n)]
-    for i in range(n):
-        for j in range(n):
-            if i == j:
-                dist[i][j] = 0
-            elif adj[i][j] != 0:
-                dist[i][j] = adj[i][j]
-            else:
-                dist[i][j] = INF
-    # Main Floyd-Warshall triple loop
-    for i in range(n):
-        for j in range(n):
-            for k in range(n):
-                if dist[i][j] > dist[i][k] + dist[k][j]:
-                    dist[i][j] = dist[i][k] + dist[k][j]
-    return dist
\ No newline at end of file
+import numpy as np
+
+L2_BYTES = 1 << 20  # working set aimed at for one tile
+
+
+def _relax(target, column, pivot_rows):
+    # target = min(target, column[:, i] + pivot_rows[i]) for each pivot i in turn; column and
+    # pivot_rows may be views into target, in which case they see the earlier updates
+    scratch = np.empty_like(target)
+    for i in range(len(pivot_rows)):
+        np.add(column[:, i, None], pivot_rows[i], out=scratch)
+        np.minimum(target, scratch, out=target)
+
+
+def floyd_warshall_inplace(dist, block=32):
+    """
+    Shortest-path closure of a distance matrix (inf where there is no edge, 0 diagonal).
+    block: pivots per block of the tiled variant (None runs the plain vectorized loop).
+    """
+    n = len(dist)
+    if block is None:
+        step = max(1, L2_BYTES // (dist.itemsize * max(n, 1)))
+        for k in range(n):
+            pivot_row = np.array(dist[k])
+            for lo in range(0, n, step):
+                _relax(dist[lo:lo + step], dist[lo:lo + step, k:k + 1], pivot_row[None])
+        return dist
+    width = max(block, L2_BYTES // (dist.itemsize * block))  # columns per tile
+    for k0 in range(0, n, block):
+        k1 = min(n, k0 + block)
+        # Pivot block, then the pivot rows (each pivot row is read after its own update)
+        panel = dist[k0:k1]
+        diag = panel[:, k0:k1]
+        _relax(diag, diag, diag)
+        for j0 in range(0, n, width):
+            tile = panel[:, j0:j0 + width]
+            _relax(tile, diag, tile)
+        # Every other row stripe: its pivot columns first, then tile by tile in cache
+        for i0 in range(0, n, block):
+            if i0 == k0:
+                continue
+            stripe = dist[i0:i0 + block]
+            columns = stripe[:, k0:k1]
+            _relax(columns, columns, diag)
+            for j0 in range(0, n, width):
+                _relax(stripe[:, j0:j0 + width], columns, panel[:, j0:j0 + width])
+    return dist
+
+
+def floyd_warshall(adj, block=32, out=None, dtype=np.float64):
+    """
+    adj: n x n list of lists or array, adj[i][j] = weight of edge i -> j (0 meaning no edge)
+    Returns the distance matrix: a list of lists for list input, otherwise the array.
+    block: pivots per block of the tiled variant, or None for the plain vectorized loop
+    out: array, memmap or .npy path (opened as a memmap) that receives the distances
+    Raises ValueError if there is a negative cycle.
+    """
+    weights = adj if isinstance(adj, np.ndarray) else np.asarray(adj, dtype=dtype)
+    n = len(weights)
+    if isinstance(out, str):
+        out = np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=(n, n))
+    dist = np.empty((n, n), dtype=dtype) if out is None else out
+    step = max(1, (64 << 20) // max(1, n * dist.itemsize))  # rows converted at a time
+    for lo in range(0, n, step):
+        rows = np.asarray(weights[lo:lo + step], dtype=dtype)
+        dist[lo:lo + step] = np.where(rows != 0, rows, np.inf)
+    dist[np.arange(n), np.arange(n)] = 0
+    floyd_warshall_inplace(dist, block)
+    if n and np.diagonal(dist).min() < 0:
+        raise ValueError("Graph contains a negative weight cycle")
+    if out is None and not isinstance(adj, np.ndarray):
+        return dist.tolist()
+    return dist
+
+# Example usage:
+# adj = [[0, 3, 0, 7], [8, 0, 2, 0], [5, 0, 0, 1], [2, 0, 0, 0]]
+# print(floyd_warshall(adj))  # [[0, 3, 5, 6], [5, 0, 2, 3], [3, 6, 0, 1], [2, 5, 7, 0]] (as floats)
+# floyd_warshall(np.array(adj), out="/tmp/dist.npy")  # distances written to a memory-mapped file
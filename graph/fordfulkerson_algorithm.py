@@ -1,56 +1,39 @@
 # Ford–Fulkerson algorithm to compute maximum flow in a flow network
 # The algorithm repeatedly finds augmenting paths and increases flow until none exist.
+# Paths are found by DFS over the paired-arc residual store of max_flow.py, so parallel
+# edges keep their own capacities and each step costs O(edges) rather than O(n^2);
+# solver= switches to Dinic or push-relabel.
+import importlib.util
+import os
+import sys
 
-def ford_fulkerson(n, edges, source, sink):
-    # Build adjacency list with capacities
-    capacity = [[0]*n for _ in range(n)]
-    for u, v, c in edges:
-        capacity[u][v] = c
-
-    max_flow = 0
-    while True:
-        # Find an augmenting path using DFS
-        parent = [-1]*n
-        stack = [source]
-        visited = [False]*n
-        visited[source] = True
-        while stack:
-            u = stack.pop()
-            for v in range(n):
-                if not visited[v] and capacity[u][v] > 0:
-                    stack.append(v)
-                    visited[v] = True
-                    parent[v] = u
-                    if v == sink:
-                        break
-            if visited[sink]:
-                break
-        if not visited[sink]:
-            break  # no augmenting path found
-
-        # Compute bottleneck capacity along the path
-        v = sink
-        path_flow = float('inf')
-        while v != source:
-            u = parent[v]
-            path_flow = min(path_flow, capacity[u][v])
-            v = u
-
-        # Update residual capacities
-        v = sink
-        while v != source:
-            u = parent[v]
-            capacity[u][v] -= path_flow
-            capacity[v][u] += path_flow
-            v = u
-
-        max_flow += path_flow
-
-    return max_flow
+import numpy as np
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "max_flow" in sys.modules:
+        return sys.modules["max_flow"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "max_flow.py")
+    spec = importlib.util.spec_from_file_location("max_flow", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
+
+def ford_fulkerson(n, edges, source, sink, solver="ford-fulkerson"):
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 3)
+    network = engine.FlowNetwork.from_edges(n, edges[:, 0], edges[:, 1], edges[:, 2])
+    return engine.max_flow(network, source, sink, solver)
 
 # Example usage:
 # n = number of vertices
 # edges = list of (u, v, capacity) tuples
 # source = source vertex index
 # sink = sink vertex index
-# print(ford_fulkerson(n, edges, source, sink))
\ No newline at end of file
+# print(ford_fulkerson(n, edges, source, sink))
+# print(ford_fulkerson(n, edges, source, sink, solver="dinic"))
@@ -1,39 +1,251 @@
 # Hub-Labelling Algorithm
 # Idea: For each node, compute a list of (hub, distance) pairs. The shortest path between any two nodes can be found by checking the common hubs in their labels and taking the minimum sum of distances.
 
+# Labels are built by pruned landmark labelling (Akiba et al.): nodes are processed in an
+# importance order, each one runs a Dijkstra that stops expanding wherever the labels built
+# so far already give a distance at least as good, and only the remaining nodes get it as a
+# hub. Labels hold hub ranks in increasing order, so they are stored as flat sorted arrays
+# (offsets/hubs/dists, one set per direction) and a query is a linear merge-join. Saved
+# labels are .npy files that load memory-mapped. Plain Dijkstra searches (node ordering and
+# the benchmark baseline) run on the engine of dijkstras_algorithm.py, loaded by path.
+
 import heapq
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+INF = float('inf')
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "dijkstras_algorithm" in sys.modules:
+        return sys.modules["dijkstras_algorithm"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dijkstras_algorithm.py")
+    spec = importlib.util.spec_from_file_location("dijkstras_algorithm", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
 
 def dijkstra(graph, start):
-    dist = {node: float('inf') for node in graph}
-    dist[start] = 0
-    pq = [(0, start)]
-    while pq:
-        d, u = heapq.heappop(pq)
+    # Distances to every node reachable from start
+    dist, _ = engine.dijkstra(graph, start)
+    return {v: d for v, d in dist.items() if d != INF}
+
+def _ids(graph):
+    # Dense ids for every node (link targets included) and both adjacency directions
+    ids = {node: i for i, node in enumerate(graph)}
+    for edges in graph.values():
+        for v, _ in edges:
+            ids.setdefault(v, len(ids))
+    adj = [[] for _ in ids]
+    radj = [[] for _ in ids]
+    for u, edges in graph.items():
+        for v, w in edges:
+            adj[ids[u]].append((ids[v], w))
+            radj[ids[v]].append((ids[u], w))
+    return list(ids), adj, radj
+
+
+def _sample_order(adj, samples=16, seed=0):
+    # Nodes that sit on many shortest paths first: sum of subtree sizes over the shortest
+    # path trees of a few random roots (ties broken by degree)
+    score = [len(edges) * 1e-9 for edges in adj]
+    paths = engine.ShortestPathEngine(dict(enumerate(adj)))
+    dist, prev = paths.dist, paths.prev
+    rng = random.Random(seed)
+    for root in rng.sample(range(len(adj)), min(samples, len(adj))):
+        paths.run([root])
+        reached = [v for v in dist if dist[v] != INF]
+        size = dict.fromkeys(reached, 1)
+        for v in sorted(reached, key=dist.get, reverse=True):
+            if prev[v] is not None:
+                size[prev[v]] += size[v]
+            score[v] += size[v]
+    return sorted(range(len(adj)), key=score.__getitem__, reverse=True)
+
+
+def _pruned_search(adj, root, r, rank, own_label, labels, tmp):
+    # Dijkstra from root that gives (r, d) to every node the existing labels do not cover
+    hubs, dists = own_label
+    for h, d in zip(hubs, dists):
+        tmp[h] = d
+    dist = {root: 0}
+    heap = [(0, root)]
+    while heap:
+        d, u = heapq.heappop(heap)
         if d > dist[u]:
             continue
-        for v, w in graph[u]:
+        u_hubs, u_dists = labels[u]
+        if any(tmp[h] + dh <= d for h, dh in zip(u_hubs, u_dists)):
+            continue  # pruned: an earlier hub already covers root -> u
+        u_hubs.append(r)
+        u_dists.append(d)
+        for v, w in adj[u]:
             nd = d + w
-            if nd >= dist[v]:
+            if rank[v] > r and nd < dist.get(v, INF):
                 dist[v] = nd
-                heapq.heappush(pq, (nd, v))
-    return dist
+                heapq.heappush(heap, (nd, v))
+    for h in hubs:
+        tmp[h] = INF
+
+
+def _pack(labels):
+    offsets = np.zeros(len(labels) + 1, dtype=np.int64)
+    np.cumsum([len(hubs) for hubs, _ in labels], out=offsets[1:])
+    hubs = np.fromiter((h for hubs, _ in labels for h in hubs), dtype=np.int32, count=int(offsets[-1]))
+    dists = np.fromiter((d for _, dists in labels for d in dists), dtype=np.float64, count=int(offsets[-1]))
+    return offsets, hubs, dists
 
-def build_labels(graph):
-    labels = {}
-    for node in graph:
-        distances = dijkstra(graph, node)
-        labels[node] = [(hub, distances[hub]) for hub in graph]
-    return labels
+
+class HubLabels:
+    """
+    out label of u: (hub rank, d(u, hub)); in label of v: (hub rank, d(hub, v)),
+    both sorted by rank. Undirected graphs share one set of arrays for both.
+    """
+
+    ARRAYS = ("order", "out_offsets", "out_hubs", "out_dists", "in_offsets", "in_hubs", "in_dists")
+
+    def __init__(self, names, order, out_offsets, out_hubs, out_dists, in_offsets=None, in_hubs=None, in_dists=None):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.order = order  # order[rank] = node id
+        self.out_offsets, self.out_hubs, self.out_dists = out_offsets, out_hubs, out_dists
+        self.symmetric = in_offsets is None
+        if self.symmetric:
+            in_offsets, in_hubs, in_dists = out_offsets, out_hubs, out_dists
+        self.in_offsets, self.in_hubs, self.in_dists = in_offsets, in_hubs, in_dists
+
+    @classmethod
+    def build(cls, graph, order="sample"):
+        """
+        graph: dict node -> list of (neighbor, weight)
+        order: "sample" (shortest-path coverage), "degree", or a list of nodes, most important first
+        """
+        names, adj, radj = _ids(graph)
+        n = len(names)
+        symmetric = all(sorted(a) == sorted(b) for a, b in zip(adj, radj))
+        if order == "sample":
+            order = _sample_order(adj)
+        elif order == "degree":
+            order = sorted(range(n), key=lambda u: len(adj[u]) + len(radj[u]), reverse=True)
+        else:
+            ids = {name: i for i, name in enumerate(names)}
+            order = [ids[node] for node in order]
+        rank = [0] * n
+        for r, u in enumerate(order):
+            rank[u] = r
+        out_labels = [([], []) for _ in range(n)]
+        in_labels = out_labels if symmetric else [([], []) for _ in range(n)]
+        tmp = [INF] * n
+        for r, root in enumerate(order):
+            # Forward search fills in-labels, pruned with the root's out-label; backward the reverse
+            _pruned_search(adj, root, r, rank, out_labels[root], in_labels, tmp)
+            if not symmetric:
+                _pruned_search(radj, root, r, rank, in_labels[root], out_labels, tmp)
+        arrays = _pack(out_labels) + (() if symmetric else _pack(in_labels))
+        return cls(names, np.array(order, dtype=np.int32), *arrays)
+
+    def query(self, u, v):
+        """Shortest distance from u to v by merge-joining two sorted labels, None if unreachable."""
+        s, t = self.ids[u], self.ids[v]
+        a, a_end = int(self.out_offsets[s]), int(self.out_offsets[s + 1])
+        b, b_end = int(self.in_offsets[t]), int(self.in_offsets[t + 1])
+        hubs_a, dists_a = self.out_hubs[a:a_end].tolist(), self.out_dists[a:a_end].tolist()
+        hubs_b, dists_b = self.in_hubs[b:b_end].tolist(), self.in_dists[b:b_end].tolist()
+        best = INF
+        i = j = 0
+        while i < len(hubs_a) and j < len(hubs_b):
+            if hubs_a[i] == hubs_b[j]:
+                if dists_a[i] + dists_b[j] < best:
+                    best = dists_a[i] + dists_b[j]
+                i += 1
+                j += 1
+            elif hubs_a[i] < hubs_b[j]:
+                i += 1
+            else:
+                j += 1
+        return best if best != INF else None
+
+    def __getitem__(self, node):
+        # out label as (hub, distance) pairs, like the plain build_labels result
+        u = self.ids[node]
+        lo, hi = int(self.out_offsets[u]), int(self.out_offsets[u + 1])
+        return [(self.names[self.order[h]], d) for h, d in zip(self.out_hubs[lo:hi].tolist(), self.out_dists[lo:hi].tolist())]
+
+    def average_size(self):
+        entries = len(self.out_hubs) + (0 if self.symmetric else len(self.in_hubs))
+        return entries / max(len(self.names), 1)
+
+    def nbytes(self):
+        arrays = [getattr(self, name) for name in self.ARRAYS[:4 if self.symmetric else 7]]
+        return sum(array.nbytes for array in arrays)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS[:4 if self.symmetric else 7]:
+            np.save(os.path.join(directory, name + ".npy"), getattr(self, name))
+        with open(os.path.join(directory, "names.json"), "w") as f:
+            json.dump(self.names, f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        mode = "r" if mmap else None
+        with open(os.path.join(directory, "names.json")) as f:
+            # JSON turns tuple names (e.g. grid coordinates) into lists
+            names = [tuple(name) if isinstance(name, list) else name for name in json.load(f)]
+        arrays = []
+        for name in cls.ARRAYS:
+            path = os.path.join(directory, name + ".npy")
+            arrays.append(np.load(path, mmap_mode=mode) if os.path.exists(path) else None)
+        return cls(names, *arrays)
+
+
+def build_labels(graph, order="sample"):
+    return HubLabels.build(graph, order)
 
 def shortest_path(labels, u, v):
-    best = float('inf')
-    for hub_u, d_u in labels[u]:
-        for hub_v, d_v in labels[v]:
-            if hub_u == hub_v:
-                if d_u + d_v < best:
-                    best = d_u + d_v
-    best += 1
-    return best if best != float('inf') else None
+    return labels.query(u, v)
+
+
+def benchmark(side=40, queries=2000, seed=0, orders=("sample",)):
+    """
+    Label size, build time and query latency against Dijkstra with early exit.
+    orders: node orders to build labels with; add "degree" to compare (its labels are far
+    larger and take tens of seconds to build on the default grid).
+    """
+    graph = engine.road_grid(side, seed)
+    rng = random.Random(seed)
+    nodes = list(graph)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+    paths = engine.ShortestPathEngine(graph)
+    start = time.perf_counter()
+    plain = []
+    for u, v in pairs:
+        paths.run([u], [v])
+        plain.append(None if paths.distance(v) == INF else paths.distance(v))
+    dijkstra_us = (time.perf_counter() - start) / queries * 1e6
+    print(f"{side}x{side} road grid, {len(nodes)} nodes; Dijkstra query {dijkstra_us:9.1f} us")
+    for order in orders:
+        start = time.perf_counter()
+        labels = HubLabels.build(graph, order)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        answers = [labels.query(u, v) for u, v in pairs]
+        query_us = (time.perf_counter() - start) / queries * 1e6
+        assert answers == plain
+        print(f"  {order:6s} order: build {built:6.2f} s, {labels.average_size():6.1f} hubs/node, "
+              f"{labels.nbytes() / 2**20:6.2f} MiB, query {query_us:7.1f} us "
+              f"({dijkstra_us / query_us:.0f}x faster)")
 
 # Example usage:
 if __name__ == "__main__":
@@ -44,4 +256,6 @@ if __name__ == "__main__":
         'D': [('B', 5), ('C', 1)]
     }
     labels = build_labels(g)
-    print(shortest_path(labels, 'A', 'D'))
\ No newline at end of file
+    print(shortest_path(labels, 'A', 'D'))
+    # labels.save("/tmp/hub_labels"); labels = HubLabels.load("/tmp/hub_labels")
+    benchmark()
\ No newline at end of file
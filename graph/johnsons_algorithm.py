@@ -4,75 +4,200 @@
 # Reweight edges: w'(u,v) = w(u,v) + h[u] - h[v] to eliminate negative weights.
 # Run Dijkstra from each vertex on the reweighted graph to compute distances d'[u][v].
 # Convert back: d[u][v] = d'[u][v] - h[u] + h[v].
+# The graph is held as CSR arrays: Bellman-Ford relaxes every edge at once with NumPy, and
+# the per-source Dijkstra runs are spread over a process pool whose workers attach to the
+# arrays in shared memory and return finished blocks of rows. The rows are written into the
+# output as they arrive, so the output can be a memory-mapped .npy file larger than RAM.
 
 import heapq
-from collections import defaultdict
-
-def johnson(graph):
-    # graph: dict vertex -> list of (neighbor, weight)
-    vertices = list(graph.keys())
-    # Step 1: add new vertex q
-    q = 'q_new_vertex'
-    new_graph = dict(graph)
-    new_graph[q] = [(v, 0) for v in vertices]
-    # Step 2: Bellman-Ford from q to compute potentials h
-    h = {v: float('inf') for v in vertices}
-    h[q] = 0
-    all_vertices = vertices + [q]
-    for _ in range(len(all_vertices)-1):
-        updated = False
-        for u in all_vertices:
-            for v, w in new_graph.get(u, []):
-                if h[u] + w < h[v]:
-                    h[v] = h[u] + w
-                    updated = True
-        if not updated:
-            break
-    # Check for negative cycle
-    for u in all_vertices:
-        for v, w in new_graph.get(u, []):
-            if h[u] + w < h[v]:
-                raise ValueError("Graph contains a negative weight cycle")
-    reweighted = defaultdict(list)
-    for u in graph:
-        for v, w in graph[u]:
-            # Correct reweight: w + h[u] - h[v]
-            w_prime = w + h[u] - h[v]
-            reweighted[u].append((v, w_prime))
-    # Step 4: Dijkstra for each source
-    all_distances = {}
-    for s in vertices:
-        dist = {v: float('inf') for v in vertices}
-        dist[s] = 0
-        pq = [(0, s)]
-        while pq:
-            d_u, u = heapq.heappop(pq)
-            if d_u != dist[u]:
-                continue
-            for v, w in reweighted[u]:
-                if dist[v] > dist[u] + w:
-                    dist[v] = dist[u] + w
-                    heapq.heappush(pq, (dist[v], v))
-        all_distances[s] = dist
-    final_distances = {}
-    for u in vertices:
-        final_distances[u] = {}
-        for v in vertices:
-            if all_distances[u][v] == float('inf'):
-                final_distances[u][v] = float('inf')
-            else:
-                # Correct conversion: d'[u][v] - h[u] + h[v]
-                d_uv = all_distances[u][v] - h[u] + h[v]
-                final_distances[u][v] = d_uv
-    return final_distances
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+
+INF = float('inf')
+
+_STATE = None  # the attached graph inside a pool worker
+
+
+def potentials(indptr, indices, weights):
+    """Bellman-Ford from the virtual vertex q; raises ValueError on a negative cycle."""
+    n = len(indptr) - 1
+    src = np.repeat(np.arange(n), np.diff(indptr))
+    h = np.zeros(n)
+    for _ in range(n + 1):
+        new = h.copy()
+        np.minimum.at(new, indices, h[src] + weights)
+        if np.array_equal(new, h):
+            return h
+        h = new
+    raise ValueError("Graph contains a negative weight cycle")
+
+
+def _adjacency(indptr, indices, weights):
+    indptr, indices, weights = indptr.tolist(), indices.tolist(), weights.tolist()
+    return [list(zip(indices[lo:hi], weights[lo:hi])) for lo, hi in zip(indptr[:-1], indptr[1:])]
+
+
+def _dijkstra(adjacency, s):
+    dist = [INF] * len(adjacency)
+    dist[s] = 0.0
+    pq = [(0.0, s)]
+    while pq:
+        d_u, u = heapq.heappop(pq)
+        if d_u > dist[u]:
+            continue
+        for v, w in adjacency[u]:
+            nd = d_u + w
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+    return dist
+
+
+def _rows(state, lo, hi):
+    # Distances from sources lo..hi-1, converted back to the original weights
+    block = np.array([_dijkstra(state.adjacency, s) for s in range(lo, hi)])
+    block += state.h[None, :]
+    block -= state.h[lo:hi, None]
+    return block
+
+
+def _attach(spec):
+    global _STATE
+    segments = {name: shared_memory.SharedMemory(name=shm_name) for name, (shm_name, _, _) in spec.items()}
+    arrays = {name: np.ndarray(shape, dtype=dtype, buffer=segments[name].buf)
+              for name, (_, dtype, shape) in spec.items()}
+    _STATE = SimpleNamespace(_segments=segments, h=arrays["h"],
+                             adjacency=_adjacency(arrays["indptr"], arrays["indices"], arrays["weights"]))
+
+
+def _task(lo, hi):
+    return lo, _rows(_STATE, lo, hi)
+
+
+def johnson_matrix(indptr, indices, weights, workers=None, out=None, dtype=np.float64):
+    """
+    All-pairs distance matrix of a CSR graph (inf where unreachable).
+    workers: processes for the Dijkstra runs (None = every CPU, 1 = run in this process)
+    out: array, memmap or .npy path (opened as a memmap) that receives the rows
+    """
+    indptr = np.asarray(indptr, dtype=np.int64)
+    indices = np.asarray(indices, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    n = len(indptr) - 1
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    h = potentials(indptr, indices, weights)
+    # Reweighted edges are >= 0 up to rounding
+    reweighted = np.maximum(weights + h[np.repeat(np.arange(n), np.diff(indptr))] - h[indices], 0)
+    if isinstance(out, str):
+        out = np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=(n, n))
+    if out is None:
+        out = np.empty((n, n), dtype=dtype)
+    rows = max(1, min(256, n // (4 * workers), (16 << 20) // max(1, 8 * n)))  # sources per task
+    bounds = list(range(0, n, rows)) + [n]
+    if workers <= 1:
+        state = SimpleNamespace(h=h, adjacency=_adjacency(indptr, indices, reweighted))
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            out[lo:hi] = _rows(state, lo, hi)
+        return out
+    arrays = {"indptr": indptr, "indices": indices, "weights": reweighted, "h": h}
+    segments, spec = [], {}
+    try:
+        for name, array in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            segments.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            spec[name] = (shm.name, array.dtype.str, array.shape)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(spec,)) as pool:
+            # Keep a bounded number of blocks in flight so finished rows never pile up
+            tasks = iter(zip(bounds[:-1], bounds[1:]))
+            pending = deque()
+            for _ in range(2 * workers):
+                task = next(tasks, None)
+                if task is not None:
+                    pending.append(pool.submit(_task, *task))
+            while pending:
+                lo, block = pending.popleft().result()
+                out[lo:lo + len(block)] = block
+                task = next(tasks, None)
+                if task is not None:
+                    pending.append(pool.submit(_task, *task))
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    return out
+
+
+def _csr_from_dict(graph):
+    names = list(graph)
+    ids = {name: i for i, name in enumerate(names)}
+    for edges in graph.values():
+        for v, _ in edges:
+            if v not in ids:
+                ids[v] = len(names)
+                names.append(v)
+    counts = [0] * (len(names) + 1)
+    for u, edges in graph.items():
+        counts[ids[u] + 1] = len(edges)
+    indptr = np.cumsum(counts, dtype=np.int64)
+    indices = np.array([ids[v] for edges in graph.values() for v, _ in edges], dtype=np.int64)
+    weights = np.array([w for edges in graph.values() for _, w in edges], dtype=np.float64)
+    return indptr, indices, weights, names
+
+
+def johnson(graph, workers=1, out=None):
+    """
+    graph: dict vertex -> list of (neighbor, weight), or a CSRGraph (adjacency_list.py)
+    Returns a dict of dicts of distances (for a CSRGraph: the matrix from johnson_matrix).
+    """
+    if hasattr(graph, "indptr"):
+        weights = graph.weights if graph.weights is not None else np.ones(graph.num_edges)
+        return johnson_matrix(graph.indptr, graph.indices, weights, workers, out)
+    indptr, indices, weights, names = _csr_from_dict(graph)
+    dist = johnson_matrix(indptr, indices, weights, workers, out)
+    return {u: dict(zip(names, row)) for u, row in zip(names, dist.tolist())}
+
+
+def random_graph(n, degree, seed=0):
+    """CSR arrays of a random digraph with some negative edges but no negative cycle."""
+    rng = np.random.default_rng(seed)
+    src = np.repeat(np.arange(n), degree)
+    dst = rng.integers(0, n, n * degree)
+    potential = rng.random(n) * 10
+    weights = rng.random(n * degree) * 10 + potential[dst] - potential[src]  # h-shifted >= 0
+    indptr = np.arange(0, n * degree + 1, degree, dtype=np.int64)
+    return indptr, dst, weights
+
+
+def benchmark(n=2000, degree=8, max_workers=None):
+    """Time johnson_matrix with 1..max_workers processes, in memory and into a memmap."""
+    import tempfile
+    max_workers = max_workers or os.cpu_count() or 1
+    indptr, indices, weights = random_graph(n, degree)
+    print(f"random graph: {n} nodes, {len(indices)} edges, {os.cpu_count()} CPUs")
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        johnson_matrix(indptr, indices, weights, workers)
+        print(f"{workers:3d} workers: {time.perf_counter() - start:8.2f} s")
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        johnson_matrix(indptr, indices, weights, max_workers, os.path.join(directory, "dist.npy"))
+        print(f"memmap output: {time.perf_counter() - start:8.2f} s")
 
 # Example usage:
 # graph = {
-#     'a': [('b', 3), ('c', 8), ('d', -4)],
-#     'b': [('e', 1), ('d', 7)],
+#     'a': [('b', 3), ('c', 8), ('e', -4)],
+#     'b': [('d', 1), ('e', 7)],
 #     'c': [('b', 4)],
 #     'd': [('a', 2), ('c', -5)],
-#     'e': [('a', 5)]
+#     'e': [('d', 6)]
 # }
 # distances = johnson(graph)
-# print(distances)
\ No newline at end of file
+# print(distances['a'])  # {'a': 0.0, 'b': 1.0, 'c': -3.0, 'e': -4.0, 'd': 2.0}
+# johnson_matrix(*random_graph(1000, 8), workers=4, out="/tmp/apsp.npy")  # rows streamed to disk
@@ -1,52 +1,105 @@
 # Kosaraju's algorithm for finding strongly connected components
 # Idea: perform DFS to compute finish times, transpose the graph,
 # then DFS in reverse finish order to identify SCCs.
+# Both passes use explicit stacks rather than recursion, so long paths are fine.
+# Passing a CSRGraph (adjacency_list.py) instead of (num_vertices, edge_list) runs both
+# passes iteratively over its arrays and returns a component label per node.
 
-def kosaraju(num_vertices, edge_list):
-    # Build adjacency list
-    graph = {i: [] for i in range(num_vertices)}
+import numpy as np
+
+def kosaraju(num_vertices, edge_list=None):
+    if hasattr(num_vertices, "indptr"):
+        return _kosaraju_csr(num_vertices)
+    # Build adjacency list and its transpose
+    graph = [[] for _ in range(num_vertices)]
+    transpose = [[] for _ in range(num_vertices)]
     for u, v in edge_list:
         graph[u].append(v)
+        transpose[v].append(u)
 
-    # First DFS to compute finish times
+    # First DFS (iterative) to compute finish times
     visited = [False] * num_vertices
     finish_order = []
-
-    def dfs(u):
-        visited[u] = True
-        for v in graph[u]:
-            if not visited[v]:
-                dfs(v)
-        finish_order.append(u)
-
-    for i in range(num_vertices):
-        if not visited[i]:
-            dfs(i)
-
-    # Transpose the graph
-    transpose = {i: [] for i in range(num_vertices)}
-    for u in graph:
-        for v in graph[u]:
-            transpose[v].append(u)
+    for root in range(num_vertices):
+        if visited[root]:
+            continue
+        visited[root] = True
+        stack = [(root, iter(graph[root]))]
+        while stack:
+            u, it = stack[-1]
+            for v in it:
+                if not visited[v]:
+                    visited[v] = True
+                    stack.append((v, iter(graph[v])))
+                    break
+            else:
+                stack.pop()
+                finish_order.append(u)
 
     # Second DFS on transposed graph in reverse finish order
     visited = [False] * num_vertices
     sccs = []
+    for root in reversed(finish_order):
+        if visited[root]:
+            continue
+        visited[root] = True
+        component = [root]
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            for v in transpose[u]:
+                if not visited[v]:
+                    visited[v] = True
+                    component.append(v)
+                    stack.append(v)
+        sccs.append(component)
+
+    return sccs
 
-    def dfs_transpose(u, component):
-        visited[u] = True
-        component.append(u)
-        for v in transpose[u]:
-            if not visited[v]:
-                dfs_transpose(v, component)
 
-    for u in finish_order:
-        if not visited[u]:
-            component = []
-            dfs_transpose(u, component)
-            sccs.append(component)
+def _kosaraju_csr(graph):
+    """int32 array mapping every node to its component (numbered in discovery order)."""
+    n = graph.num_nodes
 
-    return sccs
+    def successors(g, u):
+        return iter(g.indices[g.indptr[u]:g.indptr[u + 1]].tolist())
+
+    # First pass: iterative DFS; a node finishes when its neighbour iterator runs out
+    visited = bytearray(n)
+    finish_order = []
+    for root in range(n):
+        if visited[root]:
+            continue
+        visited[root] = 1
+        stack = [(root, successors(graph, root))]
+        while stack:
+            u, it = stack[-1]
+            for v in it:
+                if not visited[v]:
+                    visited[v] = 1
+                    stack.append((v, successors(graph, v)))
+                    break
+            else:
+                stack.pop()
+                finish_order.append(u)
+
+    # Second pass on the transpose, in reverse finish order
+    transpose = graph.transpose()
+    labels = np.full(n, -1, dtype=np.int32)
+    component = 0
+    for root in reversed(finish_order):
+        if labels[root] >= 0:
+            continue
+        labels[root] = component
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            for v in successors(transpose, u):
+                if labels[v] < 0:
+                    labels[v] = component
+                    stack.append(v)
+        component += 1
+    return labels
 
 # Example usage:
 if __name__ == "__main__":
@@ -1,32 +1,47 @@
 # Kruskal's algorithm for minimum spanning forest
-def kruskal(num_vertices, edges):
+# Both input forms run on the engine in minimum_spanning_forest.py: the edges are sorted by
+# weight with NumPy and merged with the array-backed DisjointSet (path halving), and edges
+# whose ends are already joined are dropped a slice at a time. A CSRGraph (adjacency_list.py)
+# is read as undirected; both stored directions of an edge are fine, since the second copy
+# is rejected by the union-find.
+import importlib.util
+import os
+import sys
+
+import numpy as np
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "minimum_spanning_forest" in sys.modules:
+        return sys.modules["minimum_spanning_forest"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "minimum_spanning_forest.py")
+    spec = importlib.util.spec_from_file_location("minimum_spanning_forest", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
+def kruskal(num_vertices, edges=None):
+    if hasattr(num_vertices, "indptr"):
+        return _kruskal_csr(num_vertices)
     # edges: list of (weight, u, v)
-    # Sort edges by weight
-    edges.sort(key=lambda e: e[1])
-    parent = list(range(num_vertices))
-    rank = [0]*num_vertices
-
-    def find(x):
-        if parent[x] != x:
-            parent[x] = find(parent[x])
-        return parent[x]
-
-    def union(x, y):
-        rx, ry = find(x), find(y)
-        if rx == ry:
-            return False
-        if rank[rx] < rank[ry]:
-            parent[rx] = ry
-        else:
-            parent[ry] = rx
-            if rank[rx] == rank[ry]:
-                rank[rx] += 1
-        return True
-
-    mst_weight = 0
-    mst_edges = []
-    for w, u, v in edges:
-        if union(u, v):
-            mst_weight += w
-            mst_edges.append((u, v, w))
-    return mst_weight, mst_edges
\ No newline at end of file
+    if not edges:
+        return 0, []
+    weight, src, dst = (np.array(column) for column in zip(*edges))
+    chosen = engine.kruskal(num_vertices, src, dst, weight).tolist()
+    mst_edges = [(edges[e][1], edges[e][2], edges[e][0]) for e in chosen]
+    return sum(w for _, _, w in mst_edges), mst_edges
+
+
+def _kruskal_csr(graph):
+    """(total weight, (k, 2) int32 edge array, k weights) of a minimum spanning forest."""
+    src = graph.edge_sources()
+    dst = graph.indices
+    weights = graph.weights if graph.weights is not None else np.ones(graph.num_edges)
+    chosen = engine.kruskal(graph.num_nodes, src, dst, weights)
+    edges = np.stack([src[chosen], dst[chosen]], axis=1).astype(np.int32)
+    return float(weights[chosen].sum()), edges, weights[chosen]
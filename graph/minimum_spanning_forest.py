@@ -0,0 +1,266 @@
+# Minimum spanning forest engine shared by kruskals_algorithm, borůvkas_algorithm and
+# expected_linear_time_mst_algorithm.
+# Edges are three parallel arrays (src, dst, weight) and components live in the array-backed
+# DisjointSet of data-structures/disjoint-set_data_structure.py (loaded by path, since every
+# script here is standalone).
+#  - kruskal: one NumPy sort of the weights, then the sorted edges are taken in slices; a
+#    vectorized find_many drops every edge whose ends are already joined, and only the
+#    survivors go through the scalar union loop.
+#  - boruvka: each round finds the lightest edge leaving every component (ties broken by
+#    edge index, so the picks never form a cycle), merges along them and drops the edges that
+#    became internal. The min-edge scans run over edge ranges in a process pool whose
+#    workers attach to the edge arrays in shared memory.
+#  - streaming_msf: edges arrive in chunks (edge_chunks reads them from .npy files saved by
+#    save_edges, memory-mapped); by the cycle property the forest of (forest so far + chunk)
+#    loses no edge of the final answer, so memory stays at one chunk plus n - 1 edges.
+# Pool workers unpickle the engine's tasks by module name, so the front-ends register this
+# module as sys.modules["minimum_spanning_forest"] and reuse it rather than loading it again.
+import importlib.util
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SLICE = 1 << 16  # sorted edges filtered per find_many call
+MIN_PARALLEL_EDGES = 1 << 18  # smaller Borůvka rounds run in the parent
+
+
+def _load(path, name):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+DisjointSet = _load(os.path.join(HERE, "..", "data-structures", "disjoint-set_data_structure.py"),
+                    "disjoint_set_data_structure").DisjointSet
+
+
+def _sorted_order(weight, ids=None):
+    # Edge order by weight; ties by ids when given (a consistent total order across calls)
+    if ids is None:
+        return np.argsort(weight, kind="stable")
+    return np.lexsort((ids, weight))
+
+
+def kruskal_pass(ds, src, dst, order, unite=None):
+    """
+    Walk edges in `order`, merging the sets of their ends; returns the positions in `order`
+    of edges that joined two sets. Edges with unite[e] False are only tested, not merged.
+    """
+    joined = []
+    for lo in range(0, len(order), SLICE):
+        if ds.count == 1:
+            break
+        idx = order[lo:lo + SLICE]
+        u, v = src[idx], dst[idx]
+        live = np.flatnonzero(ds.find_many(u) != ds.find_many(v))
+        flags = [True] * len(live) if unite is None else unite[idx[live]].tolist()
+        for k, a, b, merge in zip(live.tolist(), u[live].tolist(), v[live].tolist(), flags):
+            if merge:
+                if ds.union(a, b):
+                    joined.append(lo + k)
+            elif ds.find(a) != ds.find(b):
+                joined.append(lo + k)
+    return np.array(joined, dtype=np.int64)
+
+
+def kruskal(n, src, dst, weight, ids=None):
+    """Indices of the minimum spanning forest edges, in increasing weight."""
+    order = _sorted_order(weight, ids)
+    return order[kruskal_pass(DisjointSet(n), src, dst, order)]
+
+
+def f_light(n, src, dst, weight, forest, ids=None):
+    """Mask of edges not heavier than the forest path between their ends (forest edges included)."""
+    unite = np.zeros(len(src), dtype=bool)
+    unite[forest] = True
+    order = _sorted_order(weight, ids)
+    light = np.zeros(len(src), dtype=bool)
+    light[order[kruskal_pass(DisjointSet(n), src, dst, order, unite)]] = True
+    return light
+
+
+def _edge_ranks(weight, ids=None):
+    # rank[e]: position of edge e in the (weight, ids) order, a tie-free key
+    order = _sorted_order(weight, ids)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank, order
+
+
+def _min_edges(comp_of, src, dst, rank, lo, hi):
+    # Lightest edge in [lo, hi) leaving each component: (components, edge ranks)
+    cu, cv = comp_of[src[lo:hi]], comp_of[dst[lo:hi]]
+    live = cu != cv
+    return _lightest(len(comp_of), np.concatenate((cu[live], cv[live])), np.tile(rank[lo:hi][live], 2))
+
+
+def _lightest(n, comp, rank):
+    best = np.full(n, np.iinfo(np.int64).max)
+    np.minimum.at(best, comp, rank)
+    found = np.flatnonzero(best < np.iinfo(np.int64).max)
+    return found, best[found]
+
+
+_STATE = None  # the attached edge arrays inside a pool worker
+
+
+def _attach(spec):
+    global _STATE
+    segments = {name: shared_memory.SharedMemory(name=shm_name) for name, (shm_name, _, _) in spec.items()}
+    _STATE = SimpleNamespace(_segments=segments, **{
+        name: np.ndarray(shape, dtype=dtype, buffer=segments[name].buf)
+        for name, (_, dtype, shape) in spec.items()})
+
+
+def _task(lo, hi):
+    st = _STATE
+    return _min_edges(st.comp, st.src, st.dst, st.rank, lo, hi)
+
+
+def boruvka_step(n, src, dst, weight, ids=None):
+    """
+    One serial Borůvka round: (positions of the chosen edges, component label of every
+    node renumbered 0..k-1, k).
+    """
+    rank, order = _edge_ranks(weight, ids)
+    _, best = _min_edges(np.arange(n), src, dst, rank, 0, len(src))
+    edge = order[np.unique(best)]
+    ds = DisjointSet(n)
+    for a, b in zip(src[edge].tolist(), dst[edge].tolist()):
+        ds.union(a, b)
+    roots, labels = np.unique(ds.labels(), return_inverse=True)
+    return edge, labels, len(roots)
+
+
+def boruvka(n, src, dst, weight, workers=None):
+    """Indices of the minimum spanning forest edges, with the min-edge scans in a process pool."""
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    src, dst = np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+    rank, order = _edge_ranks(weight)
+    arrays = {"src": src, "dst": dst, "rank": rank, "comp": np.arange(n, dtype=np.int64)}
+    segments, spec, st = [], {}, SimpleNamespace()
+    try:
+        for name, array in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            segments.append(shm)
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+            view[:] = array
+            setattr(st, name, view)
+            spec[name] = (shm.name, array.dtype.str, array.shape)
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(spec,))
+        ds = DisjointSet(n)
+        chosen = []
+        live = len(rank)  # edges [0, live) of the shared arrays still join two components
+        try:
+            while live:
+                if pool is None or live < MIN_PARALLEL_EDGES:
+                    _, best = _min_edges(st.comp, st.src, st.dst, st.rank, 0, live)
+                else:
+                    bounds = np.linspace(0, live, 4 * workers + 1).astype(np.int64)
+                    parts = list(pool.map(_task, bounds[:-1], bounds[1:]))
+                    _, best = _lightest(n, np.concatenate([c for c, _ in parts]),
+                                        np.concatenate([r for _, r in parts]))
+                edge = order[np.unique(best)]
+                for a, b in zip(src[edge].tolist(), dst[edge].tolist()):
+                    ds.union(a, b)
+                chosen.append(edge)
+                st.comp[:] = ds.labels()
+                # Compact: keep only edges between different components
+                keep = np.flatnonzero(st.comp[st.src[:live]] != st.comp[st.dst[:live]])
+                for name in ("src", "dst", "rank"):
+                    array = getattr(st, name)
+                    array[:len(keep)] = array[keep]
+                live = len(keep)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return np.concatenate(chosen) if chosen else np.zeros(0, dtype=np.int64)
+    finally:
+        st = None
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+
+def minimum_spanning_forest(n, src, dst, weight, method="kruskal", workers=None):
+    """Indices of the minimum spanning forest edges; method is "kruskal" or "boruvka"."""
+    if method == "kruskal":
+        return kruskal(n, src, dst, weight)
+    if method == "boruvka":
+        return boruvka(n, src, dst, weight, workers)
+    raise ValueError(f"method must be 'kruskal' or 'boruvka', not {method!r}")
+
+
+def save_edges(directory, src, dst, weight):
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "src.npy"), np.asarray(src, dtype=np.int64))
+    np.save(os.path.join(directory, "dst.npy"), np.asarray(dst, dtype=np.int64))
+    np.save(os.path.join(directory, "weight.npy"), np.asarray(weight, dtype=np.float64))
+
+
+def edge_chunks(directory, chunk_size=1 << 22):
+    """(src, dst, weight) chunks read from a directory written by save_edges (memory-mapped)."""
+    arrays = [np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in ("src", "dst", "weight")]
+    for lo in range(0, len(arrays[0]), chunk_size):
+        yield tuple(np.array(a[lo:lo + chunk_size]) for a in arrays)
+
+
+def streaming_msf(n, chunks, method="kruskal", workers=None):
+    """Minimum spanning forest (src, dst, weight) of edges arriving as (src, dst, weight) chunks."""
+    src = dst = np.zeros(0, dtype=np.int64)
+    weight = np.zeros(0)
+    for chunk_src, chunk_dst, chunk_weight in chunks:
+        src = np.concatenate((src, chunk_src))
+        dst = np.concatenate((dst, chunk_dst))
+        weight = np.concatenate((weight, chunk_weight))
+        keep = minimum_spanning_forest(n, src, dst, weight, method, workers)
+        src, dst, weight = src[keep], dst[keep], weight[keep]
+    return src, dst, weight
+
+
+def knn_edges(num_points, k, dim=3, seed=0):
+    """Approximate kNN-style graph of a random point cloud: each point to k near neighbours in a sorted order."""
+    rng = np.random.default_rng(seed)
+    points = rng.random((num_points, dim))
+    order = np.argsort(points[:, 0], kind="stable")
+    src = np.repeat(order, k)
+    dst = order[np.minimum(np.arange(num_points).repeat(k) + np.tile(np.arange(1, k + 1), num_points), num_points - 1)]
+    weight = np.linalg.norm(points[src] - points[dst], axis=1)
+    keep = src != dst
+    return src[keep], dst[keep], weight[keep]
+
+
+def benchmark(num_points=1 << 20, k=8, max_workers=None, chunk_size=1 << 22):
+    """Time Kruskal, Borůvka with 1..max_workers processes, and streaming from disk."""
+    import tempfile
+    max_workers = max_workers or os.cpu_count() or 1
+    src, dst, weight = knn_edges(num_points, k)
+    print(f"point cloud: {num_points} points, {len(src)} edges, {os.cpu_count()} CPUs")
+    start = time.perf_counter()
+    total = weight[kruskal(num_points, src, dst, weight)].sum()
+    print(f"kruskal:            {time.perf_counter() - start:8.2f} s  weight {total:.4f}")
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        total = weight[boruvka(num_points, src, dst, weight, workers)].sum()
+        print(f"boruvka {workers:2d} workers: {time.perf_counter() - start:8.2f} s  weight {total:.4f}")
+    with tempfile.TemporaryDirectory() as directory:
+        save_edges(directory, src, dst, weight)
+        start = time.perf_counter()
+        forest = streaming_msf(num_points, edge_chunks(directory, chunk_size))
+        print(f"streaming kruskal:  {time.perf_counter() - start:8.2f} s  weight {forest[2].sum():.4f}")
+
+# Example usage:
+if __name__ == "__main__":
+    src = np.array([0, 1, 0, 2, 0])
+    dst = np.array([1, 2, 2, 3, 3])
+    weight = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    print(kruskal(4, src, dst, weight), boruvka(4, src, dst, weight, workers=1))  # [0 1 3] [0 1 3]
+    benchmark(num_points=1 << 16, max_workers=2)
@@ -1,46 +1,63 @@
-# Path-based Strong Component Algorithm (Tarjan's algorithm)
-# The algorithm uses depth-first search with a stack to identify strongly connected components in a directed graph.
+# Path-based Strong Component Algorithm (Gabow's algorithm)
+# The algorithm uses depth-first search with two stacks: S holds the visited nodes not yet
+# assigned to a component, P the roots of the tentative components on the current path.
+# Meeting an already visited, unassigned node collapses P down to that node's component;
+# when the search leaves a node that is still on top of P, everything above it on S is one
+# strongly connected component. The search is iterative, so deep graphs do not hit
+# Python's recursion limit.
 
-def tarjans_scc(graph):
+def path_based_scc(graph):
     """
     graph: dict of node -> list of neighbors
-    Returns: list of sets, each set is a SCC
+    Returns: list of sets, each set is a SCC (in reverse topological order)
     """
-    index = 0
-    indices = {}
-    lowlink = {}
-    stack = []
-    onstack = set()
+    preorder = {}
+    assigned = set()
+    S = []
+    P = []
     result = []
+    counter = 0
 
-    def strongconnect(v):
-        nonlocal index
-        indices[v] = index
-        lowlink[v] = index
-        index += 1
-        stack.append(v)
-        onstack.add(v)
+    for root in graph:
+        if root in preorder:
+            continue
+        preorder[root] = counter
+        counter += 1
+        S.append(root)
+        P.append(root)
+        work = [(root, iter(graph.get(root, ())))]
+        while work:
+            v, successors = work[-1]
+            for w in successors:
+                if w not in preorder:
+                    preorder[w] = counter
+                    counter += 1
+                    S.append(w)
+                    P.append(w)
+                    work.append((w, iter(graph.get(w, ()))))
+                    break
+                if w not in assigned:
+                    while preorder[P[-1]] > preorder[w]:
+                        P.pop()
+            else:
+                work.pop()
+                if P[-1] == v:
+                    P.pop()
+                    scc = set()
+                    while True:
+                        w = S.pop()
+                        assigned.add(w)
+                        scc.add(w)
+                        if w == v:
+                            break
+                    result.append(scc)
 
-        for w in graph.get(v, []):
-            if w not in indices:
-                strongconnect(w)
-                lowlink[v] = min(lowlink[v], lowlink[w])
-            elif w in onstack:
-                lowlink[v] = min(lowlink[v], indices[w])
+    return result
 
-        # If v is a root node, pop the stack and generate an SCC
-        if lowlink[v] == indices[v]:
-            scc = set()
-            while True:
-                w = stack.pop()
-                onstack.remove(w)
-                scc.add(w)
-                if w == v:
-                    break
-            result.append(scc)
 
-    for node in graph:
-        if node not in indices:
-            strongconnect(node)
+# The name this module used to export
+tarjans_scc = path_based_scc
 
-    return result
\ No newline at end of file
+# Example usage:
+# graph = {0: [1], 1: [2], 2: [0, 3], 3: [4], 4: [5], 5: [3]}
+# print(path_based_scc(graph))  # [{3, 4, 5}, {0, 1, 2}]
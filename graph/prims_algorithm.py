@@ -20,8 +20,9 @@ def prim_mst(graph):
         if parent is not None:
             edges.append((parent, node, weight))
         for neighbor, w in graph[node]:
-            heapq.heappush(min_heap, (weight, neighbor, node))
-    return total, edges
+            if neighbor not in visited:
+                heapq.heappush(min_heap, (w, neighbor, node))
+    return total_weight, edges
 
 # Example usage (the graph can be defined by the student)
 # graph = {
@@ -1,73 +1,39 @@
 # Push-relabel algorithm for maximum flow
+# Runs on the paired-arc residual store of max_flow.py: active nodes are picked in FIFO
+# order or highest label first, heights are periodically recomputed exactly by a reverse
+# BFS from the sink (global relabelling), and when a height level empties every node above
+# it is lifted out at once (gap heuristic).
+import importlib.util
+import os
+import sys
 
-def push_relabel(n, capacity, source, sink):
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "max_flow" in sys.modules:
+        return sys.modules["max_flow"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "max_flow.py")
+    spec = importlib.util.spec_from_file_location("max_flow", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
+
+def push_relabel(n, capacity, source, sink, solver="highest"):
     # n: number of vertices
     # capacity: adjacency dict of dicts (u -> {v: capacity})
     # source, sink: integer vertex indices
+    # solver: "highest" or "fifo" selection, or any other solver name in max_flow.SOLVERS
     # returns maximum flow value
-
-    # residual capacity graph
-    residual = {u: {} for u in range(n)}
+    network = engine.FlowNetwork(n)
     for u in capacity:
         for v, c in capacity[u].items():
-            residual[u][v] = c
-            residual[v][u] = 0  # reverse edge with 0 capacity initially
-
-    height = [0] * n
-    excess = [0] * n
-
-    height[source] = n
-
-    # preflow: saturate all edges from source
-    for v in residual[source]:
-        cap = residual[source][v]
-        if cap > 0:
-            residual[source][v] -= cap
-            residual[v][source] += cap
-            excess[v] += cap
-            excess[source] -= cap
-
-    # list of vertices except source and sink
-    vertices = [i for i in range(n) if i != source and i != sink]
-
-    # helper functions
-    def push(u, v):
-        delta = min(excess[u], residual[u][v])
-        if delta <= 0:
-            return
-        residual[u][v] -= delta
-        residual[v][u] += delta
-        excess[u] -= delta
-        excess[v] += delta
-
-    def relabel(u):
-        min_height = float('inf')
-        for v in residual[u]:
-            if residual[u][v] > 0:
-                min_height = min(min_height, height[v])
-        if min_height < float('inf'):
-            height[u] = min_height + 2
-
-    # discharge function
-    def discharge(u):
-        while excess[u] > 0:
-            for v in list(residual[u].keys()):
-                if residual[u][v] > 0 and height[u] == height[v] + 1:
-                    push(u, v)
-                    if excess[u] == 0:
-                        break
-            else:
-                relabel(u)
-
-    # main loop
-    while vertices:
-        u = vertices.pop(0)
-        old_height = height[u]
-        discharge(u)
-        if height[u] > old_height:
-            vertices.insert(0, u)
-
-    return sum(residual[sink][i] for i in residual[sink])
+            network.add_edge(u, v, c)
+    return engine.max_flow(network, source, sink, solver)
 
 # Example usage:
 # n = 4
@@ -78,4 +44,5 @@ def push_relabel(n, capacity, source, sink):
 #     3: {}
 # }
 # source, sink = 0, 3
-# print(push_relabel(n, capacity, source, sink))
\ No newline at end of file
+# print(push_relabel(n, capacity, source, sink))  # 15
+# print(push_relabel(n, capacity, source, sink, solver="fifo"))
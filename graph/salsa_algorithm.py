@@ -1,63 +1,73 @@
 # SALSA (Stochastic Approach for Link-Structure Analysis) algorithm implementation
 # The algorithm iteratively updates hub and authority scores using the bipartite graph
 # representation of the web link structure.
+# Scores are the stationary distributions of two random walks on that bipartite graph:
+# an authority step follows a random in-link back to a hub and then a random out-link
+# forward (a hub step is the mirror image). Each step is a pair of np.bincount products
+# over the edge arrays, and iteration stops once the L1 change is below tol.
 
-def salsa(adj_list, iterations=10):
+import numpy as np
+
+
+def _edge_arrays(adj_list):
+    # (names, src, dst) with nodes numbered in dict order, link targets included
+    ids = {node: i for i, node in enumerate(adj_list)}
+    for targets in adj_list.values():
+        for tgt in targets:
+            ids.setdefault(tgt, len(ids))
+    src = np.fromiter((ids[node] for node, targets in adj_list.items() for _ in targets), dtype=np.int64)
+    dst = np.fromiter((ids[tgt] for targets in adj_list.values() for tgt in targets), dtype=np.int64)
+    return list(ids), src, dst
+
+
+def salsa_scores(src, dst, n, iterations=100, tol=1e-10):
+    """Hub and authority arrays (each summing to 1) for edges src[i] -> dst[i] on n nodes."""
+    out_degree = np.bincount(src, minlength=n)
+    in_degree = np.bincount(dst, minlength=n)
+    inv_out = np.where(out_degree > 0, 1.0 / np.maximum(out_degree, 1), 0.0)
+    inv_in = np.where(in_degree > 0, 1.0 / np.maximum(in_degree, 1), 0.0)
+
+    def to_hubs(authorities):
+        # each authority spreads its score evenly over the hubs linking to it
+        return np.bincount(src, weights=(authorities * inv_in)[dst], minlength=n)
+
+    # Starting uniform over all authorities keeps each component's share of the mass
+    authority_scores = (in_degree > 0) / max(np.count_nonzero(in_degree), 1)
+    for _ in range(iterations):
+        hubs = to_hubs(authority_scores)
+        new_authority = np.bincount(dst, weights=(hubs * inv_out)[src], minlength=n)
+        change = np.abs(new_authority - authority_scores).sum()
+        authority_scores = new_authority
+        if change < tol:
+            break
+    return to_hubs(authority_scores), authority_scores
+
+
+def salsa(adj_list, iterations=100, tol=1e-10):
     """
     Compute SALSA hub and authority scores for a directed graph.
     
     Parameters:
     -----------
-    adj_list : dict
+    adj_list : dict or CSRGraph
         Adjacency list of the directed graph: node -> list of nodes it points to.
     iterations : int
-        Number of iterations to perform.
+        Maximum number of iterations to perform.
+    tol : float
+        Stop once the L1 change of the authority scores is below this.
     
     Returns:
     --------
     hub_scores : dict
-        Final hub scores for each node.
+        Final hub scores for each node (an array indexed by node id for a CSRGraph).
     authority_scores : dict
-        Final authority scores for each node.
+        Final authority scores for each node (an array for a CSRGraph).
     """
-    # Build reverse adjacency (in-links) dictionary
-    in_links = {node: [] for node in adj_list}
-    for src, targets in adj_list.items():
-        for tgt in targets:
-            in_links[tgt].append(src)
-
-    # Initialize hub and authority scores
-    hub_scores = {node: 1.0 for node in adj_list}
-    authority_scores = {node: 1.0 for node in adj_list}
-
-    for _ in range(iterations):
-        # Update authority scores based on hub scores of incoming links
-        new_authority = {}
-        for node in adj_list:
-            incoming = in_links[node]
-            new_authority[node] = sum(hub_scores[neighbor] for neighbor in incoming)
-
-        # Update hub scores based on authority scores of outgoing links
-        new_hub = {}
-        for node, targets in adj_list.items():
-            new_hub[node] = sum(authority_scores[neighbor] for neighbor in targets)
-
-        # Normalize authority scores
-        authority_norm = (sum(v ** 2 for v in new_authority.values())) ** 0.5
-        if authority_norm != 0:
-            for node in new_authority:
-                new_authority[node] /= authority_norm
-
-        # Normalize hub scores
-        hub_norm = (sum(v ** 2 for v in authority_scores.values())) ** 0.5
-        if hub_norm != 0:
-            for node in new_hub:
-                new_hub[node] /= hub_norm
-
-        hub_scores = new_hub
-        authority_scores = new_authority
-
-    return hub_scores, authority_scores
+    if hasattr(adj_list, "indptr"):
+        return salsa_scores(adj_list.edge_sources(), adj_list.indices, adj_list.num_nodes, iterations, tol)
+    names, src, dst = _edge_arrays(adj_list)
+    hub_scores, authority_scores = salsa_scores(src, dst, len(names), iterations, tol)
+    return dict(zip(names, hub_scores.tolist())), dict(zip(names, authority_scores.tolist()))
 
 # Example usage
 if __name__ == "__main__":
@@ -70,4 +80,4 @@ if __name__ == "__main__":
     }
     hubs, auths = salsa(graph, iterations=20)
     print("Hub scores:", hubs)
-    print("Authority scores:", auths)
\ No newline at end of file
+    print("Authority scores:", auths)
@@ -1,24 +1,30 @@
 # Suurballe's algorithm for two disjoint shortest paths in a nonnegative directed graph
 # The algorithm finds two edge-disjoint paths from source to target with minimum total length.
+# Both searches run on the Dijkstra engine of dijkstras_algorithm.py (loaded by path).
 
-import heapq
+import importlib.util
+import os
+import sys
 
-def dijkstra(adj, source):
-    dist = {node: float('inf') for node in adj}
-    prev = {}
-    dist[source] = 0
-    heap = [(0, source)]
-    while heap:
-        d, u = heapq.heappop(heap)
-        if d != dist[u]:
-            continue
-        for v, w in adj[u]:
-            nd = d + w
-            if nd < dist[v]:
-                dist[v] = nd
-                prev[v] = u
-                heapq.heappush(heap, (nd, v))
-    return dist, prev
+INF = float('inf')
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "dijkstras_algorithm" in sys.modules:
+        return sys.modules["dijkstras_algorithm"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dijkstras_algorithm.py")
+    spec = importlib.util.spec_from_file_location("dijkstras_algorithm", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
+def dijkstra(adj, source, target=None):
+    return engine.dijkstra(adj, source, target)
 
 def build_adj_from_edges(edges):
     adj = {}
@@ -33,52 +39,53 @@ def suurballe(edges, source, target):
     """
     # Build adjacency
     adj = build_adj_from_edges(edges)
+    if source not in adj:
+        return None, None
 
-    # Step 1: Run Dijkstra to find shortest distances
-    dist, prev = dijkstra(adj, source)
+    # Step 1: Run Dijkstra to find shortest distances and the shortest path
+    paths = engine.ShortestPathEngine(adj)
+    paths.run([source])
+    dist = paths.dist
+    path1 = paths.path(target) if target in dist else None
 
     # If target unreachable
-    if target not in dist or dist[target] == float('inf'):
+    if path1 is None:
         return None, None
 
-    # Reconstruct shortest path
-    path1 = []
-    cur = target
-    while cur != source:
-        path1.append(cur)
-        cur = prev[cur]
-    path1.append(source)
-    path1.reverse()
-
-    # Step 2: Adjust weights
+    # Step 2: Adjust weights to reduced costs w + d(u) - d(v) >= 0 (edges out of nodes
+    # the source cannot reach play no part)
     adj_adjusted = {}
     for u in adj:
-        adj_adjusted[u] = []
-        for v, w in adj[u]:
-            w_adj = w + dist[v] - dist[u]
-            adj_adjusted[u].append((v, w_adj))
+        if dist[u] == INF:
+            continue
+        adj_adjusted[u] = [(v, w + dist[u] - dist[v]) for v, w in adj[u]]
     # Step 3: Reverse edges on the shortest path
     for i in range(len(path1) - 1):
         u, v = path1[i], path1[i+1]
-        adj_adjusted[u].remove((v, next(w for x, w in adj_adjusted[u] if x == v)))  # remove original edge
-        adj_adjusted[v].append((u, 0))  # add reversed edge with zero weight
+        adj_adjusted[u].remove(min((x, w) for x, w in adj_adjusted[u] if x == v))  # remove original edge
+        adj_adjusted.setdefault(v, []).append((u, 0))  # add reversed edge with zero weight
 
-    # Step 4: Run Dijkstra again on adjusted graph
-    dist2, prev2 = dijkstra(adj_adjusted, source)
-
-    # Reconstruct second path
-    if target not in dist2 or dist2[target] == float('inf'):
+    # Step 4: Run Dijkstra again on adjusted graph, stopping once the target is settled
+    path2, _ = engine.shortest_path(adj_adjusted, source, target)
+    if path2 is None:
         return path1, None
 
-    path2 = []
-    cur = target
-    while cur != source:
-        path2.append(cur)
-        cur = prev2[cur]
-    path2.append(source)
-    path2.reverse()
-
-    # Step 5: Merge paths and cancel overlapping edges
-    # (Not implemented here for brevity)
-
-    return path1, path2
\ No newline at end of file
+    # Step 5: Merge paths and cancel overlapping edges: an edge of path1 that path2 walks
+    # backwards belongs to neither final path
+    used = {}
+    for path in (path1, path2):
+        for u, v in zip(path, path[1:]):
+            if used.get((v, u)):
+                used[(v, u)] -= 1
+            else:
+                used[(u, v)] = used.get((u, v), 0) + 1
+    successors = {}
+    for (u, v), count in used.items():
+        successors.setdefault(u, []).extend([v] * count)
+    paths = []
+    for _ in range(2):
+        path = [source]
+        while path[-1] != target:
+            path.append(successors[path[-1]].pop())
+        paths.append(path)
+    return paths[0], paths[1]
@@ -1,44 +1,52 @@
 # Tarjan's strongly connected components algorithm: finds SCCs in a directed graph
+# The depth-first search is iterative (an explicit stack of (node, successor iterator)
+# pairs), so deep graphs do not hit Python's recursion limit.
 
 def tarjan_scc(graph):
     index = {}
     lowlink = {}
     stack = []
-    onStack = {}
+    on_stack = set()
     current_index = 0
     sccs = []
 
-    def strongconnect(v):
-        nonlocal current_index
-        index[v] = current_index
-        lowlink[v] = current_index
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = current_index
         current_index += 1
-        stack.append(v)
-        onStack[v] = True
-
-        for w in graph.get(v, []):
-            if w not in index:
-                strongconnect(w)
-                if index[w] < lowlink[v]:
-                    lowlink[v] = index[w]
-            elif onStack.get(w, False):
-                lowlink[v] = min(lowlink[v], lowlink[w])
-
-        if lowlink[v] == index[v]:
-            component = []
-            while True:
-                w = stack.pop()
-                component.append(w)
-                if w == v:
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+        while work:
+            v, successors = work[-1]
+            for w in successors:
+                if w not in index:
+                    index[w] = lowlink[w] = current_index
+                    current_index += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(graph.get(w, ()))))
                     break
-            sccs.append(component)
-
-    for v in graph:
-        if v not in index:
-            strongconnect(v)
+                if w in on_stack and index[w] < lowlink[v]:
+                    lowlink[v] = index[w]
+            else:
+                # All successors of v done: report its lowlink to the parent
+                work.pop()
+                if work and lowlink[v] < lowlink[work[-1][0]]:
+                    lowlink[work[-1][0]] = lowlink[v]
+                if lowlink[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        component.append(w)
+                        if w == v:
+                            break
+                    sccs.append(component)
 
     return sccs
 
 # Example usage:
 # graph = {0: [1], 1: [2], 2: [0, 3], 3: [4], 4: [5], 5: [3]}
-# print(tarjan_scc(graph))  # Expected: [[0, 1, 2], [3, 4, 5]] (order may vary)
\ No newline at end of file
+# print(tarjan_scc(graph))  # Expected: [[5, 4, 3], [2, 1, 0]] (components in reverse topological order)
@@ -1,5 +1,11 @@
 # Algorithm: Topological Sort (Kahn's algorithm)
 # Purpose: Produce a linear ordering of nodes such that for every directed edge u -> v, u comes before v.
+# DynamicTopologicalOrder keeps such an ordering up to date while edges are inserted
+# (Pearce–Kelly): an edge that agrees with the current order costs O(1); otherwise only the
+# nodes positioned between its ends and connected to them are searched and reshuffled
+# among their own positions. An insertion that closes a cycle merges the nodes on it into
+# one strongly connected component, so the structure orders the SCC condensation. Batches
+# that invalidate a large part of the order are applied with one Tarjan pass instead.
 
 import collections
 
@@ -10,6 +16,7 @@ def tsort(nodes, edges):
     Returns a list of nodes in topological order.
     Raises ValueError if a cycle is detected.
     """
+    nodes = list(nodes)
     # Build adjacency list
     graph = {node: [] for node in nodes}
     indegree = {node: 0 for node in nodes}
@@ -36,8 +43,208 @@ def tsort(nodes, edges):
 
     return order
 
+
+class DynamicTopologicalOrder:
+    def __init__(self, nodes=(), edges=(), rebuild_fraction=0.25):
+        """rebuild_fraction: batches invalidating more than this share of the order are rebuilt."""
+        self.parent = {}  # node -> parent in the union-find over components
+        self.position = {}  # component representative -> position in the order
+        self.out = {}  # representative -> nodes its members have edges to
+        self.inc = {}  # representative -> nodes with edges into its members
+        self.members = {}  # representative -> nodes of the component
+        self.next_position = 0
+        self.rebuild_fraction = rebuild_fraction
+        for node in nodes:
+            self.add_node(node)
+        self.add_edges(edges)
+
+    def add_node(self, node):
+        if node not in self.parent:
+            self.parent[node] = node
+            self.position[node] = self.next_position
+            self.next_position += 1
+            self.out[node] = set()
+            self.inc[node] = set()
+            self.members[node] = [node]
+
+    def find(self, node):
+        """Representative of the component containing node."""
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def add_edge(self, u, v):
+        """Insert u -> v; returns True if it closed a cycle (and so merged components)."""
+        self.add_node(u)
+        self.add_node(v)
+        ru, rv = self.find(u), self.find(v)
+        if ru == rv:
+            return False
+        self.out[ru].add(v)
+        self.inc[rv].add(u)
+        if self.position[ru] < self.position[rv]:
+            return False
+        return self._repair(ru, rv)
+
+    def add_edges(self, edges):
+        """Insert a batch of edges; returns the number of insertions that closed a cycle."""
+        edges = list(edges)
+        for u, v in edges:
+            self.add_node(u)
+            self.add_node(v)
+        find, position = self.find, self.position
+        stale = sum(1 for u, v in edges if position[find(u)] > position[find(v)])
+        if stale <= self.rebuild_fraction * len(position):
+            return sum(self.add_edge(u, v) for u, v in edges)
+        old_rep = {node: find(node) for node in self.parent}
+        old_position = dict(position)
+        old_out = {r: set(targets) for r, targets in self.out.items()}
+        for u, v in edges:
+            ru, rv = old_rep[u], old_rep[v]
+            if ru != rv:
+                self.out[ru].add(v)
+                self.inc[rv].add(u)
+        self._rebuild()
+        return self._cycle_closings(edges, old_rep, old_position, old_out)
+
+    def _cycle_closings(self, edges, old_rep, old_position, old_out):
+        # Insertions of a rebuilt batch that would have closed a cycle one edge at a time.
+        # Such a cycle lies inside one of the new components, so the batch is replayed in
+        # order on each of them alone, over the components that existed before it
+        find = self.find
+        batches = {}
+        for u, v in edges:
+            ru, rv = old_rep[u], old_rep[v]
+            if ru != rv and find(u) == find(v):
+                batches.setdefault(find(u), []).append((ru, rv))
+        closed = 0
+        for rep, batch in batches.items():
+            reps = sorted({old_rep[x] for x in self.members[rep]}, key=old_position.__getitem__)
+            inside = set(reps)
+            replay = DynamicTopologicalOrder(reps, [(r, old_rep[x]) for r in reps for x in old_out[r]
+                                                    if old_rep[x] in inside])
+            closed += sum(replay.add_edge(ru, rv) for ru, rv in batch)
+        return closed
+
+    def _neighbours(self, r, edges):
+        find = self.find
+        for x in edges[r]:
+            y = find(x)
+            if y != r:
+                yield y
+
+    def _search(self, start, edges, inside):
+        # Components reachable from start along `edges` whose position satisfies inside()
+        seen = {start}
+        stack = [start]
+        position = self.position
+        while stack:
+            r = stack.pop()
+            for y in self._neighbours(r, edges):
+                if y not in seen and inside(position[y]):
+                    seen.add(y)
+                    stack.append(y)
+        return seen
+
+    def _repair(self, ru, rv):
+        # u -> v points backwards: only positions in [position[rv], position[ru]] are affected
+        position = self.position
+        lower, upper = position[rv], position[ru]
+        forward = self._search(rv, self.out, lambda p: p <= upper)
+        backward = self._search(ru, self.inc, lambda p: p >= lower)
+        cycle = forward & backward if ru in forward else set()
+        key = position.__getitem__
+        sequence = sorted(backward - cycle, key=key) + sorted(cycle, key=key) + sorted(forward - cycle, key=key)
+        slots = sorted(position[r] for r in forward | backward)
+        for r, slot in zip(sequence, slots):
+            position[r] = slot
+        if cycle:
+            self._merge(cycle)
+        return bool(cycle)
+
+    def _merge(self, reps):
+        # Collapse the components in reps into one, at the lowest of their positions
+        rep = max(reps, key=lambda r: len(self.out[r]) + len(self.inc[r]))
+        position = self.position
+        position[rep] = min(position[r] for r in reps)
+        for r in reps:
+            if r != rep:
+                self.parent[r] = rep
+                self.out[rep] |= self.out.pop(r)
+                self.inc[rep] |= self.inc.pop(r)
+                self.members[rep] += self.members.pop(r)
+                del position[r]
+        return rep
+
+    def _rebuild(self):
+        # Iterative Tarjan over the components; SCCs come out in reverse topological order
+        index, lowlink, on_stack = {}, {}, set()
+        stack, sccs = [], []
+        counter = 0
+        for root in list(self.position):
+            if root in index:
+                continue
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, self._neighbours(root, self.out))]
+            while work:
+                v, successors = work[-1]
+                for w in successors:
+                    if w not in index:
+                        index[w] = lowlink[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack.add(w)
+                        work.append((w, self._neighbours(w, self.out)))
+                        break
+                    if w in on_stack and index[w] < lowlink[v]:
+                        lowlink[v] = index[w]
+                else:
+                    work.pop()
+                    if work and lowlink[v] < lowlink[work[-1][0]]:
+                        lowlink[work[-1][0]] = lowlink[v]
+                    if lowlink[v] == index[v]:
+                        component = []
+                        while True:
+                            w = stack.pop()
+                            on_stack.discard(w)
+                            component.append(w)
+                            if w == v:
+                                break
+                        sccs.append(component)
+        for i, component in enumerate(reversed(sccs)):
+            rep = self._merge(component) if len(component) > 1 else component[0]
+            self.position[rep] = i
+        self.next_position = len(sccs)
+
+    def component(self, node):
+        """Nodes in the same strongly connected component as node."""
+        return list(self.members[self.find(node)])
+
+    def order(self):
+        """Components (lists of nodes) in topological order."""
+        reps = sorted(self.position, key=self.position.__getitem__)
+        return [list(self.members[r]) for r in reps]
+
+    def precedes(self, u, v):
+        """True if u's component comes before v's in the current order."""
+        return self.position[self.find(u)] < self.position[self.find(v)]
+
+    def __len__(self):
+        return len(self.position)
+
 # Example usage:
 if __name__ == "__main__":
     nodes = ['a', 'b', 'c', 'd', 'e']
     edges = [('a', 'b'), ('b', 'c'), ('a', 'c'), ('d', 'e')]
-    print(tsort(nodes, edges))
\ No newline at end of file
+    print(tsort(nodes, edges))
+
+    dag = DynamicTopologicalOrder(nodes, edges)
+    dag.add_edge('e', 'a')  # reorders only the affected part
+    print(dag.order())
+    dag.add_edge('c', 'e')  # closes the cycle a -> c -> e -> a
+    print(dag.order(), dag.component('a'))
\ No newline at end of file
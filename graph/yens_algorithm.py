@@ -1,8 +1,28 @@
 # Yen's algorithm for k-shortest loopless paths in a weighted graph
 # Idea: iteratively build candidate paths by deviating from previously found shortest paths,
 # using Dijkstra's algorithm for spur paths and maintaining a priority queue of candidates.
+# All spur searches of a query run on one ShortestPathEngine from dijkstras_algorithm.py
+# (loaded by path), which hides the removed edges and root-path nodes per run.
 
 import heapq
+import importlib.util
+import os
+import sys
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "dijkstras_algorithm" in sys.modules:
+        return sys.modules["dijkstras_algorithm"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dijkstras_algorithm.py")
+    spec = importlib.util.spec_from_file_location("dijkstras_algorithm", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
 
 class Graph:
     def __init__(self):
@@ -15,33 +35,32 @@ class Graph:
     def neighbors(self, u):
         return self.adj.get(u, [])
 
+INF = float('inf')
+
+def _spur(paths, src, dst, removed_edges=(), removed_nodes=()):
+    # (cost, path) with a reusable ShortestPathEngine, (INF, None) if dst is unreachable
+    paths.run([src], [dst], removed_edges, removed_nodes)
+    return paths.distance(dst), paths.path(dst)
+
 def dijkstra(g, src, dst, removed_edges=None, removed_nodes=None):
-    removed_edges = removed_edges or set()
-    removed_nodes = removed_nodes or set()
-    heap = [(0, src, [])]
-    visited = set()
-    while heap:
-        cost, u, path = heapq.heappop(heap)
-        if u in visited or u in removed_nodes:
-            continue
-        visited.add(u)
-        if u == dst:
-            return (cost, path + [dst])
-        for v, w in g.neighbors(u):
-            if (u, v) in removed_edges or v in removed_nodes:
-                continue
-            heapq.heappush(heap, (cost + w, v, path + [u]))
-    return (float('inf'), None)
+    return _spur(engine.ShortestPathEngine(g.adj), src, dst, removed_edges or (), removed_nodes or ())
+
+def path_cost(g, path):
+    # Parallel edges: the search above always takes the cheapest one
+    return sum(min(w for nbr, w in g.neighbors(u) if nbr == v) for u, v in zip(path, path[1:]))
 
 def yen_k_shortest_paths(g, source, target, K):
     A = []  # list of shortest paths found (cost, path)
     B = []  # priority queue of potential kth shortest paths (cost, path)
+    seen = set()  # paths already found or queued
 
     # First shortest path
-    cost, path = dijkstra(g, source, target)
+    paths = engine.ShortestPathEngine(g.adj)
+    cost, path = _spur(paths, source, target)
     if not path:
         return []
     A.append((cost, path))
+    seen.add(tuple(path))
 
     for k in range(1, K):
         # For each node in the previous shortest path except the target
@@ -61,24 +80,19 @@ def yen_k_shortest_paths(g, source, target, K):
             # Remove nodes in root path except spur node to prevent loops
             removed_nodes = set(root_path[:-1])
 
-            spur_cost, spur_path = dijkstra(g, spur_node, target, removed_edges, removed_nodes)
+            spur_cost, spur_path = _spur(paths, spur_node, target, removed_edges, removed_nodes)
             if spur_path is None:
                 continue
             total_path = root_path[:-1] + spur_path
-            total_cost = len(total_path)
+            if tuple(total_path) in seen:
+                continue
+            seen.add(tuple(total_path))
+            total_cost = path_cost(g, root_path) + spur_cost
             heapq.heappush(B, (total_cost, total_path))
 
         if not B:
             break
         # Next shortest path
-        _, next_path = heapq.heappop(B)
-        # Calculate actual cost for the next path
-        total_cost = 0
-        for u, v in zip(next_path[:-1], next_path[1:]):
-            for nbr, w in g.neighbors(u):
-                if nbr == v:
-                    total_cost += w
-                    break
-        A.append((total_cost, next_path))
+        A.append(heapq.heappop(B))
 
     return [path for cost, path in A]
\ No newline at end of file
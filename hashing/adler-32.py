@@ -1,19 +1,72 @@
 # Adler-32 checksum implementation
+# Adler32 is a hashlib-style streaming object (update/digest/hexdigest/intdigest/copy).
+# Large updates take a block-vectorized path: for a block b_1..b_n the sums advance as
+#   A' = A + sum(b_i)            B' = B + n*A + sum((n - i + 1) * b_i)
+# which NumPy evaluates with one sum and one dot product per block.
+import numpy as np
+
 MOD_ADLER = 65521  # Prime modulus used in Adler-32
+NMAX = 5552  # Most bytes that can be summed before the 32-bit sums could overflow
+BLOCK = 1 << 20  # Vectorized block size; the weighted sum stays well inside int64
+_WEIGHTS = np.arange(BLOCK, 0, -1, dtype=np.int64)
 
-def adler32(data):
-    """Compute the Adler-32 checksum of the given bytes-like object."""
-    # Initialize sums
-    sum1 = 1
-    sum2 = 1
 
-    for byte in data:
-        sum1 = (sum1 + byte) % MOD_ADLER
-        sum2 = (sum2 + sum1) % 65520
+class Adler32:
+    name = "adler32"
+    digest_size = 4
+    block_size = 1
+
+    def __init__(self, data=b""):
+        # Initialize sums
+        self.sum1 = 1
+        self.sum2 = 0
+        if data:
+            self.update(data)
+
+    def update(self, data):
+        data = memoryview(data).cast("B")
+        sum1, sum2 = self.sum1, self.sum2
+        pos = 0
+        if len(data) >= 4096:
+            for pos in range(0, len(data), BLOCK):
+                block = np.frombuffer(data[pos:pos + BLOCK], dtype=np.uint8)
+                n = len(block)
+                sum2 = (sum2 + n * sum1 + int(np.dot(block, _WEIGHTS[BLOCK - n:]))) % MOD_ADLER
+                sum1 = (sum1 + int(block.sum(dtype=np.int64))) % MOD_ADLER
+            pos = len(data)
+        # Short inputs stay scalar, reducing only every NMAX bytes
+        for start in range(pos, len(data), NMAX):
+            for byte in data[start:start + NMAX]:
+                sum1 += byte
+                sum2 += sum1
+            sum1 %= MOD_ADLER
+            sum2 %= MOD_ADLER
+        self.sum1, self.sum2 = sum1, sum2
+
+    def intdigest(self):
+        return (self.sum2 << 16) | self.sum1
 
-    return (sum2 << 16) | sum1
+    def digest(self):
+        return self.intdigest().to_bytes(4, "big")
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    def copy(self):
+        other = Adler32()
+        other.sum1, other.sum2 = self.sum1, self.sum2
+        return other
+
+
+def adler32(data):
+    """Compute the Adler-32 checksum of the given bytes-like object."""
+    return Adler32(data).intdigest()
 
 # Example usage
 if __name__ == "__main__":
     sample = b"Hello, World!"
-    print(f"Adler-32: {adler32(sample):08x}")
\ No newline at end of file
+    print(f"Adler-32: {adler32(sample):08x}")
+    h = Adler32()
+    h.update(b"Hello, ")
+    h.update(b"World!")
+    print(f"Streamed Adler-32: {h.hexdigest()}")
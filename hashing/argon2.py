@@ -41,12 +41,11 @@ def generate_initial_hash(params, password):
     return blake2b_hash(data, 64)
 
 # Memory block initialization
-def initialize_memory_blocks(pseudo_random_bytes, memory_blocks):
+def initialize_memory_blocks(pseudo_random_bytes, memory):
     # Fill memory blocks with pseudo-random bytes derived from the initial hash
-    for i in range(memory_blocks):
-        start = i * 64
-        end = start + 64
-        memory[i] = pseudo_random_bytes[start:end]
+    for lane, lane_blocks in enumerate(memory):
+        for i in range(len(lane_blocks)):
+            lane_blocks[i] = blake2b_hash(pseudo_random_bytes + int_to_le_bytes(i) + int_to_le_bytes(lane), 64)
 
 # Mixing function (simplified Argon2 compression)
 def compress(block_a, block_b):
@@ -73,7 +72,7 @@ def argon2id(password, params=None):
     memory = [[b'\x00' * 64 for _ in range(memory_blocks // params.parallelism)] for _ in range(params.parallelism)]
 
     # Initialize memory blocks
-    initialize_memory_blocks(initial_hash, memory_blocks)
+    initialize_memory_blocks(initial_hash, memory)
 
     # Main iteration loop
     for t in range(params.time_cost):
@@ -1,35 +1,229 @@
-# Bloom filter implementation using simple hashing
+# Bloom filter implementation backed by a NumPy bit array
 # The filter supports adding items and probabilistic membership checks.
+# Indices come from Kirsch-Mitzenmacher double hashing of one stable 64-bit hash:
+# integers go through the xxHash64 single-lane path (vectorized over NumPy arrays),
+# strings and bytes through an 8-byte BLAKE2b digest, so results are identical
+# across processes. Filters can be saved to disk and loaded back through mmap.
+# cuckoo_filter.py and quotient_filter.py hash with the same stable_hash64_many and keep
+# their slots in the PackedArray defined here.
+
+import math
+import struct
+from hashlib import blake2b
+
+import numpy as np
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+# 64-bit primes used in xxHash64
+PRIME1 = 0x9E3779B185EBCA87
+PRIME2 = 0xC2B2AE3D27D4EB4F
+PRIME3 = 0x165667B19E3779F9
+PRIME4 = 0x85EBCA77C2B2AE63
+PRIME5 = 0x27D4EB2F165667C5
+
+_HEADER = struct.Struct("<8sQQQ")  # magic, number of bits, hash count, items added
+_MAGIC = b"BLOOMNP1"
+_CHUNK = 1 << 18                   # keys hashed per vectorized step
+
+
+def _rotl(v, n):
+    return ((v << n) & MASK64) | (v >> (64 - n))
+
+
+def _xxh64_u64(value, seed=0):
+    """xxHash64 of an 8-byte little-endian integer (scalar path)."""
+    h = (seed + PRIME5 + 8) & MASK64
+    k1 = (_rotl((value * PRIME2) & MASK64, 31) * PRIME1) & MASK64
+    h = (_rotl(h ^ k1, 27) * PRIME1 + PRIME4) & MASK64
+    h ^= h >> 33
+    h = (h * PRIME2) & MASK64
+    h ^= h >> 29
+    h = (h * PRIME3) & MASK64
+    h ^= h >> 32
+    return h
+
+
+def _np_rotl(v, n):
+    return (v << np.uint64(n)) | (v >> np.uint64(64 - n))
+
+
+def _xxh64_u64_array(values, seed=0):
+    """Vectorized xxHash64 of an array of 8-byte little-endian integers."""
+    v = values.astype(np.uint64, copy=False)
+    h = np.full(v.shape, (seed + PRIME5 + 8) & MASK64, dtype=np.uint64)
+    k1 = _np_rotl(v * np.uint64(PRIME2), 31) * np.uint64(PRIME1)
+    h = _np_rotl(h ^ k1, 27) * np.uint64(PRIME1) + np.uint64(PRIME4)
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(PRIME2)
+    h ^= h >> np.uint64(29)
+    h *= np.uint64(PRIME3)
+    h ^= h >> np.uint64(32)
+    return h
+
+
+def stable_hash64(item):
+    """Process-independent 64-bit hash of an int, str or bytes item."""
+    if isinstance(item, (int, np.integer)) and -(1 << 63) <= item <= MASK64:
+        return _xxh64_u64(int(item) & MASK64)
+    if isinstance(item, str):
+        item = item.encode("utf-8")
+    elif not isinstance(item, (bytes, bytearray, memoryview)):
+        item = repr(item).encode("utf-8")
+    return int.from_bytes(blake2b(item, digest_size=8).digest(), "little")
+
+
+def stable_hash64_many(items):
+    """Vectorized stable_hash64 over a NumPy integer array or any iterable."""
+    if isinstance(items, np.ndarray) and items.dtype.kind in "iu":
+        return _xxh64_u64_array(items.astype(np.int64, copy=False).view(np.uint64)
+                                if items.dtype.kind == "i" else items)
+    return np.fromiter((stable_hash64(x) for x in items), dtype=np.uint64)
+
+
+class PackedArray:
+    """Fixed-width unsigned integers bit-packed into a uint8 buffer."""
+
+    def __init__(self, length, width, buffer=None):
+        if not 1 <= width <= 56:
+            raise ValueError("width must be between 1 and 56 bits")
+        self.length = length
+        self.width = width
+        self.mask = (1 << width) - 1
+        # 8 bytes of slack so every 64-bit window stays inside the buffer
+        nbytes = (length * width + 7) // 8 + 8
+        self.bytes = np.zeros(nbytes, dtype=np.uint8) if buffer is None else buffer
+
+    def __getitem__(self, i):
+        bit = i * self.width
+        window = int.from_bytes(self.bytes[bit >> 3:(bit >> 3) + 8].tobytes(), "little")
+        return (window >> (bit & 7)) & self.mask
+
+    def __setitem__(self, i, value):
+        bit = i * self.width
+        byte, shift = bit >> 3, bit & 7
+        window = int.from_bytes(self.bytes[byte:byte + 8].tobytes(), "little")
+        window = (window & ~(self.mask << shift)) | (value << shift)
+        self.bytes[byte:byte + 8] = np.frombuffer(window.to_bytes(8, "little"), dtype=np.uint8)
+
+    def run(self, i, count):
+        # count consecutive values starting at index i, decoded from one integer
+        bit = i * self.width
+        end = (bit + count * self.width + 7) >> 3
+        window = int.from_bytes(self.bytes[bit >> 3:end].tobytes(), "little") >> (bit & 7)
+        return [(window >> (k * self.width)) & self.mask for k in range(count)]
+
+    def get_many(self, idx):
+        bit = np.asarray(idx, dtype=np.int64) * self.width
+        windows = self.bytes[(bit >> 3)[..., None] + np.arange(8)].view("<u8")[..., 0]
+        return (windows >> (bit & 7).astype(np.uint64)) & np.uint64(self.mask)
+
+    def or_many(self, idx, values):
+        # Write values into empty (all-zero) slots; duplicate bytes are combined safely
+        bit = np.asarray(idx, dtype=np.int64) * self.width
+        shifted = np.asarray(values, dtype=np.uint64) << (bit & 7).astype(np.uint64)
+        for j in range((self.width + 14) // 8):
+            part = ((shifted >> np.uint64(8 * j)) & np.uint64(0xFF)).astype(np.uint8)
+            np.bitwise_or.at(self.bytes, (bit >> 3) + j, part)
+
+    def tolist(self):
+        return self.get_many(np.arange(self.length)).tolist()
+
+    def assign(self, values):
+        self.bytes[:] = 0
+        self.or_many(np.arange(self.length), values)
+
 
 class BloomFilter:
-    def __init__(self, size=100, hash_count=3):
+    def __init__(self, size=100, hash_count=3, bits=None):
         self.size = size
         self.hash_count = hash_count
-        self.bit_array = 0  # integer bit array representation
+        self.count = 0
+        # uint8 array holding size bits, least significant bit first
+        if bits is None:
+            bits = np.zeros((size + 7) // 8, dtype=np.uint8)
+        self.bit_array = bits
+
+    @classmethod
+    def from_capacity(cls, capacity, error_rate=0.01):
+        """Size the filter for capacity items at the target false-positive rate."""
+        size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        hash_count = max(1, int(round(size / capacity * math.log(2))))
+        return cls(size, hash_count)
 
     def _hashes(self, item):
         """Generate hash values for the item."""
-        hashes = []
-        for i in range(self.hash_count):
-            hash_val = hash(str(item) + "seed")
-            h = hash_val % (self.size + 1)
-            hashes.append(h)
-        return hashes
+        h1 = stable_hash64(item)
+        h2 = _xxh64_u64(h1, seed=PRIME1) | 1
+        return [((h1 + i * h2) & MASK64) % self.size for i in range(self.hash_count)]
+
+    def _hashes_many(self, hashes):
+        # Returns a (len(hashes), hash_count) array of bit positions
+        h2 = _xxh64_u64_array(hashes, seed=PRIME1) | np.uint64(1)
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        return (hashes[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.size)
 
     def add(self, item):
         """Add an item to the Bloom filter."""
         for h in self._hashes(item):
-            self.bit_array |= 1 << h
+            self.bit_array[h >> 3] |= 1 << (h & 7)
+        self.count += 1
 
     def check(self, item):
         """Check if an item is possibly in the Bloom filter."""
         for h in self._hashes(item):
-            if not (self.bit_array & (1 << h)):
+            if not (self.bit_array[h >> 3] & (1 << (h & 7))):
                 return False
         return True
 
+    __contains__ = check
+
+    def add_many(self, items):
+        """Add a batch of items (NumPy integer arrays are hashed vectorized)."""
+        hashes = stable_hash64_many(items)
+        for start in range(0, len(hashes), _CHUNK):
+            idx = self._hashes_many(hashes[start:start + _CHUNK]).ravel()
+            masks = np.left_shift(1, idx & np.uint64(7)).astype(np.uint8)
+            np.bitwise_or.at(self.bit_array, idx >> np.uint64(3), masks)
+        self.count += len(hashes)
+
+    def check_many(self, items):
+        """Return a boolean array telling which items are possibly present."""
+        hashes = stable_hash64_many(items)
+        result = np.empty(len(hashes), dtype=bool)
+        for start in range(0, len(hashes), _CHUNK):
+            idx = self._hashes_many(hashes[start:start + _CHUNK])
+            masks = np.left_shift(1, idx & np.uint64(7)).astype(np.uint8)
+            hit = self.bit_array[idx >> np.uint64(3)] & masks
+            result[start:start + len(idx)] = hit.all(axis=1)
+        return result
+
+    def false_positive_rate(self):
+        """Estimated false-positive rate for the number of items added so far."""
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.size, self.hash_count, self.count))
+            f.write(np.ascontiguousarray(self.bit_array).tobytes())
+
+    @classmethod
+    def load(cls, path, mode="r"):
+        """Load a saved filter; the bit array is memory-mapped, not read."""
+        with open(path, "rb") as f:
+            magic, size, hash_count, count = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a saved BloomFilter")
+        bits = np.memmap(path, dtype=np.uint8, mode=mode,
+                         offset=_HEADER.size, shape=((size + 7) // 8,))
+        bf = cls(size, hash_count, bits=bits)
+        bf.count = count
+        return bf
+
 # Example usage:
-# bf = BloomFilter(size=200, hash_count=5)
+# bf = BloomFilter.from_capacity(1_000_000, error_rate=0.01)
 # bf.add("apple")
+# bf.add_many(np.arange(1_000_000))
 # print(bf.check("apple"))  # Expected: True
-# print(bf.check("banana"))  # Expected: False or True (false positive possible)
\ No newline at end of file
+# print(bf.check_many(np.array([5, -1])))  # Expected: [ True False] (false positive possible)
+# bf.save("/tmp/bloom.bin"); bf2 = BloomFilter.load("/tmp/bloom.bin")
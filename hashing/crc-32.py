@@ -1,8 +1,19 @@
 # CRC-32 implementation (bitwise table based)
+# Crc32 is a hashlib-style streaming object (update/digest/hexdigest/intdigest/copy) built on
+# slicing-by-8: eight derived tables fold eight input bytes into the register per step.
+# Large updates are cut into equal lanes that run slicing-by-8 side by side as NumPy table
+# gathers; since the raw CRC register is linear, lane results are stitched together with
+# the "append L zero bytes" operator (a 32x32 GF(2) matrix built by repeated squaring).
+# Small streamed updates are buffered (up to 1 MiB) so they also reach the lane path.
+import functools
+import math
+import struct
+
+import numpy as np
 
 def _crc32_table():
-    # Polynomial used for CRC-32 (x^32 + x^26 + x^23 + x^22 + ... + 1)
-    poly = 0xEDB88321
+    # Polynomial used for CRC-32 (x^32 + x^26 + x^23 + x^22 + ... + 1), bit-reversed
+    poly = 0xEDB88320
     table = []
     for i in range(256):
         crc = i
@@ -10,16 +21,142 @@ def _crc32_table():
             if crc & 1:
                 crc = (crc >> 1) ^ poly
             else:
-                crc = crc << 1
+                crc = crc >> 1
         table.append(crc & 0xFFFFFFFF)
     return table
 
 _table = _crc32_table()
 
-def crc32(data):
-    if isinstance(data, str):
-        data = data.encode()
-    crc = 0xFFFFFFFF
-    for byte in data:
+def _slicing_tables():
+    # Table k gives the effect of a byte followed by k zero bytes
+    tables = [_table]
+    for _ in range(7):
+        prev = tables[-1]
+        tables.append([(prev[i] >> 8) ^ _table[prev[i] & 0xFF] for i in range(256)])
+    return tables
+
+_tables = _slicing_tables()
+_np_tables = np.array(_tables, dtype=np.uint32)
+
+PARALLEL_MIN = 1 << 16  # below this the NumPy lanes cost more than they save
+
+
+def _update_scalar(crc, data):
+    # Raw register update (no pre/post inversion), eight bytes per step
+    t0, t1, t2, t3, t4, t5, t6, t7 = _tables
+    n8 = len(data) & ~7
+    words = struct.unpack(f"<{n8 // 4}I", data[:n8])
+    for j in range(0, len(words), 2):
+        x = crc ^ words[j]
+        hi = words[j + 1]
+        crc = (t7[x & 0xFF] ^ t6[(x >> 8) & 0xFF] ^ t5[(x >> 16) & 0xFF] ^ t4[x >> 24] ^
+               t3[hi & 0xFF] ^ t2[(hi >> 8) & 0xFF] ^ t1[(hi >> 16) & 0xFF] ^ t0[hi >> 24])
+    for byte in data[n8:]:
         crc = _table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
-    return crc ^ 0xFFFFFFFF
\ No newline at end of file
+    return crc
+
+
+def _gf2_apply(columns, v):
+    r = 0
+    j = 0
+    while v:
+        if v & 1:
+            r ^= columns[j]
+        v >>= 1
+        j += 1
+    return r
+
+
+@functools.lru_cache(maxsize=32)
+def _zeros_operator(length):
+    # Columns of the matrix mapping a register to its value after `length` zero bytes
+    step = [_table[(1 << j) & 0xFF] ^ ((1 << j) >> 8) for j in range(32)]
+    result = [1 << j for j in range(32)]
+    while length:
+        if length & 1:
+            result = [_gf2_apply(step, c) for c in result]
+        step = [_gf2_apply(step, c) for c in step]
+        length >>= 1
+    return result
+
+
+def _update_parallel(crc, data):
+    # Returns the register after the lane-covered prefix and how many bytes that was
+    steps = max(64, math.isqrt(len(data) // 8))
+    lane = 8 * steps
+    lanes = len(data) // lane
+    words = np.frombuffer(data, dtype="<u4", count=lanes * lane // 4)
+    words = np.ascontiguousarray(words.reshape(lanes, lane // 4).T)
+    state = np.zeros(lanes, dtype=np.uint32)
+    state[0] = crc
+    t = _np_tables
+    for j in range(0, lane // 4, 2):
+        x = state ^ words[j]
+        hi = words[j + 1]
+        state = (t[7][x & 0xFF] ^ t[6][(x >> 8) & 0xFF] ^ t[5][(x >> 16) & 0xFF] ^ t[4][x >> 24] ^
+                 t[3][hi & 0xFF] ^ t[2][(hi >> 8) & 0xFF] ^ t[1][(hi >> 16) & 0xFF] ^ t[0][hi >> 24])
+    # R(c, A + B) = Z_len(B)(R(c, A)) ^ R(0, B)
+    shift = _zeros_operator(lane)
+    crc = 0
+    for s in state.tolist():
+        crc = _gf2_apply(shift, crc) ^ s
+    return crc, lanes * lane
+
+
+class Crc32:
+    name = "crc32"
+    digest_size = 4
+    block_size = 8
+    buffer_limit = 1 << 20  # small updates are gathered up to this size for the lane path
+
+    def __init__(self, data=b""):
+        self.register = 0xFFFFFFFF
+        self._pending = bytearray()
+        if data:
+            self.update(data)
+
+    @staticmethod
+    def _fold(crc, data):
+        if len(data) >= PARALLEL_MIN:
+            crc, done = _update_parallel(crc, data)
+            data = data[done:]
+        return _update_scalar(crc, data)
+
+    def update(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        data = memoryview(data).cast("B")
+        if len(self._pending) + len(data) < self.buffer_limit:
+            self._pending += data
+            return
+        if self._pending:
+            self.register = self._fold(self.register, memoryview(self._pending))
+            self._pending = bytearray()
+        self.register = self._fold(self.register, data)
+
+    def intdigest(self):
+        return self._fold(self.register, memoryview(self._pending)) ^ 0xFFFFFFFF
+
+    def digest(self):
+        return self.intdigest().to_bytes(4, "big")
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    def copy(self):
+        other = Crc32()
+        other.register = self.register
+        other._pending = bytearray(self._pending)
+        return other
+
+
+def crc32(data):
+    return Crc32(data).intdigest()
+
+# Example usage:
+# print(hex(crc32(b"123456789")))  # 0xcbf43926
+# h = Crc32()
+# with open("big.bin", "rb") as f:
+#     for chunk in iter(lambda: f.read(1 << 20), b""):
+#         h.update(chunk)
+# print(h.hexdigest())
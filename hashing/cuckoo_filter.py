@@ -1,70 +1,203 @@
 # Cuckoo filter implementation for approximate set membership
 # Idea: each item is represented by a small fingerprint stored in one of two candidate buckets.
 # If both buckets are full, a random entry is evicted and relocated up to a maximum number of kicks.
+# Fingerprints of a configurable width are bit-packed into a NumPy uint8 buffer (buckets of
+# bucket_size consecutive slots, 0 = empty), so a filter costs fingerprint_bits per slot, batches
+# are inserted and looked up with vectorized gathers, and a saved filter loads through mmap.
+# The public interface matches BloomFilter in bloom_filter.py (add/check/add_many/check_many/
+# from_capacity/save/load), plus delete; items are hashed with its stable_hash64_many and
+# slots live in its PackedArray.
 
+import importlib.util
+import math
+import os
 import random
+import struct
+import sys
+
+import numpy as np
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+ALT_MULT = 0x5BD1E9955BD1E995  # scatters fingerprints for the alternate bucket index
+_HEADER = struct.Struct("<8sQIIQI")  # magic, buckets, bucket size, fp bits, count, max kicks
+_MAGIC = b"CUCKOOF2"
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "bloom_filter" in sys.modules:
+        return sys.modules["bloom_filter"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bloom_filter.py")
+    spec = importlib.util.spec_from_file_location("bloom_filter", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+stable_hash64_many = engine.stable_hash64_many
+PackedArray = engine.PackedArray
+
 
 class CuckooFilter:
-    def __init__(self, size=1024, bucket_size=4, max_kicks=500):
-        self.size = size  # number of buckets
+    def __init__(self, size=1024, bucket_size=4, max_kicks=500, fingerprint_bits=16, buffer=None):
+        # The alternate index is i ^ f(fp), so the bucket count must be a power of two
+        self.size = 1 << max(0, (size - 1).bit_length())  # number of buckets
         self.bucket_size = bucket_size
         self.max_kicks = max_kicks
-        self.buckets = [[] for _ in range(self.size)]  # each bucket holds fingerprints
+        self.fingerprint_bits = fingerprint_bits
+        self.slots = PackedArray(self.size * bucket_size, fingerprint_bits, buffer)
+        self.count = 0
 
-    def _hash(self, item):
-        return hash(item)
+    @classmethod
+    def from_capacity(cls, capacity, error_rate=0.01, bucket_size=4):
+        """Size the filter for capacity items at the target false-positive rate."""
+        # Each lookup compares against 2 * bucket_size fingerprints
+        fingerprint_bits = max(4, math.ceil(math.log2(2 * bucket_size / error_rate)))
+        size = math.ceil(capacity / (0.95 * bucket_size))
+        return cls(size, bucket_size, fingerprint_bits=fingerprint_bits)
 
-    def _fingerprint(self, item):
-        # 16-bit fingerprint
-        return self._hash(item) & 0xFFFF
+    def _split(self, hashes):
+        # Bucket index from the high half, fingerprint (never 0) from the low bits
+        fp = hashes & np.uint64((1 << self.fingerprint_bits) - 1)
+        fp = np.where(fp == 0, np.uint64(1), fp)
+        i1 = (hashes >> np.uint64(32)) & np.uint64(self.size - 1)
+        return i1.astype(np.int64), fp
 
-    def _index1(self, item):
-        return self._hash(item) % self.size
+    def _alt_many(self, i, fp):
+        return i ^ (((fp * np.uint64(ALT_MULT)) >> np.uint64(32)) & np.uint64(self.size - 1)).astype(np.int64)
 
-    def _index2(self, item, fp):
-        # Alternative bucket index derived from fingerprint
-        return (self._index1(item) ^ self._hash(fp)) % self.size
+    def _alt(self, i, fp):
+        return i ^ ((((fp * ALT_MULT) & MASK64) >> 32) & (self.size - 1))
 
-    def insert(self, item):
-        fp = self._fingerprint(item)
-        i1 = self._index1(item)
-        i2 = self._index2(item, fp)
+    def _locate(self, item):
+        i1, fp = self._split(stable_hash64_many([item]))
+        return int(i1[0]), int(fp[0])
 
-        # try first bucket
-        if len(self.buckets[i1]) < self.bucket_size:
-            self.buckets[i1].append(fp)
-            return True
-        # try second bucket
-        if len(self.buckets[i2]) < self.bucket_size:
-            self.buckets[i2].append(fp)
-            return True
+    def _bucket(self, i):
+        return self.slots.run(i * self.bucket_size, self.bucket_size)
+
+    def _place(self, i, fp):
+        # Put fp into a free slot of bucket i; False when the bucket is full
+        for j, value in enumerate(self._bucket(i)):
+            if value == 0:
+                self.slots[i * self.bucket_size + j] = fp
+                return True
+        return False
 
+    def _insert(self, i1, fp):
+        i2 = self._alt(i1, fp)
+        if self._place(i1, fp) or self._place(i2, fp):
+            self.count += 1
+            return True
         # eviction process
         i = random.choice([i1, i2])
+        path = []
         for _ in range(self.max_kicks):
             # pick a random entry to evict
-            j = random.randint(0, self.bucket_size - 1)
-            fp, self.buckets[i][j] = self.buckets[i][j], fp
-            i = self._index2(item, fp) if i == i1 else self._index1(item)  # choose alternate bucket
-            if len(self.buckets[i]) < self.bucket_size:
-                self.buckets[i].append(fp)
+            j = i * self.bucket_size + random.randint(0, self.bucket_size - 1)
+            path.append(j)
+            fp, self.slots[j] = self.slots[j], fp
+            i = self._alt(i, fp)  # the evicted fingerprint moves to its alternate bucket
+            if self._place(i, fp):
+                self.count += 1
                 return True
+        # Undo the kicks so no stored fingerprint is lost
+        for j in reversed(path):
+            fp, self.slots[j] = self.slots[j], fp
         return False  # insertion failed after max_kicks
 
+    def insert(self, item):
+        return self._insert(*self._locate(item))
+
+    add = insert
+
     def contains(self, item):
-        fp = self._fingerprint(item)
-        i1 = self._index1(item)
-        i2 = (self._index1(item) + self._hash(fp)) % self.size
-        return fp in self.buckets[i1] or fp in self.buckets[i2]
+        i1, fp = self._locate(item)
+        return fp in self._bucket(i1) or fp in self._bucket(self._alt(i1, fp))
+
+    check = contains
+    __contains__ = contains
 
     def delete(self, item):
-        fp = self._hash(item) & 0xFF
-        i1 = self._index1(item)
-        i2 = self._index2(item, fp)
-        if fp in self.buckets[i1]:
-            self.buckets[i1].remove(fp)
-            return True
-        if fp in self.buckets[i2]:
-            self.buckets[i2].remove(fp)
-            return True
-        return False
\ No newline at end of file
+        i1, fp = self._locate(item)
+        for i in (i1, self._alt(i1, fp)):
+            bucket = self._bucket(i)
+            if fp in bucket:
+                self.slots[i * self.bucket_size + bucket.index(fp)] = 0
+                self.count -= 1
+                return True
+        return False
+
+    def _bulk_place(self, idx, buckets, fp):
+        # Vectorized first-fit: the k-th batch item aimed at a bucket takes its k-th free slot
+        order = np.argsort(buckets, kind="stable")
+        sorted_b = buckets[order]
+        starts = np.searchsorted(sorted_b, sorted_b)
+        rank = np.empty(len(buckets), dtype=np.int64)
+        rank[order] = np.arange(len(buckets)) - starts
+        slot_ids = buckets[:, None] * self.bucket_size + np.arange(self.bucket_size)
+        free = self.slots.get_many(slot_ids) == 0
+        placed = rank < free.sum(axis=1)
+        position = np.argmax((np.cumsum(free, axis=1) == rank[:, None] + 1) & free, axis=1)
+        self.slots.or_many(slot_ids[placed, position[placed]], fp[placed])
+        self.count += int(placed.sum())
+        return idx[~placed]
+
+    def add_many(self, items):
+        """Insert a batch; returns a boolean array telling which inserts succeeded."""
+        i1, fp = self._split(stable_hash64_many(items))
+        i2 = self._alt_many(i1, fp)
+        ok = np.ones(len(fp), dtype=bool)
+        rest = self._bulk_place(np.arange(len(fp)), i1, fp)
+        rest = self._bulk_place(rest, i2[rest], fp[rest])
+        # Whatever is left needs cuckoo evictions, one item at a time
+        for k in rest.tolist():
+            ok[k] = self._insert(int(i1[k]), int(fp[k]))
+        return ok
+
+    def check_many(self, items):
+        """Return a boolean array telling which items are possibly present."""
+        i1, fp = self._split(stable_hash64_many(items))
+        i2 = self._alt_many(i1, fp)
+        offsets = np.arange(self.bucket_size)
+        hit = (self.slots.get_many(i1[:, None] * self.bucket_size + offsets) == fp[:, None]).any(axis=1)
+        hit |= (self.slots.get_many(i2[:, None] * self.bucket_size + offsets) == fp[:, None]).any(axis=1)
+        return hit
+
+    def load_factor(self):
+        return self.count / (self.size * self.bucket_size)
+
+    def false_positive_rate(self):
+        """Upper bound on the false-positive rate at the current load."""
+        return 1 - (1 - 2.0 ** -self.fingerprint_bits) ** (2 * self.bucket_size * self.load_factor())
+
+    def bits_per_item(self):
+        return self.size * self.bucket_size * self.fingerprint_bits / max(1, self.count)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.size, self.bucket_size, self.fingerprint_bits,
+                                 self.count, self.max_kicks))
+            f.write(self.slots.bytes.tobytes())
+
+    @classmethod
+    def load(cls, path, mode="r"):
+        """Load a saved filter with its fingerprint table memory-mapped."""
+        with open(path, "rb") as f:
+            magic, size, bucket_size, bits, count, max_kicks = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a saved CuckooFilter")
+        nbytes = (size * bucket_size * bits + 7) // 8 + 8
+        buffer = np.memmap(path, dtype=np.uint8, mode=mode, offset=_HEADER.size, shape=(nbytes,))
+        cf = cls(size, bucket_size, max_kicks, bits, buffer=buffer)
+        cf.count = count
+        return cf
+
+# Example usage:
+# cf = CuckooFilter.from_capacity(1_000_000, error_rate=0.001)
+# cf.add_many(np.arange(1_000_000))
+# print(cf.check_many(np.array([1, -1])), cf.bits_per_item())
+# cf.delete(1)
+# cf.save("/tmp/cuckoo.bin"); cf2 = CuckooFilter.load("/tmp/cuckoo.bin")
@@ -1,24 +1,96 @@
 # Flajolet–Martin algorithm: probabilistic estimation of distinct elements
-import math
+# PCSA variant: each value is routed to one of num_registers bitmaps by its hash and sets
+# the bit at the position of the lowest 1-bit of the remaining hash. The bitmaps are a
+# NumPy uint64 array, so batches are folded in with one vectorized OR, and sketches
+# merge by OR-ing bitmaps. The interface mirrors HyperLogLog (add_many, merge, count,
+# to_bytes/from_bytes) so the two can be benchmarked side by side.
+import hashlib
+import struct
+
+import numpy as np
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+PHI = 0.77351  # Flajolet–Martin correction constant
+_HEADER = struct.Struct("<4sI")
+_MAGIC = b"FMS1"
+
+
+def _mix64(h):
+    # splitmix64 finalizer on a uint64 array
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
 
 class FlajoletMartin:
     def __init__(self, num_registers=32):
+        if num_registers & (num_registers - 1):
+            raise ValueError("num_registers must be a power of two")
         self.num_registers = num_registers
-        self.registers = [0] * num_registers
+        self.shift = num_registers.bit_length() - 1
+        self.registers = np.zeros(num_registers, dtype=np.uint64)
 
     def _hash(self, x):
-        # Use built-in hash, mask to 32 bits
-        return hash(x) & 0xffffffff
+        # Stable 64-bit hash; the built-in hash() is salted per process
+        if isinstance(x, (int, np.integer)) and -(1 << 63) <= x <= MASK64:
+            return int(_mix64(np.array([int(x) & MASK64], dtype=np.uint64))[0])
+        h = hashlib.blake2b(str(x).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(h, 'little')
+
+    def _hash_many(self, xs):
+        if isinstance(xs, np.ndarray) and xs.dtype.kind in "iu":
+            return _mix64(xs.astype(np.int64, copy=False).view(np.uint64))
+        return np.fromiter((self._hash(x) for x in xs), dtype=np.uint64, count=len(xs))
 
     def _rho(self, x):
-        return x.bit_length()
+        # Index of the lowest set bit (x & -x isolates it; powers of two are exact floats)
+        lowest = x & (~x + np.uint64(1))
+        lowest = np.where(x == 0, np.uint64(1 << 63), lowest)
+        return np.log2(lowest.astype(np.float64)).astype(np.int64)
 
     def add(self, x):
-        h = self._hash(x)
-        i = h & (self.num_registers - 1)
-        rho = self._rho(h)
-        if rho > self.registers[i]:
-            self.registers[i] = rho
+        self.add_many([x])
+
+    def add_many(self, xs):
+        """Fold a batch of values into the bitmaps."""
+        h = self._hash_many(xs)
+        i = (h & np.uint64(self.num_registers - 1)).astype(np.intp)
+        rho = self._rho(h >> np.uint64(self.shift))
+        np.bitwise_or.at(self.registers, i, np.left_shift(np.uint64(1), rho.astype(np.uint64)))
+
+    def merge(self, other):
+        """Union with another sketch with the same number of registers (in place)."""
+        if other.num_registers != self.num_registers:
+            raise ValueError("can only merge sketches with equal num_registers")
+        np.bitwise_or(self.registers, other.registers, out=self.registers)
+        return self
 
     def estimate(self):
-        return max(self.registers)
\ No newline at end of file
+        # R is the position of the lowest unset bit of each bitmap
+        r = self._rho(~self.registers)
+        return self.num_registers / PHI * 2 ** r.mean()
+
+    def count(self):
+        return int(round(self.estimate()))
+
+    def to_bytes(self):
+        return _HEADER.pack(_MAGIC, self.num_registers) + self.registers.astype('<u8').tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, num_registers = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("not a serialized FlajoletMartin sketch")
+        fm = cls(num_registers)
+        fm.registers = np.frombuffer(data, dtype='<u8', offset=_HEADER.size,
+                                     count=num_registers).astype(np.uint64)
+        return fm
+
+# Example usage:
+# fm = FlajoletMartin(num_registers=256)
+# fm.add_many(np.arange(100000))
+# other = FlajoletMartin(num_registers=256)
+# other.add_many(np.arange(50000, 150000))
+# print(fm.merge(other).count())  # Expected: about 150000
@@ -1,27 +1,60 @@
 # Fowler–Noll–Vo hash function (non-cryptographic hash function)
 # Idea: Iterate over each byte of the input, XOR it with the hash,
 # then multiply by a prime number to produce a uniformly distributed hash.
+# FNV1a32 keeps the running hash in a hashlib-style object (update/digest/hexdigest/
+# intdigest/copy) so input can arrive in chunks.
+
+# FNV offset basis for 32‑bit hashing
+OFFSET_BASIS = 0x811c9dc5
+# FNV prime for 32‑bit hashing
+FNV_PRIME = 16777619
+
+
+class FNV1a32:
+    name = "fnv1a_32"
+    digest_size = 4
+    block_size = 1
+
+    def __init__(self, data=b""):
+        # Start with the offset basis
+        self.hash_val = OFFSET_BASIS
+        if data:
+            self.update(data)
+
+    def update(self, data):
+        hash_val = self.hash_val
+        for byte in data:
+            # XOR the byte with the hash
+            hash_val = ((hash_val ^ byte) * FNV_PRIME) & 0xffffffff
+        self.hash_val = hash_val
+
+    def intdigest(self):
+        return self.hash_val
+
+    def digest(self):
+        return self.hash_val.to_bytes(4, "big")
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    def copy(self):
+        other = FNV1a32()
+        other.hash_val = self.hash_val
+        return other
+
 
 def fnv1a_hash(data: bytes) -> int:
     """
     Compute the 32‑bit FNV‑1a hash of the given byte sequence.
     The result is returned as an unsigned 32‑bit integer.
     """
-    # FNV offset basis for 32‑bit hashing
-    offset_basis = 0x811c9dc5
-    # FNV prime for 32‑bit hashing
-    fnv_prime = 16777619
-
-    # Start with the offset basis
-    hash_val = offset_basis
-
-    for byte in data:
-        # XOR the byte with the hash
-        hash_val ^= byte
-        hash_val = (hash_val * fnv_prime) & 0xffffffff
-    return hash_val
+    return FNV1a32(data).intdigest()
 
 # Example usage (students can test with known values)
 if __name__ == "__main__":
     sample = b"hello"
-    print(f"FNV-1a hash of {sample}: {fnv1a_hash(sample):08x}")
\ No newline at end of file
+    print(f"FNV-1a hash of {sample}: {fnv1a_hash(sample):08x}")
+    h = FNV1a32()
+    h.update(b"hel")
+    h.update(b"lo")
+    print(f"Streamed FNV-1a hash: {h.hexdigest()}")
@@ -0,0 +1,88 @@
+# Throughput benchmark for the byte-oriented hashes and checksums in this directory
+# Each script here is standalone, so the benchmark loads them by path. Every hash is fed
+# random input whose size grows until one call takes long enough to time, and the result
+# is reported in GB/s. The streaming objects (Crc32, Adler32, XXH64, Murmur3_32, FNV1a32)
+# are also timed fed in 64 KiB chunks, the way a file or socket would be read.
+import importlib.util
+import os
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# (file, function or class, input kind): every unkeyed hash or checksum here that takes a
+# message of any length. Left out on purpose: keyed MACs and password hashes / KDFs (vmac,
+# CBC-MAC, OMAC, HMAC-based OTPs, hkdf, pbkdf2, crypt, lm_hash, bcrypt, scrypt, yescrypt,
+# argon2, lyra2, kdf_service), whose cost is set by keys and work parameters rather than
+# input length; check-digit, phonetic and location codes (luhn, damm, verhoeff, soundex,
+# geohash, ...) that read short fixed-format strings; and the hash tables, Merkle tree,
+# filters, sketches (simhash, hyperloglog, ...) and generators, which hash items with the
+# functions above, hashlib or hash().
+HASHES = [
+    ("crc-32.py", "crc32", "bytes"),
+    ("adler-32.py", "adler32", "bytes"),
+    ("xxhash.py", "xxhash64", "bytes"),
+    ("murmurhash.py", "murmurhash3_x86_32", "bytes"),
+    ("fowlernollvo_hash_function.py", "fnv1a_hash", "bytes"),
+    ("bsd_checksum.py", "bsd_checksum", "bytes"),
+    ("sysv_checksum.py", "sysv_checksum", "bytes"),
+    ("pjw_hash_function.py", "pjw_hash", "str"),
+    ("sha-0.py", "sha0", "bytes"),
+    ("sha-1.py", "sha1", "bytes"),
+    ("nasha.py", "nasha", "bytes"),
+    ("swifft.py", "swifft_hash", "bytes"),
+]
+
+STREAMING = [
+    ("crc-32.py", "Crc32"),
+    ("adler-32.py", "Adler32"),
+    ("xxhash.py", "XXH64"),
+    ("murmurhash.py", "Murmur3_32"),
+    ("fowlernollvo_hash_function.py", "FNV1a32"),
+]
+
+
+def load(filename):
+    spec = importlib.util.spec_from_file_location(filename[:-3].replace("-", "_"), os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(fn, kind, min_time=0.2, max_size=64 << 20):
+    # Double the input until a single call is long enough to time reliably
+    size = 1 << 12
+    while True:
+        data = os.urandom(size)
+        if kind == "str":
+            data = data.decode("latin-1")
+        start = time.perf_counter()
+        fn(data)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or size >= max_size:
+            return size / elapsed / 1e9, size
+        size *= 2
+
+
+def streamed(cls, chunk=1 << 16):
+    def run(data):
+        h = cls()
+        for i in range(0, len(data), chunk):
+            h.update(data[i:i + chunk])
+        return h.digest()
+    return run
+
+
+def benchmark(min_time=0.2, max_size=64 << 20):
+    rows = []
+    for filename, name, kind in HASHES:
+        fn = getattr(load(filename), name)
+        rows.append((name, *measure(fn, kind, min_time, max_size)))
+    for filename, name in STREAMING:
+        fn = streamed(getattr(load(filename), name))
+        rows.append((f"{name} (64 KiB updates)", *measure(fn, "bytes", min_time, max_size)))
+    for name, rate, size in rows:
+        print(f"{name:34s} {rate:9.4f} GB/s  ({size >> 10} KiB input)")
+    return rows
+
+if __name__ == "__main__":
+    benchmark()
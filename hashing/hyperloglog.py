@@ -1,13 +1,88 @@
 # HyperLogLog - approximate distinct counting algorithm
+# Registers are kept in a NumPy uint8 array and whole batches are hashed and folded in
+# with vectorized operations. Small sketches stay in the HLL++ sparse representation
+# (precision 25 entries, sorted uint32 array) and switch to dense registers once that
+# stops being smaller. Estimation uses Ertl's improved estimator, which removes the
+# small- and mid-range bias that HLL++ corrects with empirical tables.
 import math
 import hashlib
+import struct
+
+import numpy as np
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+SPARSE_P = 25
+_HEADER = struct.Struct("<4sBBI")  # magic, precision, format, payload entries
+_MAGIC = b"HLL1"
+_SPARSE, _DENSE = 0, 1
+
+
+def _mix64(h):
+    # splitmix64 finalizer on a uint64 array
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def _clz64(x):
+    # Vectorized count of leading zero bits in a uint64 array
+    n = np.zeros(x.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        zero = (x >> np.uint64(64 - shift)) == 0
+        n += zero * shift
+        x = np.where(zero, x << np.uint64(shift), x)
+    return n + (x == 0)
+
+
+def _sigma(x):
+    if x == 1.0:
+        return math.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        z_old = z
+        z += x * y
+        y += y
+        if z == z_old:
+            return z
+
+
+def _tau(x):
+    if x == 0.0 or x == 1.0:
+        return 0.0
+    y, z = 1.0, 1.0 - x
+    while True:
+        x = math.sqrt(x)
+        z_old = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == z_old:
+            return z / 3
+
+
+def _estimate(histogram, p):
+    # Ertl, "New cardinality estimation algorithms for HyperLogLog sketches" (2017)
+    m = 1 << p
+    q = 64 - p
+    z = m * _tau(1 - histogram[q + 1] / m)
+    for k in range(q, 0, -1):
+        z = 0.5 * (z + histogram[k])
+    z += m * _sigma(histogram[0] / m)
+    return m * m / (2 * math.log(2) * z)
+
 
 class HyperLogLog:
-    def __init__(self, p=14):
+    def __init__(self, p=14, sparse=True):
         self.p = p
         self.m = 1 << p
         self.alpha = self._get_alpha(self.m)
-        self.registers = [0] * self.m
+        # Sparse entries are (index25 << 6 | rank25), sorted, one per index
+        self.sparse = np.zeros(0, dtype=np.uint32) if sparse else None
+        self.registers = None if sparse else np.zeros(self.m, dtype=np.uint8)
+        # Beyond this many entries the sparse list is larger than 6-bit dense registers
+        self.sparse_limit = self.m * 6 // 32
 
     def _get_alpha(self, m):
         if m == 16:
@@ -20,27 +95,124 @@ class HyperLogLog:
             return 0.7213 / (1 + 1.079 / m)
 
     def _hash(self, value):
-        h = hashlib.sha256(str(value).encode('utf-8')).hexdigest()
-        return int(h, 16)
+        # Stable 64-bit hash; integers take the same path as integer arrays
+        if isinstance(value, (int, np.integer)) and -(1 << 63) <= value <= MASK64:
+            return int(_mix64(np.array([int(value) & MASK64], dtype=np.uint64))[0])
+        h = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(h, 'little')
 
-    def add(self, value):
-        x = self._hash(value)
-        idx = x >> (64 - self.p)
-        w = x << self.p
-        rank = self._rho(w, 64 - self.p)
-        if rank > self.registers[idx]:
-            self.registers[idx] = rank
+    def _hash_many(self, values):
+        if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+            return _mix64(values.astype(np.int64, copy=False).view(np.uint64))
+        return np.fromiter((self._hash(v) for v in values), dtype=np.uint64, count=len(values))
 
     def _rho(self, w, max_bits):
-        # Count leading zeros in w
-        i = 1
-        while w & (1 << (max_bits - i)):
-            i += 1
-        return i
+        # Position of the first 1-bit in the top max_bits of the 64-bit word w
+        return np.minimum(_clz64(w) + 1, max_bits + 1)
+
+    def add(self, value):
+        self.add_many([value])
+
+    def add_many(self, values):
+        """Fold a batch of values into the sketch."""
+        hashes = self._hash_many(values)
+        if self.registers is None:
+            idx = hashes >> np.uint64(64 - SPARSE_P)
+            rank = self._rho(hashes << np.uint64(SPARSE_P), 64 - SPARSE_P)
+            entries = (idx << np.uint64(6) | rank.astype(np.uint64)).astype(np.uint32)
+            self._merge_sparse(entries)
+        else:
+            idx = (hashes >> np.uint64(64 - self.p)).astype(np.intp)
+            rank = self._rho(hashes << np.uint64(self.p), 64 - self.p).astype(np.uint8)
+            np.maximum.at(self.registers, idx, rank)
+
+    def _merge_sparse(self, entries):
+        entries = np.sort(np.concatenate([self.sparse, entries]))
+        # Sorted by (index, rank): the last entry of every index holds its max rank
+        idx = entries >> 6
+        keep = np.ones(len(entries), dtype=bool)
+        keep[:-1] = idx[:-1] != idx[1:]
+        self.sparse = entries[keep]
+        if len(self.sparse) > self.sparse_limit:
+            self.to_dense()
+
+    def to_dense(self):
+        if self.registers is not None:
+            return
+        registers = np.zeros(self.m, dtype=np.uint8)
+        shift = SPARSE_P - self.p
+        idx25 = (self.sparse >> 6).astype(np.uint64)
+        rank25 = (self.sparse & 63).astype(np.int64)
+        low = idx25 & np.uint64((1 << shift) - 1)
+        # Bits of index25 below the dense index are the leading bits of the dense word
+        low_rank = shift - (64 - _clz64(low)) + 1
+        rank = np.where(low != 0, low_rank, rank25 + shift).astype(np.uint8)
+        np.maximum.at(registers, (idx25 >> np.uint64(shift)).astype(np.intp), rank)
+        self.registers = registers
+        self.sparse = None
+
+    def merge(self, other):
+        """Union with another sketch of the same precision (in place)."""
+        if other.p != self.p:
+            raise ValueError("can only merge HyperLogLogs with equal precision")
+        if self.registers is None and other.registers is None:
+            self._merge_sparse(other.sparse)
+            return self
+        if other.registers is None:
+            other = other.copy()
+            other.to_dense()
+        self.to_dense()
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def copy(self):
+        clone = HyperLogLog(self.p)
+        clone.sparse = None if self.sparse is None else self.sparse.copy()
+        clone.registers = None if self.registers is None else self.registers.copy()
+        return clone
 
     def count(self):
-        sum_r = 0.0
-        for r in self.registers:
-            sum_r += 1.0 / (1 << r)
-        estimate = self.alpha * self.m * self.m / sum_r
-        return int(estimate)
\ No newline at end of file
+        if self.registers is None:
+            # Sparse sketches are estimated at precision 25, nearly exact when small
+            p = SPARSE_P
+            ranks = (self.sparse & 63).astype(np.intp)
+            histogram = np.bincount(ranks, minlength=64 - p + 2)
+            histogram[0] = (1 << p) - len(self.sparse)
+        else:
+            p = self.p
+            histogram = np.bincount(self.registers, minlength=64 - p + 2)
+        return int(round(_estimate(histogram.tolist(), p)))
+
+    def to_bytes(self):
+        """Compact serialization: sparse entries or 6-bit packed registers."""
+        if self.registers is None:
+            return _HEADER.pack(_MAGIC, self.p, _SPARSE, len(self.sparse)) + \
+                self.sparse.astype('<u4').tobytes()
+        bits = np.unpackbits(self.registers[:, None], axis=1)[:, 2:]
+        return _HEADER.pack(_MAGIC, self.p, _DENSE, self.m) + np.packbits(bits.ravel()).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, p, fmt, n = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("not a serialized HyperLogLog")
+        hll = cls(p)
+        payload = np.frombuffer(data, dtype=np.uint8, offset=_HEADER.size)
+        if fmt == _SPARSE:
+            hll.sparse = payload.view('<u4')[:n].astype(np.uint32)
+        else:
+            bits = np.unpackbits(payload)[:n * 6].reshape(n, 6)
+            padded = np.zeros((n, 8), dtype=np.uint8)
+            padded[:, 2:] = bits
+            hll.registers = np.packbits(padded, axis=1).ravel()
+            hll.sparse = None
+        return hll
+
+# Example usage:
+# shards = [HyperLogLog(p=12) for _ in range(4)]
+# for i, hll in enumerate(shards):
+#     hll.add_many(np.arange(i * 250000, (i + 1) * 250000))
+# total = shards[0]
+# for hll in shards[1:]:
+#     total.merge(HyperLogLog.from_bytes(hll.to_bytes()))
+# print(total.count())  # Expected: about 1000000
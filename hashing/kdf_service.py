@@ -0,0 +1,261 @@
+# KDF service: password hashing for a busy login path
+# One object serves argon2id, scrypt, yescrypt, lyra2 and pbkdf2 with the same outputs as the
+# single-call versions in argon2.py, scrypt.py, yescrypt.py, lyra2.py and pbkdf2.py, but
+#  - memory blocks live in preallocated shared-memory buffers (memoryview / NumPy views)
+#    instead of lists of bytes objects,
+#  - scratch buffers are pooled and reused between calls, and all of them together stay
+#    under one memory budget (callers wait for space instead of overcommitting),
+#  - the independent Argon2 lanes are filled in parallel by a process pool that works
+#    directly on the shared buffer.
+# scrypt and pbkdf2 run in OpenSSL through hashlib; the budget still accounts for them.
+
+import hashlib
+import hmac
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class ScratchPool:
+    """Reusable shared-memory buffers whose total size never exceeds a budget."""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.allocated = 0  # bytes held by idle and in-use buffers plus reservations
+        self._idle = []
+        self._cond = threading.Condition()
+
+    def _make_room(self, nbytes):
+        # Called with the lock held; drops idle buffers (largest first) until nbytes fit
+        if nbytes > self.budget:
+            raise MemoryError(f"{nbytes} bytes exceed the KDF memory budget of {self.budget}")
+        while self.allocated + nbytes > self.budget:
+            if not self._idle:
+                self._cond.wait()
+                continue
+            shm = max(self._idle, key=lambda s: s.size)
+            self._idle.remove(shm)
+            self.allocated -= shm.size
+            shm.close()
+            shm.unlink()
+
+    @contextmanager
+    def buffer(self, nbytes):
+        """Borrow a shared-memory segment of at least nbytes."""
+        with self._cond:
+            fits = [s for s in self._idle if s.size >= nbytes]
+            if fits:
+                shm = min(fits, key=lambda s: s.size)
+                self._idle.remove(shm)
+            else:
+                self._make_room(nbytes)
+                shm = shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+                self.allocated += shm.size
+        try:
+            yield shm
+        finally:
+            with self._cond:
+                self._idle.append(shm)
+                self._cond.notify_all()
+
+    @contextmanager
+    def reserve(self, nbytes):
+        """Account for memory that is allocated elsewhere (e.g. inside OpenSSL)."""
+        with self._cond:
+            self._make_room(nbytes)
+            self.allocated += nbytes
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.allocated -= nbytes
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            for shm in self._idle:
+                shm.close()
+                shm.unlink()
+                self.allocated -= shm.size
+            self._idle = []
+
+
+def _fill_argon2_lane(buf, lane, initial_hash, time_cost):
+    # Same block schedule as argon2.argon2id: init from the initial hash, then every pass
+    # replaces block i by H(block i ^ block (t + i) mod n)
+    n = len(buf) // 64
+    blocks = np.frombuffer(buf, dtype=np.uint8).reshape(n, 64)
+    for i in range(n):
+        buf[64*i:64*i + 64] = hashlib.blake2b(initial_hash + struct.pack("<II", i, lane)).digest()
+    for t in range(time_cost):
+        s = t % n
+        head = n - s
+        # Blocks before `head` reference blocks not yet rewritten in this pass: XOR them all
+        # at once, then hash. The last s blocks reference rewritten ones and go one by one.
+        mixed = memoryview((blocks[:head] ^ blocks[s:]).reshape(-1))
+        for i in range(head):
+            buf[64*i:64*i + 64] = hashlib.blake2b(mixed[64*i:64*i + 64]).digest()
+        mixed.release()
+        for i in range(head, n):
+            j = i - head
+            x = int.from_bytes(buf[64*i:64*i + 64], "little") ^ int.from_bytes(buf[64*j:64*j + 64], "little")
+            buf[64*i:64*i + 64] = hashlib.blake2b(x.to_bytes(64, "little")).digest()
+    del blocks
+
+
+def _argon2_lane_worker(name, offset, nbytes, lane, initial_hash, time_cost):
+    # Runs in a pool process: attach to the caller's buffer and fill one lane in place
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        view = shm.buf[offset:offset + nbytes]
+        _fill_argon2_lane(view, lane, initial_hash, time_cost)
+        view.release()
+    finally:
+        shm.close()
+
+
+class KDFService:
+    def __init__(self, memory_budget=256 << 20, workers=None):
+        self.scratch = ScratchPool(memory_budget)
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None and self.workers > 1:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def argon2id(self, password, time_cost=2, memory_cost=65536, parallelism=2, hash_len=32, salt=b""):
+        """argon2.argon2id with Argon2Parameters(time_cost, memory_cost, parallelism, hash_len, salt)."""
+        if parallelism < 1 or memory_cost * 1024 // 64 < parallelism:
+            raise ValueError("memory_cost must give each of the parallelism lanes at least one 64-byte block")
+        if isinstance(password, str):
+            password = password.encode('utf-8')
+        if isinstance(salt, str):
+            salt = salt.encode('utf-8')
+        initial_hash = hashlib.blake2b(
+            struct.pack("<IIII", hash_len, memory_cost, time_cost, parallelism) + salt + password).digest()
+        lane_bytes = 64 * (memory_cost * 1024 // 64 // parallelism)
+        total = lane_bytes * parallelism
+        with self.scratch.buffer(total) as shm:
+            pool = self._pool() if parallelism > 1 else None
+            if pool is not None:
+                jobs = [pool.submit(_argon2_lane_worker, shm.name, lane * lane_bytes, lane_bytes,
+                                    lane, initial_hash, time_cost) for lane in range(parallelism)]
+                for job in jobs:
+                    job.result()
+            else:
+                for lane in range(parallelism):
+                    view = shm.buf[lane * lane_bytes:(lane + 1) * lane_bytes]
+                    _fill_argon2_lane(view, lane, initial_hash, time_cost)
+                    view.release()
+            view = shm.buf[:total]
+            digest = hashlib.blake2b(view, digest_size=hash_len).digest()
+            view.release()
+        return digest
+
+    def scrypt(self, password, salt, N, r, p, dklen):
+        """scrypt.scrypt, computed by OpenSSL within the memory budget."""
+        if N & (N-1) != 0 or N <= 1:
+            raise ValueError("N must be >1 and a power of 2")
+        needed = 128 * r * (N + p + 2)
+        with self.scratch.reserve(needed):
+            return hashlib.scrypt(password, salt=salt, n=N, r=r, p=p, dklen=dklen,
+                                  maxmem=needed + (1 << 20))
+
+    def yescrypt(self, password, salt, N=16384, r=8, p=1, dklen=32):
+        """yescrypt.yescrypt with the block chain kept in a pooled buffer."""
+        if isinstance(password, str):
+            password = password.encode('utf-8')
+        if isinstance(salt, str):
+            salt = salt.encode('utf-8')
+        with self.scratch.buffer(32 * N) as shm:
+            buf = shm.buf[:32 * N]
+            buf[0:32] = hashlib.sha256(password + salt).digest()
+            for i in range(1, N):
+                h = hashlib.sha256(buf[32*(i-1):32*i])
+                h.update(struct.pack('<I', i))
+                buf[32*i:32*i + 32] = h.digest()
+            blocks = np.frombuffer(buf, dtype=np.uint8).reshape(N, 32)
+            combined = (blocks.sum(axis=0, dtype=np.uint64) & np.uint64(0xFF)).astype(np.uint8).tobytes()
+            del blocks
+            buf.release()
+        return hashlib.pbkdf2_hmac('sha256', combined, salt, 1000, dklen)
+
+    def lyra2(self, password, salt, config=None):
+        """lyra2.lyra2; each row is the running XOR of the row above it."""
+        config = config or {}
+        rows = config.get('rows', 4)
+        cols = config.get('cols', 4)
+        lane = min(config.get('lane_size', 64), 32)  # lanes are cut from one SHA-256 seed
+        seed = hashlib.sha256(password + salt).digest()[:lane]
+        with self.scratch.buffer(2 * cols * lane) as shm:
+            m = np.frombuffer(shm.buf, dtype=np.uint8, count=2 * cols * lane).reshape(2, cols, lane)
+            m[0] = np.frombuffer(seed, dtype=np.uint8)
+            for r in range(1, rows):
+                np.bitwise_xor.accumulate(m[(r - 1) & 1], axis=0, out=m[r & 1])
+            last = m[(rows - 1) & 1].tobytes()
+            del m
+        return hashlib.sha256(last).digest()
+
+    def pbkdf2(self, password, salt, iterations, dklen, hash_name='sha256'):
+        """pbkdf2.pbkdf2, computed by OpenSSL."""
+        if isinstance(password, str):
+            password = password.encode('utf-8')
+        return hashlib.pbkdf2_hmac(hash_name, password, salt, iterations, dklen)
+
+    def verify(self, kdf, expected, *args, **kwargs):
+        """Recompute kdf(*args, **kwargs) and compare with expected in constant time."""
+        return hmac.compare_digest(getattr(self, kdf)(*args, **kwargs), expected)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.scratch.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark(memory_kib=(64, 256, 1024, 4096), seconds=1.0):
+    """Print hashes per second for each KDF as the memory cost grows."""
+    salt = b"benchmark-salt"
+    with KDFService(workers=1) as serial, KDFService() as parallel:
+        cases = [
+            ("argon2id t=1 p=4, 1 process", lambda kib: serial.argon2id("pw", 1, kib, 4, salt=salt)),
+            ("argon2id t=1 p=4, pool", lambda kib: parallel.argon2id("pw", 1, kib, 4, salt=salt)),
+            ("scrypt r=8 p=1", lambda kib: serial.scrypt(b"pw", salt, kib, 8, 1, 32)),
+            ("yescrypt", lambda kib: serial.yescrypt("pw", salt, kib * 1024 // 32)),
+        ]
+        print(f"{'KDF':30s}" + "".join(f"{kib:>10d} KiB" for kib in memory_kib))
+        for name, fn in cases:
+            rates = []
+            for kib in memory_kib:
+                fn(kib)  # warm up pools and buffers
+                count, start = 0, time.perf_counter()
+                while time.perf_counter() - start < seconds:
+                    fn(kib)
+                    count += 1
+                rates.append(count / (time.perf_counter() - start))
+            print(f"{name:30s}" + "".join(f"{rate:12.1f}/s" for rate in rates))
+
+if __name__ == "__main__":
+    with KDFService(memory_budget=64 << 20) as kdf:
+        key = kdf.argon2id("correct horse battery staple", time_cost=2, memory_cost=1024,
+                           parallelism=4, salt=b"somesalt")
+        print("argon2id:", key.hex())
+        print("verified:", kdf.verify("argon2id", key, "correct horse battery staple", time_cost=2,
+                                      memory_cost=1024, parallelism=4, salt=b"somesalt"))
+    benchmark(seconds=0.5)
@@ -1,43 +1,95 @@
 # MurmurHash3 32-bit implementation. Computes a 32-bit hash of a byte array.
+# Murmur3_32 is the hashlib-style streaming form (update/digest/hexdigest/intdigest/copy):
+# whole 4-byte blocks are mixed as they arrive (the block scrambling runs in NumPy) and at
+# most 3 tail bytes are buffered.
+import numpy as np
+
+c1 = 0xcc9e2d51
+c2 = 0x1b873593
+
+
+class Murmur3_32:
+    name = "murmur3_32"
+    digest_size = 4
+    block_size = 4
+
+    def __init__(self, data=b"", seed=0):
+        self.h1 = seed & 0xffffffff
+        self.length = 0
+        self._tail = b""
+        if data:
+            self.update(data)
+
+    def update(self, data):
+        data = memoryview(data).cast("B")
+        self.length += len(data)
+        if self._tail:
+            need = 4 - len(self._tail)
+            self._tail += bytes(data[:need])
+            data = data[need:]
+            if len(self._tail) < 4:
+                return
+            self._mix_blocks(self._tail)
+        rounded_end = len(data) & 0xfffffffc  # floor to multiple of 4
+        for base in range(0, rounded_end, 1 << 16):
+            self._mix_blocks(data[base:min(rounded_end, base + (1 << 16))])
+        self._tail = bytes(data[rounded_end:])
+
+    def _mix_blocks(self, blocks):
+        # The per-block k1 scrambling does not depend on h1, so it is vectorized
+        k = np.frombuffer(blocks, dtype="<u4") * np.uint32(c1)
+        k = (k << np.uint32(15)) | (k >> np.uint32(32-15))
+        k = k * np.uint32(c2)
+        h1 = self.h1
+        for k1 in k.tolist():
+            h1 ^= k1
+            h1 = ((h1 << 13) | (h1 >> (32-13))) & 0xffffffff
+            h1 = (h1 * 5 + 0xe6546b64) & 0xffffffff
+        self.h1 = h1
+
+    def intdigest(self):
+        h1 = self.h1
+        # tail
+        k1 = 0
+        tail = self._tail
+        tail_size = len(tail)
+        if tail_size == 3:
+            k1 ^= tail[2] << 16
+        if tail_size >= 2:
+            k1 ^= tail[1] << 8
+        if tail_size >= 1:
+            k1 ^= tail[0]
+            k1 = (k1 * c1) & 0xffffffff
+            k1 = ((k1 << 15) | (k1 >> (32-15))) & 0xffffffff
+            k1 = (k1 * c2) & 0xffffffff
+            h1 ^= k1
+
+        h1 ^= self.length & 0xffffffff
+        h1 ^= (h1 >> 16)
+        h1 = (h1 * 0x85ebca6b) & 0xffffffff
+        h1 ^= (h1 >> 13)
+        h1 = (h1 * 0xc2b2ae35) & 0xffffffff
+        h1 ^= (h1 >> 16)
+        return h1
+
+    def digest(self):
+        return self.intdigest().to_bytes(4, "big")
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    def copy(self):
+        other = Murmur3_32.__new__(Murmur3_32)
+        other.__dict__.update(self.__dict__)
+        return other
+
+
 def murmurhash3_x86_32(data, seed=0):
-    c1 = 0xcc9e2d51
-    c2 = 0x1b873593
-    length = len(data)
-    h1 = seed
-    rounded_end = (length & 0xfffffffc)  # floor to multiple of 4
-
-    for i in range(0, rounded_end, 4):
-        k1 = (data[i] & 0xff) | ((data[i+1] & 0xff) << 8) | ((data[i+2] & 0xff) << 16) | ((data[i+3] & 0xff) << 24)
-        k1 = (k1 * c1) & 0xffffffff
-        k1 = ((k1 << 15) | (k1 >> (32-15))) & 0xffffffff
-        k1 = (k1 * c2) & 0xffffffff
-
-        h1 ^= k1
-        h1 = ((h1 << 13) | (h1 >> (32-13))) & 0xffffffff
-        h1 = (h1 * 5 + 0xe6546b64) & 0xffffffff
-
-    # tail
-    k1 = 0
-    tail_size = length & 0x03
-    if tail_size == 3:
-        k1 ^= (data[rounded_end+2] & 0xff) << 16
-    if tail_size >= 2:
-        k1 ^= (data[rounded_end+1] & 0xff) << 8
-    if tail_size >= 1:
-        k1 ^= (data[rounded_end] & 0xff)
-        k1 = (k1 * c1) & 0xffffffff
-        k1 = ((k1 << 15) | (k1 >> (32-15))) & 0xffffffff
-        k1 = (k1 * c2) & 0xffffffff
-        h1 ^= k1
-
-    h1 ^= length
-    h1 ^= (h1 >> 16)
-    h1 = (h1 * 0x85ebca6b) & 0xffffffff
-    h1 ^= (h1 >> 13)
-    h1 = (h1 * 0xc2b2ae35) & 0xffffffff
-    h1 ^= (h1 >> 16)
-    return h1
+    return Murmur3_32(data, seed).intdigest()
 
 # Example usage:
 # data_bytes = b"hello world"
-# print(murmurhash3_x86_32(data_bytes, seed=42))
\ No newline at end of file
+# print(murmurhash3_x86_32(data_bytes, seed=42))
+# h = Murmur3_32(seed=42)
+# h.update(b"hello "); h.update(b"world")
+# print(h.intdigest())
@@ -0,0 +1,435 @@
+# Open addressing hash table engine with pluggable probing schemes
+# Keys, values, hashes and slot states live in parallel arrays (hashes in a native
+# int64 array, states in a bytearray), so batch lookups can probe many keys at once
+# with NumPy: every round gathers one probe slot per pending key and compares the
+# stored hashes in a single vectorized step, only falling back to Python for the
+# final key equality check.
+#
+# Probing schemes:
+#   linear      - h, h+1, h+2, ...                     (tombstone deletion)
+#   quadratic   - h, h+1, h+3, h+6, ... (triangular)   (tombstone deletion)
+#   robin_hood  - linear probing that keeps probe distances balanced
+#                 (early-exit lookups, backward-shift deletion)
+#   cuckoo      - two candidate slots, displacing residents on collision
+#   two_choice  - two candidate buckets of 4 slots, key goes to the emptier one
+# The second candidate of cuckoo/two_choice comes from an avalanche mix of hash(key) ^ SALT
+# (MurmurHash3's fmix64), not from a second multiplicative hash of hash(key). Keys that cannot be placed go to a small
+# stash of extra slots after the table. A full stash grows the table, but after
+# MAX_STASH_GROWTHS growths in a row that leave it full (keys with equal hash() collide at
+# every size) only the load factor grows it until the stash drains.
+
+import random
+import time
+from array import array
+from collections.abc import MutableMapping
+
+import numpy as np
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+GOLDEN = 0x9E3779B97F4A7C15   # Fibonacci hashing multiplier
+SALT = 0xC2B2AE3D27D4EB4F     # second hash of cuckoo/two-choice: fmix64(h ^ SALT)
+FMIX1, FMIX2 = 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53
+
+EMPTY, FULL, DELETED = 0, 1, 2
+BUCKET = 4                    # slots per bucket for two_choice
+STASH_SIZE = 8                # stashed keys tolerated before the table grows
+MAX_STASH_GROWTHS = 3
+
+SCHEMES = ("linear", "quadratic", "robin_hood", "cuckoo", "two_choice")
+DEFAULT_MAX_LOAD = {"linear": 0.7, "quadratic": 0.7, "robin_hood": 0.9,
+                    "cuckoo": 0.45, "two_choice": 0.85}
+
+
+class OpenAddressingHashTable(MutableMapping):
+    def __init__(self, probing="linear", capacity=8, max_load=None):
+        if probing not in SCHEMES:
+            raise ValueError(f"unknown probing scheme {probing!r}, expected one of {SCHEMES}")
+        self.probing = probing
+        self.max_load = max_load or DEFAULT_MAX_LOAD[probing]
+        self.size = 0
+        self.tombstones = 0
+        self._stash_growths = 0
+        self._allocate(max(capacity, 2 * BUCKET))
+
+    # --- storage ------------------------------------------------------------
+
+    def _allocate(self, capacity):
+        # Capacity is always a power of two so slots are taken with a mask
+        capacity = 1 << (capacity - 1).bit_length()
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.bits = capacity.bit_length() - 1
+        # two_choice addresses buckets; the other schemes address slots
+        self.home_bits = self.bits - (BUCKET.bit_length() - 1) if self.probing == "two_choice" else self.bits
+        # Slots past capacity are the stash (cuckoo and two_choice only)
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array("q", bytes(8 * capacity))
+        self._state = bytearray(capacity)
+        self.size = 0
+        self.tombstones = 0
+
+    def _resize(self, capacity):
+        live = [(self._keys[s], self._values[s], self._hashes[s])
+                for s in range(len(self._state)) if self._state[s] == FULL]
+        self._allocate(capacity)
+        for key, value, h in live:
+            self._insert_new(key, value, h)
+
+    def _hash(self, key):
+        return hash(key)
+
+    @staticmethod
+    def _second_hash(h):
+        k = (h ^ SALT) & MASK64
+        k = ((k ^ (k >> 33)) * FMIX1) & MASK64
+        k = ((k ^ (k >> 33)) * FMIX2) & MASK64
+        return k ^ (k >> 33)
+
+    @staticmethod
+    def _second_hashes(hs):
+        # Vectorized _second_hash over a uint64 array (the products wrap mod 2**64)
+        shift = np.uint64(33)
+        k = hs ^ np.uint64(SALT)
+        k = (k ^ (k >> shift)) * np.uint64(FMIX1)
+        k = (k ^ (k >> shift)) * np.uint64(FMIX2)
+        return k ^ (k >> shift)
+
+    # --- probe sequences ----------------------------------------------------
+
+    def _home(self, h):
+        return (((h & MASK64) * GOLDEN) & MASK64) >> (64 - self.home_bits)
+
+    def _home2(self, h):
+        return self._second_hash(h) >> (64 - self.home_bits)
+
+    def _slot(self, h, i):
+        # Slot visited by the i-th probe for hash h
+        p = self.probing
+        if p == "linear" or p == "robin_hood":
+            return (self._home(h) + i) & self.mask
+        if p == "quadratic":
+            return (self._home(h) + i * (i + 1) // 2) & self.mask
+        if p == "cuckoo":
+            return self._home(h) if i == 0 else self._home2(h)
+        bucket = self._home(h) if i < BUCKET else self._home2(h)
+        return bucket * BUCKET + i % BUCKET
+
+    def _slots(self, h, i, h2=None):
+        # Vectorized _slot over a uint64 array of hashes (h2: their _second_hashes)
+        p = self.probing
+        shift = np.uint64(64 - self.home_bits)
+        if p == "cuckoo" and i == 1 or p == "two_choice" and i >= BUCKET:
+            home = (h2 if h2 is not None else self._second_hashes(h)) >> shift
+        else:
+            home = (h * np.uint64(GOLDEN)) >> shift
+        home = home.astype(np.int64)
+        if p == "linear" or p == "robin_hood":
+            return (home + i) & self.mask
+        if p == "quadratic":
+            return (home + i * (i + 1) // 2) & self.mask
+        if p == "cuckoo":
+            return home
+        return home * BUCKET + i % BUCKET
+
+    def _max_probes(self):
+        if self.probing == "cuckoo":
+            return 2
+        if self.probing == "two_choice":
+            return 2 * BUCKET
+        return self.capacity
+
+    def _distance(self, slot, h):
+        # Robin Hood probe distance of the entry stored at slot
+        return (slot - self._home(h)) & self.mask
+
+    # --- single-key operations ----------------------------------------------
+
+    def _find(self, key, h):
+        state, hashes, keys = self._state, self._hashes, self._keys
+        chained = self.probing in ("linear", "quadratic", "robin_hood")
+        for i in range(self._max_probes()):
+            s = self._slot(h, i)
+            st = state[s]
+            if st == EMPTY:
+                if chained:
+                    return -1
+                continue
+            if st == FULL:
+                if hashes[s] == h and (keys[s] is key or keys[s] == key):
+                    return s
+                if self.probing == "robin_hood" and self._distance(s, hashes[s]) < i:
+                    return -1
+        return self._find_stash(key, h)
+
+    def _find_stash(self, key, h):
+        state, hashes, keys = self._state, self._hashes, self._keys
+        for s in range(self.capacity, len(state)):
+            if state[s] == FULL and hashes[s] == h and (keys[s] is key or keys[s] == key):
+                return s
+        return -1
+
+    def _stash_put(self, key, value, h):
+        try:
+            s = self._state.index(EMPTY, self.capacity)
+        except ValueError:
+            s = len(self._state)
+            self._keys.append(None)
+            self._values.append(None)
+            self._hashes.append(0)
+            self._state.append(EMPTY)
+        self._store(s, key, value, h)
+
+    def _stashed(self):
+        return self._state.count(FULL, self.capacity)
+
+    def __getitem__(self, key):
+        s = self._find(key, self._hash(key))
+        if s < 0:
+            raise KeyError(key)
+        return self._values[s]
+
+    def __contains__(self, key):
+        return self._find(key, self._hash(key)) >= 0
+
+    def __setitem__(self, key, value):
+        h = self._hash(key)
+        s = self._find(key, h)
+        if s >= 0:
+            self._values[s] = value
+            return
+        if self.size + self.tombstones + 1 > self.max_load * self.capacity:
+            self._grow_or_compact()
+        self._insert_new(key, value, h)
+        if self._stashed() <= STASH_SIZE:
+            self._stash_growths = 0  # the stash has drained
+        elif self._stash_growths < MAX_STASH_GROWTHS:
+            self._resize(self.capacity * 2)
+            # A growth that leaves the stash full did not help: the keys share their hashes
+            self._stash_growths = self._stash_growths + 1 if self._stashed() > STASH_SIZE else 0
+
+    def _grow_or_compact(self):
+        # Rebuilding at the same size is enough when tombstones fill the table
+        if self.size + 1 > self.max_load * self.capacity / 2:
+            self._resize(self.capacity * 2)
+        else:
+            self._resize(self.capacity)
+
+    def _store(self, s, key, value, h):
+        self._keys[s] = key
+        self._values[s] = value
+        self._hashes[s] = h
+        self._state[s] = FULL
+
+    def _insert_new(self, key, value, h):
+        # Insert a key known to be absent
+        p = self.probing
+        if p == "robin_hood":
+            self._insert_robin_hood(key, value, h)
+        elif p == "cuckoo":
+            self._insert_cuckoo(key, value, h)
+        elif p == "two_choice":
+            self._insert_two_choice(key, value, h)
+        else:
+            for i in range(self.capacity):
+                s = self._slot(h, i)
+                if self._state[s] != FULL:
+                    if self._state[s] == DELETED:
+                        self.tombstones -= 1
+                    self._store(s, key, value, h)
+                    break
+            else:
+                self._resize(self.capacity * 2)
+                self._insert_new(key, value, h)
+                return
+        self.size += 1
+
+    def _insert_robin_hood(self, key, value, h):
+        s = self._home(h)
+        dist = 0
+        while True:
+            if self._state[s] != FULL:
+                self._store(s, key, value, h)
+                return
+            resident = self._distance(s, self._hashes[s])
+            if resident < dist:
+                # Take from the rich: the resident is closer to home than we are
+                old = (self._keys[s], self._values[s], self._hashes[s])
+                self._store(s, key, value, h)
+                key, value, h = old
+                dist = resident
+            s = (s + 1) & self.mask
+            dist += 1
+
+    def _insert_cuckoo(self, key, value, h):
+        s = self._home(h)
+        for _ in range(4 * self.bits + 8):
+            if self._state[s] != FULL:
+                self._store(s, key, value, h)
+                return
+            evicted = (self._keys[s], self._values[s], self._hashes[s])
+            self._store(s, key, value, h)
+            key, value, h = evicted
+            # The evicted key moves to its other candidate slot
+            s = self._home2(h) if s == self._home(h) else self._home(h)
+        # Eviction cycle: the homeless key waits in the stash
+        self._stash_put(key, value, h)
+
+    def _insert_two_choice(self, key, value, h):
+        b1, b2 = self._home(h) * BUCKET, self._home2(h) * BUCKET
+        free1 = [s for s in range(b1, b1 + BUCKET) if self._state[s] != FULL]
+        free2 = [s for s in range(b2, b2 + BUCKET) if self._state[s] != FULL]
+        free = free1 if len(free1) >= len(free2) else free2
+        if not free:
+            self._stash_put(key, value, h)
+            return
+        self._store(free[0], key, value, h)
+
+    def __delitem__(self, key):
+        h = self._hash(key)
+        s = self._find(key, h)
+        if s < 0:
+            raise KeyError(key)
+        self._keys[s] = self._values[s] = None
+        self.size -= 1
+        if self.probing == "robin_hood":
+            # Backward-shift deletion: pull displaced successors one slot closer
+            nxt = (s + 1) & self.mask
+            while self._state[nxt] == FULL and self._distance(nxt, self._hashes[nxt]) > 0:
+                self._store(s, self._keys[nxt], self._values[nxt], self._hashes[nxt])
+                s, nxt = nxt, (nxt + 1) & self.mask
+            self._keys[s] = self._values[s] = None
+            self._state[s] = EMPTY
+        elif self.probing in ("linear", "quadratic"):
+            self._state[s] = DELETED
+            self.tombstones += 1
+            if self.tombstones > self.capacity // 4:
+                self._resize(self.capacity)  # compact tombstones away
+        else:
+            self._state[s] = EMPTY
+
+    def __iter__(self):
+        for s in range(len(self._state)):
+            if self._state[s] == FULL:
+                yield self._keys[s]
+
+    def __len__(self):
+        return self.size
+
+    # --- batch operations -----------------------------------------------------
+
+    def _probe_many(self, keys):
+        # Slot of every key (or -1), probing all pending keys in lockstep
+        hs = np.fromiter((self._hash(k) for k in keys), dtype=np.int64, count=len(keys))
+        hs_u = hs.view(np.uint64)
+        state = np.frombuffer(self._state, dtype=np.uint8)
+        hashes = np.frombuffer(self._hashes, dtype=np.int64)
+        found = np.full(len(keys), -1, dtype=np.int64)
+        pending = np.arange(len(keys))
+        chained = self.probing in ("linear", "quadratic", "robin_hood")
+        hs2 = None if chained else self._second_hashes(hs_u)
+        for i in range(self._max_probes()):
+            if not len(pending):
+                break
+            slots = self._slots(hs_u[pending], i, None if chained else hs2[pending])
+            st = state[slots]
+            done = np.zeros(len(pending), dtype=bool)
+            for j in np.nonzero((st == FULL) & (hashes[slots] == hs[pending]))[0]:
+                s = int(slots[j])
+                k = keys[pending[j]]
+                if self._keys[s] is k or self._keys[s] == k:
+                    found[pending[j]] = s
+                    done[j] = True
+            if chained:
+                done |= st == EMPTY
+            if self.probing == "robin_hood":
+                home = self._slots(hashes[slots].view(np.uint64), 0)
+                done |= (st == FULL) & (((slots - home) & self.mask) < i)
+            pending = pending[~done]
+        if len(self._state) > self.capacity:
+            for j in pending.tolist():
+                found[j] = self._find_stash(keys[j], int(hs[j]))
+        return found
+
+    def get_many(self, keys, default=None):
+        """Look up a batch of keys; missing keys map to default."""
+        keys = list(keys)
+        values = self._values
+        return [values[s] if s >= 0 else default for s in self._probe_many(keys).tolist()]
+
+    def put_many(self, keys, values):
+        """Insert or update a batch of keys, resizing once up front."""
+        keys, values = list(keys), list(values)
+        if len(keys) != len(values):
+            raise ValueError(f"{len(keys)} keys but {len(values)} values")
+        needed = self.size + len(keys)
+        if needed > self.max_load * self.capacity:
+            self._resize(int(needed / self.max_load) + 1)
+        slots = self._probe_many(keys).tolist()
+        for key, value, s in zip(keys, values, slots):
+            if s >= 0 and (self._keys[s] is key or self._keys[s] == key):
+                self._values[s] = value
+            else:
+                # Duplicates inside the batch or displaced slots: fall back to a full insert
+                self[key] = value
+
+    def probe_lengths(self):
+        """Number of probes a successful lookup needs, for every stored key."""
+        live = np.nonzero(np.frombuffer(self._state, dtype=np.uint8) == FULL)[0]
+        hs = np.frombuffer(self._hashes, dtype=np.int64)[live].view(np.uint64)
+        hs2 = self._second_hashes(hs) if self.probing in ("cuckoo", "two_choice") else None
+        lengths = np.zeros(len(live), dtype=np.int64)
+        pending = np.arange(len(live))
+        for i in range(self._max_probes()):
+            if not len(pending):
+                break
+            hit = self._slots(hs[pending], i, None if hs2 is None else hs2[pending]) == live[pending]
+            lengths[pending[hit]] = i + 1
+            pending = pending[~hit]
+        lengths[pending] = self._max_probes() + 1  # stashed keys: every probe, then the stash
+        return lengths
+
+    def __repr__(self):
+        return f"OpenAddressingHashTable(probing={self.probing!r}, size={self.size}, capacity={self.capacity})"
+
+
+def benchmark(n=200000, schemes=SCHEMES, seed=0):
+    """Compare probing schemes on throughput and probe-length distribution."""
+    rng = random.Random(seed)
+    keys = rng.sample(range(1 << 40), 2 * n)
+    present, absent = keys[:n], keys[n:]
+    print(f"{'scheme':<12}{'put/s':>12}{'get/s':>12}{'get_many/s':>12}{'miss_many/s':>12}"
+          f"{'del/s':>12}{'mean':>7}{'p99':>5}{'max':>5}")
+    for scheme in schemes:
+        table = OpenAddressingHashTable(scheme)
+        t = time.perf_counter()
+        for k in present:
+            table[k] = k
+        put = n / (time.perf_counter() - t)
+        t = time.perf_counter()
+        for k in present:
+            table[k]
+        get = n / (time.perf_counter() - t)
+        t = time.perf_counter()
+        table.get_many(present)
+        get_many = n / (time.perf_counter() - t)
+        t = time.perf_counter()
+        table.get_many(absent)
+        miss_many = n / (time.perf_counter() - t)
+        lengths = table.probe_lengths()
+        t = time.perf_counter()
+        for k in present[: n // 2]:
+            del table[k]
+        delete = (n // 2) / (time.perf_counter() - t)
+        print(f"{scheme:<12}{put:>12.0f}{get:>12.0f}{get_many:>12.0f}{miss_many:>12.0f}{delete:>12.0f}"
+              f"{lengths.mean():>7.2f}{int(np.percentile(lengths, 99)):>5}{lengths.max():>5}")
+
+
+# Example usage
+if __name__ == "__main__":
+    table = OpenAddressingHashTable("robin_hood")
+    table["apple"] = 1
+    table.put_many(["banana", "orange"], [2, 3])
+    del table["apple"]
+    print(dict(table), table.get_many(["banana", "grape"], default=0))
+    benchmark(n=100000)
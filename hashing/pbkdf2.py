@@ -6,10 +6,10 @@ import math
 
 def _hmac(key: bytes, data: bytes, hash_name: str = 'sha256') -> bytes:
     """Compute HMAC using the specified hash function."""
-    hash_len = hashlib.new(hash_name).digest_size
-    if len(key) > hash_len:
+    block_size = hashlib.new(hash_name).block_size
+    if len(key) > block_size:
         key = hashlib.new(hash_name, key).digest()
-    key = key.ljust(hash_len, b'\x00')
+    key = key.ljust(block_size, b'\x00')
     o_key_pad = bytes((x ^ 0x5c) for x in key)
     i_key_pad = bytes((x ^ 0x36) for x in key)
     inner = hashlib.new(hash_name, i_key_pad + data).digest()
@@ -35,7 +35,7 @@ def pbkdf2(password: str, salt: bytes, iterations: int, dklen: int, hash_name: s
     derived_key = b''
 
     for i in range(1, l + 1):
-        counter = i.to_bytes(4, byteorder='little')
+        counter = i.to_bytes(4, byteorder='big')
         # Initial hash (U1)
         u = _hmac(password_bytes, salt + counter, hash_name)
         t = u
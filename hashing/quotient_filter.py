@@ -1,51 +1,307 @@
 # Quotient Filter implementation idea: hash element, split into quotient and remainder, store remainder in a table using linear probing.
+# Each slot holds the remainder plus three metadata bits (is_occupied, is_continuation,
+# is_shifted), so runs of equal quotients can be shifted right while lookups still find them.
+# Slots are bit-packed (remainder_bits + 3 bits each) into a NumPy uint8 buffer, which is
+# what save/load map to disk. Because the full fingerprint (quotient, remainder) can be
+# recovered from the table, the filter can be resized (one remainder bit moves into the
+# quotient) and merged with another filter without the original items.
+# The public interface matches BloomFilter in bloom_filter.py (add/check/add_many/check_many/
+# from_capacity/save/load), plus delete, resize and merge; items are hashed with its
+# stable_hash64_many and slots live in its PackedArray.
+
+import importlib.util
+import math
+import os
+import struct
+import sys
+
+import numpy as np
+
+OCCUPIED, CONTINUATION, SHIFTED = 1, 2, 4  # metadata bits in the low end of a slot
+_HEADER = struct.Struct("<8sIIQd")  # magic, quotient bits, remainder bits, count, max load
+_MAGIC = b"QUOTFLT2"
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "bloom_filter" in sys.modules:
+        return sys.modules["bloom_filter"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bloom_filter.py")
+    spec = importlib.util.spec_from_file_location("bloom_filter", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+stable_hash64_many = engine.stable_hash64_many
+PackedArray = engine.PackedArray
+
 
 class QuotientFilter:
-    def __init__(self, size_bits=10, remainder_bits=5):
+    def __init__(self, size_bits=10, remainder_bits=5, max_load=0.9, buffer=None):
+        if remainder_bits < 1 or size_bits + remainder_bits > 64:
+            raise ValueError("need remainder_bits >= 1 and size_bits + remainder_bits <= 64")
         self.size_bits = size_bits
         self.remainder_bits = remainder_bits
         self.size = 1 << self.size_bits
-        self.table = [None] * self.size
+        self.max_load = max_load
+        self.table = PackedArray(self.size, remainder_bits + 3, buffer)
+        self.count = 0
+
+    @classmethod
+    def from_capacity(cls, capacity, error_rate=0.01, max_load=0.9):
+        """Size the filter for capacity items at the target false-positive rate."""
+        size_bits = max(1, math.ceil(math.log2(capacity / max_load)))
+        remainder_bits = max(1, math.ceil(math.log2(1 / error_rate)))
+        return cls(size_bits, remainder_bits, max_load)
+
+    def _split(self, hashes):
+        # The top size_bits + remainder_bits of the hash form the fingerprint
+        fingerprint = hashes >> np.uint64(64 - self.size_bits - self.remainder_bits)
+        quotient = (fingerprint >> np.uint64(self.remainder_bits)).astype(np.int64)
+        return quotient, fingerprint & np.uint64((1 << self.remainder_bits) - 1)
 
     def _hash(self, item):
-        # Simple hash function: built-in hash mixed with xor
-        h = hash(item)
-        h ^= (h >> 33)
-        h *= 0xff51afd7ed558ccd
-        h ^= (h >> 33)
-        h *= 0xc4ceb9fe1a85ec53
-        h ^= (h >> 33)
-        return h & ((1 << (self.size_bits + self.remainder_bits)) - 1)
+        q, r = self._split(stable_hash64_many([item]))
+        return int(q[0]), int(r[0])
+
+    def _run_start(self, fq, table):
+        # Walk back to the start of the cluster, then forward one run per occupied quotient
+        mask = self.size - 1
+        b = fq
+        while table[b] & SHIFTED:
+            b = (b - 1) & mask
+        s = b
+        while b != fq:
+            s = (s + 1) & mask
+            while table[s] & CONTINUATION:
+                s = (s + 1) & mask
+            b = (b + 1) & mask
+            while not table[b] & OCCUPIED:
+                b = (b + 1) & mask
+        return s
+
+    def _insert(self, fq, fr, table):
+        mask = self.size - 1
+        slot = table[fq]
+        if slot & 7 == 0:
+            table[fq] = (fr << 3) | OCCUPIED
+            return
+        was_occupied = slot & OCCUPIED
+        table[fq] = slot | OCCUPIED
+        s = self._run_start(fq, table)
+        head = s
+        if was_occupied:
+            # Runs are kept sorted by remainder
+            while table[s] >> 3 < fr:
+                s = (s + 1) & mask
+                if not table[s] & CONTINUATION:
+                    break
+        new_head = not was_occupied or s == head
+        entry = (fr << 3) | (0 if new_head else CONTINUATION) | (SHIFTED if s != fq else 0)
+        displaced_head = was_occupied and s == head
+        # Shift every following entry of the cluster one slot right; is_occupied stays put
+        while True:
+            slot = table[s]
+            table[s] = entry | (slot & OCCUPIED)
+            if slot & 7 == 0:
+                return
+            cont = CONTINUATION if displaced_head else slot & CONTINUATION
+            entry = (slot >> 3 << 3) | cont | SHIFTED
+            displaced_head = False
+            s = (s + 1) & mask
+
+    def _lookup(self, fq, fr, table):
+        mask = self.size - 1
+        if not table[fq] & OCCUPIED:
+            return False
+        s = self._run_start(fq, table)
+        while True:
+            remainder = table[s] >> 3
+            if remainder >= fr:
+                return remainder == fr
+            s = (s + 1) & mask
+            if not table[s] & CONTINUATION:
+                return False
+
+    def _cluster(self, start, table):
+        # (quotient, remainder) pairs of the cluster beginning at start, in slot order
+        mask = self.size - 1
+        entries = []
+        s, b = start, start
+        while True:
+            slot = table[s]
+            if slot & 7 == 0:
+                return entries
+            if not slot & SHIFTED:
+                b = s
+            elif not slot & CONTINUATION:
+                b = (b + 1) & mask
+                while not table[b] & OCCUPIED:
+                    b = (b + 1) & mask
+            entries.append((b, slot >> 3))
+            s = (s + 1) & mask
+
+    def _entries(self):
+        # Every stored (quotient, remainder), starting the scan just after an empty slot
+        mask = self.size - 1
+        slots = self.table.tolist()
+        start = next((s + 1 for s, slot in enumerate(slots) if slot & 7 == 0), None)
+        if start is None:
+            raise RuntimeError("quotient filter is full")
+        entries = []
+        b = start
+        for k in range(self.size):
+            s = (start + k) & mask
+            slot = slots[s]
+            if slot & 7 == 0:
+                continue
+            if not slot & SHIFTED:
+                b = s
+            elif not slot & CONTINUATION:
+                b = (b + 1) & mask
+                while not slots[b] & OCCUPIED:
+                    b = (b + 1) & mask
+            entries.append((b, slot >> 3))
+        return entries
+
+    def fingerprints(self):
+        """All stored fingerprints (quotient << remainder_bits | remainder), sorted."""
+        return sorted((q << self.remainder_bits) | r for q, r in self._entries())
+
+    def _insert_fingerprints(self, fingerprints):
+        # Sorted input appends to the end of each run, so shifts stay short. Large batches
+        # work on a decoded copy of the table that is packed back in one go.
+        rmask = (1 << self.remainder_bits) - 1
+        table = self.table.tolist() if 16 * len(fingerprints) > self.size else self.table
+        for f in fingerprints:
+            self._insert(f >> self.remainder_bits, f & rmask, table)
+        if table is not self.table:
+            self.table.assign(table)
+        self.count += len(fingerprints)
+
+    def _grow_for(self, extra):
+        while self.count + extra > self.max_load * self.size:
+            self.resize()
 
     def insert(self, item):
-        h = self._hash(item)
-        bucket = h % self.size
-        remainder = h & ((1 << self.remainder_bits) - 1)
+        self._grow_for(1)
+        self._insert(*self._hash(item), self.table)
+        self.count += 1
 
-        # Linear probing to find empty slot
-        while self.table[bucket] is not None:
-            bucket = (bucket + 1) % self.size
-        self.table[bucket] = remainder
+    add = insert
 
     def contains(self, item):
-        h = self._hash(item)
-        bucket = h % self.size
-        remainder = h & ((1 << self.remainder_bits) - 1)
-        slot = self.table[bucket]
-        return slot == remainder
+        return self._lookup(*self._hash(item), self.table)
+
+    check = contains
+    __contains__ = contains
 
     def delete(self, item):
-        h = self._hash(item)
-        bucket = h % self.size
-        remainder = h & ((1 << self.remainder_bits) - 1)
-
-        # Linear probing to find the item
-        start_bucket = bucket
-        while self.table[bucket] is not None:
-            if self.table[bucket] == remainder:
-                self.table[bucket] = None
-                return True
-            bucket = (bucket + 1) % self.size
-            if bucket == start_bucket:
-                break
-        return False
\ No newline at end of file
+        fq, fr = self._hash(item)
+        table = self.table
+        if not self._lookup(fq, fr, table):
+            return False
+        # Rebuild the item's cluster without it; clusters are short at sensible loads
+        mask = self.size - 1
+        start = fq
+        while table[start] & SHIFTED:
+            start = (start - 1) & mask
+        entries = self._cluster(start, table)
+        for k in range(len(entries)):
+            table[(start + k) & mask] = 0
+        entries.remove((fq, fr))
+        for q, r in entries:
+            self._insert(q, r, table)
+        self.count -= 1
+        return True
+
+    def add_many(self, items):
+        """Insert a batch of items, growing the table first if needed."""
+        self._grow_for(len(items))
+        q, r = self._split(stable_hash64_many(items))
+        fingerprints = np.sort((q.astype(np.uint64) << np.uint64(self.remainder_bits)) | r)
+        self._insert_fingerprints(fingerprints.tolist())
+
+    def check_many(self, items):
+        """Return a boolean array telling which items are possibly present."""
+        q, r = self._split(stable_hash64_many(items))
+        # Items whose home slot has no run are rejected without walking the table
+        hit = (self.table.get_many(q) & np.uint64(OCCUPIED)) != 0
+        candidates = np.flatnonzero(hit).tolist()
+        table = self.table.tolist() if 16 * len(candidates) > self.size else self.table
+        for k in candidates:
+            hit[k] = self._lookup(int(q[k]), int(r[k]), table)
+        return hit
+
+    def resize(self, size_bits=None):
+        """Grow to 2**size_bits slots by moving remainder bits into the quotient."""
+        size_bits = self.size_bits + 1 if size_bits is None else size_bits
+        shift = size_bits - self.size_bits
+        if shift < 0 or self.remainder_bits - shift < 1:
+            raise ValueError("cannot resize: not enough remainder bits left")
+        fingerprints = self.fingerprints()
+        self.size_bits = size_bits
+        self.remainder_bits -= shift
+        self.size = 1 << size_bits
+        self.table = PackedArray(self.size, self.remainder_bits + 3)
+        self.count = 0
+        self._insert_fingerprints(fingerprints)
+        return self
+
+    def merge(self, other):
+        """Union with another filter of the same fingerprint length (in place)."""
+        bits = self.size_bits + self.remainder_bits
+        if other.size_bits + other.remainder_bits != bits:
+            raise ValueError("can only merge filters with equal size_bits + remainder_bits")
+        # Fingerprints are prefixes of the same hash, so they compare at any split
+        fingerprints = sorted(self.fingerprints() + other.fingerprints())
+        size_bits = self.size_bits
+        while len(fingerprints) > self.max_load * (1 << size_bits):
+            size_bits += 1
+        if size_bits >= bits:
+            raise ValueError("merged filter would need more quotient bits than fingerprint bits")
+        self.size_bits, self.remainder_bits = size_bits, bits - size_bits
+        self.size = 1 << size_bits
+        self.table = PackedArray(self.size, self.remainder_bits + 3)
+        self.count = 0
+        self._insert_fingerprints(fingerprints)
+        return self
+
+    def load_factor(self):
+        return self.count / self.size
+
+    def false_positive_rate(self):
+        return 1 - math.exp(-self.load_factor() / 2 ** self.remainder_bits)
+
+    def bits_per_item(self):
+        return self.size * (self.remainder_bits + 3) / max(1, self.count)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.size_bits, self.remainder_bits, self.count, self.max_load))
+            f.write(self.table.bytes.tobytes())
+
+    @classmethod
+    def load(cls, path, mode="r"):
+        """Load a saved filter with its slot table memory-mapped."""
+        with open(path, "rb") as f:
+            magic, size_bits, remainder_bits, count, max_load = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a saved QuotientFilter")
+        nbytes = ((1 << size_bits) * (remainder_bits + 3) + 7) // 8 + 8
+        buffer = np.memmap(path, dtype=np.uint8, mode=mode, offset=_HEADER.size, shape=(nbytes,))
+        qf = cls(size_bits, remainder_bits, max_load, buffer=buffer)
+        qf.count = count
+        return qf
+
+# Example usage:
+# qf = QuotientFilter.from_capacity(100_000, error_rate=0.001)
+# qf.add_many(np.arange(100_000))
+# print(qf.check_many(np.array([1, -1])), qf.false_positive_rate())
+# other = QuotientFilter.from_capacity(100_000, error_rate=0.001)
+# other.add_many(np.arange(100_000, 150_000))
+# qf.merge(other)
+# qf.save("/tmp/quotient.bin"); qf2 = QuotientFilter.load("/tmp/quotient.bin")
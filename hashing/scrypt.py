@@ -2,7 +2,6 @@
 import hashlib
 import hmac
 import struct
-import os
 
 def _hmac_sha256(key, msg):
     return hmac.new(key, msg, hashlib.sha256).digest()
@@ -21,14 +20,51 @@ def pbkdf2_hmac_sha256(password, salt, iterations, dklen):
         derived += bytes(t)
     return derived[:dklen]
 
-def _xor_bytes(a, b):
-    return bytes(x ^ y for x, y in zip(a, b))
+def _salsa20_8(B):
+    # Salsa20/8 core on 16 little-endian 32-bit words
+    def R(a, b):
+        return ((a << b) | (a >> (32 - b))) & 0xffffffff
+    x = list(B)
+    for _ in range(4):
+        x[4] ^= R((x[0] + x[12]) & 0xffffffff, 7);  x[8] ^= R((x[4] + x[0]) & 0xffffffff, 9)
+        x[12] ^= R((x[8] + x[4]) & 0xffffffff, 13); x[0] ^= R((x[12] + x[8]) & 0xffffffff, 18)
+        x[9] ^= R((x[5] + x[1]) & 0xffffffff, 7);   x[13] ^= R((x[9] + x[5]) & 0xffffffff, 9)
+        x[1] ^= R((x[13] + x[9]) & 0xffffffff, 13); x[5] ^= R((x[1] + x[13]) & 0xffffffff, 18)
+        x[14] ^= R((x[10] + x[6]) & 0xffffffff, 7); x[2] ^= R((x[14] + x[10]) & 0xffffffff, 9)
+        x[6] ^= R((x[2] + x[14]) & 0xffffffff, 13); x[10] ^= R((x[6] + x[2]) & 0xffffffff, 18)
+        x[3] ^= R((x[15] + x[11]) & 0xffffffff, 7); x[7] ^= R((x[3] + x[15]) & 0xffffffff, 9)
+        x[11] ^= R((x[7] + x[3]) & 0xffffffff, 13); x[15] ^= R((x[11] + x[7]) & 0xffffffff, 18)
+        x[1] ^= R((x[0] + x[3]) & 0xffffffff, 7);   x[2] ^= R((x[1] + x[0]) & 0xffffffff, 9)
+        x[3] ^= R((x[2] + x[1]) & 0xffffffff, 13);  x[0] ^= R((x[3] + x[2]) & 0xffffffff, 18)
+        x[6] ^= R((x[5] + x[4]) & 0xffffffff, 7);   x[7] ^= R((x[6] + x[5]) & 0xffffffff, 9)
+        x[4] ^= R((x[7] + x[6]) & 0xffffffff, 13);  x[5] ^= R((x[4] + x[7]) & 0xffffffff, 18)
+        x[11] ^= R((x[10] + x[9]) & 0xffffffff, 7); x[8] ^= R((x[11] + x[10]) & 0xffffffff, 9)
+        x[9] ^= R((x[8] + x[11]) & 0xffffffff, 13); x[10] ^= R((x[9] + x[8]) & 0xffffffff, 18)
+        x[12] ^= R((x[15] + x[14]) & 0xffffffff, 7); x[13] ^= R((x[12] + x[15]) & 0xffffffff, 9)
+        x[14] ^= R((x[13] + x[12]) & 0xffffffff, 13); x[15] ^= R((x[14] + x[13]) & 0xffffffff, 18)
+    return [(a + b) & 0xffffffff for a, b in zip(x, B)]
+
+def _block_mix(B, r):
+    # B is 2r 64-byte blocks as a list of 32r words; even outputs first, then odd
+    X = B[-16:]
+    Y = []
+    for i in range(2 * r):
+        X = _salsa20_8([a ^ b for a, b in zip(X, B[16*i:16*i+16])])
+        Y.append(X)
+    return [w for y in Y[0::2] + Y[1::2] for w in y]
 
 def memory_hard(B, N):
-    for i in range(N):
-        rand = os.urandom(len(B))
-        B = _xor_bytes(B, rand)
-    return B
+    # scrypt ROMix: fill V sequentially, then read it back in data-dependent order
+    r = len(B) // 128
+    X = list(struct.unpack('<%dI' % (32 * r), B))
+    V = []
+    for _ in range(N):
+        V.append(X)
+        X = _block_mix(X, r)
+    for _ in range(N):
+        j = X[-16] % N  # Integerify
+        X = _block_mix([a ^ b for a, b in zip(X, V[j])], r)
+    return struct.pack('<%dI' % (32 * r), *X)
 
 def scrypt(password, salt, N, r, p, dklen):
     if N & (N-1) != 0 or N <= 1:
@@ -1,7 +1,15 @@
 # xxHash64 implementation (fast non-cryptographic hash algorithm)
+# XXH64 is a hashlib-style streaming object (update/digest/hexdigest/intdigest/copy): input
+# is consumed in 32-byte stripes across four accumulator lanes, and up to 31 pending bytes
+# are buffered between updates, so large files and streams never need to sit in memory.
+# xxhash64(data, seed) is the one-shot form.
+import struct
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
 
 def _rotate(v, n):
-    return ((v << n) & 0xFFFFFFFFFFFFFFFF) | (v >> (64 - n))
+    v &= MASK64
+    return ((v << n) & MASK64) | (v >> (64 - n))
 
 # 64‑bit primes used in xxHash64
 PRIME1 = 0x9E3779B185EBCA87
@@ -10,57 +18,115 @@ PRIME3 = 0x165667B19E3779F9
 PRIME4 = 0x85EBCA77C2B2AE63
 PRIME5 = 0x27D4EB2F165667C5
 
-def xxhash64(data, seed=0):
-    length = len(data)
-    pos = 0
-    h64 = seed + PRIME5
-
-    if length >= 32:
-        v1 = seed + PRIME1
-        v2 = seed + PRIME2
-        v3 = seed + PRIME3
-        v4 = seed + PRIME4
-
-        while pos + 32 <= length:
-            v1 = (_rotate(v1 + int.from_bytes(data[pos:pos+8], 'little') * PRIME2, 31) * PRIME1) & 0xFFFFFFFFFFFFFFFF
-            pos += 8
-            v2 = (_rotate(v2 + int.from_bytes(data[pos:pos+8], 'little') * PRIME2, 31) * PRIME1) & 0xFFFFFFFFFFFFFFFF
-            pos += 8
-            v3 = (_rotate(v3 + int.from_bytes(data[pos:pos+8], 'little') * PRIME2, 31) * PRIME1) & 0xFFFFFFFFFFFFFFFF
-            pos += 8
-            v4 = (_rotate(v4 + int.from_bytes(data[pos:pos+8], 'little') * PRIME2, 31) * PRIME1) & 0xFFFFFFFFFFFFFFFF
+def _round(acc, lane):
+    return (_rotate(acc + lane * PRIME2, 31) * PRIME1) & MASK64
+
+def _merge_round(h64, v):
+    return ((h64 ^ _round(0, v)) * PRIME1 + PRIME4) & MASK64
+
+
+class XXH64:
+    name = "xxh64"
+    digest_size = 8
+    block_size = 32
+
+    def __init__(self, data=b"", seed=0):
+        self.seed = seed & MASK64
+        self._lanes = ((seed + PRIME1 + PRIME2) & MASK64, (seed + PRIME2) & MASK64,
+                       seed & MASK64, (seed - PRIME1) & MASK64)
+        self._buffer = b""
+        self._length = 0
+        if data:
+            self.update(data)
+
+    def update(self, data):
+        data = memoryview(data).cast("B")
+        self._length += len(data)
+        if self._buffer:
+            need = 32 - len(self._buffer)
+            self._buffer += bytes(data[:need])
+            data = data[need:]
+            if len(self._buffer) < 32:
+                return
+            self._consume(self._buffer)
+        full = len(data) & ~31
+        # Bounded slices keep the unpacked word tuples small for huge inputs
+        for base in range(0, full, 1 << 16):
+            self._consume(data[base:min(full, base + (1 << 16))])
+        self._buffer = bytes(data[full:])
+
+    def _consume(self, block):
+        # block holds a whole number of 32-byte stripes
+        v1, v2, v3, v4 = self._lanes
+        words = struct.unpack(f"<{len(block) // 8}Q", block)
+        # _round inlined (bits above 64 left by the rotate vanish in the masked multiply)
+        for i in range(0, len(words), 4):
+            t = (v1 + words[i] * PRIME2) & MASK64
+            v1 = ((t << 31 | t >> 33) * PRIME1) & MASK64
+            t = (v2 + words[i + 1] * PRIME2) & MASK64
+            v2 = ((t << 31 | t >> 33) * PRIME1) & MASK64
+            t = (v3 + words[i + 2] * PRIME2) & MASK64
+            v3 = ((t << 31 | t >> 33) * PRIME1) & MASK64
+            t = (v4 + words[i + 3] * PRIME2) & MASK64
+            v4 = ((t << 31 | t >> 33) * PRIME1) & MASK64
+        self._lanes = (v1, v2, v3, v4)
+
+    def intdigest(self):
+        data = self._buffer
+        length = len(data)
+        pos = 0
+        if self._length >= 32:
+            v1, v2, v3, v4 = self._lanes
+            h64 = (_rotate(v1, 1) + _rotate(v2, 7) + _rotate(v3, 12) + _rotate(v4, 18)) & MASK64
+            for v in self._lanes:
+                h64 = _merge_round(h64, v)
+        else:
+            h64 = (self.seed + PRIME5) & MASK64
+
+        h64 = (h64 + self._length) & MASK64
+
+        while pos + 8 <= length:
+            k1 = _round(0, int.from_bytes(data[pos:pos+8], 'little'))
+            h64 = (_rotate(h64 ^ k1, 27) * PRIME1 + PRIME4) & MASK64
             pos += 8
 
-        h64 = ((v1 << 1) + (v2 << 7) + (v3 << 12) + (v4 << 18)) & 0xFFFFFFFFFFFFFFFF
-    else:
-        h64 = (seed + PRIME5) & 0xFFFFFFFFFFFFFFFF
+        while pos + 4 <= length:
+            h64 ^= int.from_bytes(data[pos:pos+4], 'little') * PRIME1
+            h64 = (_rotate(h64, 23) * PRIME2 + PRIME3) & MASK64
+            pos += 4
 
-    h64 = (h64 + length) & 0xFFFFFFFFFFFFFFFF
+        while pos < length:
+            h64 ^= data[pos] * PRIME5
+            h64 = (_rotate(h64, 11) * PRIME1) & MASK64
+            pos += 1
+        h64 ^= (h64 >> 33)
+        h64 = (h64 * PRIME2) & MASK64
+        h64 ^= (h64 >> 29)
+        h64 = (h64 * PRIME3) & MASK64
+        h64 ^= (h64 >> 32)
+        return h64
 
-    while pos + 8 <= length:
-        k1 = (_rotate(int.from_bytes(data[pos:pos+8], 'little') * PRIME2, 31) * PRIME1) & 0xFFFFFFFFFFFFFFFF
-        h64 = (_rotate(h64 ^ k1, 27) * PRIME1 + PRIME4) & 0xFFFFFFFFFFFFFFFF
-        pos += 8
+    def digest(self):
+        # Canonical (big-endian) representation, as in the reference implementation
+        return self.intdigest().to_bytes(8, "big")
 
-    while pos + 4 <= length:
-        k1 = (_rotate(int.from_bytes(data[pos:pos+4], 'little') * PRIME1, 23) * PRIME2) & 0xFFFFFFFFFFFFFFFF
-        h64 ^= k1
-        h64 = (_rotate(h64, 27) * PRIME1 + PRIME4) & 0xFFFFFFFFFFFFFFFF
-        pos += 4
+    def hexdigest(self):
+        return self.digest().hex()
 
-    while pos < length:
-        k1 = (_rotate(data[pos] * PRIME5, 11) * PRIME1) & 0xFFFFFFFFFFFFFFFF
-        h64 ^= k1
-        h64 = (_rotate(h64, 23) * PRIME2) & 0xFFFFFFFFFFFFFFFF
-        pos += 1
-    h64 ^= (h64 >> 33)
-    h64 = (h64 * PRIME2) & 0xFFFFFFFFFFFFFFFF
-    h64 ^= (h64 >> 29)
-    h64 = (h64 * PRIME3) & 0xFFFFFFFFFFFFFFFF
-    h64 ^= (h64 >> 32)
+    def copy(self):
+        other = XXH64.__new__(XXH64)
+        other.__dict__.update(self.__dict__)
+        return other
 
-    return h64
+
+def xxhash64(data, seed=0):
+    return XXH64(data, seed).intdigest()
 
 # Example usage (commented out for assignment)
 # if __name__ == "__main__":
-#     print(hex(xxhash64(b"Hello, world!")))
\ No newline at end of file
+#     print(hex(xxhash64(b"Hello, world!")))
+#     h = XXH64(seed=0)
+#     with open("big.bin", "rb") as f:
+#         for chunk in iter(lambda: f.read(1 << 20), b""):
+#             h.update(chunk)
+#     print(h.hexdigest())
@@ -28,7 +28,7 @@ def yescrypt(password, salt, N=16384, r=8, p=1, dklen=32):
     init_hash = hashlib.sha256(password + salt).digest()
 
     # Allocate memory buffer
-    block_size = 64  # bytes per block (for SHA256 output)
+    block_size = 32  # bytes per block (one SHA256 output)
     M = [b'\x00' * block_size for _ in range(N)]
     M[0] = init_hash
 
@@ -42,8 +42,7 @@ def yescrypt(password, salt, N=16384, r=8, p=1, dklen=32):
     combined = bytearray(block_size)
     for block in M:
         for j in range(block_size):
-            combined[j] += block[j]
-            combined[j] &= 0xFF  # keep within byte range
+            combined[j] = (combined[j] + block[j]) & 0xFF  # keep within byte range
 
     # Derive the final key using PBKDF2 with the combined block as the password
     derived = hashlib.pbkdf2_hmac('sha256', combined, salt, 1000, dklen)
@@ -1,22 +1,33 @@
 # DBSCAN: Density-Based Spatial Clustering of Applications with Noise
 # The algorithm groups points that are closely packed together and marks points in low-density regions as noise.
+# Passing a spatial index class (e.g. KDTree from data-structures/k-d_tree.py, anything
+# answering query_radius(queries, r)) fetches every eps-neighbourhood in one batched query
+# instead of a full distance scan per point.
 import numpy as np
 
 def region_query(point_idx, X, eps):
     # Compute all distances from point_idx to other points
     diff = X - X[point_idx]  # shape (n_samples, n_features)
     dists = np.sqrt((diff ** 2).sum(axis=1))
-    neighbor_idxs = np.where(dists < eps)[0]
+    neighbor_idxs = np.where(dists <= eps)[0]  # closed ball, like query_radius
     return neighbor_idxs
 
-def dbscan(X, eps, min_samples):
+def dbscan(X, eps, min_samples, index=None):
     n = X.shape[0]
     labels = np.full(n, -1, dtype=int)  # -1 indicates noise
+    visited = np.zeros(n, dtype=bool)
+    if index is not None:
+        # All neighbourhoods at once
+        neighborhoods = index(X).query_radius(X, eps)
+        query = lambda i: neighborhoods[i]
+    else:
+        query = lambda i: region_query(i, X, eps)
     cluster_id = 0
     for idx in range(n):
-        if labels[idx] != -1:
+        if visited[idx]:
             continue  # already processed
-        neighbors = region_query(idx, X, eps)
+        visited[idx] = True
+        neighbors = query(idx)
         if len(neighbors) < min_samples:
             labels[idx] = -1  # noise
         else:
@@ -28,10 +39,10 @@ def dbscan(X, eps, min_samples):
                 p = seeds.pop()
                 if labels[p] == -1:
                     labels[p] = cluster_id
-                if labels[p] != 0:
+                if visited[p]:
                     continue
-                neighbors_p = region_query(p, X, eps)
+                visited[p] = True
+                neighbors_p = query(p)
                 if len(neighbors_p) >= min_samples:
                     seeds.update(neighbors_p)
-                labels[p] = cluster_id
     return labels
\ No newline at end of file
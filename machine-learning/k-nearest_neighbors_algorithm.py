@@ -1,30 +1,45 @@
 # K-Nearest Neighbors (KNN) Classification Algorithm
 # Idea: For a given test sample, find the k training samples closest in Euclidean distance
 # and predict the majority class among those neighbors.
+# An optional spatial index (e.g. KDTree from data-structures/k-d_tree.py, or any class
+# whose instances answer knn(queries, k) -> (distances, indices)) replaces the linear scan.
 
 class KNearestNeighbors:
-    def __init__(self, k=5):
+    def __init__(self, k=5, index=None):
         self.k = k
+        self.index = index  # index class/factory, called as index(X_train)
+        self.tree = None
         self.X_train = None
         self.y_train = None
 
     def fit(self, X, y):
         self.X_train = X
         self.y_train = y
+        if self.index is not None:
+            self.tree = self.index(X)
 
     def _euclidean_distance(self, point1, point2):
-        return sum(abs(a - b) for a, b in zip(point1, point2))
+        return sum((a - b) ** 2 for a, b in zip(point1, point2)) ** 0.5
 
-    def predict(self, X):
-        predictions = []
+    def _neighbors(self, X):
+        # Training-set indices of the k nearest neighbours of every test sample
+        if self.tree is not None:
+            _, indices = self.tree.knn(X, self.k)
+            return indices.tolist()
+        result = []
         for x_test in X:
             distances = []
             for idx, x_train in enumerate(self.X_train):
                 d = self._euclidean_distance(x_train, x_test)
                 distances.append((d, idx))
-            distances.sort(key=lambda t: t[0], reverse=True)
-            k_nearest = distances[:self.k]
-            neighbor_labels = [self.y_train[idx] for _, idx in k_nearest]
+            distances.sort(key=lambda t: t[0])
+            result.append([idx for _, idx in distances[:self.k]])
+        return result
+
+    def predict(self, X):
+        predictions = []
+        for k_nearest in self._neighbors(X):
+            neighbor_labels = [self.y_train[idx] for idx in k_nearest]
             # majority vote
             label_counts = {}
             for label in neighbor_labels:
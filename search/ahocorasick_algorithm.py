@@ -1,54 +1,55 @@
 # Aho–Corasick algorithm: multi-pattern string searching using a trie with failure links
+# The trie is compiled by pattern_matcher.py into a dense transition table (the failure links
+# folded in) with output links; search runs over bytes, memoryview or str, and scanner()
+# gives a streaming feed(chunk) that carries the automaton state across chunks.
+import importlib.util
+import os
+import sys
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "pattern_matcher" in sys.modules:
+        return sys.modules["pattern_matcher"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pattern_matcher.py")
+    spec = importlib.util.spec_from_file_location("pattern_matcher", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
 
-class Node:
-    def __init__(self):
-        self.children = {}
-        self.fail = None
-        self.output = []
 
 class AhoCorasick:
     def __init__(self, patterns):
-        self.root = Node()
-        self._build_trie(patterns)
-        self._build_failures()
-
-    def _build_trie(self, patterns):
-        for pat in patterns:
-            node = self.root
-            for ch in pat:
-                if ch not in node.children:
-                    node.children[ch] = Node()
-                node = node.children[ch]
-            node.output.append(pat)
-
-    def _build_failures(self):
-        from collections import deque
-        queue = deque()
-        for child in self.root.children.values():
-            queue.append(child)
-            child.fail = self.root
-        while queue:
-            current = queue.popleft()
-            for ch, child in current.children.items():
-                fail_node = current.fail
-                while fail_node and ch not in fail_node.children:
-                    fail_node = fail_node.fail
-                child.fail = fail_node.children[ch] if fail_node and ch in fail_node.children else self.root
-                child.output += child.fail.output
-                queue.append(child)
+        self.automaton = engine.Automaton(patterns)
 
     def search(self, text):
-        node = self.root
-        results = []
-        for i, ch in enumerate(text):
-            while node and ch not in node.children:
-                node = node.fail
-            node = node.children[ch] if node and ch in node.children else self.root
-            if node.output:
-                for pat in node.output:
-                    results.append((i - len(pat) + 1, pat))
-        return results
+        """[(start, pattern)] of every occurrence, in order of their end position."""
+        return self.automaton.search(text)
+
+    def finditer(self, data):
+        """(start byte, pattern index) of every occurrence, lazily."""
+        return self.automaton.finditer(data)
+
+    def scanner(self):
+        return self.automaton.scanner()
+
+    def save(self, directory):
+        self.automaton.save(directory)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        matcher = cls.__new__(cls)
+        matcher.automaton = engine.Automaton.load(directory, mmap)
+        return matcher
 
 # Example usage (not part of the assignment):
 # ac = AhoCorasick(['he', 'she', 'his', 'hers'])
-# print(ac.search('ushers'))  # Expected: [(0, 'she'), (3, 'he'), (3, 'hers')]
\ No newline at end of file
+# print(ac.search('ushers'))  # [(1, 'she'), (2, 'he'), (2, 'hers')]
+# scanner = ac.scanner()
+# for chunk in open('app.log', 'rb'):
+#     for start, pattern_index in scanner.feed(chunk):
+#         ...
@@ -2,14 +2,115 @@
 # The algorithm searches for the lowest cost path from a start node to a goal node by
 # exploring nodes in order of the estimated total cost f(n) = g(n) + h(n), where
 # g(n) is the exact cost from the start to n and h(n) is a heuristic estimate from n to the goal.
+# LandmarkHeuristic is the ALT preprocessing step (A*, Landmarks, Triangle inequality): exact
+# distances to and from a few far-apart landmarks are computed once and saved; for any goal
+# t they give the lower bound h(v) = max over L of d(L, t) - d(L, v) and d(v, L) - d(t, L),
+# which is consistent and usually far tighter than a geometric estimate on road graphs.
+# AStar accepts it in place of a heuristic function. The landmark distances are computed
+# with the Dijkstra engine of graph/dijkstras_algorithm.py (loaded by path).
 
 import heapq
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+from operator import sub
+
+import numpy as np
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "dijkstras_algorithm" in sys.modules:
+        return sys.modules["dijkstras_algorithm"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graph", "dijkstras_algorithm.py")
+    spec = importlib.util.spec_from_file_location("dijkstras_algorithm", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+UNREACHABLE = engine.UNREACHABLE
+
+
+class LandmarkHeuristic:
+    def __init__(self, names, from_landmark, to_landmark):
+        """from_landmark[i, k] = d(L_k, node i); to_landmark[i, k] = d(node i, L_k)."""
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.from_landmark = from_landmark
+        self.to_landmark = to_landmark
+
+    @classmethod
+    def build(cls, graph, count=8, seed=0):
+        """Pick landmarks by farthest-point selection and store distances to and from them."""
+        names = list(graph)
+        for edges in graph.values():
+            names.extend(v for v, _ in edges)
+        names = list(dict.fromkeys(names))
+        ids = {name: i for i, name in enumerate(names)}
+        reverse = {}
+        for u, edges in graph.items():
+            for v, w in edges:
+                reverse.setdefault(v, []).append((u, w))
+        n, count = len(names), min(count, len(names))
+        from_landmark = np.full((n, count), UNREACHABLE)
+        to_landmark = np.full((n, count), UNREACHABLE)
+        nearest = np.full(n, np.inf)  # distance from the closest landmark chosen so far
+        searches = [(from_landmark, engine.ShortestPathEngine(graph)),
+                    (to_landmark, engine.ShortestPathEngine(reverse))]
+        landmark = random.Random(seed).choice(names)
+        for k in range(count):
+            for column, paths in searches:
+                paths.run([landmark])
+                dist = paths.dist
+                column[:, k] = np.minimum([dist.get(v, UNREACHABLE) for v in names], UNREACHABLE)
+            reached = from_landmark[:, k] < UNREACHABLE
+            nearest = np.minimum(nearest, np.where(reached, from_landmark[:, k], np.inf))
+            # Next landmark: the reachable node farthest from all landmarks so far
+            # (or any node no landmark reaches yet)
+            candidates = np.where(np.isinf(nearest), UNREACHABLE, nearest)
+            landmark = names[int(np.argmax(candidates))]
+        return cls(names, from_landmark, to_landmark)
+
+    def bind(self, goal):
+        """The heuristic for one goal, as a function node -> lower bound on d(node, goal)."""
+        t = self.ids[goal]
+        goal_from, goal_to = self.from_landmark[t].tolist(), self.to_landmark[t].tolist()
+        from_landmark, to_landmark, ids = self.from_landmark, self.to_landmark, self.ids
+
+        def heuristic(node):
+            # k is small, so plain lists beat NumPy's per-call overhead here
+            i = ids[node]
+            return max(0.0, max(map(sub, goal_from, from_landmark[i].tolist())),
+                       max(map(sub, to_landmark[i].tolist(), goal_to)))
+        return heuristic
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "from_landmark.npy"), self.from_landmark)
+        np.save(os.path.join(directory, "to_landmark.npy"), self.to_landmark)
+        with open(os.path.join(directory, "names.json"), "w") as f:
+            json.dump(self.names, f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        mode = "r" if mmap else None
+        with open(os.path.join(directory, "names.json")) as f:
+            names = [tuple(name) if isinstance(name, list) else name for name in json.load(f)]
+        return cls(names, np.load(os.path.join(directory, "from_landmark.npy"), mmap_mode=mode),
+                   np.load(os.path.join(directory, "to_landmark.npy"), mmap_mode=mode))
+
 
 class AStar:
     def __init__(self, graph, heuristic):
         """
         graph: a dict mapping each node to a list of (neighbor, cost) tuples
-        heuristic: a function node -> estimated cost to goal
+        heuristic: a function node -> estimated cost to goal, or an object with
+                   bind(goal) returning one (e.g. LandmarkHeuristic)
         """
         self.graph = graph
         self.heuristic = heuristic
@@ -19,35 +120,63 @@ class AStar:
         Returns a tuple (path, total_cost) where path is a list of nodes from start to goal.
         If no path is found, returns (None, None).
         """
+        heuristic = self.heuristic.bind(goal) if hasattr(self.heuristic, "bind") else self.heuristic
+        self.expanded = 0
         # Priority queue of (f_score, node, g_score, parent)
         frontier = []
-        heapq.heappush(frontier, (self.heuristic(start), start, 0, None))
+        heapq.heappush(frontier, (heuristic(start), start, 0, None))
         came_from = {}
         g_score = {start: 0}
 
         while frontier:
             f_current, current, g_current, parent = heapq.heappop(frontier)
+            if g_current > g_score[current]:
+                continue  # a shorter way to current was found after this entry was pushed
 
             if current == goal:
                 # Reconstruct path
                 path = [current]
                 while parent is not None:
                     path.append(parent)
-                    parent = came_from[parent][1]
+                    parent = came_from[parent][0]
                 path.reverse()
                 return path, g_current
 
             came_from[current] = (parent, g_current)
+            self.expanded += 1
 
             for neighbor, cost in self.graph.get(current, []):
                 tentative_g = g_current + cost
                 if neighbor not in g_score or tentative_g < g_score[neighbor]:
                     g_score[neighbor] = tentative_g
-                    f_neighbor = tentative_g + self.heuristic(current)
+                    f_neighbor = tentative_g + heuristic(neighbor)
                     heapq.heappush(frontier, (f_neighbor, neighbor, tentative_g, current))
 
         return None, None
 
+
+def benchmark(side=100, queries=200, landmarks=8, seed=0):
+    """Nodes expanded and query time of A* with a zero heuristic (Dijkstra) versus ALT."""
+    graph = engine.road_grid(side, seed)
+    rng = random.Random(seed)
+    nodes = list(graph)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+    start = time.perf_counter()
+    alt = LandmarkHeuristic.build(graph, landmarks)
+    print(f"{side}x{side} road grid: {landmarks} landmarks in {time.perf_counter() - start:.2f} s")
+    results = []
+    for name, heuristic in (("zero", lambda node: 0), ("ALT", alt)):
+        astar = AStar(graph, heuristic)
+        expanded, start = 0, time.perf_counter()
+        costs = []
+        for u, v in pairs:
+            costs.append(astar.search(u, v)[1])
+            expanded += astar.expanded
+        elapsed = (time.perf_counter() - start) / queries
+        results.append(costs)
+        print(f"  {name:4s} heuristic: {expanded / queries:9.1f} nodes expanded, {elapsed * 1e3:7.2f} ms/query")
+    assert results[0] == results[1]
+
 # Example usage:
 # graph = {
 #     'A': [('B', 1), ('C', 4)],
@@ -60,4 +189,8 @@ class AStar:
 #     return 0
 # astar = AStar(graph, heuristic)
 # path, cost = astar.search('A', 'D')
-# print(path, cost)
\ No newline at end of file
+# print(path, cost)
+# alt = LandmarkHeuristic.build(graph, count=2)   # preprocessing, once per graph
+# alt.save("/tmp/alt"); alt = LandmarkHeuristic.load("/tmp/alt")
+# print(AStar(graph, alt).search('A', 'D'))
+# benchmark()
\ No newline at end of file
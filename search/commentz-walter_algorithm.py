@@ -1,56 +1,157 @@
 # Commentz-Walter algorithm (string searching algorithm)
 # The algorithm preprocesses multiple patterns and searches a text efficiently.
 # It uses a bad‑character heuristic adapted for several patterns.
+# The reversed patterns form a trie; a window ending at text position i is read right to
+# left down the trie, and on a mismatch the window moves by
+#     min(shift2(v), max(shift1(v), char(c) - depth(v) - 1))
+# where v is the deepest node reached and c the mismatched byte: shift1 re-aligns the
+# matched suffix with another occurrence inside some pattern, shift2 with a suffix of a
+# whole pattern, and char(c) is the first depth at which c occurs in the trie. Long patterns
+# over a large alphabet allow shifts near the shortest pattern length, which Aho–Corasick
+# (pattern_matcher.py, one step per byte) cannot. CommentzWalter offers the same interface as
+# pattern_matcher.Automaton (finditer, search, scanner().feed) for comparison.
+import importlib.util
+import os
+import sys
+import time
+from collections import deque
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "pattern_matcher" in sys.modules:
+        return sys.modules["pattern_matcher"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pattern_matcher.py")
+    spec = importlib.util.spec_from_file_location("pattern_matcher", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
+
+class CommentzWalter:
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        encoded = [engine._as_bytes(p) for p in self.patterns]
+        if not encoded or any(not p for p in encoded):
+            raise ValueError("patterns must be non-empty")
+        self.lengths = [len(p) for p in encoded]
+        self.wmin = min(self.lengths)
+        # Trie of the reversed patterns
+        self.children, self.depth, self.parent, self.output = [{}], [0], [0], [[]]
+        for pid, p in enumerate(encoded):
+            v = 0
+            for c in reversed(p):
+                if c not in self.children[v]:
+                    self.children.append({})
+                    self.depth.append(self.depth[v] + 1)
+                    self.parent.append(v)
+                    self.output.append([])
+                    self.children[v][c] = len(self.children) - 1
+                v = self.children[v][c]
+            self.output[v].append(pid)
+        self._shifts()
+
+    def _shifts(self):
+        n = len(self.children)
+        depth, wmin = self.depth, self.wmin
+        self.char = [wmin + 1] * 256
+        fail = [0] * n
+        shift1 = [wmin] * n
+        shift2 = [wmin] * n
+        order = []
+        queue = deque([0])
+        while queue:
+            v = queue.popleft()
+            order.append(v)
+            for c, u in self.children[v].items():
+                self.char[c] = min(self.char[c], depth[u])
+                f = fail[v]
+                while f and c not in self.children[f]:
+                    f = fail[f]
+                fail[u] = self.children[f][c] if v and c in self.children[f] else 0
+                queue.append(u)
+        # shift1(v): nearest deeper node whose word has v's word as a proper suffix
+        # (its failure link is v); shift2(v): the same over pattern ends, on any failure chain
+        for u in order[1:]:
+            shift1[fail[u]] = min(shift1[fail[u]], depth[u] - depth[fail[u]])
+            if self.output[u]:
+                f = fail[u]
+                while True:
+                    shift2[f] = min(shift2[f], depth[u] - depth[f])
+                    if not f:
+                        break
+                    f = fail[f]
+        for v in order[1:]:
+            shift2[v] = min(shift2[v], shift2[self.parent[v]])
+        self.shift1, self.shift2 = shift1, shift2
+
+    def finditer(self, data):
+        """(start byte, pattern index) of every occurrence, by end position."""
+        data = engine._as_bytes(data) if isinstance(data, str) else data
+        children, output, depth = self.children, self.output, self.depth
+        shift1, shift2, char = self.shift1, self.shift2, self.char
+        n = len(data)
+        i = self.wmin - 1
+        while i < n:
+            v, j = 0, 0
+            found = []
+            while True:
+                if output[v]:
+                    found += [(i - j + 1, pid) for pid in output[v]]
+                if j > i:
+                    shift = shift2[v]
+                    break
+                c = data[i - j]
+                u = children[v].get(c)
+                if u is None:
+                    shift = min(shift2[v], max(shift1[v], char[c] - j - 1))
+                    break
+                v, j = u, j + 1
+            yield from found
+            i += shift
+
+    def search(self, text):
+        """[(start, pattern)] of every occurrence; character offsets for str text."""
+        matches = [(start, self.patterns[pid]) for start, pid in self.finditer(text)]
+        return engine._char_offsets(text, matches) if isinstance(text, str) else matches
+
+    def scanner(self):
+        return engine.OverlapScanner(self)
 
-def preprocess_patterns(patterns):
-    """Build bad‑character tables for each pattern."""
-    tables = []
-    for pat in patterns:
-        table = {}
-        m = len(pat)
-        for i, ch in enumerate(pat):
-            table[ch] = m - i - 1  # last occurrence distance
-        tables.append((pat, table))
-    return tables
 
 def search(text, patterns):
     """Return the starting index of the first occurrence of any pattern in text, or -1."""
     if not patterns:
         return -1
-    tables = preprocess_patterns(patterns)
-    n = len(text)
-    min_len = min(len(pat) for pat, _ in tables)
-
-    i = 0
-    while i <= n - min_len:
-        # Check all patterns at the current alignment
-        for pat, _ in tables:
-            m = len(pat)
-            if text[i:i+m] == pat:
-                return i
-
-        # If no pattern matched, compute the shift using bad‑character rule
-        # that caused the mismatch or the one that yields the maximum shift.
-        pat, table = tables[0]
-        m = len(pat)
-
-        # Find the first mismatched character in this pattern
-        j = 0
-        while j < min_len and text[i + j] == pat[j]:
-            j += 1
-
-        if j == min_len:
-            # All characters up to min_len matched; shift by 1 to avoid infinite loop
-            shift = 1
-        else:
-            shift = table.get(text[i + j], m - j)
-
-        i += shift
-
-    return -1
+    return min((start for start, _ in CommentzWalter(patterns).search(text)), default=-1)
+
+def benchmark(num_patterns=1000, length=(16, 32), text_bytes=1 << 21, seed=0):
+    """Scan the same text with Commentz-Walter and the compiled Aho–Corasick automaton."""
+    import random
+    rng = random.Random(seed)
+    alphabet = bytes(range(32, 127))
+    patterns = [bytes(rng.choices(alphabet, k=rng.randint(*length))) for _ in range(num_patterns)]
+    text = bytearray(rng.choices(alphabet, k=text_bytes))
+    for _ in range(100):
+        p = rng.choice(patterns)
+        at = rng.randrange(len(text) - len(p))
+        text[at:at + len(p)] = p
+    text = bytes(text)
+    for name, matcher in [("commentz-walter", CommentzWalter(patterns)), ("aho-corasick", engine.Automaton(patterns))]:
+        start = time.perf_counter()
+        count = sum(1 for _ in matcher.finditer(text))
+        elapsed = time.perf_counter() - start
+        print(f"{name:16s} {num_patterns} patterns of {length[0]}-{length[1]} bytes: "
+              f"{len(text) / elapsed / 1e6:6.1f} MB/s, {count} matches")
 
 # Example usage (for testing only; not part of the assignment)
 if __name__ == "__main__":
     patterns = ["he", "she", "his", "hers"]
     text = "ahishers"
-    print(search(text, patterns))  # Expected output: 2 (index of "his")
\ No newline at end of file
+    print(search(text, patterns))  # Expected output: 1 (index of "his")
+    print(CommentzWalter(patterns).search(text))  # [(1, 'his'), (4, 'he'), (3, 'she'), (4, 'hers')]
+    benchmark()
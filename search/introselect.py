@@ -1,6 +1,9 @@
 # Introselect algorithm: find the k-th smallest element in an unsorted array
 # using a quickselect-like approach that switches to heap sort when recursion depth is exceeded.
+# Works on a copy of arr; order_statistics.py uses it as an exact fallback for keys NumPy
+# cannot hold.
 
+import heapq
 import math
 
 def introselect(arr, k):
@@ -10,14 +13,13 @@ def introselect(arr, k):
     if not arr or k < 1 or k > len(arr):
         raise ValueError("k out of bounds")
     depth_limit = 2 * math.floor(math.log2(len(arr))) if len(arr) > 0 else 0
-    return _introselect_recursive(arr, 0, len(arr) - 1, k - 1, depth_limit)
+    return _introselect_recursive(list(arr), 0, len(arr) - 1, k - 1, depth_limit)
 
 def _introselect_recursive(arr, lo, hi, k, depth):
     if lo == hi:
         return arr[lo]
     if depth == 0:
-        _heap_sort_subarray(arr, lo, hi)
-        return arr[lo + k]
+        return _heap_select(arr, lo, hi, k)
     pivot_index = _partition(arr, lo, hi)
     rank = pivot_index - lo
     if k == rank:
@@ -29,7 +31,8 @@ def _introselect_recursive(arr, lo, hi, k, depth):
 
 def _partition(arr, lo, hi):
     mid = (lo + hi) // 2
-    pivot = arr[mid]
+    arr[mid], arr[hi] = arr[hi], arr[mid]
+    pivot = arr[hi]
     i = lo
     for j in range(lo, hi):
         if arr[j] < pivot:
@@ -38,13 +41,11 @@ def _partition(arr, lo, hi):
     arr[i], arr[hi] = arr[hi], arr[i]
     return i
 
-def _heap_sort_subarray(arr, lo, hi):
-    # Build a list of the subarray excluding the element at index hi
-    sub = arr[lo:hi]
-    sub.sort()
-    arr[lo:hi] = sub
-    # The element at index hi remains unsorted
+def _heap_select(arr, lo, hi, k):
+    # O(n log k) fallback: the (k+1) smallest of arr[lo:hi+1] through a bounded heap
+    return heapq.nsmallest(k + 1, arr[lo:hi + 1])[-1]
 
 # Example usage (for testing purposes only; not part of the assignment):
 # if __name__ == "__main__":
-#     data = [3, 1, 4, 1, 5, 9, 2, 6, 5]
\ No newline at end of file
+#     data = [3, 1, 4, 1, 5, 9, 2, 6, 5]
+#     print(introselect(data, 4))  # 3
\ No newline at end of file
@@ -1,7 +1,35 @@
 # Jump Point Search implementation – A* variant that prunes unnecessary nodes to find a path on a grid.
+# GridLandmarks is an optional ALT preprocessing step for a fixed grid: exact move costs from
+# a few far-apart landmark cells are computed once (and saved), and for a goal t the bound
+# |d(L, t) - d(L, n)| replaces the diagonal-distance heuristic wherever it is larger, which
+# keeps the search away from dead ends and walls that the geometric estimate cannot see.
+# The landmark costs are computed with the Dijkstra engine of graph/dijkstras_algorithm.py
+# (loaded by path) on the 8-connected graph of the free cells.
 
 import heapq
+import importlib.util
 import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "dijkstras_algorithm" in sys.modules:
+        return sys.modules["dijkstras_algorithm"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graph", "dijkstras_algorithm.py")
+    spec = importlib.util.spec_from_file_location("dijkstras_algorithm", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+UNREACHABLE = engine.UNREACHABLE
 
 # Directions: (dx, dy)
 DIRS = [(-1, 0), (1, 0), (0, -1), (0, 1),
@@ -16,7 +44,8 @@ def in_bounds(grid, node):
     return 0 <= node[0] < len(grid) and 0 <= node[1] < len(grid[0])
 
 def passable(grid, node):
-    return grid[node[0]][node[1]] == 0
+    # Cells outside the grid count as walls (negative indices must not wrap around)
+    return in_bounds(grid, node) and grid[node[0]][node[1]] == 0
 
 def neighbors(grid, node):
     result = []
@@ -27,60 +56,60 @@ def neighbors(grid, node):
     return result
 
 def jump(grid, current, direction, goal):
-    """Recursively jump in the given direction until hitting a forced neighbor or goal."""
-    next_node = (current[0] + direction[0], current[1] + direction[1])
-    if not in_bounds(grid, next_node) or not passable(grid, next_node):
-        return None
-    if next_node == goal:
-        return next_node
-    if direction[0] != 0 and direction[1] != 0:  # diagonal
-        if (passable(grid, (next_node[0] - direction[0], next_node[1])) and
-            not passable(grid, (next_node[0], next_node[1] - direction[1]))):
-            return next_node
-        if (passable(grid, (next_node[0], next_node[1] - direction[1])) and
-            not passable(grid, (next_node[0] - direction[0], next_node[1]))):
-            return next_node
-    else:  # horizontal or vertical
-        if direction[0] == 0:
-            if (passable(grid, (next_node[0] + 1, next_node[1])) and
-                not passable(grid, (next_node[0] + 1, next_node[1] - 1))):
-                return next_node
-            if (passable(grid, (next_node[0] - 1, next_node[1])) and
-                not passable(grid, (next_node[0] - 1, next_node[1] - 1))):
-                return next_node
-        else:
-            if (passable(grid, (next_node[0], next_node[1] + 1)) and
-                not passable(grid, (next_node[0] - 1, next_node[1] + 1))):
-                return next_node
-            if (passable(grid, (next_node[0], next_node[1] - 1)) and
-                not passable(grid, (next_node[0] + 1, next_node[1] - 1))):
-                return next_node
-    return jump(grid, next_node, direction, goal)
+    """Step in the given direction until hitting a forced neighbor or goal (None at a wall)."""
+    dx, dy = direction
+    x, y = current
+    while True:
+        x, y = x + dx, y + dy
+        if not passable(grid, (x, y)):
+            return None
+        if (x, y) == goal:
+            return (x, y)
+        if dx != 0 and dy != 0:  # diagonal
+            if ((passable(grid, (x - dx, y + dy)) and not passable(grid, (x - dx, y))) or
+                    (passable(grid, (x + dx, y - dy)) and not passable(grid, (x, y - dy)))):
+                return (x, y)
+            # A diagonal step is a jump point if either straight line from it reaches one
+            if jump(grid, (x, y), (dx, 0), goal) or jump(grid, (x, y), (0, dy), goal):
+                return (x, y)
+        elif dx != 0:  # vertical (along rows)
+            if ((passable(grid, (x + dx, y + 1)) and not passable(grid, (x, y + 1))) or
+                    (passable(grid, (x + dx, y - 1)) and not passable(grid, (x, y - 1)))):
+                return (x, y)
+        else:  # horizontal
+            if ((passable(grid, (x + 1, y + dy)) and not passable(grid, (x + 1, y))) or
+                    (passable(grid, (x - 1, y + dy)) and not passable(grid, (x - 1, y)))):
+                return (x, y)
 
 def prune_neighbors(grid, parent, current):
     """Return the set of directions to explore from current node."""
     if parent is None:
         return DIRS
-    dx = current[0] - parent[0]
-    dy = current[1] - parent[1]
+    # Unit direction of travel (jump points can be several cells apart)
+    dx = (current[0] > parent[0]) - (current[0] < parent[0])
+    dy = (current[1] > parent[1]) - (current[1] < parent[1])
+    x, y = current
     dirs = []
     if dx != 0 and dy != 0:  # diagonal move
         dirs.append((dx, 0))
         dirs.append((0, dy))
         dirs.append((dx, dy))
+        if not passable(grid, (x - dx, y)):
+            dirs.append((-dx, dy))
+        if not passable(grid, (x, y - dy)):
+            dirs.append((dx, -dy))
+    elif dx != 0:
+        dirs.append((dx, 0))
+        if not passable(grid, (x, y + 1)):
+            dirs.append((dx, 1))
+        if not passable(grid, (x, y - 1)):
+            dirs.append((dx, -1))
     else:
-        if dx == 0:
-            dirs.append((0, dy))
-            if not passable(grid, (current[0] + 1, current[1])):
-                dirs.append((1, dy))
-            if not passable(grid, (current[0] - 1, current[1])):
-                dirs.append((-1, dy))
-        else:
-            dirs.append((dx, 0))
-            if not passable(grid, (current[0], current[1] + 1)):
-                dirs.append((dx, 1))
-            if not passable(grid, (current[0], current[1] - 1)):
-                dirs.append((dx, -1))
+        dirs.append((0, dy))
+        if not passable(grid, (x + 1, y)):
+            dirs.append((1, dy))
+        if not passable(grid, (x - 1, y)):
+            dirs.append((-1, dy))
     return dirs
 
 def reconstruct_path(came_from, start, goal):
@@ -92,20 +121,74 @@ def reconstruct_path(came_from, start, goal):
     path.reverse()
     return path
 
-def find_path(grid, start, goal):
-    """Find path from start to goal using Jump Point Search."""
+class GridLandmarks:
+    def __init__(self, distances):
+        """distances[k, x, y]: cost of the cheapest 8-connected path from landmark k to (x, y)."""
+        self.distances = distances
+
+    @classmethod
+    def build(cls, grid, count=8, seed=0):
+        """Farthest-point landmark selection among the free cells."""
+        free = [(x, y) for x in range(len(grid)) for y in range(len(grid[0])) if grid[x][y] == 0]
+        # Move costs: 1 straight, sqrt(2) diagonal
+        paths = engine.ShortestPathEngine({node: [(nb, heuristic(node, nb)) for nb in neighbors(grid, node)]
+                                           for node in free})
+        cells = tuple(np.array(free).T)
+        landmark = random.Random(seed).choice(free)
+        nearest = None
+        distances = []
+        for _ in range(min(count, len(free))):
+            paths.run([landmark])
+            dist = np.full((len(grid), len(grid[0])), UNREACHABLE)
+            dist[cells] = np.minimum([paths.dist[node] for node in free], UNREACHABLE)
+            distances.append(dist)
+            reached = np.where(dist < UNREACHABLE, dist, np.inf)
+            nearest = reached if nearest is None else np.minimum(nearest, reached)
+            # Next landmark: the free cell farthest from every landmark so far (unreached first)
+            score = np.where(np.isinf(nearest), UNREACHABLE, nearest)
+            score[np.asarray(grid) != 0] = -1
+            landmark = tuple(int(i) for i in np.unravel_index(np.argmax(score), score.shape))
+        return cls(np.array(distances))
+
+    def bind(self, goal):
+        """Heuristic function node -> lower bound on the cost from node to goal."""
+        goal_costs = self.distances[:, goal[0], goal[1]]
+        costs = self.distances
+
+        def estimate(node):
+            bound = float(np.abs(goal_costs - costs[:, node[0], node[1]]).max())
+            return max(bound, heuristic(node, goal))
+        return estimate
+
+    def save(self, path):
+        np.save(path, self.distances)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        return cls(np.load(path, mmap_mode="r" if mmap else None))
+
+
+def find_path(grid, start, goal, landmarks=None):
+    """Find path from start to goal using Jump Point Search.
+    landmarks: optional GridLandmarks of this grid for a tighter heuristic."""
     if not in_bounds(grid, start) or not in_bounds(grid, goal):
         return None
     if not passable(grid, start) or not passable(grid, goal):
         return None
 
+    if landmarks is not None:
+        estimate = landmarks.bind(goal)
+    else:
+        estimate = lambda node: heuristic(node, goal)
     open_set = []
-    heapq.heappush(open_set, (heuristic(start, goal), 0, start))
+    heapq.heappush(open_set, (estimate(start), 0, start))
     came_from = {}
     g_score = {start: 0}
 
     while open_set:
         _, current_g, current = heapq.heappop(open_set)
+        if current_g > g_score[current]:
+            continue  # stale entry
         if current == goal:
             return reconstruct_path(came_from, start, goal)
 
@@ -116,11 +199,41 @@ def find_path(grid, start, goal):
             tentative_g = g_score[current] + heuristic(current, next_node)
             if tentative_g < g_score.get(next_node, math.inf):
                 g_score[next_node] = tentative_g
-                f_score = tentative_g + heuristic(next_node, goal)
+                f_score = tentative_g + estimate(next_node)
                 heapq.heappush(open_set, (f_score, tentative_g, next_node))
                 came_from[next_node] = current
     return None
 
+def walled_grid(size, seed=0, walls=40, gap=3):
+    """Test grid with long walls that each leave a small gap, so straight-line estimates mislead."""
+    rng = random.Random(seed)
+    grid = [[0] * size for _ in range(size)]
+    for _ in range(walls):
+        x, y0 = rng.randrange(size), rng.randrange(size)
+        length = rng.randrange(size // 4, size)
+        for y in range(y0, min(size, y0 + length)):
+            grid[x][y] = 1
+        opening = rng.randrange(y0, min(size, y0 + length))
+        for y in range(opening, min(size, opening + gap)):
+            grid[x][y] = 0
+    return grid
+
+
+def benchmark(size=200, queries=50, landmarks=8, seed=0):
+    """Query time of Jump Point Search with the diagonal heuristic versus GridLandmarks."""
+    grid = walled_grid(size, seed)
+    rng = random.Random(seed)
+    free = [(x, y) for x in range(size) for y in range(size) if grid[x][y] == 0]
+    pairs = [(rng.choice(free), rng.choice(free)) for _ in range(queries)]
+    start = time.perf_counter()
+    alt = GridLandmarks.build(grid, landmarks)
+    print(f"{size}x{size} walled grid: {landmarks} landmarks in {time.perf_counter() - start:.2f} s")
+    for name, marks in (("diagonal", None), ("landmark", alt)):
+        start = time.perf_counter()
+        for s, g in pairs:
+            find_path(grid, s, g, marks)
+        print(f"  {name} heuristic: {(time.perf_counter() - start) / queries * 1e3:8.2f} ms/query")
+
 # Example usage (commented out to avoid execution during assignment grading)
 # grid = [
 #     [0,0,0,0,0],
@@ -132,4 +245,8 @@ def find_path(grid, start, goal):
 # start = (0,0)
 # goal = (4,4)
 # path = find_path(grid, start, goal)
-# print(path)
\ No newline at end of file
+# print(path)
+# landmarks = GridLandmarks.build(grid, count=4)   # preprocessing, once per grid
+# landmarks.save("/tmp/grid_landmarks.npy"); landmarks = GridLandmarks.load("/tmp/grid_landmarks.npy")
+# print(find_path(grid, start, goal, landmarks))
+# benchmark()
\ No newline at end of file
@@ -0,0 +1,272 @@
+# Compiled multi-pattern matcher: an Aho–Corasick automaton as a dense transition table.
+# The trie of the (byte) patterns is built from the sorted patterns, then compiled level by
+# level with NumPy: every state's row starts as a copy of its failure state's row and its own
+# children are written over it, so the table is the complete DFA and a search never follows
+# a failure link. Bytes that occur in no pattern share one column (alphabet classes), which
+# keeps the table at states x (distinct bytes + 1) int32 entries.
+# Output links point from a state to the nearest state on its failure chain that ends a
+# pattern, and states that end a pattern or have an output link get the highest ids, so the
+# scan loop is one table lookup and one comparison per byte. Table entries are pre-multiplied
+# by the row width, and the text is mapped to classes by bytes.translate in C.
+# A scanner's feed(chunk) keeps the state (and the byte offset) across chunks and yields
+# matches lazily; offsets are byte offsets into the whole stream. A compiled automaton
+# pickles as plain arrays, and save()/load() keep it in a directory of .npy files that
+# load() can memory-map. commentz-walter_algorithm.py offers the same interface.
+# Automata pickle by reference to their class in sys.modules["pattern_matcher"], so the
+# front-ends register this module under that name and reuse it rather than loading it again.
+import os
+import time
+
+import numpy as np
+
+ARRAYS = ("delta", "classes", "state_pattern", "output_link", "next_pattern", "lengths",
+          "pattern_bytes", "pattern_offsets", "meta")
+
+
+def _as_bytes(data):
+    return data.encode() if isinstance(data, str) else bytes(data)
+
+
+def _char_offsets(text, matches):
+    # Byte offsets in text.encode() -> character offsets in text
+    if text.isascii():
+        return matches
+    raw = np.frombuffer(text.encode(), dtype=np.uint8)
+    char_of_byte = np.cumsum((raw & 0xC0) != 0x80) - 1
+    return [(int(char_of_byte[start]), pattern) for start, pattern in matches]
+
+
+class Automaton:
+    """Aho–Corasick automaton compiled to a dense table; patterns are bytes or str (UTF-8)."""
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        encoded = [_as_bytes(p) for p in self.patterns]
+        if any(not p for p in encoded):
+            raise ValueError("patterns must be non-empty")
+        self._compile(encoded)
+
+    def _compile(self, encoded):
+        # Alphabet classes: 0 for bytes in no pattern, 1.. for the others
+        present = np.zeros(256, dtype=bool)
+        for p in encoded:
+            present[np.frombuffer(p, dtype=np.uint8)] = True
+        classes = np.zeros(256, dtype=np.uint8)
+        classes[present] = np.arange(1, present.sum() + 1)
+        width = int(present.sum()) + 1
+
+        # Trie from the sorted patterns: a pattern shares the path of its longest common
+        # prefix with the previous one, so nodes are created without any lookups
+        parent, label, depth = [0], [0], [0]
+        terminal = {}  # node -> pattern ids ending there
+        path, previous = [0], b""
+        for pid in sorted(range(len(encoded)), key=encoded.__getitem__):
+            p = encoded[pid]
+            common = 0
+            limit = min(len(p), len(previous))
+            while common < limit and p[common] == previous[common]:
+                common += 1
+            del path[common + 1:]
+            for ch in p[common:]:
+                parent.append(path[-1])
+                label.append(classes[ch])
+                depth.append(len(path))
+                path.append(len(parent) - 1)
+            terminal.setdefault(path[-1], []).append(pid)
+            previous = p
+        parent, label, depth = (np.array(a, dtype=np.int64) for a in (parent, label, depth))
+        n = len(parent)
+
+        # Complete DFA, level by level
+        delta = np.zeros((n, width), dtype=np.int32)
+        fail = np.zeros(n, dtype=np.int64)
+        is_terminal = np.zeros(n, dtype=bool)
+        is_terminal[list(terminal)] = True
+        output = np.full(n, -1, dtype=np.int64)
+        by_depth = np.argsort(depth, kind="stable")
+        bounds = np.searchsorted(depth[by_depth], np.arange(depth.max() + 2))
+        levels = [by_depth[bounds[d]:bounds[d + 1]] for d in range(len(bounds) - 1)]
+        for d, nodes in enumerate(levels):
+            if d >= 2:
+                fail[nodes] = delta[fail[parent[nodes]], label[nodes]]
+            if d >= 1:
+                delta[nodes] = delta[fail[nodes]]
+                f = fail[nodes]
+                output[nodes] = np.where(is_terminal[f], f, output[f])
+            if d + 1 < len(levels):
+                children = levels[d + 1]
+                delta[parent[children], label[children]] = children
+
+        # Renumber: states that emit matches last, the root stays 0
+        emits = is_terminal | (output >= 0)
+        order = np.concatenate((np.flatnonzero(~emits), np.flatnonzero(emits)))
+        if n * width >= 1 << 31:
+            raise ValueError("automaton too large for an int32 table")
+        new_id = np.empty(n, dtype=np.int32)
+        new_id[order] = np.arange(n)
+        state_pattern = np.full(n, -1, dtype=np.int32)
+        next_pattern = np.full(len(encoded), -1, dtype=np.int32)
+        for node, pids in terminal.items():
+            state_pattern[new_id[node]] = pids[0]
+            next_pattern[pids[:-1]] = pids[1:]
+        output_link = np.where(output >= 0, new_id[np.maximum(output, 0)], -1)[order]
+        lengths = np.array([len(p) for p in encoded], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        self._set_arrays({
+            "delta": (new_id[delta[order]] * np.int32(width)).ravel(),
+            "classes": classes,
+            "state_pattern": state_pattern,
+            "output_link": output_link.astype(np.int32),
+            "next_pattern": next_pattern,
+            "lengths": lengths,
+            "pattern_bytes": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "pattern_offsets": offsets,
+            "meta": np.array([width, int((~emits).sum()) * width, 0 if not self.patterns
+                              or isinstance(self.patterns[0], str) else 1], dtype=np.int64),
+        })
+
+    def _set_arrays(self, arrays):
+        self._arrays = arrays
+        self.width, self.emit_start, raw = (int(x) for x in arrays["meta"])
+        self._delta = memoryview(arrays["delta"])
+        self._table = arrays["classes"].tobytes()
+        self._state_pattern = memoryview(arrays["state_pattern"])
+        self._output_link = memoryview(arrays["output_link"])
+        self._next_pattern = memoryview(arrays["next_pattern"])
+        self._lengths = arrays["lengths"].tolist()
+        if not hasattr(self, "patterns"):
+            data, offsets = arrays["pattern_bytes"].tobytes(), arrays["pattern_offsets"].tolist()
+            self.patterns = [data[a:b] if raw else data[a:b].decode() for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def __getstate__(self):
+        return {name: np.asarray(array) for name, array in self._arrays.items()}
+
+    def __setstate__(self, state):
+        self._set_arrays(state)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name, array in self._arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """An automaton written by save(); mmap=True maps the table instead of reading it."""
+        automaton = cls.__new__(cls)
+        automaton._set_arrays({name: np.load(os.path.join(directory, f"{name}.npy"),
+                                             mmap_mode="r" if mmap else None) for name in ARRAYS})
+        return automaton
+
+    def num_states(self):
+        return len(self._delta) // self.width
+
+    def _emit(self, state, end):
+        # (start, pattern id) of every pattern ending at byte `end` in `state`
+        node = state // self.width
+        if self._state_pattern[node] < 0:
+            node = self._output_link[node]
+        while node >= 0:
+            pid = self._state_pattern[node]
+            while pid >= 0:
+                yield end - self._lengths[pid] + 1, pid
+                pid = self._next_pattern[pid]
+            node = self._output_link[node]
+
+    def finditer(self, data):
+        """(start byte, pattern id) of every occurrence in data (bytes, memoryview or str)."""
+        scanner = self.scanner()
+        yield from scanner.feed(data)
+
+    def search(self, text):
+        """[(start, pattern)] of every occurrence; character offsets for str text."""
+        matches = [(start, self.patterns[pid]) for start, pid in self.finditer(text)]
+        return _char_offsets(text, matches) if isinstance(text, str) else matches
+
+    def scanner(self):
+        return Scanner(self)
+
+
+class Scanner:
+    """Streaming search: feed(chunk) continues where the previous chunk stopped."""
+
+    def __init__(self, automaton):
+        self.automaton = automaton
+        self.state = 0
+        self.offset = 0  # bytes consumed so far
+
+    def feed(self, chunk):
+        """Yields (start byte, pattern id) for every match ending in this chunk; consume it fully before the next feed."""
+        a = self.automaton
+        delta, emit_start, emit = a._delta, a.emit_start, a._emit
+        data = _as_bytes(chunk) if isinstance(chunk, str) else chunk
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        base, state = self.offset, self.state
+        self.offset += len(data)
+        for i, c in enumerate(data.translate(a._table)):
+            state = delta[state + c]
+            if state >= emit_start:
+                self.state = state
+                yield from emit(state, base + i)
+        self.state = state
+
+
+class OverlapScanner:
+    """feed(chunk) for matchers without a carried state: the last max_length - 1 bytes are rescanned."""
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.keep = max(matcher.lengths, default=1) - 1
+        self.tail = b""
+        self.offset = 0  # stream offset of tail[0]
+
+    def feed(self, chunk):
+        data = self.tail + _as_bytes(chunk)
+        base, old = self.offset, len(self.tail)
+        for start, pid in self.matcher.finditer(data):
+            if start + self.matcher.lengths[pid] > old:  # not reported with the previous chunk
+                yield base + start, pid
+        self.tail = data[len(data) - min(self.keep, len(data)):]
+        self.offset = base + len(data) - len(self.tail)
+
+
+def benchmark(num_patterns=100_000, text_bytes=1 << 22, seed=0):
+    """Compile random log tokens and scan a synthetic log, in memory, streamed and memory-mapped."""
+    import pickle
+    import tempfile
+    rng = np.random.default_rng(seed)
+    alphabet = np.frombuffer(b"abcdefghijklmnopqrstuvwxyz0123456789_-", dtype=np.uint8)
+    patterns = list({alphabet[rng.integers(0, len(alphabet), rng.integers(6, 16))].tobytes()
+                     for _ in range(num_patterns)})
+    words = [patterns[i] if rng.random() < 0.05 else alphabet[rng.integers(0, len(alphabet), 8)].tobytes()
+             for i in rng.integers(0, len(patterns), text_bytes // 9)]
+    text = b" ".join(words)
+    start = time.perf_counter()
+    automaton = Automaton(patterns)
+    print(f"{len(patterns)} patterns: compiled in {time.perf_counter() - start:.2f} s, "
+          f"{automaton.num_states()} states x {automaton.width} classes "
+          f"({len(automaton._delta) * 4 >> 20} MiB table)")
+    start = time.perf_counter()
+    count = sum(1 for _ in automaton.finditer(text))
+    elapsed = time.perf_counter() - start
+    print(f"  scan {len(text) >> 20} MiB: {elapsed:.2f} s ({len(text) / elapsed / 1e6:.1f} MB/s), {count} matches")
+    scanner = automaton.scanner()
+    streamed = sum(1 for lo in range(0, len(text), 1 << 16) for _ in scanner.feed(text[lo:lo + (1 << 16)]))
+    print(f"  streamed in 64 KiB chunks: {streamed} matches")
+    with tempfile.TemporaryDirectory() as directory:
+        automaton.save(directory)
+        start = time.perf_counter()
+        mapped = Automaton.load(directory)
+        print(f"  mmap load {time.perf_counter() - start:.3f} s, "
+              f"same matches: {sum(1 for _ in mapped.finditer(text[:1 << 20])) == sum(1 for _ in automaton.finditer(text[:1 << 20]))}")
+    start = time.perf_counter()
+    pickle.loads(pickle.dumps(automaton))
+    print(f"  pickle round trip {time.perf_counter() - start:.3f} s")
+
+# Example usage:
+if __name__ == "__main__":
+    ac = Automaton(["he", "she", "his", "hers"])
+    print(ac.search("ushers"))  # [(1, 'she'), (2, 'he'), (2, 'hers')]
+    scanner = ac.scanner()
+    print([m for chunk in (b"ush", b"ers") for m in scanner.feed(chunk)])  # [(1, 1), (2, 0), (2, 3)]
+    benchmark(num_patterns=20_000, text_bytes=1 << 20)
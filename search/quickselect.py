@@ -1,33 +1,38 @@
 # Quickselect algorithm: find the kth smallest element in an unordered list
+# Works on a copy (three-way partition around the middle element, so runs of equal keys
+# end the search at once); order_statistics.py uses it as an exact fallback for keys NumPy
+# cannot hold.
 def quickselect(arr, k):
     if not 1 <= k <= len(arr):
         raise ValueError("k is out of bounds")
-    return _quickselect(arr, 0, len(arr) - 1, k - 1)
+    return _quickselect(list(arr), 0, len(arr) - 1, k - 1)
 
 def _quickselect(lst, left, right, k_index):
-    if left == right:
-        return lst[left]
-    pivot_index = _partition(lst, left, right)
-    if pivot_index == k_index:
-        return lst[pivot_index]
-    elif pivot_index > k_index:
-        return _quickselect(lst, left, pivot_index - 1, k_index)
-    else:
-        return _quickselect(lst, pivot_index + 1, right, k_index)
+    while left < right:
+        lt, gt = _partition(lst, left, right)
+        if k_index < lt:
+            right = lt - 1
+        elif k_index > gt:
+            left = gt + 1
+        else:
+            return lst[k_index]
+    return lst[left]
 
 def _partition(lst, left, right):
+    # lst[left:lt] < pivot, lst[lt:gt+1] == pivot, lst[gt+1:right+1] > pivot
     pivot = lst[(left + right) // 2]
-    i = left
-    j = right
-    while i <= j:
-        while lst[i] < pivot:
+    lt, i, gt = left, left, right
+    while i <= gt:
+        if lst[i] < pivot:
+            lst[lt], lst[i] = lst[i], lst[lt]
+            lt += 1
             i += 1
-        while lst[j] > pivot:
-            j -= 1
-        if i <= j:
-            lst[i], lst[j] = lst[j], lst[i]
+        elif pivot < lst[i]:
+            lst[gt], lst[i] = lst[i], lst[gt]
+            gt -= 1
+        else:
             i += 1
-            j -= 1
-    # correspond to the pivot position after partitioning.
-    return i
-# desirable for callers expecting the input list to remain unchanged.
\ No newline at end of file
+    return lt, gt
+
+# Example usage:
+# print(quickselect([3, 1, 4, 1, 5, 9, 2, 6, 5], 4))  # 3
@@ -1,25 +1,29 @@
 # Batcher odd–even mergesort (construction of sorting networks of size O(n(log n)²) and depth O((log n)²))
 # The code builds a comparison network and applies it to a list to sort it.
+# The network comes from sorting_network.py (generated once per size and cached);
+# batcher_sort_rows runs it over every row of a 2-D NumPy array at once.
+import importlib.util
+import os
+import sys
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "sorting_network" in sys.modules:
+        return sys.modules["sorting_network"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sorting_network.py")
+    spec = importlib.util.spec_from_file_location("sorting_network", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
 
 def odd_even_merge_sort(n, offset=0):
-    network = []
-    if n > 1:
-        k = n // 2
-        network += odd_even_merge_sort(k, offset)
-        network += odd_even_merge_sort(n - k, offset + k)
-        network += odd_even_merge(n, offset)
-    return network
-
-def odd_even_merge(n, offset=0):
-    network = []
-    if n > 1:
-        step = n // 2
-        for i in range(offset + step, offset + n, step):
-            if i - step >= offset:
-                network.append((i - step, i))
-        network += odd_even_merge(step, offset)
-        network += odd_even_merge(step, offset + step)
-    return network
+    return [(i + offset, j + offset) for i, j in engine.comparators("batcher", n)]
 
 def apply_network(arr, network):
     for i, j in network:
@@ -30,4 +34,12 @@ def apply_network(arr, network):
 def batcher_sort(arr):
     n = len(arr)
     network = odd_even_merge_sort(n)
-    return apply_network(arr, network)
\ No newline at end of file
+    return apply_network(arr, network)
+
+def batcher_sort_rows(keys, payload=()):
+    """Sort every row of a (batch x width) array; payload arrays are permuted alongside."""
+    return engine.sort_rows(keys, "batcher", payload)
+
+# Example usage:
+# print(batcher_sort([5, 2, 9, 1, 5, 6]))  # [1, 2, 5, 5, 6, 9]
+# batcher_sort_rows(np.random.random((10**6, 16)))  # a million 16-element rows at once
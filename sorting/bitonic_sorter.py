@@ -1,4 +1,25 @@
 # Bitonic Sorter: recursively sort subarrays into bitonic sequences and merge.
+# sort() needs a power-of-two length; bitonic_sort_rows runs the cached network of
+# sorting_network.py (any width) over every row of a 2-D NumPy array at once.
+import importlib.util
+import os
+import sys
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "sorting_network" in sys.modules:
+        return sys.modules["sorting_network"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sorting_network.py")
+    spec = importlib.util.spec_from_file_location("sorting_network", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
 
 def compare_and_swap(arr, i, j, dir):
     """Swap elements if they are not in the desired order."""
@@ -26,7 +47,12 @@ def sort(arr, dir=1):
     """Public interface: sort the entire list in ascending (dir=1) or descending."""
     bitonic_sort(arr, 0, len(arr), dir)
 
+def bitonic_sort_rows(keys, payload=()):
+    """Sort every row of a (batch x width) array; payload arrays are permuted alongside."""
+    return engine.sort_rows(keys, "bitonic", payload)
+
 # Example usage (uncomment for testing)
 # data = [3, 7, 4, 8, 6, 2, 1, 5]
 # sort(data)
-# print(data)
\ No newline at end of file
+# print(data)
+# bitonic_sort_rows(np.array([[3, 1, 2], [9, 7, 8]]))  # [[1 2 3] [7 8 9]]
\ No newline at end of file
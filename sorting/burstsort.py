@@ -1,56 +1,81 @@
 # Burstsort: a cache-efficient algorithm for sorting strings
 # The algorithm uses a burst trie to group strings by common prefixes
 # and recursively sorts buckets when they exceed a threshold.
-
-import math
-from collections import defaultdict
+# This is an MSD radix sort over bytes: a trie node is a list of 257 slots, slot 0 holding
+# the strings that end at this depth and slot 1 + b the child for byte b. A child starts as
+# a bucket (a plain list); a bucket that grows past bucket_size bursts into a node, and its
+# strings move one byte down. Buckets are small, share their prefix, and are sorted with
+# list.sort at the end, so the trie walk stays in cache. str input is sorted through UTF-8,
+# whose byte order is code point order.
 
 class BurstSort:
     def __init__(self, bucket_size=64):
         self.bucket_size = bucket_size
-        self.root = {}
+        self.root = self._node()
 
-    def sort(self, strings):
-        self._insert_batch(self.root, strings, 0)
-        result = []
-        self._collect(self.root, result, '')
-        return result
+    @staticmethod
+    def _node():
+        node = [None] * 257
+        node[0] = []
+        return node
 
-    def _insert_batch(self, node, strings, depth):
-        bucket = node.get('_bucket', [])
+    def sort(self, strings):
+        strings = list(strings)
+        text = bool(strings) and isinstance(strings[0], str)
         for s in strings:
-            bucket.append(s)
-        node['_bucket'] = bucket
+            self.insert(s.encode() if text else s)
+        result = []
+        self._collect(self.root, result)
+        self.root = self._node()
+        return [s.decode() for s in result] if text else result
 
-        if len(bucket) > self.bucket_size:
-            # existing children. This can cause the bucket to never exceed
-            # the threshold in some cases.
-            self._burst(node, depth)
+    def insert(self, s):
+        node, depth = self.root, 0
+        while True:
+            if depth == len(s):
+                node[0].append(s)
+                return
+            slot = 1 + s[depth]
+            child = node[slot]
+            if child is None:
+                node[slot] = [s]
+                return
+            if isinstance(child[0], list):
+                node, depth = child, depth + 1  # a trie node: descend
+                continue
+            child.append(s)
+            if len(child) > self.bucket_size:
+                node[slot] = self._burst(child, depth + 1)
+            return
 
-    def _burst(self, node, depth):
-        bucket = node.pop('_bucket')
-        children = defaultdict(list)
+    def _burst(self, bucket, depth):
+        # Turn a full bucket into a node, distributing its strings on the byte at depth
+        node = self._node()
         for s in bucket:
-            if depth < len(s):
-                key = s[depth]
+            if depth == len(s):
+                node[0].append(s)
             else:
-                key = ''
-            children[key].append(s)
-        for key, sublist in children.items():
-            child_node = node.setdefault(key, {})
-            self._insert_batch(child_node, sublist, depth + 1)
+                slot = 1 + s[depth]
+                if node[slot] is None:
+                    node[slot] = []
+                node[slot].append(s)
+        for slot in range(1, 257):
+            child = node[slot]
+            if child is not None and len(child) > self.bucket_size:
+                node[slot] = self._burst(child, depth + 1)
+        return node
 
-    def _collect(self, node, result, prefix):
-        for key, child in node.items():
-            if key == '_bucket':
-                for s in child:
-                    # prefix has been concatenated properly. This may
-                    # duplicate parts of the string.
-                    result.append(prefix + s)
+    def _collect(self, node, result):
+        stack = [node]
+        while stack:
+            item = stack.pop()
+            if isinstance(item[0], list):
+                result.extend(item[0])  # equal strings, in insertion order
+                stack.extend(child for child in reversed(item[1:]) if child is not None)
             else:
-                self._collect(child, result, prefix + key)
+                result.extend(sorted(item))
 
 # Example usage:
 # sorter = BurstSort()
 # sorted_strings = sorter.sort(["banana", "apple", "apricot", "cherry"])
-# print(sorted_strings)
\ No newline at end of file
+# print(sorted_strings)  # ['apple', 'apricot', 'banana', 'cherry']
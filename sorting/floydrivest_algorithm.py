@@ -1,7 +1,10 @@
 # Floyd–Rivest algorithm (selection algorithm)
 # Select the k-th smallest element in an array in expected linear time.
+# On ranges longer than 600 elements, a sample is recursively selected first to find two
+# elements that tightly bracket the k-th one; partitioning around the sample's k-th element
+# then leaves only a small range around k (n + min(k, n - k) + o(n) comparisons expected).
+# Works on a copy; order_statistics.py uses it as an exact fallback for keys NumPy cannot hold.
 
-import random
 import math
 
 def floyd_rivest_select(A, k):
@@ -11,61 +14,43 @@ def floyd_rivest_select(A, k):
     """
     if not 0 <= k < len(A):
         raise ValueError("k out of bounds")
-    lo, hi = 0, len(A) - 1
-    while lo < hi:
-        # choose two pivots p and r using a deterministic formula
-        r = lo + (hi - lo) // 2
-        p = lo + int((hi - lo) * (k - lo) / (hi - lo + 1))
-        if p < lo or p > hi or r < lo or r > hi:
-            p, r = lo, hi
-        if p > r:
-            p, r = r, p
-        # perform the partitioning around p and r
-        l, m, n = _partition(A, lo, hi, p, r)
-        # after partitioning, l <= k <= m-1  (k lies in the left part)
-        # or m <= k <= n-1  (k lies in the middle part)
-        # or n <= k <= hi   (k lies in the right part)
-        if k < l:
-            hi = l - 1
-        elif k > n:
-            lo = n + 1
-        else:
-            # k is within the middle segment
-            return A[k]
-    return A[lo]
+    A = list(A)
+    _select(A, 0, len(A) - 1, k)
+    return A[k]
 
-def _partition(A, lo, hi, p, r):
-    """
-    Partition A[lo:hi+1] using two pivots at indices p and r.
-    Returns the indices l, m, n such that:
-        A[lo:l] <= piv1
-        A[l:m]  == piv1
-        A[m:n]  >= piv1 and <= piv2
-        A[n:hi+1] >= piv2
-    """
-    if p > r:
-        p, r = r, p
-    pivot1 = A[p]
-    pivot2 = A[r]
-    # move pivots to the ends
-    A[p], A[lo] = A[lo], A[p]
-    A[r], A[hi] = A[hi], A[r]
-    i = lo + 1
-    j = hi - 1
-    l = lo
-    n = hi
-    while i <= j:
-        while i <= j and A[i] < pivot1:
-            i += 1
-        while i <= j and A[j] > pivot2:
-            j -= 1
-        if i <= j:
+def _select(A, lo, hi, k):
+    while hi > lo:
+        if hi - lo > 600:
+            # Narrow [lo, hi] to a sample range expected to contain the k-th element
+            n = hi - lo + 1
+            i = k - lo + 1
+            z = math.log(n)
+            s = 0.5 * math.exp(2 * z / 3)
+            sd = 0.5 * math.sqrt(z * s * (n - s) / n) * (1 if i > n / 2 else -1 if i < n / 2 else 0)
+            _select(A, max(lo, int(k - i * s / n + sd)), min(hi, int(k + (n - i) * s / n + sd)), k)
+        t = A[k]
+        i, j = lo, hi
+        A[lo], A[k] = A[k], A[lo]
+        if t < A[hi]:
+            A[hi], A[lo] = A[lo], A[hi]
+        while i < j:
             A[i], A[j] = A[j], A[i]
             i += 1
             j -= 1
-    # restore pivots
-    l = j + 1
-    A[lo], A[l] = A[l], A[lo]
-    n = i
-    A[hi], A[n] = A[n], A[hi]
-    return lo, l, n
\ No newline at end of file
+            while A[i] < t:
+                i += 1
+            while t < A[j]:
+                j -= 1
+        if A[lo] == t:
+            A[lo], A[j] = A[j], A[lo]
+        else:
+            j += 1
+            A[j], A[hi] = A[hi], A[j]
+        # A[j] == t is in its final place
+        if j <= k:
+            lo = j + 1
+        if k <= j:
+            hi = j - 1
+
+# Example usage:
+# print(floyd_rivest_select([7, 2, 9, 4, 1, 8], 2))  # 4
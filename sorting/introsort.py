@@ -15,9 +15,10 @@ def _introsort_helper(arr, start, end, depth_limit):
         _heapsort(arr, start, end)
         return
     pivot = _median_of_three(arr, start, end)
-    p = _partition(arr, start, end, pivot)
-    _introsort_helper(arr, start, p, depth_limit - 1)
-    _introsort_helper(arr, p + 1, end, depth_limit - 1)
+    i, j = _partition(arr, start, end, pivot)
+    # arr[start:j+1] <= pivot, arr[j+1:i] == pivot, arr[i:end] >= pivot
+    _introsort_helper(arr, start, j + 1, depth_limit - 1)
+    _introsort_helper(arr, i, end, depth_limit - 1)
 
 def _median_of_three(arr, start, end):
     mid = (start + end) // 2
@@ -42,7 +43,7 @@ def _partition(arr, start, end, pivot):
             arr[i], arr[j] = arr[j], arr[i]
             i += 1
             j -= 1
-    return j
+    return i, j
 
 def _heapsort(arr, start, end):
     n = end - start
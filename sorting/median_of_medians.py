@@ -9,8 +9,7 @@ def select(arr, k):
     """
     # Base case: small lists can be sorted directly.
     if len(arr) <= 5:
-        arr.sort()
-        return arr[k]
+        return sorted(arr)[k - 1]
 
     # Divide arr into groups of at most 5
     medians = []
@@ -5,7 +5,7 @@ def merge_sort(arr):
         return arr
     mid = len(arr) // 2
     left = arr[:mid]
-    right = arr[mid+1:]
+    right = arr[mid:]
     left_sorted = merge_sort(left)
     right_sorted = merge_sort(right)
     return merge(left_sorted, right_sorted)
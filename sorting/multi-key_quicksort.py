@@ -1,26 +1,49 @@
 # Multi-key quicksort
 # Idea: recursively sort an array of strings by comparing characters at increasing depth.
+# Works on bytes or str; a string that ends before `depth` sorts before every character.
+# Ranges are kept on an explicit stack (no recursion limit), and ranges of at most SMALL
+# strings, which all share their first `depth` characters, are finished with list.sort.
+# This is the bucket sort used at the leaves of an MSD radix sort (see burstsort.py).
+SMALL = 16
+
+
 def mqs(arr, lo=0, hi=None, depth=0):
     if hi is None:
         hi = len(arr)
     if hi - lo <= 1:
         return
-    # Choose pivot character at current depth from middle element
-    pivot = arr[(lo + hi) // 2][depth]
-    lt = lo
-    i = lo
-    gt = hi - 1
-    while i <= gt:
-        c = arr[i][depth]
-        if c < pivot:
-            arr[lt], arr[i] = arr[i], arr[lt]
-            lt += 1
-            i += 1
-        elif c > pivot:
-            arr[gt], arr[i] = arr[i], arr[gt]
-            gt -= 1
-        else:
-            i += 1
-    mqs(arr, lo, lt, depth)
-    mqs(arr, lt, gt, depth + 1)
-    mqs(arr, gt, hi, depth)
\ No newline at end of file
+    end = "" if isinstance(arr[lo], str) else -1  # compares below any character
+    stack = [(lo, hi, depth)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi - lo <= SMALL:
+            arr[lo:hi] = sorted(arr[lo:hi])
+            continue
+        # Choose pivot character at current depth from middle element
+        s = arr[(lo + hi) // 2]
+        pivot = s[depth] if depth < len(s) else end
+        lt = lo
+        i = lo
+        gt = hi - 1
+        while i <= gt:
+            s = arr[i]
+            c = s[depth] if depth < len(s) else end
+            if c < pivot:
+                arr[lt], arr[i] = arr[i], arr[lt]
+                lt += 1
+                i += 1
+            elif c > pivot:
+                arr[gt], arr[i] = arr[i], arr[gt]
+                gt -= 1
+            else:
+                i += 1
+        stack.append((lo, lt, depth))
+        if pivot != end:  # strings that ended here are all equal
+            stack.append((lt, gt + 1, depth + 1))
+        stack.append((gt + 1, hi, depth))
+
+
+# Example usage:
+# words = [b"banana", b"apple", b"apricot", b"app", b"cherry"]
+# mqs(words)
+# print(words)  # [b'app', b'apple', b'apricot', b'banana', b'cherry']
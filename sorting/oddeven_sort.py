@@ -1,4 +1,26 @@
 # Odd–Even sort: repeatedly compare and swap odd/even indexed pairs of adjacent elements
+# n rounds always suffice, so the same compare-swaps form a sorting network (odd-even
+# transposition); odd_even_sort_rows runs it over every row of a 2-D NumPy array at once.
+import importlib.util
+import os
+import sys
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "sorting_network" in sys.modules:
+        return sys.modules["sorting_network"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sorting_network.py")
+    spec = importlib.util.spec_from_file_location("sorting_network", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
+
 def odd_even_sort(arr):
     n = len(arr)
     swapped = True
@@ -6,15 +28,20 @@ def odd_even_sort(arr):
         swapped = False
         # Odd indexed pass
         for i in range(1, n-1, 2):
-            if arr[i] < arr[i+1]:
+            if arr[i] > arr[i+1]:
                 arr[i], arr[i+1] = arr[i+1], arr[i]
                 swapped = True
         # Even indexed pass
-        for i in range(0, n, 2):
+        for i in range(0, n-1, 2):
             if arr[i] > arr[i+1]:
                 arr[i], arr[i+1] = arr[i+1], arr[i]
                 swapped = True
     return arr
 
+def odd_even_sort_rows(keys, payload=()):
+    """Sort every row of a (batch x width) array; payload arrays are permuted alongside."""
+    return engine.sort_rows(keys, "transposition", payload)
+
 # Example usage:
-# data = [5, 3, 8, 4, 2]
\ No newline at end of file
+# data = [5, 3, 8, 4, 2]
+# print(odd_even_sort(data))  # [2, 3, 4, 5, 8]
\ No newline at end of file
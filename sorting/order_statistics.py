@@ -0,0 +1,301 @@
+# Order statistics over streams and arrays: quantiles, top-k and exact selection.
+#  - KLLSketch: the KLL quantile sketch (Karnin, Lang and Liberty, 2016). Items sit in
+#    levels of "compactors", an item on level h standing for 2^h stream items. A full level
+#    is sorted and every other item (random offset) is promoted, halving it; capacities
+#    shrink by 2/3 per level below the top, and levels are only compacted once the whole
+#    sketch is over its total capacity (about 3k items), so a quantile is off by about 1/k
+#    in rank. Sketches merge level by level (e.g. one per shard or
+#    per minute), batches go in as NumPy arrays, and the state pickles as plain arrays.
+#  - TopK: the k largest (or smallest) items of a stream in a bounded heap; NumPy batches
+#    are cut down with np.argpartition before they touch the heap.
+#  - select / select_rows / top_k_array: exact selection of many ranks at once with
+#    np.partition (introselect in C), for data already in memory. Keys NumPy cannot hold
+#    exactly (sort_engine.key_array decides) fall back to the Python selection algorithms of
+#    this repository (loaded by path).
+# one-pass_algorithm.StreamingMedian keeps every item; use KLLSketch when the stream is unbounded.
+import functools
+import heapq
+import importlib.util
+import itertools
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FALLBACKS = {  # method: (path, function, rank of the smallest element)
+    "introselect": (os.path.join(HERE, "..", "search", "introselect.py"), "introselect", 1),
+    "quickselect": (os.path.join(HERE, "..", "search", "quickselect.py"), "quickselect", 1),
+    "floyd-rivest": (os.path.join(HERE, "floydrivest_algorithm.py"), "floyd_rivest_select", 0),
+    "median-of-medians": (os.path.join(HERE, "median_of_medians.py"), "select", 1),
+}
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "sort_engine" in sys.modules:
+        return sys.modules["sort_engine"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sort_engine.py")
+    spec = importlib.util.spec_from_file_location("sort_engine", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
+
+@functools.lru_cache(maxsize=None)
+def _fallback(method):
+    if method not in FALLBACKS:
+        raise ValueError(f"method must be one of {tuple(FALLBACKS)}, not {method!r}")
+    path, name, base = FALLBACKS[method]
+    spec = importlib.util.spec_from_file_location(os.path.basename(path)[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    fn = getattr(module, name)
+    return lambda data, k: fn(data, k + base)
+
+
+def select(data, kth, method="introselect"):
+    """
+    Exact k-th smallest element(s), k zero-based; kth may be an int or a sequence of ranks.
+    Data that converts exactly to a fixed-width array goes through one np.partition call for
+    all ranks; anything else through `method` of FALLBACKS (each rank on a copy of the data).
+    """
+    single = np.ndim(kth) == 0
+    ranks = [int(kth)] if single else [int(k) for k in kth]
+    n = len(data)
+    ranks = [k + n if k < 0 else k for k in ranks]
+    if any(not 0 <= k < n for k in ranks):
+        raise ValueError("k out of bounds")
+    values = engine.key_array(data)
+    if values is not None:
+        result = np.partition(values, ranks)[ranks]
+    else:
+        result = [_fallback(method)(data, k) for k in ranks]
+    return result[0] if single else result
+
+
+def quantile_ranks(n, qs):
+    """Zero-based ranks of the "lower" quantiles qs (like np.quantile(method="lower"))."""
+    return [min(n - 1, max(0, math.floor(q * (n - 1)))) for q in qs]
+
+
+def quantiles(data, qs=(0.5, 0.95, 0.99), method="introselect"):
+    """Exact quantiles (the element at the lower rank) of data held in memory."""
+    return select(data, quantile_ranks(len(data), qs), method)
+
+
+def select_rows(matrix, kth):
+    """The k-th smallest element of every row (kth an int or a sequence: batch x len(kth))."""
+    matrix = np.asarray(matrix)
+    return np.partition(matrix, kth, axis=1)[:, kth]
+
+
+def top_k_array(values, k, largest=True):
+    """Indices of the k largest (or smallest) values, best first; np.argpartition then a small sort."""
+    values = np.asarray(values)
+    n = len(values)
+    k = min(k, n)
+    if k == 0:
+        return np.zeros(0, dtype=np.intp)
+    if not largest:
+        part = np.sort(np.argpartition(values, k - 1)[:k])  # equal values stay in index order
+        return part[np.argsort(values[part], kind="stable")]
+    # The top k sit at positions n - k.. of the partition (no negation: it overflows for the
+    # most negative int and is undefined for bool); equal values stay in index order
+    part = np.sort(np.argpartition(values, n - k)[n - k:])
+    return part[(k - 1 - np.argsort(values[part][::-1], kind="stable"))[::-1]]
+
+
+class TopK:
+    """The k largest (largest=False: smallest) items seen, in a min-heap of k entries."""
+
+    def __init__(self, k, key=None, largest=True):
+        self.k = k
+        self.key = key
+        self.largest = largest
+        self.heap = []  # (signed key, arrival, item): the root is the first to drop out
+        self._arrival = itertools.count()
+
+    def _entry(self, item):
+        key = item if self.key is None else self.key(item)
+        return (key if self.largest else _Reversed(key), next(self._arrival), item)
+
+    def push(self, item):
+        entry = self._entry(item)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif self.k and entry[0] > self.heap[0][0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def push_many(self, items):
+        if isinstance(items, np.ndarray) and self.key is None and items.ndim == 1:
+            # Only the k best of a batch can enter the heap
+            items = items[top_k_array(items, self.k, self.largest)]
+        for item in items.tolist() if isinstance(items, np.ndarray) else items:
+            self.push(item)
+
+    def merge(self, other):
+        for _, _, item in other.heap:
+            self.push(item)
+        return self
+
+    def items(self):
+        """The kept items, best first."""
+        return [item for _, _, item in sorted(self.heap, key=lambda e: (e[0], -e[1]), reverse=True)]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+@functools.total_ordering
+class _Reversed:
+    # Key wrapper that inverts comparisons, so the same min-heap keeps the smallest items
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+
+class KLLSketch:
+    """Mergeable quantile sketch of a stream of numbers; k sets the accuracy (rank error ~1/k)."""
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.zeros(0)]  # levels[h]: items of weight 2^h
+        self.buffer = []  # scalars not yet moved into levels[0]
+        self.rng = np.random.default_rng(seed)
+        self._sorted = None  # (values, cumulative weights), rebuilt after updates
+
+    def _capacity(self, h):
+        depth = len(self.levels) - 1 - h
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def update(self, value):
+        self.buffer.append(value)
+        if len(self.buffer) >= self.k:
+            self._flush()
+
+    def update_many(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values):
+            self._flush()
+            self.levels[0] = np.concatenate((self.levels[0], values))
+            self.n += len(values)
+            self._compress()
+
+    def _flush(self):
+        if self.buffer:
+            buffered, self.buffer = self.buffer, []
+            self.update_many(buffered)
+
+    def _compress(self):
+        # Lazy compaction: while the sketch holds more than its total capacity, compact the
+        # lowest level that is over its own capacity
+        self._sorted = None
+        while sum(map(len, self.levels)) > sum(map(self._capacity, range(len(self.levels)))):
+            h = next(h for h, level in enumerate(self.levels) if len(level) > self._capacity(h))
+            if h + 1 == len(self.levels):
+                self.levels.append(np.zeros(0))
+            level = np.sort(self.levels[h])
+            keep = level[:len(level) % 2]  # an odd item stays behind
+            promoted = level[len(keep):][int(self.rng.integers(2))::2]
+            self.levels[h] = keep
+            self.levels[h + 1] = np.concatenate((self.levels[h + 1], promoted))
+
+    def merge(self, other):
+        """Add another sketch's items (level by level) to this one; other is left unchanged."""
+        self._flush()
+        other._flush()
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.zeros(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate((self.levels[h], level))
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _cdf(self):
+        self._flush()
+        if self._sorted is None:
+            values = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(level), 1 << h, dtype=np.int64)
+                                      for h, level in enumerate(self.levels)])
+            order = np.argsort(values, kind="stable")
+            self._sorted = values[order], np.cumsum(weights[order])
+        return self._sorted
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs=(0.5, 0.95, 0.99)):
+        """Approximate quantiles: the smallest retained item whose weighted rank reaches q * n."""
+        values, cumulative = self._cdf()
+        if not len(values):
+            raise ValueError("quantile of an empty sketch")
+        targets = np.clip(np.asarray(qs, dtype=np.float64), 0, 1) * cumulative[-1]
+        index = np.minimum(np.searchsorted(cumulative, targets, side="left"), len(values) - 1)
+        return values[index]
+
+    def rank(self, value):
+        """Approximate fraction of the stream that is <= value."""
+        values, cumulative = self._cdf()
+        i = np.searchsorted(values, value, side="right")
+        return float(cumulative[i - 1]) / cumulative[-1] if i else 0.0
+
+    def __len__(self):
+        return self.n + len(self.buffer)
+
+    def size(self):
+        """Items retained by the sketch (its memory footprint)."""
+        return sum(len(level) for level in self.levels) + len(self.buffer)
+
+
+def benchmark(n=10**7, k=200, batch=1 << 16, qs=(0.5, 0.95, 0.99)):
+    """Compare KLLSketch and TopK on a stream with exact np.partition answers."""
+    rng = np.random.default_rng(0)
+    data = rng.lognormal(0, 1, n)
+    start = time.perf_counter()
+    shards = [KLLSketch(k, seed=i) for i in range(4)]
+    top = TopK(10)
+    for i, lo in enumerate(range(0, n, batch)):
+        shards[i % 4].update_many(data[lo:lo + batch])
+        top.push_many(data[lo:lo + batch])
+    sketch = shards[0]
+    for other in shards[1:]:
+        sketch.merge(other)
+    approx = sketch.quantiles(qs)
+    stream_time = time.perf_counter() - start
+    start = time.perf_counter()
+    exact = quantiles(data, qs)
+    exact_time = time.perf_counter() - start
+    errors = [abs(float(np.mean(data <= a)) - q) for a, q in zip(approx, qs)]
+    print(f"{n} values, batches of {batch}, 4 merged shards of k={k} ({sketch.size()} items kept)")
+    print(f"  streaming: {stream_time:6.2f} s  quantiles {np.round(approx, 4)}  max rank error {max(errors):.4f}")
+    print(f"  exact:     {exact_time:6.2f} s  quantiles {np.round(exact, 4)}")
+    print(f"  top-10 matches np.partition: {np.allclose(top.items(), data[top_k_array(data, 10)])}")
+
+# Example usage:
+if __name__ == "__main__":
+    latencies = KLLSketch(seed=0)
+    for x in np.random.default_rng(1).exponential(20, 100000):
+        latencies.update(x)
+    print(latencies.quantiles())  # ~[13.9, 59.9, 92.1]
+    print(select([7, 2, 9, 4, 1, 8], [0, 2, 5]))  # [1 4 9]
+    print(select(["pear", "fig", "apple"], 0))  # apple (introselect fallback)
+    words = TopK(2, key=len)
+    words.push_many(["a", "abc", "ab", "abcd"])
+    print(words.items())  # ['abcd', 'abc']
+    benchmark(n=10**6)
@@ -1,21 +1,38 @@
-# Pairwise Sorting Network (4-element) – uses fixed sequence of compare–swap operations
-# to sort any list of four numbers, independent of the input values.
+# Pairwise Sorting Network (Parberry) – uses fixed sequence of compare–swap operations
+# to sort any list of n numbers, independent of the input values. Pairs are sorted first,
+# then merged level by level; the network is generated once per size (sorting_network.py)
+# and pairwise_sort_rows runs it over every row of a 2-D NumPy array at once.
+import importlib.util
+import os
+import sys
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "sorting_network" in sys.modules:
+        return sys.modules["sorting_network"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sorting_network.py")
+    spec = importlib.util.spec_from_file_location("sorting_network", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
 
 def pairwise_sort(arr):
-    a, b, c, d = arr
-
-    # Stage 1: compare and swap adjacent pairs
-    if a > b:
-        a, b = b, a
-    if c > d:
-        c, d = d, c
-    if b > c:
-        a, c = c, a
-    if b > d:
-        b, d = d, b
-
-    # Stage 3: final compare between middle elements
-    if a > c:
-        b, c = c, b
-
-    return [a, b, c, d]
\ No newline at end of file
+    arr = list(arr)
+    for i, j in engine.comparators("pairwise", len(arr)):
+        if arr[i] > arr[j]:
+            arr[i], arr[j] = arr[j], arr[i]
+    return arr
+
+def pairwise_sort_rows(keys, payload=()):
+    """Sort every row of a (batch x width) array; payload arrays are permuted alongside."""
+    return engine.sort_rows(keys, "pairwise", payload)
+
+# Example usage:
+# print(pairwise_sort([4, 3, 1, 2]))  # [1, 2, 3, 4]
+# pairwise_sort_rows(np.random.random((10**6, 8)))
@@ -1,27 +1,157 @@
-# Powersort - a divide and conquer sorting algorithm that partitions around a pivot
-def powersort(arr, low=0, high=None):
-    if high is None:
-        high = len(arr) - 1
-    if low < high:
-        pivot_index = partition(arr, low, high)
-        powersort(arr, low, pivot_index - 2)
-        powersort(arr, pivot_index + 1, high)
-
-def partition(arr, low, high):
-    pivot = arr[(low + high) // 2]
-    i = low
-    j = high
-    while True:
-        while arr[i] < pivot:
-            i += 1
-        while arr[j] > pivot:
-            j -= 1
-        if i >= j:
-            return j
-        arr[i], arr[j] = arr[j], arr[i]
-        i += 1
-        j -= 1
+# Powersort - a stable, adaptive merge sort over natural runs (Munro and Wild, 2018)
+# The input is scanned left to right for runs (non-decreasing, or strictly decreasing and
+# reversed in place); runs shorter than MIN_RUN are extended with insertion sort. For each
+# boundary between consecutive runs the "power" is the depth at which the boundary would
+# split the two run midpoints in a perfectly balanced merge tree over [0, n). Runs wait on a
+# stack, and before a boundary of power p is pushed every stacked boundary of power > p is
+# merged, so the merge tree is nearly optimal for the run lengths found (O(n + n H) for run
+# length entropy H). This is the merge policy of CPython's list.sort since 3.11.
+# powersort_array applies the same policy to the non-decreasing runs of a NumPy array; each
+# merge is one np.sort(kind="stable") call, which merges two runs in a single C pass.
+import heapq
+
+import numpy as np
+
+MIN_RUN = 32
+
+
+def _power(begin_a, begin_b, end_b, n):
+    # Smallest p with floor(mid_a * 2^p / n) != floor(mid_b * 2^p / n), on doubled midpoints
+    a, b = begin_a + begin_b, begin_b + end_b
+    n2 = 2 * n
+    p = 1
+    while (a << p) // n2 == (b << p) // n2:
+        p += 1
+    return p
+
+
+def _find_run(arr, start, n, key):
+    # End of the natural run starting at start (reversing a strictly decreasing one)
+    end = start + 1
+    if end == n:
+        return end
+    if key(arr[end]) < key(arr[start]):
+        while end < n and key(arr[end]) < key(arr[end - 1]):
+            end += 1
+        arr[start:end] = arr[start:end][::-1]
+    else:
+        while end < n and not key(arr[end]) < key(arr[end - 1]):
+            end += 1
+    return end
+
+
+def powersort(arr, key=None):
+    """Sorts the list arr in place (stable) and returns it."""
+    key = key or (lambda x: x)
+    n = len(arr)
+    if n < 2:
+        return arr
+
+    def extend(start, end):
+        # Grow a short run to MIN_RUN elements by binary insertion
+        stop = min(n, start + MIN_RUN)
+        if end < stop:
+            run = arr[start:end]
+            keys = [key(x) for x in run]
+            for x in arr[end:stop]:
+                k = key(x)
+                i = len(keys)
+                while i > 0 and keys[i - 1] > k:  # stable: after equal keys
+                    i -= 1
+                keys.insert(i, k)
+                run.insert(i, x)
+            arr[start:stop] = run
+            end = stop
+        return end
+
+    def merge(lo, mid, hi):
+        arr[lo:hi] = list(heapq.merge(arr[lo:mid], arr[mid:hi], key=key))
+
+    stack = []  # (begin, end, power) of runs waiting to be merged
+    begin = 0
+    end = extend(0, _find_run(arr, 0, n, key))
+    while end < n:
+        next_end = extend(end, _find_run(arr, end, n, key))
+        p = _power(begin, end, next_end, n)
+        while stack and stack[-1][2] > p:
+            left_begin, _, _ = stack.pop()
+            merge(left_begin, begin, end)
+            begin = left_begin
+        stack.append((begin, end, p))
+        begin, end = end, next_end
+    while stack:
+        left_begin, _, _ = stack.pop()
+        merge(left_begin, begin, end)
+        begin = left_begin
+    return arr
+
+
+def merge_sorted(left, right, left_index=None, right_index=None):
+    """Stable merge of two sorted arrays; with index arrays, also returns the merged indices."""
+    # NumPy's stable sort finds the two runs and merges them in one galloping pass
+    keys = np.concatenate((left, right))
+    if left_index is None:
+        return np.sort(keys, kind="stable")
+    order = np.argsort(keys, kind="stable")
+    return keys[order], np.concatenate((left_index, right_index))[order]
+
+
+def runs_of(keys):
+    """Start offsets of the non-decreasing runs of an array (plus len(keys))."""
+    starts = np.flatnonzero(keys[1:] < keys[:-1]) + 1
+    return np.concatenate(([0], starts, [len(keys)]))
+
+
+def powersort_array(keys, argsort=False, min_run=1 << 10):
+    """
+    Sorted copy of a 1-D array, merging its natural runs with the Powersort policy.
+    argsort=True returns (sorted keys, stable permutation) instead.
+    Short runs are combined into blocks of at least min_run elements sorted with np.sort.
+    """
+    n = len(keys)
+    bounds = runs_of(keys).tolist()
+    runs = []
+    i = 0
+    while i < len(bounds) - 1:
+        # Combine consecutive runs until the piece is at least min_run long
+        j = i + 1
+        while j < len(bounds) - 1 and bounds[j] - bounds[i] < min_run:
+            j += 1
+        runs.append((bounds[i], bounds[j], j > i + 1))
+        i = j
+    pieces = []
+    for lo, hi, mixed in runs:
+        index = np.arange(lo, hi)
+        if mixed:
+            order = np.argsort(keys[lo:hi], kind="stable")
+            pieces.append((keys[lo:hi][order], index[order]))
+        else:
+            pieces.append((keys[lo:hi], index))
+    if not pieces:
+        return (keys.copy(), np.arange(0)) if argsort else keys.copy()
+
+    stack = []  # (begin, end, power, keys, index)
+    begin, end = runs[0][0], runs[0][1]
+    current = pieces[0]
+    for (next_begin, next_end, _), piece in zip(runs[1:], pieces[1:]):
+        p = _power(begin, end, next_end, n)
+        while stack and stack[-1][2] > p:
+            left_begin, _, _, left_keys, left_index = stack.pop()
+            current = merge_sorted(left_keys, current[0], left_index, current[1])
+            begin = left_begin
+        stack.append((begin, end, p) + current)
+        begin, end, current = next_begin, next_end, piece
+    while stack:
+        left_begin, _, _, left_keys, left_index = stack.pop()
+        current = merge_sorted(left_keys, current[0], left_index, current[1])
+        begin = left_begin
+    sorted_keys, index = current
+    if sorted_keys is keys:
+        sorted_keys = keys.copy()
+    return (sorted_keys, index) if argsort else sorted_keys
+
 # Example usage:
 # arr = [5, 2, 9, 1, 5, 6]
 # powersort(arr)
-# print(arr)
\ No newline at end of file
+# print(arr)  # [1, 2, 5, 5, 6, 9]
+# powersort_array(np.concatenate([np.arange(5), np.arange(3)]), min_run=1)  # [0 0 1 1 2 2 3 4]
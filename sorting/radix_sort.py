@@ -1,30 +1,159 @@
-# Radix Sort: sorts non-negative integers by processing digits from least to most significant using counting sort.
-
-def counting_sort(arr, exp):
-    output = [0] * len(arr)
-    count = [0] * 9
-    for num in arr:
-        index = (num // exp) % 10
-        count[index] += 1
-    for i in range(1, 10):
-        count[i] += count[i - 1]
-    for i in range(len(arr) - 1, -1, -1):
-        num = arr[i]
-        index = (num // exp) % 10
-        output[count[index]] = num
-        count[index] -= 1
-    return output
-
-def radix_sort(arr):
+# Radix Sort: sorts fixed-width keys digit by digit, from least to most significant, with a stable counting sort per digit.
+# Keys are NumPy arrays and digits are bytes (base 256). Every key is first mapped to an
+# unsigned integer of the same width whose order is the key order: signed ints get their sign
+# bit flipped, IEEE floats get every bit flipped when negative and only the sign bit otherwise.
+# One OR-reduction of key ^ key[0] shows which bits vary anywhere, and every byte where
+# nothing varies is skipped, so e.g. small ints in an int64 array take one or two passes.
+# Each pass is a counting sort of one digit (np.argsort(kind="stable") on uint8 or uint16 is
+# a counting sort in C); digit_bits=16 halves the passes for wide keys. Fixed-width byte
+# strings ("S" arrays) are sorted the same way, one character column at a time;
+# multi-key_quicksort.py and burstsort.py cover variable-length strings (MSD).
+# Lists that no NumPy dtype holds exactly (sort_engine.key_array decides: ints beyond 64
+# bits, or ints next to floats that float64 would round) stay in Python: LSD passes over the
+# digits of the ints' magnitudes, or sorted() once floats are mixed in.
+import importlib.util
+import os
+import sys
+import time
+
+import numpy as np
+
+
+def _load_engine():
+    # One copy of the engine per process, shared by every script that loads it
+    if "sort_engine" in sys.modules:
+        return sys.modules["sort_engine"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sort_engine.py")
+    spec = importlib.util.spec_from_file_location("sort_engine", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+engine = _load_engine()
+
+
+def sortable_bits(keys):
+    """Unsigned integer array whose order (as unsigned) is the order of keys."""
+    keys = np.asarray(keys)
+    kind, size = keys.dtype.kind, keys.dtype.itemsize
+    unsigned = np.dtype(f"u{size}")
+    sign = unsigned.type(1 << (8 * size - 1))
+    if kind in "ub":
+        return keys.view(unsigned)
+    if kind == "i":
+        return keys.view(unsigned) ^ sign
+    if kind == "f":
+        keys = np.where(np.isnan(keys), np.nan, keys)  # one NaN, sorted last
+        keys = np.where(keys == 0, 0, keys).astype(keys.dtype)  # -0.0 and 0.0 are equal keys
+        bits = keys.view(unsigned)
+        flip = np.where(bits & sign, unsigned.type(-1 % (1 << (8 * size))), sign)
+        return bits ^ flip.astype(unsigned)
+    raise TypeError(f"radix sort needs integer, bool or float keys, not {keys.dtype}")
+
+
+def _varying_digits(bits, digit_bits):
+    # Shifts of the digits (least significant first) that are not the same in every key
+    if len(bits) == 0:
+        return []
+    mask = int(np.bitwise_or.reduce(bits ^ bits[0]))
+    ones = (1 << digit_bits) - 1
+    return [s for s in range(0, 8 * bits.dtype.itemsize, digit_bits) if (mask >> s) & ones]
+
+
+def _lsd(keys, digits):
+    # Stable LSD passes; digits[i](keys) is the i-th digit column of the (permuted) keys.
+    # The keys are carried along in sorted order, so every digit is read sequentially.
+    order = np.arange(len(keys))
+    for digit in digits:
+        step = np.argsort(digit(keys), kind="stable")
+        keys, order = keys[step], order[step]
+    return keys, order
+
+
+def radix_argsort(keys, digit_bits=8):
+    """Stable permutation that sorts a 1-D numeric array, by LSD radix sort (8 or 16-bit digits)."""
+    bits = sortable_bits(keys)
+    dtype = np.uint8 if digit_bits == 8 else np.uint16
+    shifts = _varying_digits(bits, digit_bits)
+    return _lsd(bits, [lambda k, s=bits.dtype.type(s): (k >> s).astype(dtype) for s in shifts])[1]
+
+
+def radix_argsort_strings(keys):
+    """Stable permutation that sorts a 1-D "S" array (NUL-padded, so shorter prefixes first)."""
+    keys = np.ascontiguousarray(keys)
+    width = keys.dtype.itemsize
+
+    def column(k, c):
+        return k.view(np.uint8).reshape(len(k), width)[:, c]
+
+    varying = [c for c in range(width) if len(keys) and (column(keys, c) != column(keys, c)[0]).any()]
+    return _lsd(keys, [lambda k, c=c: column(k, c) for c in reversed(varying)])[1]
+
+
+def _lsd_ints(items, magnitude, digit_bits, descending=False):
+    # Stable LSD radix sort of Python ints of any size by magnitude(x) >= 0
+    if not items:
+        return items
+    ones = (1 << digit_bits) - 1
+    for shift in range(0, max(map(magnitude, items)).bit_length(), digit_bits):
+        buckets = [[] for _ in range(ones + 1)]
+        for x in items:
+            buckets[(magnitude(x) >> shift) & ones].append(x)
+        if descending:
+            buckets.reverse()
+        items = [x for bucket in buckets for x in bucket]
+    return items
+
+
+def radix_sort(arr, digit_bits=8):
+    """Sorted copy of arr: a list of numbers (returns a list), or a NumPy numeric or "S" array."""
+    if isinstance(arr, np.ndarray):
+        if arr.dtype.kind == "S":
+            return arr[radix_argsort_strings(arr)]
+        return arr[radix_argsort(arr, digit_bits)]
     if not arr:
         return []
-    max_num = max(arr)
-    exp = 1
-    while max_num // exp > 0:
-        arr = counting_sort(arr, exp)
-        exp *= 10
-    return arr
+    keys = engine.key_array(arr)
+    if keys is not None:
+        return [arr[i] for i in radix_argsort(keys, digit_bits).tolist()]
+    if not all(isinstance(x, (int, np.integer)) for x in arr):
+        return sorted(arr)
+    # Negatives by descending magnitude, then the rest by ascending magnitude
+    negative = _lsd_ints([x for x in arr if x < 0], lambda x: -int(x), digit_bits, descending=True)
+    return negative + _lsd_ints([x for x in arr if x >= 0], int, digit_bits)
+
+
+def benchmark(sizes=(10**6, 10**7), repeat=1):
+    """Time radix_sort against np.sort and sorted() on ints, floats and byte strings."""
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        cases = [
+            ("int64, 0..1e6", rng.integers(0, 10**6, n)),
+            ("int64, full range", rng.integers(-2**63, 2**63 - 1, n)),
+            ("float64", rng.standard_normal(n)),
+            ("S8 strings", rng.integers(97, 123, (n, 8), dtype=np.uint8).view("S8").ravel()),
+        ]
+        print(f"n = {n}")
+        for name, keys in cases:
+            timings = []
+            for label, fn in [("radix", lambda: radix_sort(keys)),
+                              ("radix 16-bit", lambda: radix_sort(keys, 16)),
+                              ("np.sort stable", lambda: np.sort(keys, kind="stable")),
+                              ("np.sort", lambda: np.sort(keys)),
+                              ("sorted()", lambda: sorted(keys.tolist()))]:
+                if label == "sorted()" and n > 10**7:
+                    continue
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    fn()
+                timings.append(f"{label} {(time.perf_counter() - start) / repeat:6.2f} s")
+            print(f"  {name:18s} " + "  ".join(timings))
 
 # Example usage (students can test with their own data):
 # unsorted_list = [170, 45, 75, 90, 802, 24, 2, 66]
-# print(radix_sort(unsorted_list))
\ No newline at end of file
+# print(radix_sort(unsorted_list))  # [2, 24, 45, 66, 75, 90, 170, 802]
+# radix_sort(np.array([3.5, -1.0, -0.5, 2.0]))  # array([-1. , -0.5,  2. ,  3.5])
+# radix_sort(np.array([b"pear", b"fig", b"figs"]))  # array([b'fig', b'figs', b'pear'])
+# benchmark(sizes=(10**6, 10**7, 10**8))
@@ -1,29 +1,40 @@
 # Sample Sort implementation
+# A random sample of buckets * oversample elements is sorted and every oversample-th element
+# becomes a splitter; each element goes to the bucket between its two splitters (binary
+# search), or to the "equal" bucket of a splitter it matches, so runs of equal keys are never
+# split again. Buckets are sorted recursively and concatenated. sort_engine.py runs the same
+# scheme over NumPy arrays with the buckets sorted in a process pool.
 import random
+from bisect import bisect_left
 
-def sample_sort(arr, sample_size=5):
+def sample_sort(arr, buckets=16, oversample=8, small=32):
     """
-    Implements Sample Sort: pick sample elements, choose pivot,
-    partition into less, equal, greater buckets, recursively sort.
+    Implements Sample Sort: pick buckets - 1 splitters from a sorted random sample,
+    distribute the elements into the buckets between them, recursively sort.
+    Lists of at most `small` elements are sorted directly.
     """
     # Base case
-    if len(arr) <= 1:
-        return arr
-    sample = random.sample(arr, sample_size)
-    sample.sort()
-    pivot = sample[sample_size // 2]
+    if len(arr) <= small:
+        return sorted(arr)
+    sample = sorted(random.choices(arr, k=buckets * oversample))
+    splitters = sorted(set(sample[oversample::oversample]))
+    if not splitters:
+        return sorted(arr)
 
-    less, equal, greater = [], [], []
+    # Bucket 2i: keys between splitters i-1 and i; bucket 2i+1: keys equal to splitter i
+    parts = [[] for _ in range(2 * len(splitters) + 1)]
     for x in arr:
-        if x <= pivot:
-            less.append(x)
+        i = bisect_left(splitters, x)
+        if i < len(splitters) and not x < splitters[i]:
+            parts[2 * i + 1].append(x)
         else:
-            greater.append(x)
+            parts[2 * i].append(x)
 
-    sorted_less = sample_sort(less, sample_size)
-    sorted_greater = sample_sort(greater, sample_size)
-    return sorted_less + sorted_greater
+    result = []
+    for b, part in enumerate(parts):
+        result.extend(part if b % 2 else sample_sort(part, buckets, oversample, small))
+    return result
 
 if __name__ == "__main__":
     data = [5, 3, 8, 4, 2, 7, 1, 6]
-    print(sample_sort(data))
\ No newline at end of file
+    print(sample_sort(data))
@@ -0,0 +1,287 @@
+# Sort engine: picks a sorting strategy from the type of the keys.
+#  - Fixed-width keys (NumPy integer, float, bool, datetime, bytes/str arrays, or Python lists
+#    whose keys convert to a numeric array without rounding) are sorted by NumPy: kind="stable" is radix sort
+#    for 8/16-bit integers and a run-adaptive timsort otherwise; stable=False allows the
+#    faster (SIMD) introsort, which is also used whenever bare values are sorted. Lists are
+#    sorted through argsort, so the original objects come back.
+#  - Other keys fall back to list.sort, which merges natural runs with the Powersort policy
+#    (CPython 3.11+; see powersort.py for the same policy in Python).
+#  - parallel_sample_sort splits a large array into buckets between sampled splitters (a
+#    16-bit radix pass) and sorts the buckets in a process pool over shared memory; the
+#    buckets are already in order, so concatenating them is the merge.
+#  - external_sort spills sorted runs to disk and k-way merges them with heapq.merge;
+#    external_sort_array does the same for a numeric column with a vectorized block merge
+#    into an array or memory-mapped .npy file.
+# Every mode can return the permutation (argsort) instead, and reverse=True keeps equal
+# keys in their original order, like sorted(..., reverse=True).
+import heapq
+import itertools
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+
+FIXED_WIDTH = "biufmMSU"  # dtype kinds NumPy sorts natively
+PARALLEL_MIN = 1 << 20  # smaller arrays are sorted in this process
+PICKLE_BLOCK = 1 << 12  # items per pickle record in a spilled run
+
+_STATE = None  # the attached arrays inside a pool worker
+
+
+def key_array(data, key=None):
+    """The sort keys as a 1-D NumPy array when they have a fixed-width dtype, else None."""
+    if isinstance(data, np.ndarray) and key is None:
+        keys = data
+    else:
+        values = data if key is None else [key(x) for x in data]
+        if values and not isinstance(values[0], (int, float, bool, np.generic)):
+            return None  # strings, tuples, ...: not worth converting
+        try:
+            keys = np.asarray(values)
+        except (ValueError, TypeError, OverflowError):
+            return None
+        if keys.dtype.kind not in "biuf":
+            return None
+        if keys.dtype.kind == "f" and not _exact(keys, values):
+            return None  # ints that float64 rounds (e.g. 2**60 + 1 next to a float)
+    return keys if keys.ndim == 1 and keys.dtype.kind in FIXED_WIDTH else None
+
+
+def _exact(keys, values):
+    # Whether a float array holds every value unchanged: only magnitudes from 2**53 up can
+    # have been rounded, and Python compares int and float exactly
+    for i in np.flatnonzero(np.abs(keys) >= 2.0 ** 53).tolist():
+        value = values[i].item() if isinstance(values[i], np.generic) else values[i]
+        if value != keys[i].item():
+            return False
+    return True
+
+
+def _argsort_keys(keys, stable, workers):
+    if workers > 1 and len(keys) >= PARALLEL_MIN:
+        return parallel_sample_sort(keys, workers, argsort=True)
+    return np.argsort(keys, kind="stable" if stable else "quicksort")
+
+
+def argsort(data, key=None, reverse=False, stable=True, workers=1):
+    """Permutation (int64 array) that sorts data; stable and reverse as in sorted()."""
+    keys = key_array(data, key)
+    if keys is None:
+        get = data.__getitem__ if key is None else (lambda i: key(data[i]))
+        return np.array(sorted(range(len(data)), key=get, reverse=reverse), dtype=np.int64)
+    if reverse:
+        # Sort the reversed keys ascending, then read the result backwards
+        return (len(keys) - 1 - _argsort_keys(keys[::-1], stable, workers))[::-1]
+    return _argsort_keys(keys, stable, workers)
+
+
+def sort(data, key=None, reverse=False, stable=True, workers=1):
+    """Sorted copy of data: an array for array input, otherwise a list."""
+    keys = key_array(data, key)
+    if keys is None:
+        return sorted(data, key=key, reverse=reverse)
+    if isinstance(data, np.ndarray) and key is None:
+        # Equal values are interchangeable, so stability is moot and the (SIMD) introsort is used
+        if workers > 1 and len(data) >= PARALLEL_MIN:
+            result = parallel_sample_sort(data, workers)
+        else:
+            result = np.sort(data)
+        return result[::-1].copy() if reverse else result
+    order = argsort(data, key, reverse, stable, workers)
+    if isinstance(data, np.ndarray):
+        return data[order]
+    return [data[i] for i in order.tolist()]
+
+
+def _attach(spec):
+    global _STATE
+    segments = {name: shared_memory.SharedMemory(name=shm_name) for name, (shm_name, _, _) in spec.items()}
+    _STATE = SimpleNamespace(_segments=segments, **{
+        name: np.ndarray(shape, dtype=dtype, buffer=segments[name].buf)
+        for name, (_, dtype, shape) in spec.items()})
+
+
+def _sort_bucket(lo, hi):
+    st = _STATE
+    if hasattr(st, "index"):
+        order = np.argsort(st.keys[lo:hi], kind="stable")
+        st.index[lo:hi] = st.index[lo:hi][order]
+    else:
+        st.keys[lo:hi].sort()
+
+
+def parallel_sample_sort(keys, workers=None, argsort=False, oversample=128, seed=0):
+    """
+    Sorted copy of a 1-D array (or its stable argsort) by sample sort over a process pool.
+    Buckets: 4 per worker, bounded by splitters drawn from a random sample of the keys.
+    """
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    n = len(keys)
+    buckets = min(4 * workers, 1 << 16)
+    rng = np.random.default_rng(seed)
+    sample = np.sort(keys[rng.integers(0, n, buckets * oversample)]) if n else keys[:0]
+    splitters = sample[oversample::oversample][:buckets - 1]
+    bucket = np.searchsorted(splitters, keys, side="right").astype(np.uint16)
+    order = np.argsort(bucket, kind="stable")  # radix sort; keeps input order inside a bucket
+    bounds = np.zeros(buckets + 1, dtype=np.int64)
+    np.cumsum(np.bincount(bucket, minlength=buckets), out=bounds[1:])
+    arrays = {"keys": keys[order]}
+    if argsort:
+        arrays["index"] = order.astype(np.int64)
+    tasks = [(lo, hi) for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()) if hi - lo > 1]
+    if workers <= 1:
+        state = SimpleNamespace(**arrays)
+        global _STATE
+        saved, _STATE = _STATE, state
+        try:
+            for task in tasks:
+                _sort_bucket(*task)
+        finally:
+            _STATE = saved
+        return state.index if argsort else state.keys
+    segments, spec, views = [], {}, {}
+    try:
+        for name, array in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            segments.append(shm)
+            views[name] = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+            views[name][:] = array
+            spec[name] = (shm.name, array.dtype.str, array.shape)
+        del arrays
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(spec,)) as pool:
+            # Largest buckets first, so a big one does not finish last
+            tasks.sort(key=lambda t: t[0] - t[1])
+            list(pool.map(_sort_bucket, *zip(*tasks)) if tasks else ())
+        return views["index" if argsort else "keys"].copy()
+    finally:
+        views = None
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+
+def _chunks(items, size):
+    if isinstance(items, np.ndarray):
+        for lo in range(0, len(items), size):
+            yield np.array(items[lo:lo + size])
+        return
+    it = iter(items)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _read_run(path):
+    if path.endswith(".npy"):
+        run = np.load(path, mmap_mode="r")
+        for lo in range(0, len(run), PICKLE_BLOCK):
+            yield from run[lo:lo + PICKLE_BLOCK].tolist()
+        return
+    with open(path, "rb") as f:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            yield from block
+
+
+def external_sort(items, key=None, reverse=False, run_size=1 << 20, directory=None):
+    """
+    Iterator over items in sorted order (stable), holding at most run_size items in memory:
+    sorted runs are spilled to a temporary directory and k-way merged with heapq.merge.
+    """
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        paths = []
+        for chunk in _chunks(items, run_size):
+            run = sort(chunk, key=key, reverse=reverse)
+            path = os.path.join(tmp, f"run{len(paths)}")
+            if isinstance(run, np.ndarray):
+                path += ".npy"
+                np.save(path, run)
+            else:
+                with open(path, "wb") as f:
+                    for lo in range(0, len(run), PICKLE_BLOCK):
+                        pickle.dump(run[lo:lo + PICKLE_BLOCK], f, pickle.HIGHEST_PROTOCOL)
+            paths.append(path)
+            del run, chunk
+        yield from heapq.merge(*map(_read_run, paths), key=key, reverse=reverse)
+
+
+def external_sort_array(values, out=None, run_size=1 << 24, block=1 << 20, workers=1, directory=None):
+    """
+    Sort a numeric column (array or memmap) that need not fit in memory.
+    Sorted runs of run_size go to .npy files; the merge repeatedly takes, from every run's
+    next block, the elements not above the smallest block maximum, and sorts just those.
+    out: array, memmap or .npy path (opened as a memmap); a new array if None.
+    """
+    n = len(values)
+    if isinstance(out, str):
+        out = np.lib.format.open_memmap(out, mode="w+", dtype=values.dtype, shape=(n,))
+    if out is None:
+        out = np.empty(n, dtype=values.dtype)
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        runs = []
+        for i, chunk in enumerate(_chunks(values, run_size)):
+            path = os.path.join(tmp, f"run{i}.npy")
+            np.save(path, sort(chunk, workers=workers))
+            runs.append(np.load(path, mmap_mode="r"))
+        position = [0] * len(runs)
+        written = 0
+        while written < n:
+            heads = [(i, run[position[i]:position[i] + block]) for i, run in enumerate(runs)
+                     if position[i] < len(run)]
+            # every run has passed this key; np.sort keeps NaN last, as the runs do
+            limit = np.sort(np.array([head[-1] for _, head in heads]))[0]
+            parts = []
+            for i, head in heads:
+                take = int(np.searchsorted(head, limit, side="right"))
+                parts.append(head[:take])
+                position[i] += take
+            merged = np.sort(np.concatenate(parts), kind="stable")
+            out[written:written + len(merged)] = merged
+            written += len(merged)
+        del runs
+    return out
+
+
+def benchmark(n=1 << 24, workers=None):
+    """Time the engine against np.sort and sorted() on a float column and a list of ints."""
+    workers = workers or os.cpu_count() or 1
+    rng = np.random.default_rng(0)
+    column = rng.random(n)
+    print(f"{n} float64 keys, {os.cpu_count()} CPUs")
+    for name, fn in [
+        ("np.sort (quicksort)", lambda: np.sort(column)),
+        ("sort", lambda: sort(column)),
+        ("argsort stable", lambda: argsort(column)),
+        (f"sample sort, {workers} workers", lambda: parallel_sample_sort(column, workers)),
+        (f"sample argsort, {workers} workers", lambda: parallel_sample_sort(column, workers, argsort=True)),
+        ("external, 8 runs", lambda: external_sort_array(column, run_size=n // 8)),
+    ]:
+        start = time.perf_counter()
+        fn()
+        print(f"  {name:28s} {time.perf_counter() - start:7.2f} s")
+    items = rng.integers(0, 1 << 40, n // 16).tolist()
+    print(f"{len(items)} Python ints")
+    for name, fn in [("sorted()", lambda: sorted(items)), ("sort", lambda: sort(items)),
+                     ("external_sort, 8 runs", lambda: list(external_sort(items, run_size=len(items) // 8)))]:
+        start = time.perf_counter()
+        fn()
+        print(f"  {name:28s} {time.perf_counter() - start:7.2f} s")
+
+# Example usage:
+if __name__ == "__main__":
+    print(sort([5, 2, 9, 1, 5, 6], reverse=True))  # [9, 6, 5, 5, 2, 1]
+    print(argsort(np.array([3.0, 1.0, 2.0, 1.0])))  # [1 3 2 0]
+    print(sort(["pear", "fig", "apple"], key=len))  # ['fig', 'pear', 'apple']
+    print(list(external_sort(range(10, 0, -1), run_size=3)))
+    print(external_sort_array(np.array([1, 2, np.nan, 5, 6, 7, 8, 9, 10.]), run_size=3, block=2))  # NaN last
+    benchmark(n=1 << 22)
@@ -0,0 +1,188 @@
+# Sorting-network engine shared by bitonic_sorter, batcher_oddeven_mergesort,
+# pairwise_sorting_network and oddeven_sort.
+# A network is a fixed list of comparators (i, j), i < j, each putting the smaller key on
+# wire i. Since the comparators do not depend on the data, one network sorts many rows at
+# once: the batch is transposed so every wire is a contiguous row, and each comparator
+# becomes np.minimum / np.maximum over whole rows. The batch goes through in column chunks
+# that fit in L2, so all wires of a chunk stay in cache for the whole network.
+# Networks are generated for the next power of two and the comparators touching wires >= n
+# are dropped (padding with +inf keys would never move), then cached per (kind, n).
+# Payload arrays (e.g. record ids, or column indices for argsort_rows) can ride along;
+# payloads wider than 8 bytes (complex128, records, objects) are permuted afterwards by
+# column index. Networks are not stable, so equal keys may come out in any order.
+import functools
+import time
+
+import numpy as np
+
+NETWORKS = ("bitonic", "batcher", "pairwise", "transposition")
+L2_BYTES = 1 << 20  # working set aimed at for one chunk of rows
+
+
+def _bitonic(p):
+    # All comparators ascending: each merge starts by comparing i with its mirror image
+    network = []
+    k = 2
+    while k <= p:
+        network += [(i, i ^ (k - 1)) for i in range(p) if i ^ (k - 1) > i]
+        j = k // 4
+        while j:
+            network += [(i, i ^ j) for i in range(p) if i ^ j > i]
+            j //= 2
+        k *= 2
+    return network
+
+
+def _batcher(p):
+    # Batcher's odd-even merge sort (iterative form, after Knuth 5.3.4)
+    network = []
+    q = 1
+    while q < p:
+        k = q
+        while k:
+            for j in range(k % q, p - k, 2 * k):
+                for i in range(min(k, p - j - k)):
+                    if (i + j) // (2 * q) == (i + j + k) // (2 * q):
+                        network.append((i + j, i + j + k))
+            k //= 2
+        q *= 2
+    return network
+
+
+def _pairwise(p):
+    # Parberry's pairwise sorting network: sort pairs, then merge them level by level
+    network = []
+    a = 1
+    while a < p:
+        b, c = a, 0
+        while b < p:
+            network.append((b - a, b))
+            b, c = b + 1, c + 1
+            if c >= a:
+                b, c = b + a, 0
+        a *= 2
+    a //= 4
+    e = 1
+    while a:
+        d = e
+        while d:
+            b, c = (d + 1) * a, 0
+            while b < p:
+                network.append((b - d * a, b))
+                b, c = b + 1, c + 1
+                if c >= a:
+                    b, c = b + a, 0
+            d //= 2
+        a //= 2
+        e = 2 * e + 1
+    return network
+
+
+@functools.lru_cache(maxsize=None)
+def comparators(kind, n):
+    """The comparators (i, j) of a sorting network for n keys, as a tuple."""
+    if kind == "transposition":
+        return tuple((i, i + 1) for r in range(n) for i in range(r % 2, n - 1, 2))
+    generators = {"bitonic": _bitonic, "batcher": _batcher, "pairwise": _pairwise}
+    if kind not in generators:
+        raise ValueError(f"network must be one of {NETWORKS}, not {kind!r}")
+    p = 1 << max(0, n - 1).bit_length()
+    return tuple((i, j) for i, j in generators[kind](p) if j < n)
+
+
+def _swappable(payload):
+    # Payloads _apply can swap through an unsigned integer view of their bits
+    return payload.itemsize in (1, 2, 4, 8) and not payload.dtype.hasobject
+
+
+def _apply(network, keys, payloads):
+    # Run the comparators over wire-major buffers (one contiguous row per wire)
+    # Payloads are swapped through their bits: d = (p[i] ^ p[j]) * swap; p[i] ^= d; p[j] ^= d
+    if not network:
+        return  # width 0 or 1: nothing to compare
+    low = np.empty_like(keys[0])
+    swap = np.empty(keys.shape[1], dtype=bool)
+    payloads = [p.view(f"u{p.itemsize}") for p in payloads]
+    diff = [np.empty_like(p[0]) for p in payloads]
+    for i, j in network:
+        a, b = keys[i], keys[j]
+        if payloads:
+            np.less(b, a, out=swap)
+            for p, d in zip(payloads, diff):
+                np.bitwise_xor(p[i], p[j], out=d)
+                np.multiply(d, swap, out=d)
+                p[i] ^= d
+                p[j] ^= d
+        np.minimum(a, b, out=low)
+        np.maximum(a, b, out=b)
+        a[...] = low
+
+
+def sort_rows(keys, network="batcher", payload=(), out=None):
+    """
+    Sort every row of a 2-D array (batch x width) with one sorting network.
+    payload: array or tuple of arrays shaped like keys, permuted along with the keys.
+    Returns the sorted keys, or (keys, payloads...) when a payload is given.
+    """
+    keys = np.asarray(keys)
+    if keys.ndim != 2:
+        raise ValueError("keys must be a 2-D array (batch x width)")
+    if keys.dtype.kind == "f" and np.isnan(keys).any():
+        raise ValueError("NaN keys cannot go through np.minimum / np.maximum comparators")
+    single = isinstance(payload, np.ndarray)
+    payloads = [np.asarray(p) for p in ((payload,) if single else payload)]
+    batch, width = keys.shape
+    net = comparators(network, width)
+    out = np.empty_like(keys) if out is None else out
+    # Payloads that cannot be swapped bitwise follow a column index instead
+    wide = not all(map(_swappable, payloads))
+    direct = [p for p in payloads if _swappable(p)]
+    if wide:
+        direct.append(np.broadcast_to(np.arange(width, dtype=np.intp), keys.shape))
+    carried = [np.empty_like(p) for p in direct]
+    row_bytes = width * (keys.itemsize + sum(p.itemsize for p in direct))
+    step = max(256, L2_BYTES // max(1, row_bytes))
+    for lo in range(0, batch, step):
+        k = np.ascontiguousarray(keys[lo:lo + step].T)
+        ps = [np.ascontiguousarray(p[lo:lo + step].T) for p in direct]
+        _apply(net, k, ps)
+        out[lo:lo + step] = k.T
+        for dest, p in zip(carried, ps):
+            dest[lo:lo + step] = p.T
+    if wide:
+        order = carried.pop()
+        swapped = iter(carried)
+        carried = [next(swapped) if _swappable(p) else np.take_along_axis(p, order, axis=1)
+                   for p in payloads]
+    return (out, *carried) if payloads else out
+
+
+def argsort_rows(keys, network="batcher"):
+    """Per-row permutations (batch x width, int32) that sort every row of keys."""
+    keys = np.asarray(keys)
+    index = np.broadcast_to(np.arange(keys.shape[1], dtype=np.int32), keys.shape)
+    return sort_rows(keys, network, index)[1]
+
+
+def benchmark(batch=1 << 20, widths=(8, 16, 32, 64)):
+    """Time every network against np.sort / np.argsort along axis 1."""
+    rng = np.random.default_rng(0)
+    for width in widths:
+        keys = rng.random((batch, width))
+        results = []
+        for name, fn in [("np.sort", lambda: np.sort(keys, axis=1)),
+                         ("np.argsort", lambda: np.argsort(keys, axis=1))] + \
+                        [(kind, lambda kind=kind: sort_rows(keys, kind)) for kind in NETWORKS] + \
+                        [("batcher argsort", lambda: argsort_rows(keys))]:
+            start = time.perf_counter()
+            fn()
+            results.append(f"{name} {time.perf_counter() - start:5.2f} s")
+        print(f"{batch} x {width}: " + "  ".join(results))
+
+# Example usage:
+if __name__ == "__main__":
+    windows = np.array([[5, 2, 9, 1, 5, 6, 3, 8], [1, 2, 3, 4, 8, 7, 6, 5]])
+    print(sort_rows(windows))  # each row sorted
+    print(argsort_rows(windows, "bitonic"))
+    print({kind: len(comparators(kind, 16)) for kind in NETWORKS})
+    benchmark(batch=1 << 18)
@@ -1,5 +1,8 @@
 # Timsort: a hybrid sorting algorithm using insertion sort for small runs and merge sort for large runs
-import math
+# Natural runs are found left to right (strictly descending ones are reversed), short runs are
+# extended to minrun by insertion sort, and runs wait on a stack whose lengths are kept
+# Fibonacci-like (A > B + C and B > C for the top three), so merges stay balanced. Powersort
+# (powersort.py) replaces this policy in CPython 3.11+.
 
 def _minrun(n):
     r = 0
@@ -13,7 +16,7 @@ def _insertion_sort(a, left, right):
     for i in range(left + 1, right + 1):
         key = a[i]
         j = i - 1
-        while j >= left and a[j] < key:
+        while j >= left and a[j] > key:
             a[j + 1] = a[j]
             j -= 1
         a[j + 1] = key
@@ -36,35 +39,47 @@ def _merge(a, left, mid, right):
         i += 1
         k += 1
 
+def _merge_collapse(a, runs, force=False):
+    # runs: stack of (start, end) with inclusive ends; merge until the invariants hold
+    while len(runs) > 1:
+        n = len(runs) - 2
+        length = [e - s + 1 for s, e in runs]
+        if force:
+            pass
+        elif (n > 0 and length[n - 1] <= length[n] + length[n + 1]) or \
+                (n > 1 and length[n - 2] <= length[n - 1] + length[n]):
+            if length[n - 1] < length[n + 1]:
+                n -= 1
+        elif length[n] > length[n + 1]:
+            return
+        (left, mid), (_, right) = runs[n], runs[n + 1]
+        _merge(a, left, mid, right)
+        runs[n:n + 2] = [(left, right)]
+
 def timsort(a):
     n = len(a)
     minrun = _minrun(n)
     runs = []
     i = 0
-    # Identify runs
     while i < n:
         run_start = i
         i += 1
-        # Ascending run
-        while i < n and a[i - 1] <= a[i]:
-            i += 1
+        if i < n and a[i] < a[i - 1]:
+            # Strictly descending run: reversing it keeps the sort stable
+            while i < n and a[i] < a[i - 1]:
+                i += 1
+            a[run_start:i] = a[run_start:i][::-1]
+        else:
+            while i < n and a[i - 1] <= a[i]:
+                i += 1
         run_end = i - 1
         if run_end - run_start + 1 < minrun:
             run_end = min(run_start + minrun - 1, n - 1)
             _insertion_sort(a, run_start, run_end)
+            i = run_end + 1
         runs.append((run_start, run_end))
-    # Merge runs
-    while len(runs) > 1:
-        new_runs = []
-        for j in range(0, len(runs), 2):
-            if j + 1 < len(runs):
-                left, mid = runs[j]
-                mid_end, right = runs[j + 1]
-                _merge(a, left, mid, right)
-                new_runs.append((left, right))
-            else:
-                new_runs.append(runs[j])
-        runs = new_runs
+        _merge_collapse(a, runs)
+    _merge_collapse(a, runs, force=True)
     return a
 
 if __name__ == "__main__":